@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Script to re-run recurring charge detection for many users.
+
+Used after a detection model change. Users are processed across a process
+pool by RecurringChargeDetectionConsumer.backfill; finished users are
+recorded in a checkpoint file, so re-running the same command resumes an
+interrupted backfill and retries users that failed.
+
+Usage:
+    python3 backfill_recurring_charges.py [--user-id USER_ID ...] [--users-file PATH]
+                                          [--checkpoint PATH] [--workers N]
+
+Options:
+    --user-id            Only backfill this user (may be repeated)
+    --users-file         File with one user ID per line
+    --checkpoint         Checkpoint file (default: recurring_charge_backfill.checkpoint)
+    --workers            Worker processes (default: CPU count)
+    --min-occurrences    Minimum occurrences to form a pattern (default: 3)
+    --min-confidence     Minimum pattern confidence (default: 0.6)
+
+Without --user-id or --users-file, every user that owns an account is backfilled.
+"""
+
+import sys
+import os
+import argparse
+import logging
+from typing import List, Set
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Set up environment variables for DynamoDB tables
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+PROJECT_NAME = 'housef3'
+
+# Set default table names if not already set
+os.environ.setdefault('ACCOUNTS_TABLE', f'{PROJECT_NAME}-{ENVIRONMENT}-accounts')
+os.environ.setdefault('TRANSACTIONS_TABLE', f'{PROJECT_NAME}-{ENVIRONMENT}-transactions')
+os.environ.setdefault('RECURRING_CHARGE_PATTERNS_TABLE', f'{PROJECT_NAME}-{ENVIRONMENT}-recurring-charge-patterns')
+os.environ.setdefault('RECURRING_CHARGE_PREDICTIONS_TABLE', f'{PROJECT_NAME}-{ENVIRONMENT}-recurring-charge-predictions')
+os.environ.setdefault('FILE_STORAGE_BUCKET', f'{PROJECT_NAME}-{ENVIRONMENT}-file-storage')
+
+from utils.db.base import tables
+from consumers.recurring_charge_detection_consumer import RecurringChargeDetectionConsumer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def scan_all_user_ids() -> Set[str]:
+    """
+    Collect the IDs of all users that own at least one account.
+
+    Returns:
+        Set of user IDs
+    """
+    logger.info("Scanning accounts for user IDs...")
+
+    accounts_table = tables.accounts
+    scan_params = {'ProjectionExpression': 'userId'}
+    user_ids: Set[str] = set()
+
+    while True:
+        response = accounts_table.scan(**scan_params)
+        user_ids.update(item['userId'] for item in response.get('Items', []) if item.get('userId'))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    logger.info(f"Found {len(user_ids)} users")
+    return user_ids
+
+
+def read_user_ids(path: str) -> List[str]:
+    """Read one user ID per line, ignoring blank lines."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    """Main function to backfill recurring charge detection."""
+    parser = argparse.ArgumentParser(description='Re-run recurring charge detection for many users')
+    parser.add_argument('--user-id', type=str, action='append',
+                       help='Only backfill this user (may be repeated)')
+    parser.add_argument('--users-file', type=str,
+                       help='File with one user ID per line')
+    parser.add_argument('--checkpoint', type=str, default='recurring_charge_backfill.checkpoint',
+                       help='Checkpoint file recording finished users')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (default: CPU count)')
+    parser.add_argument('--min-occurrences', type=int, default=3,
+                       help='Minimum occurrences to form a pattern')
+    parser.add_argument('--min-confidence', type=float, default=0.6,
+                       help='Minimum pattern confidence')
+
+    args = parser.parse_args()
+
+    logger.info("Starting recurring charge detection backfill")
+
+    try:
+        user_ids = list(args.user_id or [])
+        if args.users_file:
+            user_ids.extend(read_user_ids(args.users_file))
+        if not user_ids:
+            user_ids = sorted(scan_all_user_ids())
+
+        summary = RecurringChargeDetectionConsumer().backfill(
+            user_ids,
+            checkpoint_path=args.checkpoint,
+            max_workers=args.workers,
+            min_occurrences=args.min_occurrences,
+            min_confidence=args.min_confidence,
+        )
+
+        logger.info(
+            f"Backfilled {summary['users']} users ({summary['skipped']} already done): "
+            f"{summary['patterns']} patterns, {summary['predictions']} predictions"
+        )
+
+        if summary['failed'] > 0:
+            logger.warning(f"{summary['failed']} users failed - re-run to retry them")
+            sys.exit(1)
+
+    except Exception as e:
+        logger.error(f"Script failed with error: {str(e)}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
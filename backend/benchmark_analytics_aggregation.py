@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the analytics engine's period aggregation.
+
+Compares the pure Python aggregation with the columnar NumPy backend
+(services/analytics_columnar.py) on synthetic transaction summaries. The
+columnar time is split into loading the arrays from the summaries and the
+vectorized group-bys themselves. No AWS access needed.
+
+Usage:
+    python benchmark_analytics_aggregation.py [--rows 50000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+from typing import Callable, List
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from models.transaction import TransactionSummary
+from services import analytics_columnar
+from services.analytics_computation_engine import AnalyticsComputationEngine
+
+USER_ID = 'benchmark-user'
+
+
+def build_transactions(rows: int) -> List[TransactionSummary]:
+    """Build summaries spread over two years, 4 accounts and 20 categories."""
+    rng = random.Random(42)
+    account_ids = [f'account-{i}' for i in range(4)]
+    category_ids = [f'category-{i}' for i in range(20)]
+    base_date = 1672531200000  # 2023-01-01
+    return [
+        TransactionSummary(
+            transaction_id=str(i),
+            account_id=account_ids[i % len(account_ids)],
+            date=base_date + rng.randrange(0, 730) * 86400000,
+            amount=Decimal(rng.randrange(-20000, 10000)).scaleb(-2),
+            transaction_type=rng.choice(['DEBIT', 'CREDIT', None]),
+            primary_category_id=category_ids[i % len(category_ids)],
+            category_ids=(category_ids[i % len(category_ids)],)
+        )
+        for i in range(rows)
+    ]
+
+
+def best_seconds(run: Callable[[], object], repeat: int) -> float:
+    """Best wall time over several runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000, help='Number of synthetic transactions')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend (best is reported)')
+    args = parser.parse_args()
+
+    if not analytics_columnar.NUMPY_AVAILABLE:
+        sys.exit("NumPy is not installed - install requirements-ml.txt to run this benchmark")
+
+    transactions = build_transactions(args.rows)
+    engine = AnalyticsComputationEngine()
+    engine._transfer_category_cache[USER_ID] = {'category-0'}
+
+    transfer_category_ids = engine._get_transfer_category_ids(USER_ID)
+    columns = analytics_columnar.TransactionColumns.from_summaries(transactions)
+
+    with patch.object(analytics_columnar, 'aggregate_period', return_value=None):
+        python_seconds = best_seconds(lambda: engine._aggregate_transactions(USER_ID, transactions), args.repeat)
+    load_seconds = best_seconds(
+        lambda: analytics_columnar.TransactionColumns.from_summaries(transactions), args.repeat
+    )
+    group_seconds = best_seconds(
+        lambda: analytics_columnar.aggregate_columns(columns, transfer_category_ids), args.repeat
+    )
+    columnar_seconds = load_seconds + group_seconds
+
+    print(f"Rows: {args.rows}, best of {args.repeat}")
+    print(f"{'Step':<24}{'seconds':>10}")
+    print(f"{'Python aggregation':<24}{python_seconds:>10.3f}")
+    print(f"{'Columnar load':<24}{load_seconds:>10.3f}")
+    print(f"{'Columnar group-bys':<24}{group_seconds:>10.3f}")
+    print(f"Group-by speedup: {python_seconds / group_seconds:.1f}x")
+    print(f"End-to-end speedup: {python_seconds / columnar_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark category rule matching.
+
+Compares rule-by-rule matching (CategoryRuleEngine.rule_matches_transaction
+for every effective rule) with the compiled rule set from
+services/category_rule_matcher.py on synthetic categories and transactions.
+No AWS access needed.
+
+Usage:
+    python benchmark_category_rules.py [--categories 50] [--rules 10] [--transactions 2000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from decimal import Decimal
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from models.category import Category, CategoryRule, CategoryType, MatchCondition
+from models.transaction import Transaction
+from services.category_rule_engine import CategoryRuleEngine
+
+USER_ID = 'benchmark-user'
+MERCHANTS = ['TESCO', 'SAINSBURYS', 'AMAZON', 'NETFLIX', 'SHELL', 'TFL', 'UBER', 'DELIVEROO', 'BOOTS', 'ARGOS']
+
+
+def build_categories(count: int, rules_per_category: int, rng: random.Random):
+    text_conditions = [MatchCondition.CONTAINS, MatchCondition.STARTS_WITH,
+                       MatchCondition.ENDS_WITH, MatchCondition.EQUALS]
+    categories = []
+    for i in range(count):
+        rules = []
+        for j in range(rules_per_category):
+            merchant = f"{rng.choice(MERCHANTS)}{rng.randrange(100)}"
+            if j % 5 == 4:
+                rule = CategoryRule(fieldToMatch='description', condition=MatchCondition.REGEX,
+                                    value=rf"{merchant}\s+\d+")
+            elif j % 7 == 6:
+                low = Decimal(rng.randrange(0, 200))
+                rule = CategoryRule(fieldToMatch='amount', condition=MatchCondition.AMOUNT_BETWEEN,
+                                    value='', amountMin=low, amountMax=low + 50)
+            else:
+                rule = CategoryRule(fieldToMatch='description', condition=rng.choice(text_conditions),
+                                    value=merchant)
+            rules.append(rule)
+        categories.append(Category(userId=USER_ID, name=f'Category {i}', type=CategoryType.EXPENSE, rules=rules))
+    return categories
+
+
+def build_transactions(count: int, rng: random.Random):
+    return [
+        Transaction(
+            userId=USER_ID, fileId=uuid.uuid4(), accountId=uuid.uuid4(), date=1704067200000,
+            description=f"CARD PAYMENT {rng.choice(MERCHANTS)}{rng.randrange(100)} {rng.randrange(10000)} LONDON GB",
+            amount=Decimal(rng.randrange(-30000, 30000)).scaleb(-2)
+        )
+        for _ in range(count)
+    ]
+
+
+def rule_by_rule(engine: CategoryRuleEngine, transactions, categories) -> int:
+    hierarchy = engine.build_category_hierarchy(categories)
+    matches = 0
+    for transaction in transactions:
+        for category in categories:
+            for rule in engine.get_effective_rules(category, categories, hierarchy):
+                if rule.auto_suggest and engine.rule_matches_transaction(rule, transaction):
+                    matches += 1
+                    if not rule.allow_multiple_matches:
+                        break
+    return matches
+
+
+def compiled(engine: CategoryRuleEngine, transactions, categories) -> int:
+    compiled_rules = engine.compile_rules(categories)
+    return sum(len(compiled_rules.categorize(transaction)) for transaction in transactions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--categories', type=int, default=50, help='Number of categories')
+    parser.add_argument('--rules', type=int, default=10, help='Rules per category')
+    parser.add_argument('--transactions', type=int, default=2000, help='Number of transactions')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(42)
+    categories = build_categories(args.categories, args.rules, rng)
+    transactions = build_transactions(args.transactions, rng)
+    engine = CategoryRuleEngine()
+
+    start = time.perf_counter()
+    expected = rule_by_rule(engine, transactions, categories)
+    rule_by_rule_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = compiled(engine, transactions, categories)
+    compiled_seconds = time.perf_counter() - start
+
+    assert actual == expected, f"match counts differ: {actual} != {expected}"
+    print(f"Rules: {args.categories * args.rules}, transactions: {args.transactions}, matches: {actual}")
+    print(f"{'Matcher':<16}{'seconds':>10}")
+    print(f"{'Rule by rule':<16}{rule_by_rule_seconds:>10.3f}")
+    print(f"{'Compiled':<16}{compiled_seconds:>10.3f}")
+    print(f"Speedup: {rule_by_rule_seconds / compiled_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
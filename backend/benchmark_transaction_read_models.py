@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark deserialization of DynamoDB transaction items.
+
+Compares rows/sec of the full Transaction model (Transaction.from_dynamodb_item
+on whole items) with the TransactionSummary read model (on items projected to
+TRANSACTION_SUMMARY_ATTRIBUTES). Runs on synthetic items; no AWS access needed.
+
+Usage:
+    python benchmark_transaction_read_models.py [--rows 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from models.transaction import (
+    Transaction,
+    TransactionSummary,
+    TRANSACTION_SUMMARY_ATTRIBUTES,
+)
+
+
+def build_items(rows: int) -> List[Dict[str, Any]]:
+    """Build DynamoDB-shaped transaction items with a category assignment each."""
+    account_ids = [str(uuid.uuid4()) for _ in range(4)]
+    category_ids = [str(uuid.uuid4()) for _ in range(20)]
+    base_date = 1704067200000  # 2024-01-01
+    items = []
+    for i in range(rows):
+        category_id = category_ids[i % len(category_ids)]
+        items.append({
+            'userId': 'benchmark-user',
+            'fileId': str(uuid.uuid4()),
+            'transactionId': str(uuid.uuid4()),
+            'accountId': account_ids[i % len(account_ids)],
+            'date': Decimal(base_date + i * 3600000),
+            'description': f'CARD PAYMENT TO MERCHANT {i % 500} REF {i:08d}',
+            'amount': Decimal(f'-{(i % 9000) / 100 + 1:.2f}'),
+            'currency': 'GBP',
+            'balance': Decimal('1234.56'),
+            'importOrder': Decimal(i),
+            'transactionType': 'DEBIT',
+            'memo': 'Benchmark memo',
+            'status': 'new',
+            'statusDate': f'new#{base_date + i * 3600000}',
+            'createdAt': Decimal(base_date),
+            'updatedAt': Decimal(base_date),
+            'transactionHash': Decimal(i),
+            'primaryCategoryId': category_id,
+            'categories': [{
+                'categoryId': category_id,
+                'confidence': Decimal(100),
+                'status': 'confirmed',
+                'isManual': False,
+                'assignedAt': Decimal(base_date),
+                'ruleId': 'rule_benchmark',
+            }],
+        })
+    return items
+
+
+def project(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reduce items to the attributes DynamoDB would return for the summary projection."""
+    return [
+        {key: item[key] for key in TRANSACTION_SUMMARY_ATTRIBUTES if key in item}
+        for item in items
+    ]
+
+
+def rows_per_second(items: List[Dict[str, Any]], transform: Callable[[Dict[str, Any]], Any], repeat: int) -> float:
+    """Best rows/sec over several runs."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            transform(item)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(items) / elapsed)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000, help='Number of synthetic items')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per model (best is reported)')
+    args = parser.parse_args()
+
+    items = build_items(args.rows)
+    projected = project(items)
+
+    full_rate = rows_per_second(items, Transaction.from_dynamodb_item, args.repeat)
+    summary_rate = rows_per_second(projected, TransactionSummary.from_dynamodb_item, args.repeat)
+
+    full_bytes = sum(len(repr(item)) for item in items)
+    projected_bytes = sum(len(repr(item)) for item in projected)
+
+    print(f"Rows: {args.rows}, best of {args.repeat}")
+    print(f"{'Model':<22}{'rows/sec':>14}")
+    print(f"{'Transaction':<22}{full_rate:>14,.0f}")
+    print(f"{'TransactionSummary':<22}{summary_rate:>14,.0f}")
+    print(f"Speedup: {summary_rate / full_rate:.1f}x")
+    print(f"Projected item size: {projected_bytes / full_bytes:.0%} of full item (repr length)")
+
+
+if __name__ == "__main__":
+    main()
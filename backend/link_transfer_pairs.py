@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script to store pair links for transfers marked before links were persisted.
+
+GET /transfers/paired lists the pair links stored on transactions when a pair
+is marked. Transactions categorized as transfers before that have no link, so
+this script re-pairs them once per user and stores the links on both sides.
+
+Usage:
+    python3 link_transfer_pairs.py [--user-id USER_ID]
+
+Options:
+    --user-id    Only link transfer pairs for a specific user ID
+"""
+
+import sys
+import os
+import argparse
+import logging
+from typing import Set
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Set up environment variables for DynamoDB tables
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+PROJECT_NAME = 'housef3'
+
+# Set default table names if not already set
+os.environ.setdefault('ACCOUNTS_TABLE', f'{PROJECT_NAME}-{ENVIRONMENT}-accounts')
+os.environ.setdefault('TRANSACTIONS_TABLE', f'{PROJECT_NAME}-{ENVIRONMENT}-transactions')
+os.environ.setdefault('CATEGORIES_TABLE_NAME', f'{PROJECT_NAME}-{ENVIRONMENT}-categories')
+
+from utils.db.base import tables
+from services.transfer_detection_service import TransferDetectionService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def scan_all_user_ids() -> Set[str]:
+    """
+    Collect the IDs of all users that own at least one account.
+
+    Returns:
+        Set of user IDs
+    """
+    logger.info("Scanning accounts for user IDs...")
+
+    accounts_table = tables.accounts
+    scan_params = {'ProjectionExpression': 'userId'}
+    user_ids: Set[str] = set()
+
+    while True:
+        response = accounts_table.scan(**scan_params)
+        user_ids.update(item['userId'] for item in response.get('Items', []) if item.get('userId'))
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    logger.info(f"Found {len(user_ids)} users")
+    return user_ids
+
+
+def main():
+    """Main function to link existing transfer pairs."""
+    parser = argparse.ArgumentParser(description='Store pair links for existing transfer transactions')
+    parser.add_argument('--user-id', type=str,
+                       help='Only link transfer pairs for a specific user ID')
+
+    args = parser.parse_args()
+
+    logger.info("Starting transfer pair link script")
+
+    try:
+        user_ids = {args.user_id} if args.user_id else scan_all_user_ids()
+
+        transfer_service = TransferDetectionService()
+        total_linked = 0
+        failed_users = 0
+
+        for i, user_id in enumerate(sorted(user_ids), 1):
+            logger.info(f"Processing user {i}/{len(user_ids)}: {user_id}")
+            try:
+                total_linked += transfer_service.link_existing_transfer_pairs(user_id)
+            except Exception as e:
+                logger.error(f"Error linking transfer pairs for user {user_id}: {str(e)}")
+                failed_users += 1
+
+        logger.info(f"Linked {total_linked} transfer pairs for {len(user_ids)} users")
+
+        if failed_users > 0:
+            logger.warning(f"{failed_users} users failed - check logs for details")
+            sys.exit(1)
+
+    except Exception as e:
+        logger.error(f"Script failed with error: {str(e)}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
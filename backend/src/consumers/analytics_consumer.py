@@ -12,6 +12,11 @@ Event Types Processed:
 - account.created: Low priority (3)
 - account.updated: Low priority (3)
 - account.deleted: High priority (1)
+- file.deleted: Medium priority (2)
+
+Monthly rollups are kept current here as well: the months a processed file
+touches are recomputed, while deletions and edits rebuild the rollups of the
+affected accounts.
 """
 
 import json
@@ -28,6 +33,7 @@ from models.events import BaseEvent, FileDeletionVoteEvent
 from models.analytics import AnalyticType, AnalyticsProcessingStatus
 from utils.db_utils import store_analytics_status
 from services.event_service import event_service
+from services.analytics_rollup_service import refresh_file_rollups, refresh_account_rollups
 
 # Event publishing configuration
 ENABLE_EVENT_PUBLISHING = os.environ.get('ENABLE_EVENT_PUBLISHING', 'true').lower() == 'true'
@@ -44,7 +50,8 @@ class AnalyticsEventConsumer(BaseEventConsumer):
         'account.created': 3,       # Low priority - no transactions yet
         'account.updated': 3,       # Low priority - metadata changes only
         'account.deleted': 1,       # High priority - major data change
-        'file.deletion.requested': 2  # Medium priority - prepare for file deletion
+        'file.deletion.requested': 2,  # Medium priority - prepare for file deletion
+        'file.deleted': 2           # Medium priority - data removal
     }
     
     # Analytics types affected by each event type
@@ -55,8 +62,12 @@ class AnalyticsEventConsumer(BaseEventConsumer):
         'account.created': [],  # No analytics until transactions exist
         'account.updated': [],  # Metadata only, no financial impact
         'account.deleted': ['cash_flow', 'category_trends', 'financial_health', 'account_efficiency'],
-        'file.deletion.requested': ['cash_flow', 'category_trends', 'financial_health', 'account_efficiency']
+        'file.deletion.requested': ['cash_flow', 'category_trends', 'financial_health', 'account_efficiency'],
+        'file.deleted': ['cash_flow', 'category_trends', 'financial_health', 'account_efficiency']
     }
+
+    # Events after which the affected accounts' rollups are rebuilt
+    ROLLUP_REFRESH_EVENTS = {'transaction.updated', 'transactions.deleted', 'account.deleted', 'file.deleted'}
     
     def __init__(self):
         super().__init__("analytics_consumer")
@@ -74,6 +85,9 @@ class AnalyticsEventConsumer(BaseEventConsumer):
             priority = self.PRIORITY_MAP.get(event_type, 3)
             analytics_types = self._get_analytics_types(event_type)
             
+            # Bring monthly rollups up to date before queueing recomputation
+            self._update_rollups(event)
+            
             # Create status records for each analytics type
             success_count = self._create_analytics_status_records(event, analytics_types, priority)
             
@@ -104,6 +118,25 @@ class AnalyticsEventConsumer(BaseEventConsumer):
         
         return analytics_types
     
+    def _update_rollups(self, event: BaseEvent) -> None:
+        """Apply the event to the user's monthly rollups"""
+        data = event.data or {}
+        account_ids = data.get('accountIds') or ([data['accountId']] if data.get('accountId') else [])
+        
+        try:
+            if event.event_type == 'file.processed':
+                if data.get('processingStatus', 'success') == 'success' and data.get('fileId'):
+                    refresh_file_rollups(event.user_id, data['fileId'])
+            elif event.event_type in self.ROLLUP_REFRESH_EVENTS:
+                refresh_account_rollups(event.user_id, account_ids)
+        except Exception as e:
+            logger.error(f"Failed to update rollups for {event.event_type} event {event.event_id}: {str(e)}")
+            # A partial update is not safe to keep; rebuild the affected accounts instead
+            try:
+                refresh_account_rollups(event.user_id, account_ids)
+            except Exception as rebuild_error:
+                logger.error(f"Failed to rebuild rollups for user {event.user_id}: {str(rebuild_error)}")
+    
     def _create_analytics_status_records(self, event: BaseEvent, analytics_types: List[str], priority: int) -> int:
         """Create analytics status records for all analytics types"""
         success_count = 0
@@ -6,6 +6,7 @@ and applies category rules to automatically categorize them.
 
 Event Types Processed:
 - file.processed: Apply rules to newly created transactions from file uploads
+- category.rule_created: Drop the user's cached compiled rules
 
 The consumer uses the existing CategoryRuleEngine to apply rules and create
 category suggestions for manual review.
@@ -23,13 +24,15 @@ logger.setLevel(logging.INFO)
 
 # Constants
 FILE_DELETION_REQUESTED_EVENT = 'file.deletion.requested'
+CATEGORY_RULE_CREATED_EVENT = 'category.rule_created'
 from consumers.base_consumer import BaseEventConsumer
 from models.events import BaseEvent, FileDeletionVoteEvent
 from models.category import CategorySuggestionStrategy
 from services.category_rule_engine import CategoryRuleEngine
+from services.category_rule_matcher import invalidate_compiled_rules
 from services.event_service import event_service
 from utils.db_utils import list_categories_by_user_from_db
-from utils.db.base import tables
+from utils.db.transactions import get_transactions_by_ids, update_transaction_categories
 
 # Event publishing configuration
 ENABLE_EVENT_PUBLISHING = os.environ.get('ENABLE_EVENT_PUBLISHING', 'true').lower() == 'true'
@@ -41,7 +44,8 @@ class CategorizationEventConsumer(BaseEventConsumer):
     # Event types that should trigger categorization
     CATEGORIZATION_EVENT_TYPES = {
         'file.processed',        # New transactions from file uploads
-        FILE_DELETION_REQUESTED_EVENT  # Process before file deletion
+        FILE_DELETION_REQUESTED_EVENT,  # Process before file deletion
+        CATEGORY_RULE_CREATED_EVENT  # Invalidates compiled rules
     }
     
     def __init__(self):
@@ -60,6 +64,10 @@ class CategorizationEventConsumer(BaseEventConsumer):
             
             logger.info(f"Processing {event_type} event {event.event_id} for categorization")
             
+            if event_type == CATEGORY_RULE_CREATED_EVENT:
+                invalidate_compiled_rules(user_id)
+                return
+            
             # Extract transaction IDs based on event type
             transaction_ids = self._extract_transaction_ids(event)
             
@@ -163,57 +171,63 @@ class CategorizationEventConsumer(BaseEventConsumer):
         }
         
         try:
-            # Process each transaction individually
-            for transaction_id in transaction_ids:
+            # Fetch all transactions in BatchGetItem chunks; ids that are
+            # missing or owned by another user are not returned
+            transactions = get_transactions_by_ids(transaction_ids, user_id)
+            stats['errors'] += len(transaction_ids) - len(transactions)
+            if len(transactions) < len(transaction_ids):
+                logger.warning(
+                    f"{len(transaction_ids) - len(transactions)} of {len(transaction_ids)} transactions "
+                    f"not found for user {user_id}"
+                )
+            
+            # Compile the rules once for all transactions in the event
+            compiled_rules = self.rule_engine.compile_rules(categories)
+            
+            # Apply categorization rules to the whole batch
+            changed_transactions = []
+            for transaction in transactions:
                 try:
-                    # Get the transaction from database
-                    from models.transaction import Transaction
-                    response = tables.transactions.get_item(Key={'transactionId': transaction_id})
-                    if 'Item' not in response:
-                        logger.warning(f"Transaction {transaction_id} not found")
-                        stats['errors'] += 1
-                        continue
-                    
-                    transaction = Transaction.from_dynamodb_item(response['Item'])
-                    if transaction.user_id != user_id:
-                        logger.warning(f"Transaction {transaction_id} does not belong to user {user_id}")
-                        stats['errors'] += 1
-                        continue
-                    
-                    # Apply categorization rules
                     suggestions = self.rule_engine.categorize_transaction(
                         transaction=transaction,
                         user_categories=categories,
-                        suggestion_strategy=CategorySuggestionStrategy.ALL_MATCHES
+                        suggestion_strategy=CategorySuggestionStrategy.ALL_MATCHES,
+                        compiled_rules=compiled_rules
                     )
                     
                     if suggestions:
                         # Add suggestions to the transaction
+                        assignment_count = len(transaction.categories)
                         for suggestion in suggestions:
                             transaction.add_category_suggestion(
                                 category_id=suggestion.category_id,
                                 confidence=suggestion.confidence,
                                 rule_id=suggestion.rule_id
                             )
-                        
-                        # Save the updated transaction
-                        from utils.db_utils import update_transaction
-                        update_transaction(transaction)
+                        if len(transaction.categories) != assignment_count:
+                            changed_transactions.append(transaction)
                         
                         stats['suggestions_created'] += len(suggestions)
                         stats['transactions_categorized'] += 1
-                        
-                        logger.info(f"Applied {len(suggestions)} category suggestions to transaction {transaction_id}")
                     else:
-                        logger.debug(f"No category matches found for transaction {transaction_id}")
+                        logger.debug(f"No category matches found for transaction {transaction.transaction_id}")
                     
                     stats['processed'] += 1
                     
                 except Exception as e:
-                    logger.error(f"Error processing transaction {transaction_id}: {str(e)}")
+                    logger.error(f"Error processing transaction {transaction.transaction_id}: {str(e)}")
                     stats['errors'] += 1
                     continue
             
+            # Write back only the changed category attributes, in groups
+            if changed_transactions:
+                result = update_transaction_categories(changed_transactions)
+                stats['errors'] += result.failed_count
+                logger.info(
+                    f"Saved category suggestions for {result.written_count} of "
+                    f"{len(changed_transactions)} changed transactions"
+                )
+            
             logger.info(f"Categorization completed: {stats}")
             return stats
             
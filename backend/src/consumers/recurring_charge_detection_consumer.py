@@ -6,30 +6,53 @@ charge pattern detection and processes them asynchronously.
 
 Event Types Processed:
 - recurring_charge.detection.requested: Trigger ML-based pattern detection
+- file.processed: Incrementally score the file's new transactions
 
 The consumer uses the RecurringChargeDetectionService to analyze transaction
-history and identify recurring patterns, then saves them to DynamoDB.
+history and identify recurring patterns, then saves them to DynamoDB. For
+file.processed events the IncrementalDetectionService matches the new
+transactions against existing patterns and only re-clusters the residue.
+
+RecurringChargeDetectionConsumer.backfill re-runs full detection for a list
+of users (e.g. after a model change) across a process pool, with a
+checkpoint file so an interrupted backfill can be resumed.
 """
 
 import json
 import logging
+import multiprocessing
+import os
 import traceback
 import uuid
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Set, Tuple, Union
+from datetime import datetime, timedelta, timezone
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 from consumers.base_consumer import BaseEventConsumer, EventProcessingError
 from models.events import BaseEvent
-from services.recurring_charges import RecurringChargeDetectionService, RecurringChargePredictionService
-from utils.db.transactions import list_user_transactions
-from utils.db.recurring_charges import batch_create_patterns_in_db
+from services.recurring_charges import (
+    RecurringChargeDetectionService,
+    RecurringChargePredictionService,
+    S3FeatureStore,
+)
+from services.recurring_charges.incremental_detection_service import (
+    IncrementalDetectionService,
+    RESIDUE_LOOKBACK_DAYS,
+)
+from utils.db.transactions import iter_user_transactions, get_transactions_by_ids
+from utils.db.recurring_charges import (
+    batch_create_patterns_in_db,
+    list_patterns_by_user_from_db,
+    update_pattern_in_db,
+)
 from utils.db.accounts import list_user_accounts
 from models.transaction import Transaction
 from models.account import Account
-from models.recurring_charge import RecurringChargePatternCreate
+from models.recurring_charge import RecurringChargePattern, RecurringChargePatternCreate
 
 # Operation tracking
 from services.operation_tracking_service import (
@@ -37,6 +60,20 @@ from services.operation_tracking_service import (
     OperationStatus,
 )
 
+# Safety limit on transactions fetched for a single detection run
+MAX_DETECTION_TRANSACTIONS = 100000
+
+# Users queued per backfill worker, bounds the results held in memory
+BACKFILL_QUEUE_DEPTH = 2
+
+# Pattern fields a new detection run refreshes on a stored pattern; the ID,
+# review state and user-edited criteria are kept
+REDETECTED_PATTERN_FIELDS = (
+    'day_of_week', 'day_of_month', 'amount_mean', 'amount_std', 'amount_min', 'amount_max',
+    'confidence_score', 'transaction_count', 'first_occurrence', 'last_occurrence',
+    'feature_vector', 'cluster_id', 'matched_transaction_ids',
+)
+
 
 class RecurringChargeDetectionConsumer(BaseEventConsumer):
     """Consumer for recurring charge detection events"""
@@ -44,11 +81,15 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
     # Event types that should trigger detection
     DETECTION_EVENT_TYPES = {
         "recurring_charge.detection.requested",
+        "file.processed",
     }
     
     def __init__(self):
         super().__init__("recurring_charge_detection_consumer")
-        self.detection_service = RecurringChargeDetectionService(country_code="US")
+        self.detection_service = RecurringChargeDetectionService(
+            country_code="US", feature_store=S3FeatureStore()
+        )
+        self.incremental_service = IncrementalDetectionService(self.detection_service)
         self.prediction_service = RecurringChargePredictionService()
     
     def should_process_event(self, event: BaseEvent) -> bool:
@@ -66,6 +107,10 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
         4. Generates predictions for next occurrences
         5. Updates operation tracking status
         """
+        if event.event_type == "file.processed":
+            self._process_new_transactions(event)
+            return
+        
         try:
             event_type = event.event_type
             user_id = event.user_id
@@ -156,6 +201,7 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
                 min_occurrences=min_occurrences,
                 min_confidence=min_confidence,
                 accounts_map=accounts_map,
+                complete_history=not (account_id or start_date_ts or end_date_ts),
             )
             
             logger.info(f"Detected {len(patterns)} recurring charge patterns")
@@ -173,7 +219,8 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
             predictions_created = 0
             
             if patterns:
-                patterns_saved_count = batch_create_patterns_in_db(patterns)
+                saved_patterns = batch_create_patterns_in_db(patterns)
+                patterns_saved_count = len(saved_patterns)
                 logger.info(f"Saved {patterns_saved_count} patterns to database")
                 
                 # Generate predictions for each pattern
@@ -184,7 +231,7 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
                     step_description="Generating predictions for detected patterns",
                 )
                 
-                predictions_created = self._generate_predictions(user_id, patterns)
+                predictions_created = self._generate_predictions(user_id, saved_patterns)
                 logger.info(f"Generated {predictions_created} predictions")
             
             # Update operation status to completed
@@ -235,6 +282,255 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
                 )
             raise
     
+    def _process_new_transactions(self, event: BaseEvent) -> None:
+        """
+        Incrementally detect patterns for the transactions of a processed file.
+        
+        The file's transactions are matched against the user's existing
+        patterns; matched patterns are updated in place and get a fresh
+        prediction. Only the unmatched residue (plus earlier transactions of
+        the same merchants) is re-clustered for new patterns.
+        """
+        user_id = event.user_id
+        transaction_ids = (event.data or {}).get("transactionIds") or []
+        if not transaction_ids:
+            logger.info(f"No transaction IDs in file.processed event {event.event_id}, skipping detection")
+            return
+        
+        new_transactions = [
+            tx for tx in get_transactions_by_ids([uuid.UUID(tx_id) for tx_id in transaction_ids], user_id)
+            if tx.date is not None and tx.amount is not None and tx.status != "duplicate"
+        ]
+        if not new_transactions:
+            logger.info(f"No new transactions to score for user {user_id}")
+            return
+        
+        patterns = list_patterns_by_user_from_db(user_id)
+        latest = max(tx.date for tx in new_transactions)
+        lookback_start = min(tx.date for tx in new_transactions) - int(
+            timedelta(days=RESIDUE_LOOKBACK_DAYS).total_seconds() * 1000
+        )
+        history = self._fetch_transactions(user_id, None, lookback_start, latest)
+        
+        result = self.incremental_service.detect(
+            user_id=user_id,
+            new_transactions=new_transactions,
+            history=history,
+            patterns=patterns,
+            accounts_map=self._fetch_accounts_map(user_id),
+        )
+        
+        for pattern in result.updated_patterns:
+            update_pattern_in_db(pattern)
+        
+        # Predictions need the stored patterns (with IDs), not the Create DTOs
+        created_patterns = batch_create_patterns_in_db(result.new_patterns) if result.new_patterns else []
+        patterns_saved_count = len(created_patterns)
+        
+        predictions_created = self._generate_predictions(
+            user_id, result.updated_patterns + created_patterns
+        )
+        
+        logger.info(
+            f"Incremental detection completed: {len(result.updated_patterns)} patterns updated, "
+            f"{patterns_saved_count} patterns created, {predictions_created} predictions, "
+            f"{len(new_transactions)} new and {result.residue_count} residue transactions analyzed"
+        )
+    
+    def detect_user_patterns(
+        self,
+        user_id: str,
+        min_occurrences: int = 3,
+        min_confidence: float = 0.6,
+    ) -> List[RecurringChargePatternCreate]:
+        """
+        Run full detection over a user's transaction history without saving.
+        
+        Args:
+            user_id: User ID
+            min_occurrences: Minimum number of occurrences to form a pattern
+            min_confidence: Minimum confidence score to include a pattern
+            
+        Returns:
+            Detected patterns
+        """
+        transactions = self._fetch_transactions(user_id, None)
+        if not transactions:
+            return []
+        return self.detection_service.detect_recurring_patterns(
+            user_id=user_id,
+            transactions=transactions,
+            min_occurrences=min_occurrences,
+            min_confidence=min_confidence,
+            accounts_map=self._fetch_accounts_map(user_id),
+            complete_history=True,
+        )
+    
+    def backfill(
+        self,
+        user_ids: Iterable[str],
+        checkpoint_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        min_occurrences: int = 3,
+        min_confidence: float = 0.6,
+    ) -> Dict[str, int]:
+        """
+        Run full detection for many users and save their patterns.
+        
+        Detection is CPU-bound, so users are spread over a process pool whose
+        workers each initialize their services once. Patterns are saved and
+        predicted from this process as each user finishes; patterns the user
+        already has are updated in place and only predicted if active. Users
+        listed in the checkpoint file are skipped and every saved user is
+        appended to it; failed users are not, so a re-run retries them
+        without duplicating what an interrupted run already saved.
+        
+        Args:
+            user_ids: Users to run detection for
+            checkpoint_path: Optional JSON lines file recording finished users
+            max_workers: Worker processes (default: CPU count). 1 runs
+                detection in this process with this consumer's services.
+            min_occurrences: Minimum number of occurrences to form a pattern
+            min_confidence: Minimum confidence score to include a pattern
+            
+        Returns:
+            Summary counts: users, skipped, failed, patterns, predictions
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        finished = _read_backfill_checkpoint(checkpoint_path) if checkpoint_path else set()
+        pending = [user_id for user_id in user_ids if user_id not in finished]
+        summary = {
+            "users": 0,
+            "skipped": len(user_ids) - len(pending),
+            "failed": 0,
+            "patterns": 0,
+            "predictions": 0,
+        }
+        logger.info(f"Backfilling recurring charge detection for {len(pending)} users ({summary['skipped']} already done)")
+        
+        for user_id, patterns, error in self._iter_backfill_results(
+            pending, max_workers, min_occurrences, min_confidence
+        ):
+            if error is not None:
+                logger.error(f"Backfill detection failed for user {user_id}: {error}")
+                summary["failed"] += 1
+                continue
+            
+            try:
+                saved_patterns, updated_patterns = self._save_detected_patterns(user_id, patterns)
+                patterns_saved_count = len(saved_patterns)
+                predictions_created = self._generate_predictions(
+                    user_id, saved_patterns + [pattern for pattern in updated_patterns if pattern.active]
+                )
+            except Exception as e:
+                logger.exception(f"Backfill save failed for user {user_id}: {e}")
+                summary["failed"] += 1
+                continue
+            if checkpoint_path:
+                _append_backfill_checkpoint(checkpoint_path, user_id, patterns_saved_count)
+            
+            summary["users"] += 1
+            summary["patterns"] += patterns_saved_count
+            summary["predictions"] += predictions_created
+            logger.info(
+                f"Backfilled user {user_id}: {patterns_saved_count} patterns, {predictions_created} predictions "
+                f"({summary['users'] + summary['failed']}/{len(pending)})"
+            )
+        
+        logger.info(f"Backfill completed: {summary}")
+        return summary
+    
+    def _save_detected_patterns(
+        self,
+        user_id: str,
+        patterns: List[RecurringChargePatternCreate],
+    ) -> Tuple[List[RecurringChargePattern], List[RecurringChargePattern]]:
+        """
+        Save the detected patterns, updating the ones the user already has.
+        
+        A detected pattern is already known when a stored pattern of the user
+        has the same merchant pattern, frequency and temporal pattern type,
+        whatever its review status. The stored pattern takes the new detection
+        results (REDETECTED_PATTERN_FIELDS) and keeps its patternId, review
+        state and user edits.
+        
+        Args:
+            user_id: User ID
+            patterns: Detected patterns
+            
+        Returns:
+            Tuple of (newly saved patterns, updated stored patterns)
+        """
+        if not patterns:
+            return [], []
+        
+        stored = {_pattern_key(pattern): pattern for pattern in list_patterns_by_user_from_db(user_id)}
+        new_patterns: Dict[Tuple[str, str, str], RecurringChargePatternCreate] = {}
+        detected_known: Dict[Tuple[str, str, str], RecurringChargePatternCreate] = {}
+        for pattern in patterns:
+            key = _pattern_key(pattern)
+            if key in stored:
+                detected_known.setdefault(key, pattern)
+            else:
+                new_patterns.setdefault(key, pattern)
+        
+        now = int(datetime.now(timezone.utc).timestamp() * 1000)
+        updated_patterns = []
+        for key, detected in detected_known.items():
+            update = {field: getattr(detected, field) for field in REDETECTED_PATTERN_FIELDS}
+            update['updated_at'] = now
+            updated_patterns.append(update_pattern_in_db(stored[key].model_copy(update=update)))
+        
+        if updated_patterns:
+            logger.info(f"Updated {len(updated_patterns)} stored patterns of user {user_id} from detection")
+        saved_patterns = batch_create_patterns_in_db(list(new_patterns.values())) if new_patterns else []
+        return saved_patterns, updated_patterns
+    
+    def _iter_backfill_results(
+        self,
+        user_ids: List[str],
+        max_workers: Optional[int],
+        min_occurrences: int,
+        min_confidence: float,
+    ) -> Iterator[Tuple[str, Optional[List[RecurringChargePatternCreate]], Optional[Exception]]]:
+        """Yield (user_id, patterns, error) for each user as detection finishes."""
+        workers = max_workers or os.cpu_count() or 1
+        if workers == 1:
+            for user_id in user_ids:
+                try:
+                    yield user_id, self.detect_user_patterns(user_id, min_occurrences, min_confidence), None
+                except Exception as e:
+                    yield user_id, None, e
+            return
+        
+        # Spawned workers create their own AWS clients instead of inheriting this process's
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_backfill_worker,
+        ) as executor:
+            queued = iter(user_ids)
+            in_flight = {}
+            
+            def submit_next() -> None:
+                user_id = next(queued, None)
+                if user_id is not None:
+                    future = executor.submit(_detect_user_patterns, user_id, min_occurrences, min_confidence)
+                    in_flight[future] = user_id
+            
+            for _ in range(workers * BACKFILL_QUEUE_DEPTH):
+                submit_next()
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    user_id = in_flight.pop(future)
+                    submit_next()
+                    try:
+                        yield user_id, future.result(), None
+                    except Exception as e:
+                        yield user_id, None, e
+    
     def _fetch_accounts_map(self, user_id: str) -> Dict[uuid.UUID, Account]:
         """
         Fetch all accounts for a user and return as a dictionary.
@@ -280,36 +576,19 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
             # Prepare account filter if specified
             account_ids = [uuid.UUID(account_id)] if account_id else None
             
-            # Fetch transactions with date range filtering
-            # We'll paginate to get all transactions in the date range
-            all_transactions = []
-            last_key = None
-            page_size = 1000  # Fetch in chunks to avoid timeouts
-            max_pages = 100  # Safety limit to prevent infinite loops
-            page_count = 0
-            
-            while page_count < max_pages:
-                page_count += 1
-                
-                transactions, last_key, _ = list_user_transactions(
+            # Stream all transactions in the date range, most recent first, capped
+            # by a safety limit to avoid Lambda timeouts
+            all_transactions = list(islice(
+                iter_user_transactions(
                     user_id=user_id,
-                    limit=page_size,
-                    last_evaluated_key=last_key,
                     account_ids=account_ids,
                     start_date_ts=start_date_ts,
                     end_date_ts=end_date_ts,
                     sort_order_date='desc',  # Most recent first!
                     ignore_dup=True,  # Automatically filter duplicates
-                )
-                
-                if not transactions:
-                    break
-                    
-                all_transactions.extend(transactions)
-                
-                # If no more pages, stop
-                if not last_key:
-                    break
+                ),
+                MAX_DETECTION_TRANSACTIONS
+            ))
             
             # Filter out transactions without dates or amounts
             valid_transactions = [
@@ -333,14 +612,14 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
     def _generate_predictions(
         self,
         user_id: str,
-        patterns: List[Any],
+        patterns: List[RecurringChargePattern],
     ) -> int:
         """
-        Generate predictions for detected patterns.
+        Generate predictions for saved patterns.
         
         Args:
             user_id: User ID
-            patterns: List of RecurringChargePattern objects
+            patterns: List of stored RecurringChargePattern objects
             
         Returns:
             Number of predictions created
@@ -403,6 +682,63 @@ class RecurringChargeDetectionConsumer(BaseEventConsumer):
             logger.warning(f"Failed to update operation status: {e}", exc_info=True)
 
 
+# Consumer of the backfill worker process, created once by _init_backfill_worker
+_backfill_consumer: Optional[RecurringChargeDetectionConsumer] = None
+
+
+def _init_backfill_worker() -> None:
+    global _backfill_consumer
+    _backfill_consumer = RecurringChargeDetectionConsumer()
+
+
+def _detect_user_patterns(
+    user_id: str,
+    min_occurrences: int,
+    min_confidence: float,
+) -> List[RecurringChargePatternCreate]:
+    return _backfill_consumer.detect_user_patterns(user_id, min_occurrences, min_confidence)
+
+
+def _pattern_key(pattern: Union[RecurringChargePattern, RecurringChargePatternCreate]) -> Tuple[str, str, str]:
+    """Identify a pattern by what detection derives it from, for de-duplication."""
+    return (pattern.merchant_pattern, pattern.frequency.value, pattern.temporal_pattern_type.value)
+
+
+def _read_backfill_checkpoint(checkpoint_path: str) -> Set[str]:
+    """
+    Return the users recorded as finished in a backfill checkpoint file.
+    
+    A partial last line left by an interrupted write is truncated so the
+    next record starts on its own line.
+    """
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, "rb+") as f:
+        content = f.read()
+        complete = content[:content.rfind(b"\n") + 1]
+        if len(complete) < len(content):
+            f.truncate(len(complete))
+    
+    finished = set()
+    for line in complete.decode("utf-8").splitlines():
+        try:
+            finished.add(json.loads(line)["userId"])
+        except (ValueError, KeyError):
+            continue
+    return finished
+
+
+def _append_backfill_checkpoint(checkpoint_path: str, user_id: str, patterns_saved: int) -> None:
+    with open(checkpoint_path, "a") as f:
+        f.write(json.dumps({"userId": user_id, "patternsSaved": patterns_saved}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Reused across warm Lambda invocations so services are initialized once
+_consumer: Optional[RecurringChargeDetectionConsumer] = None
+
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Lambda handler for recurring charge detection events from EventBridge.
@@ -431,8 +767,10 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
         logger.info(f"Recurring charge detection consumer received event: {json.dumps(event)}")
         
-        consumer = RecurringChargeDetectionConsumer()
-        result = consumer.handle_eventbridge_event(event, context)
+        global _consumer
+        if _consumer is None:
+            _consumer = RecurringChargeDetectionConsumer()
+        result = _consumer.handle_eventbridge_event(event, context)
         
         logger.info("Recurring charge detection consumer completed successfully")
         return result
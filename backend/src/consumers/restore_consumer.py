@@ -120,6 +120,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             job = _ensure_job(user_id, restore_id, s3_key, package_size)
 
             # Perform initial validation only
+            package_data = None
             try:
                 # Parse package
                 logger.info(f"Starting package parsing for restore job {restore_id} from S3 key: {s3_key}")
@@ -192,6 +193,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 job.error = str(e)
                 update_fzip_job(job)
                 continue
+            finally:
+                # Release the spooled package file
+                fzip_service._close_package(package_data)
 
         return _response(200, {"message": "Processed records"})
 
@@ -12,10 +12,12 @@ from pydantic import ValidationError
 from models.category import Category, CategoryCreate, CategoryUpdate, CategoryRule, MatchCondition, CategorySuggestionStrategy
 from models.transaction import Transaction
 from services.category_rule_engine import CategoryRuleEngine
-from utils.db_utils import create_category_in_db, delete_category_from_db, checked_mandatory_category, list_categories_by_user_from_db, update_category_in_db, list_user_transactions, update_transaction
+from utils.db_utils import create_category_in_db, delete_category_from_db, checked_mandatory_category, list_categories_by_user_from_db, update_category_in_db, list_user_transactions, iter_user_transactions, update_transaction, mark_transaction_rollups_stale
 from utils.db.base import tables, NotFound, NotAuthorized
 from utils.lambda_utils import mandatory_path_parameter, optional_query_parameter, mandatory_body_parameter, optional_body_parameter, mandatory_query_parameter
 from utils.auth import get_user_from_event
+from services.event_service import event_service
+from models.events import CategoryRuleCreatedEvent
 
 # Setup logging (ensure it's configured after potential path adjustments for utils if utils also configure logging)
 logger = logging.getLogger(__name__) # Use __name__ for module-specific logger
@@ -755,6 +757,20 @@ def add_rule_to_category_handler(event: Dict[str, Any], user_id: str) -> Dict[st
         if not updated_category:
             return create_response(500, {"error": "Failed to update category with new rule"})
         
+        # Publish rule created event (compiled rule caches are rebuilt on it)
+        try:
+            rule_event = CategoryRuleCreatedEvent(
+                user_id=user_id,
+                category_id=category_id,
+                rule_id=rule.rule_id,
+                rule_pattern=rule.value,
+                auto_apply=rule.auto_suggest
+            )
+            event_service.publish_event(rule_event)
+            logger.info(f"CategoryRuleCreatedEvent published for rule {rule.rule_id}")
+        except Exception as e:
+            logger.warning(f"Failed to publish category rule created event: {str(e)}")
+        
         return create_response(201, updated_category.model_dump(by_alias=True, mode='json'))
         
     except (NotFound, NotAuthorized):
@@ -1106,45 +1122,31 @@ def reset_and_reapply_categories_handler(event: Dict[str, Any], user_id: str) ->
         logger.info(f"Starting category reset and reapply for user {user_id}")
         
         # Step 1: Get all user transactions and clear category assignments
-        transactions = []
-        last_evaluated_key = None
-        batch_size = 1000
+        transactions = list(iter_user_transactions(user_id))  # Get ALL transactions
         cleared_transactions = 0
-        
-        while True:
-            batch, last_evaluated_key, _ = list_user_transactions(
-                user_id, 
-                limit=batch_size,
-                last_evaluated_key=last_evaluated_key,
-                uncategorized_only=False  # Get ALL transactions
-            )
-            
-            if not batch:
-                break
-            
-            transactions.extend(batch)
-            logger.info(f"Retrieved batch of {len(batch)} transactions (total so far: {len(transactions)})")
-            
-            if not last_evaluated_key:
-                break
+        cleared = []
         
         logger.info(f"Found {len(transactions)} total transactions to reset")
         
-        # Step 2: Clear all category assignments from transactions
+        # Step 2: Clear all category assignments (and transfer pair links) from transactions.
+        # Both sides of every pair are among the user's transactions, so each link is cleared on both sides.
         for transaction in transactions:
-            if transaction.categories or transaction.primary_category_id:
+            if transaction.categories or transaction.primary_category_id or transaction.paired_transaction_id:
                 # Clear all category assignments
-                if  transaction.categories  or len(transaction.categories) > 0 or transaction.primary_category_id :
+                if  transaction.categories  or len(transaction.categories) > 0 or transaction.primary_category_id or transaction.paired_transaction_id:
                     transaction.categories = []
                     transaction.primary_category_id = None
+                    transaction.paired_transaction_id = None
                     
                     # Update the transaction in the database
                     update_transaction(transaction)
+                    cleared.append(transaction)
                     cleared_transactions += 1
                 
                 if cleared_transactions % 100 == 0:
                     logger.info(f"Cleared categories from {cleared_transactions} transactions")
         
+        mark_transaction_rollups_stale(cleared)
         logger.info(f"Cleared categories from {cleared_transactions} transactions")
         
         # Step 3: Get all user categories and re-apply rules
@@ -343,9 +343,9 @@ def process_fzip_backup_job(fzip_job: FZIPJob) -> FZIPJob:
             fzip_job.current_phase = "collecting_data"
             update_fzip_job(fzip_job)
 
-            # Collect user data
+            # Stream user data; records are read while the package is written
             backup_type_enum = fzip_job.backup_type or FZIPBackupType.COMPLETE
-            collected_data = fzip_service_instance.collect_backup_data(
+            collected_data = fzip_service_instance.stream_backup_data(
                 user_id=fzip_job.user_id,
                 backup_type=backup_type_enum,
                 include_analytics=fzip_job.include_analytics,
@@ -377,17 +377,18 @@ def process_fzip_backup_job(fzip_job: FZIPJob) -> FZIPJob:
             update_fzip_job(fzip_job)
             
             # Publish completion event
+            export_summaries = collected_data.get('_export_summaries', {})
             completion_event = BackupCompletedEvent(
                 user_id=fzip_job.user_id,
                 backup_id=str(fzip_job.job_id),
                 package_size=package_size,
                 s3_key=s3_key,
                 data_summary={
-                    "accounts": len(collected_data.get('accounts', [])),
-                    "transactions": len(collected_data.get('transactions', [])),
-                    "categories": len(collected_data.get('categories', [])),
-                    "file_maps": len(collected_data.get('file_maps', [])),
-                    "transaction_files": len(collected_data.get('transaction_files', []))
+                    "accounts": export_summaries.get('accounts', {}).get('processed_count', 0),
+                    "transactions": export_summaries.get('transactions', {}).get('processed_count', 0),
+                    "categories": export_summaries.get('categories', {}).get('processed_count', 0),
+                    "file_maps": export_summaries.get('file_maps', {}).get('processed_count', 0),
+                    "transaction_files": export_summaries.get('transaction_files', {}).get('processed_count', 0)
                 }
             )
             event_service.publish_event(completion_event)
@@ -659,8 +660,10 @@ def start_fzip_restore_handler(event: Dict[str, Any], user_id: str, job_id: str)
                 'body': json.dumps({'error': INVALID_RESTORE_JOB_NOT_FOUND_MESSAGE})
             }
         
-        # Accept both awaiting confirmation (new flow) and validation passed (existing jobs during transition)
-        if restore_job.status not in [FZIPStatus.RESTORE_AWAITING_CONFIRMATION, FZIPStatus.RESTORE_VALIDATION_PASSED]:
+        # Accept both awaiting confirmation (new flow) and validation passed (existing jobs during transition),
+        # plus failed restores that checkpointed progress and can continue from the last committed chunk
+        resumable = restore_job.status == FZIPStatus.RESTORE_FAILED and bool(restore_job.restore_checkpoint)
+        if restore_job.status not in [FZIPStatus.RESTORE_AWAITING_CONFIRMATION, FZIPStatus.RESTORE_VALIDATION_PASSED] and not resumable:
             return {
                 'statusCode': 400,
                 'body': json.dumps({'error': f'FZIP restore job is not ready to start. Current status: {restore_job.status.value}'})
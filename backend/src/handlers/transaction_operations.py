@@ -7,12 +7,13 @@ from datetime import datetime
 from models.transaction import Transaction, TransactionCategoryAssignment, CategoryAssignmentStatus
 from models.category import Category
 from utils.auth import get_user_from_event
-from utils.db_utils import list_user_transactions
+from utils.db_utils import list_user_transactions, update_transaction, mark_transaction_rollups_stale
 from utils.db.base import tables
 from utils.lambda_utils import create_response, mandatory_path_parameter
 
 # Event-driven architecture imports
 from services.event_service import event_service
+from services.transfer_detection_service import TransferDetectionService
 from models.events import TransactionUpdatedEvent, TransactionsDeletedEvent
 
 logger = logging.getLogger()
@@ -264,8 +265,8 @@ def confirm_category_suggestions_handler(event: Dict[str, Any], user_id: str) ->
                 return create_response(400, {"error": "Primary category must be one of the confirmed categories"})
         
         # Update transaction in database
-        transaction_item = transaction.to_dynamodb_item()
-        tables.transactions.put_item(Item=transaction_item)
+        update_transaction(transaction)
+        mark_transaction_rollups_stale([transaction])
         
         return create_response(200, {
             "transactionId": transaction_id,
@@ -305,10 +306,16 @@ def remove_category_assignment_handler(event: Dict[str, Any], user_id: str) -> D
         
         if not removed:
             return create_response(404, {"error": "Category assignment not found"})
-        
+
+        # A transaction that is no longer categorized as a transfer loses its pair link on both sides
+        if transaction.paired_transaction_id is not None:
+            transfer_service = TransferDetectionService()
+            if not transfer_service.is_transfer(transaction):
+                transfer_service.unlink_transfer_pair(transaction, user_id)
+
         # Update transaction in database
-        transaction_item = transaction.to_dynamodb_item()
-        tables.transactions.put_item(Item=transaction_item)
+        update_transaction(transaction)
+        mark_transaction_rollups_stale([transaction])
         
         return create_response(200, {
             "transactionId": transaction_id,
@@ -363,8 +370,8 @@ def set_primary_category_handler(event: Dict[str, Any], user_id: str) -> Dict[st
             return create_response(400, {"error": "Category must be assigned to transaction before setting as primary"})
         
         # Update transaction in database
-        transaction_item = transaction.to_dynamodb_item()
-        tables.transactions.put_item(Item=transaction_item)
+        update_transaction(transaction)
+        mark_transaction_rollups_stale([transaction])
         
         return create_response(200, {
             "transactionId": transaction_id,
@@ -420,8 +427,8 @@ def add_manual_category_handler(event: Dict[str, Any], user_id: str) -> Dict[str
         transaction.add_manual_category(category_uuid, set_as_primary=is_primary)
         
         # Update transaction in database
-        transaction_item = transaction.to_dynamodb_item()
-        tables.transactions.put_item(Item=transaction_item)
+        update_transaction(transaction)
+        mark_transaction_rollups_stale([transaction])
         
         # Publish transaction updated event
         try:
@@ -503,8 +510,8 @@ def quick_update_category_handler(event: Dict[str, Any], user_id: str) -> Dict[s
         transaction.add_manual_category(category_uuid, set_as_primary=True)
         
         # Update transaction in database
-        transaction_item = transaction.to_dynamodb_item()
-        tables.transactions.put_item(Item=transaction_item)
+        update_transaction(transaction)
+        mark_transaction_rollups_stale([transaction])
         
         # Publish transaction updated event
         try:
@@ -5,12 +5,13 @@ Handler for transfer-related operations.
 import json
 import logging
 import traceback
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import uuid
 
 from services.transfer_detection_service import TransferDetectionService
 from utils.db.base import tables
 from models.transaction import Transaction
+from utils.db.transactions import list_transfer_pairs, count_transfer_pairs, mark_transaction_rollups_stale
 from utils.lambda_utils import (
     create_response,
     optional_query_parameter,
@@ -162,89 +163,22 @@ def _parse_date_range_parameters(event: Dict[str, Any]) -> tuple[Optional[int],
         raise ValueError("Invalid date format. Expected milliseconds since epoch")
 
 
-def _get_transfer_transactions_with_pagination(
-    user_id: str, 
-    transfer_category_ids: list, 
-    start_date_ts: Optional[int] = None, 
-    end_date_ts: Optional[int] = None
-) -> list:
-    """Get transfer transactions with pagination."""
-    from utils.db_utils import list_user_transactions
-    
-    transfer_transactions = []
-    last_evaluated_key = None
-    
-    while True:
-        if start_date_ts and end_date_ts:
-            batch_result, last_evaluated_key, _ = list_user_transactions(
-                user_id=user_id,
-                category_ids=transfer_category_ids,
-                start_date_ts=start_date_ts,
-                end_date_ts=end_date_ts,
-                last_evaluated_key=last_evaluated_key,
-                limit=500
-            )
-        else:
-            batch_result, last_evaluated_key, _ = list_user_transactions(
-                user_id=user_id,
-                category_ids=transfer_category_ids,
-                last_evaluated_key=last_evaluated_key,
-                limit=500
-            )
-        
-        transfer_transactions.extend(batch_result)
-        
-        if not last_evaluated_key:
-            break
+def _parse_pagination_parameters(event: Dict[str, Any]) -> tuple[Optional[int], Optional[Dict[str, Any]]]:
+    """Parse the page size and pagination key from event."""
+    limit_param = optional_query_parameter(event, "limit")
+    last_evaluated_key_param = optional_query_parameter(event, "lastEvaluatedKey")
     
-    return transfer_transactions
-
-
-def _find_transfer_pairs(transfer_transactions: list, transfer_service: TransferDetectionService) -> list:
-    """Find transfer pairs from transactions."""
-    paired_transfers = []
-    processed_transaction_ids = set()
-    
-    for tx in transfer_transactions:
-        if str(tx.transaction_id) in processed_transaction_ids:
-            continue
-            
-        # Look for matching transfer transaction
-        for other_tx in transfer_transactions:
-            if _is_valid_transfer_pair(tx, other_tx, processed_transaction_ids, transfer_service):
-                outgoing_tx, incoming_tx = _determine_transfer_direction(tx, other_tx)
-                if outgoing_tx and incoming_tx:
-                    paired_transfers.append(_create_transfer_pair_response(outgoing_tx, incoming_tx))
-                    processed_transaction_ids.add(str(tx.transaction_id))
-                    processed_transaction_ids.add(str(other_tx.transaction_id))
-                    break
-    
-    return paired_transfers
-
-
-def _is_valid_transfer_pair(
-    tx: Any, 
-    other_tx: Any, 
-    processed_transaction_ids: set, 
-    transfer_service: TransferDetectionService
-) -> bool:
-    """Check if two transactions form a valid transfer pair."""
-    return (
-        str(other_tx.transaction_id) != str(tx.transaction_id) and
-        str(other_tx.transaction_id) not in processed_transaction_ids and
-        tx.account_id != other_tx.account_id and
-        transfer_service._transactions_could_be_transfer_pair(tx, other_tx)
-    )
-
-
-def _determine_transfer_direction(tx: Any, other_tx: Any) -> tuple[Optional[Any], Optional[Any]]:
-    """Determine which transaction is outgoing and which is incoming."""
-    if tx.amount < 0 and other_tx.amount > 0:
-        return tx, other_tx
-    elif tx.amount > 0 and other_tx.amount < 0:
-        return other_tx, tx
-    else:
-        return None, None  # Skip if both same sign
+    limit = None
+    if limit_param:
+        limit = int(limit_param)
+        if limit <= 0:
+            raise ValueError("limit must be a positive integer")
+    
+    last_evaluated_key = json.loads(last_evaluated_key_param) if last_evaluated_key_param else None
+    if last_evaluated_key and "date" in last_evaluated_key:
+        # The key's Decimal date is serialized as a string, but the index key is numeric
+        last_evaluated_key["date"] = int(last_evaluated_key["date"])
+    return limit, last_evaluated_key
 
 
 def _create_transfer_pair_response(outgoing_tx: Any, incoming_tx: Any) -> Dict[str, Any]:
@@ -259,48 +193,39 @@ def _create_transfer_pair_response(outgoing_tx: Any, incoming_tx: Any) -> Dict[s
 
 @api_handler()
 def get_paired_transfers_handler(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-    """Get existing paired transfer transactions for a user."""
+    """
+    Get existing paired transfer transactions for a user.
+    
+    Reads the pair links stored when pairs are marked, so no pairing is done
+    per request. With a limit, one page is returned along with the
+    lastEvaluatedKey for the next one.
+    """
     logger.info(f"Getting paired transfers for user {user_id}")
     
     # Parse parameters
     start_date_ts, end_date_ts = _parse_date_range_parameters(event)
-    count_only_param = optional_query_parameter(event, "count_only")
-    
-    # Initialize transfer detection service
-    transfer_service = TransferDetectionService()
-    
-    # Get transfer category IDs for this user
-    transfer_category_ids = list(transfer_service._get_transfer_category_ids(user_id))
-    
-    if not transfer_category_ids:
-        # No transfer categories exist, return empty result
-        logger.info(f"No transfer categories found for user {user_id}")
-        if count_only_param == "true":
-            return {"count": 0}
-        return {
-            "pairedTransfers": [],
-            "count": 0,
-            "dateRange": {
-                "startDate": start_date_ts,
-                "endDate": end_date_ts
-            } if start_date_ts and end_date_ts else None
-        }
-    
-    # Get transfer transactions with pagination
-    transfer_transactions = _get_transfer_transactions_with_pagination(
-        user_id, transfer_category_ids, start_date_ts, end_date_ts
+    limit, last_evaluated_key = _parse_pagination_parameters(event)
+    
+    # If only count is requested, count the stored links without loading them
+    if optional_query_parameter(event, "count_only") == "true":
+        return {"count": count_transfer_pairs(user_id, start_date_ts, end_date_ts)}
+    
+    transfer_pairs, new_last_evaluated_key = list_transfer_pairs(
+        user_id,
+        limit=limit,
+        last_evaluated_key=last_evaluated_key,
+        start_date_ts=start_date_ts,
+        end_date_ts=end_date_ts
     )
     
-    # Find transfer pairs
-    paired_transfers = _find_transfer_pairs(transfer_transactions, transfer_service)
-    
-    logger.info(f"Found {len(paired_transfers)} existing transfer pairs")
+    logger.info(f"Found {len(transfer_pairs)} stored transfer pairs")
     
-    # If only count is requested, return just the count
-    if count_only_param == "true":
-        return {"count": len(paired_transfers)}
+    paired_transfers = [
+        _create_transfer_pair_response(outgoing_tx, incoming_tx)
+        for outgoing_tx, incoming_tx in transfer_pairs
+    ]
     
-    return {
+    response: Dict[str, Any] = {
         "pairedTransfers": paired_transfers,
         "count": len(paired_transfers),
         "dateRange": {
@@ -308,6 +233,9 @@ def get_paired_transfers_handler(event: Dict[str, Any], user_id: str) -> Dict[st
             "endDate": end_date_ts
         } if start_date_ts and end_date_ts else None
     }
+    if new_last_evaluated_key:
+        response["lastEvaluatedKey"] = new_last_evaluated_key
+    return response
 
 
 def _validate_transfer_pair_ids(pair: Dict[str, Any]) -> tuple[Optional[str], Optional[str], Optional[str]]:
@@ -344,9 +272,15 @@ def _get_and_validate_transactions(
 def _process_single_transfer_pair(
     pair: Dict[str, Any], 
     user_id: str, 
-    transfer_service: TransferDetectionService
+    transfer_service: TransferDetectionService,
+    marked_transactions: List[Transaction]
 ) -> tuple[Optional[Dict[str, str]], Optional[Dict[str, Any]]]:
-    """Process a single transfer pair and return success or failure result."""
+    """
+    Process a single transfer pair and return success or failure result.
+    
+    Both transactions of a marked pair are appended to marked_transactions so
+    the caller can flag their analytics rollups once for all pairs.
+    """
     # Validate transaction IDs
     outgoing_tx_id, incoming_tx_id, validation_error = _validate_transfer_pair_ids(pair)
     if validation_error or not outgoing_tx_id or not incoming_tx_id:
@@ -360,9 +294,10 @@ def _process_single_transfer_pair(
         return None, {"pair": pair, "error": transaction_error or "Transaction validation failed"}
     
     # Mark as transfer pair
-    success = transfer_service.mark_as_transfer_pair(outgoing_tx, incoming_tx, user_id)
+    success = transfer_service.mark_as_transfer_pair(outgoing_tx, incoming_tx, user_id, mark_rollups=False)
     
     if success:
+        marked_transactions.extend([outgoing_tx, incoming_tx])
         return {
             "outgoingTransactionId": outgoing_tx_id,
             "incomingTransactionId": incoming_tx_id
@@ -390,10 +325,13 @@ def bulk_mark_transfers_handler(event: Dict[str, Any], user_id: str) -> Dict[str
     
     successful_pairs = []
     failed_pairs = []
+    marked_transactions: List[Transaction] = []
     
     for pair in transfer_pairs:
         try:
-            success_result, failure_result = _process_single_transfer_pair(pair, user_id, transfer_service)
+            success_result, failure_result = _process_single_transfer_pair(
+                pair, user_id, transfer_service, marked_transactions
+            )
             
             if success_result:
                 successful_pairs.append(success_result)
@@ -408,6 +346,8 @@ def bulk_mark_transfers_handler(event: Dict[str, Any], user_id: str) -> Dict[str
                 "error": str(e)
             })
     
+    mark_transaction_rollups_stale(marked_transactions)
+    
     # Update checked date range in user preferences if we have successful approvals and date range info
     if successful_pairs and scanned_start_date and scanned_end_date:
         try:
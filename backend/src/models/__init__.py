@@ -11,7 +11,9 @@ from .account import (
 from .transaction import (
     Transaction, 
     TransactionCategoryAssignment, 
-    CategoryAssignmentStatus
+    CategoryAssignmentStatus,
+    TransactionSummary,
+    TRANSACTION_SUMMARY_ATTRIBUTES
 )
 
 from .transaction_file import (
@@ -48,6 +50,8 @@ from .analytics import (
     AnalyticDateRange,
     AnalyticsProcessingStatus,
     AnalyticsData,
+    MonthlyRollup,
+    RollupEntry,
     DataGap,
     DataDisclaimer
 )
@@ -80,6 +84,8 @@ __all__ = [
     'Transaction',
     'TransactionCategoryAssignment',
     'CategoryAssignmentStatus',
+    'TransactionSummary',
+    'TRANSACTION_SUMMARY_ATTRIBUTES',
     'TransactionFile',
     'FileFormat',
     'ProcessingStatus',
@@ -103,6 +109,8 @@ __all__ = [
     'AnalyticDateRange',
     'AnalyticsProcessingStatus',
     'AnalyticsData',
+    'MonthlyRollup',
+    'RollupEntry',
     'DataGap',
     'DataDisclaimer',
     'UserPreferences',
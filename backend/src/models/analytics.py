@@ -4,7 +4,8 @@ Analytics models for the financial analytics system.
 import enum
 import logging
 from datetime import datetime, timezone, date
-from typing import Optional, Dict, Any, List, Union
+from decimal import Decimal
+from typing import Optional, Dict, Any, List, Union, Tuple
 from typing_extensions import Self
 
 from pydantic import BaseModel, Field, ConfigDict
@@ -268,6 +269,131 @@ class AnalyticsData(BaseModel):
         return cls.model_validate(data)
 
 
+def month_key(date_ts: int) -> str:
+    """Return the UTC YYYY-MM month of a millisecond timestamp."""
+    return datetime.fromtimestamp(date_ts / 1000, tz=timezone.utc).strftime('%Y-%m')
+
+
+class RollupEntry(BaseModel):
+    """Aggregates for one (primary category, assigned categories, transaction type) slice of a monthly rollup"""
+    category_id: Optional[str] = Field(default=None, alias="categoryId")
+    # Every category assigned to the entry's transactions, primary included, sorted
+    category_ids: List[str] = Field(default_factory=list, alias="categoryIds")
+    transaction_type: Optional[str] = Field(default=None, alias="transactionType")
+    income: Decimal = Field(default=Decimal('0'))
+    expense: Decimal = Field(default=Decimal('0'))  # Positive magnitude of outgoing amounts
+    income_count: int = Field(default=0, alias="incomeCount")
+    expense_count: int = Field(default=0, alias="expenseCount")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    @property
+    def key(self) -> Tuple[Optional[str], Tuple[str, ...], Optional[str]]:
+        return self.category_id, tuple(self.category_ids), self.transaction_type
+
+    @property
+    def count(self) -> int:
+        return self.income_count + self.expense_count
+
+    def has_category(self, category_ids: set) -> bool:
+        """Whether any category assigned to the entry's transactions is in category_ids."""
+        return self.category_id in category_ids or any(
+            category_id in category_ids for category_id in self.category_ids
+        )
+
+
+class MonthlyRollup(BaseModel):
+    """
+    Per-user, per-account, per-month transaction aggregates.
+    
+    Stored in the analytics data table so analytics can be derived without
+    rescanning transactions. A month is always recomputed from its
+    transactions, which keeps updates idempotent when events are replayed
+    or files are reprocessed.
+    """
+    user_id: str = Field(alias="userId")
+    account_id: str = Field(alias="accountId")
+    month: str  # YYYY-MM (UTC)
+    entries: List[RollupEntry] = Field(default_factory=list)
+    version: int = 0
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        alias="updatedAt"
+    )
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    @property
+    def income(self) -> Decimal:
+        return sum((entry.income for entry in self.entries), Decimal('0'))
+
+    @property
+    def expense(self) -> Decimal:
+        return sum((entry.expense for entry in self.entries), Decimal('0'))
+
+    @property
+    def transaction_count(self) -> int:
+        return sum(entry.count for entry in self.entries)
+
+    def add_amount(self, amount: Decimal, category_id: Optional[str] = None,
+                   transaction_type: Optional[str] = None,
+                   category_ids: Tuple[str, ...] = ()) -> None:
+        """Add a single transaction amount to the matching entry."""
+        entry = self._entry_for(category_id, tuple(sorted(set(category_ids))), transaction_type)
+        if amount > 0:
+            entry.income += amount
+            entry.income_count += 1
+        else:
+            entry.expense += abs(amount)
+            entry.expense_count += 1
+
+    def merge(self, other: "MonthlyRollup") -> None:
+        """Add another rollup's aggregates into this one."""
+        for other_entry in other.entries:
+            entry = self._entry_for(*other_entry.key)
+            entry.income += other_entry.income
+            entry.expense += other_entry.expense
+            entry.income_count += other_entry.income_count
+            entry.expense_count += other_entry.expense_count
+
+    def _entry_for(self, category_id: Optional[str], category_ids: Tuple[str, ...],
+                   transaction_type: Optional[str]) -> RollupEntry:
+        for entry in self.entries:
+            if entry.key == (category_id, category_ids, transaction_type):
+                return entry
+        entry = RollupEntry(categoryId=category_id, categoryIds=list(category_ids),
+                            transactionType=transaction_type)
+        self.entries.append(entry)
+        return entry
+
+    @staticmethod
+    def sort_key(month: str, account_id: str) -> str:
+        """Sort key of the rollup for one month and account."""
+        return f"{month}#{account_id}"
+
+    def to_dynamodb_item(self) -> Dict[str, Any]:
+        """Serialize to DynamoDB format with partition key and sort key"""
+        item = self.model_dump(mode='python', by_alias=True, exclude_none=True)
+
+        # Partition key groups all rollups of a user; sort key is month#account_id
+        item['pk'] = f"{self.user_id}#rollup"
+        item['sk'] = self.sort_key(self.month, self.account_id)
+
+        if 'updatedAt' in item and item['updatedAt']:
+            item['updatedAt'] = item['updatedAt'].isoformat()
+
+        return item
+
+    @classmethod
+    def from_dynamodb_item(cls, data: Dict[str, Any]) -> Self:
+        """Deserialize from DynamoDB format"""
+        data = dict(data)
+        if 'updatedAt' in data and isinstance(data['updatedAt'], str):
+            data['updatedAt'] = datetime.fromisoformat(data['updatedAt'])
+
+        return cls.model_validate(data)
+
+
 class DataGap(BaseModel):
     """Represents a gap in available data"""
     account_id: str = Field(alias="accountId")
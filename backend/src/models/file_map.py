@@ -27,6 +27,7 @@ class FileMap(BaseModel):
     account_id: Optional[uuid.UUID] = Field(default=None, alias="accountId")
     description: Optional[str] = Field(default=None, max_length=1000)
     reverse_amounts: bool = Field(default=False, alias="reverseAmounts")  # Flag to reverse transaction amounts (multiply by -1)
+    date_format: Optional[str] = Field(default=None, alias="dateFormat")  # Date format inferred from the first import, reused by later ones
     created_at: int = Field(default_factory=lambda: int(datetime.now(timezone.utc).timestamp() * 1000), alias="createdAt")
     updated_at: int = Field(default_factory=lambda: int(datetime.now(timezone.utc).timestamp() * 1000), alias="updatedAt")
 
@@ -80,6 +81,9 @@ class FileMap(BaseModel):
             if hasattr(self, key) and getattr(self, key) != value:
                 setattr(self, key, value)
                 updated_fields = True
+                if key == 'mappings':
+                    # The date column may have changed, so infer its format again
+                    self.date_format = None
         
         if updated_fields:
             self.updated_at = int(datetime.now(timezone.utc).timestamp() * 1000)
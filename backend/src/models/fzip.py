@@ -103,6 +103,8 @@ class FZIPJob(BaseModel):
     # Results
     validation_results: Dict[str, Any] = Field(default_factory=dict, alias="validationResults")
     restore_results: Dict[str, Any] = Field(default_factory=dict, alias="restoreResults")
+    # Last committed restore chunk: {"entityType": ..., "committed": <records done>}
+    restore_checkpoint: Optional[Dict[str, Any]] = Field(default=None, alias="restoreCheckpoint")
     
     # Configuration
     parameters: Optional[Dict[str, Any]] = None
@@ -1,6 +1,6 @@
 from locale import currency
 import uuid
-from typing import Dict, Any, Optional, Union, ClassVar, List
+from typing import Dict, Any, Optional, Union, ClassVar, List, NamedTuple, Tuple
 from datetime import datetime, timezone
 import logging
 from decimal import Decimal
@@ -98,6 +98,26 @@ class TransactionCategoryAssignment(BaseModel):
         return cls.model_validate(converted_data)
 
 
+def _parse_legacy_category_assignment(assignment: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a category assignment stored in the legacy string format.
+    Returns None (and logs) if the string cannot be parsed.
+    """
+    import json
+    import ast
+    try:
+        # Try to parse as JSON first
+        try:
+            return json.loads(assignment)
+        except json.JSONDecodeError:
+            # If JSON parsing fails, try ast.literal_eval for Python dict format
+            return ast.literal_eval(assignment)
+    except (ValueError, SyntaxError) as e:
+        # If we can't parse the string, skip this assignment and log it
+        logger.warning(f"Unable to parse category assignment string: {assignment}, error: {e}")
+        return None
+
+
 class Transaction(BaseModel):
     """
     Represents a single financial transaction, using Pydantic for validation and serialization.
@@ -127,6 +147,9 @@ class Transaction(BaseModel):
     categories: List[TransactionCategoryAssignment] = Field(default_factory=list)
     primary_category_id: Optional[uuid.UUID] = Field(default=None, alias="primaryCategoryId")  # Main category for display
 
+    # Transfer pair link: the other side of a transfer marked by the user
+    paired_transaction_id: Optional[uuid.UUID] = Field(default=None, alias="pairedTransactionId")
+
     # Class variable to store names of fields that trigger hash regeneration
     _hash_trigger_fields: ClassVar[set[str]] = {"account_id", "date", "description", "amount", "currency"}
 
@@ -340,6 +363,18 @@ class Transaction(BaseModel):
             return f"{self.status}#{self.date}"
         return None
 
+    @property
+    def computed_transfer_pair_user_id(self) -> Optional[str]:
+        """
+        Computed key for the sparse TransferPairIndex.
+        
+        Only the outgoing side of a linked transfer pair carries it, so querying
+        the index yields each stored pair exactly once, ordered by date.
+        """
+        if self.paired_transaction_id is not None and self.amount is not None and self.amount < 0:
+            return self.user_id
+        return None
+
     @classmethod
     def create(cls, create_data: "TransactionCreate") -> "Transaction":
         """
@@ -370,6 +405,11 @@ class Transaction(BaseModel):
         if status_date is not None:
             data['statusDate'] = status_date
 
+        # Add computed transferPairUserId field (outgoing side of a pair only)
+        transfer_pair_user_id = self.computed_transfer_pair_user_id
+        if transfer_pair_user_id is not None:
+            data['transferPairUserId'] = transfer_pair_user_id
+
         # Ensure UUID fields are strings for DynamoDB
         for key, value in data.items():
             if isinstance(value, uuid.UUID):
@@ -415,23 +455,12 @@ class Transaction(BaseModel):
                     )
                 elif isinstance(assignment, str):
                     # Legacy format: string representation of dictionary
-                    try:
-                        import json
-                        import ast
-                        # Try to parse as JSON first
-                        try:
-                            assignment_dict = json.loads(assignment)
-                        except json.JSONDecodeError:
-                            # If JSON parsing fails, try ast.literal_eval for Python dict format
-                            assignment_dict = ast.literal_eval(assignment)
-                        
-                        processed_categories.append(
-                            TransactionCategoryAssignment.from_dynamodb_item(assignment_dict)
-                        )
-                    except (json.JSONDecodeError, ValueError, SyntaxError) as e:
-                        # If we can't parse the string, skip this assignment and log it
-                        logger.warning(f"Unable to parse category assignment string: {assignment}, error: {e}")
+                    assignment_dict = _parse_legacy_category_assignment(assignment)
+                    if assignment_dict is None:
                         continue
+                    processed_categories.append(
+                        TransactionCategoryAssignment.from_dynamodb_item(assignment_dict)
+                    )
                 else:
                     # Already a TransactionCategoryAssignment object
                     processed_categories.append(assignment)
@@ -442,6 +471,63 @@ class Transaction(BaseModel):
         return cls.model_validate(converted_data)
 
 
+class TransactionSummary(NamedTuple):
+    """
+    Read-only projection of a transaction for bulk analytics and matching.
+    
+    Built straight from a projected DynamoDB item without Pydantic validation,
+    hash recomputation or category assignment reconstruction. Use
+    TRANSACTION_SUMMARY_ATTRIBUTES as the ProjectionExpression so only these
+    attributes are fetched.
+    """
+    transaction_id: str
+    account_id: str
+    date: int  # milliseconds since epoch
+    amount: Decimal
+    transaction_type: Optional[str]
+    primary_category_id: Optional[str]
+    category_ids: Tuple[str, ...]
+    file_id: Optional[str] = None
+    currency: Optional[str] = None
+
+    @classmethod
+    def from_dynamodb_item(cls, data: Dict[str, Any]) -> "TransactionSummary":
+        """Build a summary from a (projected) DynamoDB item."""
+        category_ids = []
+        for assignment in data.get('categories') or ():
+            if isinstance(assignment, str):
+                assignment = _parse_legacy_category_assignment(assignment)
+            if isinstance(assignment, dict) and assignment.get('categoryId'):
+                category_ids.append(str(assignment['categoryId']))
+        
+        amount = data['amount']
+        return cls(
+            transaction_id=data['transactionId'],
+            account_id=data['accountId'],
+            date=int(data['date']),
+            amount=amount if isinstance(amount, Decimal) else Decimal(str(amount)),
+            transaction_type=data.get('transactionType'),
+            primary_category_id=data.get('primaryCategoryId'),
+            category_ids=tuple(category_ids),
+            file_id=data.get('fileId'),
+            currency=data.get('currency')
+        )
+
+
+# DynamoDB attributes needed to build a TransactionSummary
+TRANSACTION_SUMMARY_ATTRIBUTES = (
+    'transactionId',
+    'accountId',
+    'date',
+    'amount',
+    'transactionType',
+    'primaryCategoryId',
+    'categories',
+    'fileId',
+    'currency',
+)
+
+
 def transaction_to_json(transaction_input: Union[Transaction, Dict[str, Any]]) -> str:
     """
     Serializes a Transaction object or a compatible dictionary to a JSON string.
@@ -0,0 +1,215 @@
+"""
+Columnar (NumPy) aggregation backend for the analytics engine.
+
+Loads a period's transactions into arrays once - int64 minor-unit amounts,
+datetime64 months and integer codes for accounts and categories - and runs
+the engine's aggregations as vectorized group-bys. Amounts stay exact
+integers throughout and are converted to Decimal only in the results.
+
+NumPy is provided by the ML Lambda layer. Where it is missing, or where an
+amount has more than two decimal places, callers fall back to the engine's
+pure Python aggregation.
+"""
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the Lambda layer
+    np = None
+    NUMPY_AVAILABLE = False
+
+from models.transaction import TransactionSummary
+
+logger = logging.getLogger(__name__)
+
+# Below this many transactions array setup costs more than it saves
+COLUMNAR_MIN_ROWS = 1000
+
+# Amounts are held as integer hundredths
+MINOR_UNIT_EXPONENT = -2
+
+
+def _to_minor_units(amounts: Sequence[Decimal]) -> Optional["np.ndarray"]:
+    """Return the amounts as int64 minor units, or None if any is not a whole number of them."""
+    scaled = np.array(amounts, dtype=object) * (10 ** -MINOR_UNIT_EXPONENT)
+    minor = scaled.astype(np.int64)
+    if not (minor == scaled).all():
+        return None
+    return minor
+
+
+def _factorize(values: Iterable[Any]) -> Tuple["np.ndarray", List[Any]]:
+    """Integer code per value, in order of first appearance, and the distinct values."""
+    index: Dict[Any, int] = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return np.array(codes, dtype=np.intp), list(index)
+
+
+def _to_decimal(minor_units: Any) -> Decimal:
+    return Decimal(int(minor_units)).scaleb(MINOR_UNIT_EXPONENT)
+
+
+def _group_sums(codes: "np.ndarray", values: "np.ndarray", size: int) -> "np.ndarray":
+    """Exact int64 sum of values per code."""
+    sums = np.zeros(size, dtype=np.int64)
+    np.add.at(sums, codes, values)
+    return sums
+
+
+class TransactionColumns:
+    """A period's transactions as NumPy columns."""
+
+    def __init__(self, amounts: "np.ndarray", months: "np.ndarray",
+                 account_codes: "np.ndarray", account_labels: List[str],
+                 category_codes: "np.ndarray", category_labels: List[str],
+                 category_set_codes: "np.ndarray", category_sets: List[Tuple[str, ...]]):
+        self.amounts = amounts
+        self.months = months
+        self.account_codes = account_codes
+        self.account_labels = account_labels
+        self.category_codes = category_codes
+        self.category_labels = category_labels
+        # Each row's assigned category ids, coded by distinct tuple
+        self.category_set_codes = category_set_codes
+        self.category_sets = category_sets
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @classmethod
+    def from_summaries(cls, transactions: Sequence[TransactionSummary]) -> Optional["TransactionColumns"]:
+        """
+        Build columns from transaction summaries.
+
+        Returns:
+            The columns, or None if an amount cannot be held exactly in minor units
+        """
+        amounts = _to_minor_units([t.amount for t in transactions])
+        if amounts is None:
+            return None
+
+        dates = np.array([t.date for t in transactions], dtype=np.int64)
+        months = dates.astype('datetime64[ms]').astype('datetime64[M]')
+
+        account_codes, account_labels = _factorize([str(t.account_id) for t in transactions])
+
+        # Category key: transaction type if set, otherwise the side of the amount
+        category_codes, category_labels = _factorize([
+            t.transaction_type or ('Income' if t.amount > 0 else 'Expense') for t in transactions
+        ])
+        category_set_codes, category_sets = _factorize([t.category_ids for t in transactions])
+
+        return cls(
+            amounts=amounts,
+            months=months,
+            account_codes=account_codes,
+            account_labels=account_labels,
+            category_codes=category_codes,
+            category_labels=category_labels,
+            category_set_codes=category_set_codes,
+            category_sets=category_sets
+        )
+
+    def transfer_mask(self, transfer_category_ids: Set[str]) -> "np.ndarray":
+        """Boolean mask of rows carrying any transfer category."""
+        if not transfer_category_ids:
+            return np.zeros(len(self), dtype=bool)
+        is_transfer = np.array(
+            [not transfer_category_ids.isdisjoint(ids) for ids in self.category_sets], dtype=bool
+        )
+        return is_transfer[self.category_set_codes]
+
+    def category_spending(self, mask: Optional["np.ndarray"] = None) -> Tuple[Dict[str, Decimal], Dict[str, int]]:
+        """Absolute spending and row count per category key over the masked rows."""
+        codes = self.category_codes if mask is None else self.category_codes[mask]
+        amounts = self.amounts if mask is None else self.amounts[mask]
+        size = len(self.category_labels)
+
+        sums = _group_sums(codes, np.abs(amounts), size)
+        counts = np.bincount(codes, minlength=size)
+
+        spending, row_counts = {}, {}
+        for code in np.flatnonzero(counts):
+            label = self.category_labels[code]
+            spending[label] = _to_decimal(sums[code])
+            row_counts[label] = int(counts[code])
+        return spending, row_counts
+
+
+def aggregate_period(transactions: Sequence[TransactionSummary],
+                     transfer_category_ids: Set[str]) -> Optional[Dict[str, Any]]:
+    """
+    Vectorized equivalent of the engine's single-pass period aggregation.
+
+    Returns:
+        Dictionary with total_income, total_expenses, transaction_count,
+        monthly_income, category_spending, category_counts and account_flows
+        (account id to [income, expenses, count]), or None if the columnar
+        backend cannot be used for these transactions
+    """
+    if not NUMPY_AVAILABLE or len(transactions) < COLUMNAR_MIN_ROWS:
+        return None
+
+    columns = TransactionColumns.from_summaries(transactions)
+    if columns is None:
+        logger.info("Amounts exceed minor-unit precision - using Python aggregation")
+        return None
+
+    return aggregate_columns(columns, transfer_category_ids)
+
+
+def aggregate_columns(columns: TransactionColumns, transfer_category_ids: Set[str]) -> Dict[str, Any]:
+    """Run the period aggregation over already loaded columns (see aggregate_period)."""
+    amounts = columns.amounts
+    income = amounts > 0
+    kept = ~columns.transfer_mask(transfer_category_ids)
+    kept_income = kept & income
+    kept_expense = kept & ~income
+
+    # Monthly income for the stability score
+    income_months, month_codes = np.unique(columns.months[kept_income], return_inverse=True)
+    month_sums = _group_sums(month_codes.ravel(), amounts[kept_income], len(income_months))
+    monthly_income = {
+        str(month): _to_decimal(total) for month, total in zip(income_months, month_sums)
+    }
+
+    category_spending, category_counts = columns.category_spending(kept)
+
+    # Per-account flows, transfers included
+    size = len(columns.account_labels)
+    account_income = _group_sums(columns.account_codes, np.where(income, amounts, 0), size)
+    account_expenses = _group_sums(columns.account_codes, np.where(amounts < 0, -amounts, 0), size)
+    account_counts = np.bincount(columns.account_codes, minlength=size)
+    account_flows = {
+        label: [_to_decimal(account_income[code]), _to_decimal(account_expenses[code]), int(account_counts[code])]
+        for code, label in enumerate(columns.account_labels)
+    }
+
+    return {
+        'total_income': _to_decimal(amounts[kept_income].sum()),
+        'total_expenses': _to_decimal(-amounts[kept_expense].sum()),
+        'transaction_count': int(kept.sum()),
+        'monthly_income': monthly_income,
+        'category_spending': category_spending,
+        'category_counts': category_counts,
+        'account_flows': account_flows,
+    }
+
+
+def category_spending(transactions: Sequence[TransactionSummary]) -> Optional[Dict[str, Decimal]]:
+    """
+    Vectorized absolute spending per category key, transfers included.
+
+    Returns:
+        Spending per category, or None if the columnar backend cannot be used
+    """
+    if not NUMPY_AVAILABLE or len(transactions) < COLUMNAR_MIN_ROWS:
+        return None
+
+    columns = TransactionColumns.from_summaries(transactions)
+    if columns is None:
+        return None
+    return columns.category_spending()[0]
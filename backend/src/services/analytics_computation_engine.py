@@ -3,19 +3,57 @@ Analytics computation engine for financial analytics.
 """
 import logging
 import uuid
-from datetime import date, datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from collections import defaultdict
 
 from models.account import AccountType
-from models.transaction import Transaction
+from models.analytics import AnalyticType, MonthlyRollup
+from models.transaction import TransactionSummary, TRANSACTION_SUMMARY_ATTRIBUTES
 from models.category import CategoryType
-from utils.db_utils import list_user_accounts, list_user_transactions, list_categories_by_user_from_db
+from services import analytics_columnar
+from utils.db_utils import list_user_accounts, iter_user_transactions, list_categories_by_user_from_db
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Analytics computed by AnalyticsComputationEngine.compute_analytics
+ENGINE_ANALYTIC_TYPES = (
+    AnalyticType.CASH_FLOW,
+    AnalyticType.CATEGORY_TRENDS,
+    AnalyticType.ACCOUNT_EFFICIENCY,
+    AnalyticType.FINANCIAL_HEALTH,
+)
+
+
+@dataclass
+class AnalyticsComputationContext:
+    """
+    Transactions of one user, fetched once per date window.
+
+    Pass the same context to every computation for a user so that a window
+    shared by several analytics is only read from DynamoDB once.
+    """
+    user_id: str
+    windows: Dict[Tuple[date, date, Optional[str]], List[TransactionSummary]] = field(default_factory=dict)
+
+
+@dataclass
+class _PeriodTotals:
+    """Aggregates collected in a single pass over a period's transactions."""
+    total_income: Decimal = Decimal('0')
+    total_expenses: Decimal = Decimal('0')
+    transaction_count: int = 0  # Excludes transfers
+    monthly_income: Dict[str, Decimal] = field(default_factory=lambda: defaultdict(lambda: Decimal('0')))
+    category_spending: Dict[str, Decimal] = field(default_factory=lambda: defaultdict(lambda: Decimal('0')))
+    category_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # Account id to [income, expenses, count], transfers included
+    account_flows: Dict[str, List[Any]] = field(
+        default_factory=lambda: defaultdict(lambda: [Decimal('0'), Decimal('0'), 0])
+    )
+
 
 class AnalyticsComputationEngine:
     """
@@ -44,25 +82,147 @@ class AnalyticsComputationEngine:
             logger.warning(f"Error getting transfer categories for user {user_id}: {str(e)}")
             return set()
     
-    def _is_transfer_transaction(self, transaction: Transaction, user_id: str) -> bool:
+    def _is_transfer_transaction(self, transaction: TransactionSummary, user_id: str) -> bool:
         """Check if a transaction is categorized as a transfer."""
-        if not transaction.categories:
+        if not transaction.category_ids:
             return False
         
         transfer_category_ids = self._get_transfer_category_ids(user_id)
         
-        for assignment in transaction.categories:
-            if str(assignment.category_id) in transfer_category_ids:
-                return True
-        
-        return False
+        return any(category_id in transfer_category_ids for category_id in transaction.category_ids)
     
-    def _filter_non_transfer_transactions(self, transactions: List[Transaction], user_id: str) -> List[Transaction]:
-        """Filter out transfer transactions from the list."""
-        return [tx for tx in transactions if not self._is_transfer_transaction(tx, user_id)]
+    def compute_analytics(self, user_id: str, time_period: str,
+                          analytic_types: Iterable[AnalyticType],
+                          account_id: Optional[str] = None,
+                          context: Optional[AnalyticsComputationContext] = None
+                          ) -> Dict[AnalyticType, Dict[str, Any]]:
+        """
+        Compute several analytic types for one period in a single pass.
+
+        The period's transactions are read once and aggregated once; category
+        trends add one read of the previous period.
+
+        Args:
+            user_id: The user ID
+            time_period: Time period (e.g., '2024-12', '2024-Q4', '2024')
+            analytic_types: Types to compute, from ENGINE_ANALYTIC_TYPES
+            account_id: Optional specific account ID (cash flow and categories)
+            context: Optional context shared with other computations for the user
+
+        Returns:
+            Dictionary of analytic type to its analytics data
+        """
+        requested = set(analytic_types)
+        context = context or AnalyticsComputationContext(user_id=user_id)
+
+        start_date, end_date = self._parse_time_period(time_period)
+        transactions = self._get_window_transactions(context, start_date, end_date, account_id)
+        logger.info(f"Computing {[t.value for t in requested]} for user {user_id}, period {start_date} to {end_date}, "
+                    f"account {account_id}: {len(transactions)} transactions")
+
+        totals = self._aggregate_transactions(user_id, transactions)
+        results = {}
+
+        needs_cash_flow = bool(requested & {AnalyticType.CASH_FLOW, AnalyticType.FINANCIAL_HEALTH})
+        needs_accounts = bool(requested & {AnalyticType.ACCOUNT_EFFICIENCY, AnalyticType.FINANCIAL_HEALTH})
+
+        if needs_cash_flow:
+            results[AnalyticType.CASH_FLOW] = self._build_cash_flow_result(
+                totals.total_income, totals.total_expenses, totals.transaction_count,
+                totals.monthly_income, start_date, end_date
+            )
+
+        if AnalyticType.CATEGORY_TRENDS in requested:
+            # Previous period of the same length, immediately before this one
+            period_length = (end_date - start_date).days
+            previous_end = start_date - timedelta(days=1)
+            previous_start = previous_end - timedelta(days=period_length)
+            previous_spending = self._category_spending(
+                self._get_window_transactions(context, previous_start, previous_end, account_id)
+            )
+            category_trends = self._compare_category_spending(totals.category_spending, previous_spending)
+            results[AnalyticType.CATEGORY_TRENDS] = self._build_category_result(
+                totals.category_spending, totals.category_counts, category_trends
+            )
+
+        if needs_accounts:
+            accounts = list_user_accounts(user_id)
+            account_flows = {account: tuple(flow) for account, flow in totals.account_flows.items()}
+            results[AnalyticType.ACCOUNT_EFFICIENCY] = self._build_account_result(accounts, account_flows)
+
+        if AnalyticType.FINANCIAL_HEALTH in requested:
+            results[AnalyticType.FINANCIAL_HEALTH] = self._build_financial_health_result(
+                results[AnalyticType.CASH_FLOW], results[AnalyticType.ACCOUNT_EFFICIENCY]
+            )
+
+        return {analytic_type: results[analytic_type] for analytic_type in requested if analytic_type in results}
+
+    def _get_window_transactions(self, context: AnalyticsComputationContext, start_date: date,
+                                 end_date: date, account_id: Optional[str] = None) -> List[TransactionSummary]:
+        """Return the transactions of a date window, reading it at most once per context."""
+        key = (start_date, end_date, account_id)
+        if key not in context.windows:
+            account_ids = [uuid.UUID(account_id)] if account_id else None
+            context.windows[key] = self._get_transactions_for_period(
+                context.user_id, start_date, end_date, account_ids
+            )
+        return context.windows[key]
+
+    def _aggregate_transactions(self, user_id: str, transactions: List[TransactionSummary]) -> _PeriodTotals:
+        """
+        Collect cash flow, category and per-account aggregates in one pass.
+
+        Large periods are aggregated with the columnar NumPy backend when it
+        is available; the results are identical.
+        """
+        columnar = analytics_columnar.aggregate_period(transactions, self._get_transfer_category_ids(user_id))
+        if columnar is not None:
+            return _PeriodTotals(**columnar)
+
+        totals = _PeriodTotals()
+
+        for transaction in transactions:
+            amount = transaction.amount
+
+            # Account analytics count every transaction, transfers included
+            flow = totals.account_flows[str(transaction.account_id)]
+            if amount > 0:
+                flow[0] += amount
+            elif amount < 0:
+                flow[1] += abs(amount)
+            flow[2] += 1
+
+            if self._is_transfer_transaction(transaction, user_id):
+                continue
+
+            totals.transaction_count += 1
+            if amount > 0:
+                totals.total_income += amount
+                transaction_date = datetime.fromtimestamp(transaction.date / 1000, tz=timezone.utc)
+                totals.monthly_income[transaction_date.strftime('%Y-%m')] += amount
+            else:
+                totals.total_expenses += abs(amount)
+
+            category = self._category_key(transaction.transaction_type, amount > 0)
+            totals.category_spending[category] += abs(amount)
+            totals.category_counts[category] += 1
+
+        return totals
+
+    def _category_spending(self, transactions: List[TransactionSummary]) -> Dict[str, Decimal]:
+        """Spending per category key, transfers included."""
+        columnar = analytics_columnar.category_spending(transactions)
+        if columnar is not None:
+            return columnar
+
+        spending = defaultdict(lambda: Decimal('0'))
+        for transaction in transactions:
+            spending[self._category_key(transaction.transaction_type, transaction.amount > 0)] += abs(transaction.amount)
+        return spending
 
     def compute_cash_flow_analytics(self, user_id: str, time_period: str,
-                                    account_id: Optional[str] = None) -> Dict[str, Any]:
+                                    account_id: Optional[str] = None,
+                                    context: Optional[AnalyticsComputationContext] = None) -> Dict[str, Any]:
         """
         Compute cash flow analytics for the Overview tab.
 
@@ -70,101 +230,122 @@ class AnalyticsComputationEngine:
             user_id: The user ID
             time_period: Time period (e.g., '2024-12', '2024-Q4', '2024')
             account_id: Optional specific account ID
+            context: Optional context shared with other computations for the user
 
         Returns:
             Dictionary with cash flow analytics data
         """
-        logger.info(f"Computing cash flow analytics for user {user_id}, period {time_period}, account {account_id}")
-        
         try:
-            # Parse time period to get date range
-            start_date, end_date = self._parse_time_period(time_period)
-            logger.info(f"Parsed time period: {start_date} to {end_date}")
+            return self.compute_analytics(
+                user_id, time_period, [AnalyticType.CASH_FLOW], account_id, context
+            )[AnalyticType.CASH_FLOW]
 
-            # Get transactions for the period
-            account_ids = [uuid.UUID(account_id)] if account_id else None
-            all_transactions = self._get_transactions_for_period(user_id, start_date, end_date, account_ids)
-            logger.info(f"Found {len(all_transactions)} transactions in period")
-            
-            # Filter out transfer transactions
-            transactions = self._filter_non_transfer_transactions(all_transactions, user_id)
-            logger.info(f"After filtering transfers: {len(transactions)} transactions")
-
-            # Separate income and expenses
-            income_transactions = []
-            expense_transactions = []
-
-            for transaction in transactions:
-                logger.debug(f"Processing transaction {transaction.transaction_id}: amount={transaction.amount}")
-                if transaction.amount > 0:
-                    income_transactions.append(transaction)
-                else:
-                    expense_transactions.append(transaction)
-
-            logger.info(f"Split into {len(income_transactions)} income and {len(expense_transactions)} expense transactions")
+        except Exception as e:
+            logger.error(f"Error computing cash flow analytics: {str(e)}")
+            return self._default_cash_flow_result()
 
-            # Calculate totals
-            total_income = sum(t.amount for t in income_transactions)
-            total_expenses = abs(sum(t.amount for t in expense_transactions))
-            net_cash_flow = total_income - total_expenses
+    def compute_cash_flow_from_rollups(self, user_id: str, time_period: str,
+                                       rollups: List[MonthlyRollup],
+                                       account_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compute cash flow analytics from monthly rollups instead of transactions.
 
-            logger.info(f"Calculated totals - Income: {total_income}, Expenses: {total_expenses}, Net Cash Flow: {net_cash_flow}")
+        Args:
+            user_id: The user ID
+            time_period: Time period (e.g., '2024-12', '2024-Q4', '2024')
+            rollups: The user's monthly rollups
+            account_id: Optional specific account ID
 
-            # Calculate monthly averages if period is longer than a month
-            months_in_period = self._calculate_months_in_period(start_date, end_date)
-            avg_monthly_income = total_income / months_in_period if months_in_period > 0 else total_income
-            avg_monthly_expenses = total_expenses / months_in_period if months_in_period > 0 else total_expenses
+        Returns:
+            Dictionary with cash flow analytics data
+        """
+        try:
+            start_date, end_date = self._parse_time_period(time_period)
+            transfer_category_ids = self._get_transfer_category_ids(user_id)
 
-            # Calculate transaction frequency
-            transaction_count = len(transactions)
-            avg_transaction_amount = ((total_income + total_expenses) / transaction_count
-                                      if transaction_count > 0 else 0)
+            total_income = Decimal('0')
+            total_expenses = Decimal('0')
+            transaction_count = 0
+            monthly_income = defaultdict(lambda: Decimal('0'))
 
-            # Income stability analysis (variance in monthly income)
-            income_stability_score = self._calculate_income_stability(
-                income_transactions, start_date, end_date
+            for rollup in self._rollups_in_period(rollups, start_date, end_date, account_id):
+                for entry in rollup.entries:
+                    if entry.has_category(transfer_category_ids):
+                        continue
+                    total_income += entry.income
+                    total_expenses += entry.expense
+                    transaction_count += entry.count
+                    if entry.income_count:
+                        monthly_income[rollup.month] += entry.income
+
+            return self._build_cash_flow_result(
+                total_income, total_expenses, transaction_count, monthly_income, start_date, end_date
             )
 
-            # Calculate expense ratio
-            expense_ratio = (total_expenses / total_income * 100) if total_income > 0 else 0
-
-            return {
-                "totalIncome": Decimal(str(total_income)),
-                "totalExpenses": Decimal(str(total_expenses)),
-                "netCashFlow": Decimal(str(net_cash_flow)),
-                "avgMonthlyIncome": Decimal(str(avg_monthly_income)),
-                "avgMonthlyExpenses": Decimal(str(avg_monthly_expenses)),
-                "transactionCount": transaction_count,
-                "avgTransactionAmount": Decimal(str(avg_transaction_amount)),
-                "incomeStabilityScore": Decimal(str(income_stability_score)),
-                "expenseRatio": Decimal(str(expense_ratio)),
-                "cashFlowTrend": "positive" if net_cash_flow > 0 else "negative",
-                "periodMonths": months_in_period,
-                "periodStart": start_date.isoformat(),
-                "periodEnd": end_date.isoformat()
-            }
-
         except Exception as e:
-            logger.error(f"Error computing cash flow analytics: {str(e)}")
-            # Return safe defaults instead of crashing
-            return {
-                "totalIncome": Decimal('0.0'),
-                "totalExpenses": Decimal('0.0'),
-                "netCashFlow": Decimal('0.0'),
-                "avgMonthlyIncome": Decimal('0.0'),
-                "avgMonthlyExpenses": Decimal('0.0'),
-                "transactionCount": 0,
-                "avgTransactionAmount": Decimal('0.0'),
-                "incomeStabilityScore": Decimal('50.0'),
-                "expenseRatio": Decimal('0.0'),
-                "cashFlowTrend": "neutral",
-                "periodMonths": 1,
-                "periodStart": date.today().isoformat(),
-                "periodEnd": date.today().isoformat()
-            }
+            logger.error(f"Error computing cash flow analytics from rollups: {str(e)}")
+            return self._default_cash_flow_result()
+
+    def _build_cash_flow_result(self, total_income: Decimal, total_expenses: Decimal,
+                                transaction_count: int, monthly_income: Dict[str, Decimal],
+                                start_date: date, end_date: date) -> Dict[str, Any]:
+        """Build the cash flow analytics payload from period totals."""
+        net_cash_flow = total_income - total_expenses
+
+        logger.info(f"Calculated totals - Income: {total_income}, Expenses: {total_expenses}, Net Cash Flow: {net_cash_flow}")
+
+        # Calculate monthly averages if period is longer than a month
+        months_in_period = self._calculate_months_in_period(start_date, end_date)
+        avg_monthly_income = total_income / months_in_period if months_in_period > 0 else total_income
+        avg_monthly_expenses = total_expenses / months_in_period if months_in_period > 0 else total_expenses
+
+        # Calculate transaction frequency
+        avg_transaction_amount = ((total_income + total_expenses) / transaction_count
+                                  if transaction_count > 0 else 0)
+
+        # Income stability analysis (variance in monthly income)
+        income_stability_score = self._calculate_income_stability(monthly_income)
+
+        # Calculate expense ratio
+        expense_ratio = (total_expenses / total_income * 100) if total_income > 0 else 0
+
+        return {
+            "totalIncome": Decimal(str(total_income)),
+            "totalExpenses": Decimal(str(total_expenses)),
+            "netCashFlow": Decimal(str(net_cash_flow)),
+            "avgMonthlyIncome": Decimal(str(avg_monthly_income)),
+            "avgMonthlyExpenses": Decimal(str(avg_monthly_expenses)),
+            "transactionCount": transaction_count,
+            "avgTransactionAmount": Decimal(str(avg_transaction_amount)),
+            "incomeStabilityScore": Decimal(str(income_stability_score)),
+            "expenseRatio": Decimal(str(expense_ratio)),
+            "cashFlowTrend": "positive" if net_cash_flow > 0 else "negative",
+            "periodMonths": months_in_period,
+            "periodStart": start_date.isoformat(),
+            "periodEnd": end_date.isoformat()
+        }
+
+    def _default_cash_flow_result(self) -> Dict[str, Any]:
+        """Safe cash flow defaults returned when computation fails."""
+        return {
+            "totalIncome": Decimal('0.0'),
+            "totalExpenses": Decimal('0.0'),
+            "netCashFlow": Decimal('0.0'),
+            "avgMonthlyIncome": Decimal('0.0'),
+            "avgMonthlyExpenses": Decimal('0.0'),
+            "transactionCount": 0,
+            "avgTransactionAmount": Decimal('0.0'),
+            "incomeStabilityScore": Decimal('50.0'),
+            "expenseRatio": Decimal('0.0'),
+            "cashFlowTrend": "neutral",
+            "periodMonths": 1,
+            "periodStart": date.today().isoformat(),
+            "periodEnd": date.today().isoformat()
+        }
 
     def compute_category_analytics(self, user_id: str, time_period: str,
-                                   account_id: Optional[str] = None) -> Dict[str, Any]:
+                                   account_id: Optional[str] = None,
+                                   context: Optional[AnalyticsComputationContext] = None) -> Dict[str, Any]:
         """
         Compute category analytics for the Categories tab.
 
@@ -172,88 +353,216 @@ class AnalyticsComputationEngine:
             user_id: The user ID
             time_period: Time period
             account_id: Optional specific account ID
+            context: Optional context shared with other computations for the user
+
+        Returns:
+            Dictionary with category analytics data
+        """
+        try:
+            return self.compute_analytics(
+                user_id, time_period, [AnalyticType.CATEGORY_TRENDS], account_id, context
+            )[AnalyticType.CATEGORY_TRENDS]
+
+        except Exception as e:
+            logger.error(f"Error computing category analytics: {str(e)}")
+            return self._default_category_result()
+
+    def compute_category_analytics_from_rollups(self, user_id: str, time_period: str,
+                                                rollups: List[MonthlyRollup],
+                                                account_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compute category analytics from monthly rollups instead of transactions.
+
+        Uses the same windows and transfer rules as compute_category_analytics:
+        the period itself without transfers, and the previous period of the
+        same length in days with transfers. Months wholly inside a window come
+        from the rollups; partial months at its edges are read from
+        transactions.
+
+        Args:
+            user_id: The user ID
+            time_period: Time period
+            rollups: The user's monthly rollups
+            account_id: Optional specific account ID
 
         Returns:
             Dictionary with category analytics data
         """
         try:
             start_date, end_date = self._parse_time_period(time_period)
-            account_ids = [uuid.UUID(account_id)] if account_id else None
-            all_transactions = self._get_transactions_for_period(user_id, start_date, end_date, account_ids)
-            
-            # Filter out transfer transactions
-            transactions = self._filter_non_transfer_transactions(all_transactions, user_id)
-
-            # Group transactions by category
-            # Note: Transaction model doesn't have direct category field yet
-            # For now, use transaction_type or a simple categorization
-            category_spending = defaultdict(lambda: Decimal('0'))
-            category_counts = defaultdict(int)
-
-            for transaction in transactions:
-                # Use transaction_type if available, otherwise categorize by amount
-                if hasattr(transaction, 'transaction_type') and transaction.transaction_type:
-                    category = transaction.transaction_type
-                else:
-                    # Simple categorization based on amount (positive = income, negative = expense)
-                    category = 'Income' if transaction.amount > 0 else 'Expense'
-                
-                category_spending[category] += abs(transaction.amount)
-                category_counts[category] += 1
-
-            # Calculate category percentages
-            total_spending = sum(category_spending.values())
-            category_percentages = {}
-            category_rankings = []
-
-            for category, amount in category_spending.items():
-                percentage = (amount / total_spending * 100) if total_spending > 0 else 0
-                category_percentages[category] = percentage
-                category_rankings.append({
-                    "category": category,
-                    "amount": Decimal(str(amount)),
-                    "percentage": Decimal(str(percentage)),
-                    "transactionCount": category_counts[category]
-                })
-
-            # Sort by spending amount
-            category_rankings.sort(key=lambda x: x["amount"], reverse=True)
-
-            # Calculate category trends (requires historical comparison)
-            category_trends = self._calculate_category_trends(
-                user_id, time_period, category_spending, account_ids
+
+            category_spending, category_counts = self._window_category_spending(
+                user_id, rollups, start_date, end_date, account_id, include_transfers=False
             )
 
-            return {
-                "categoryBreakdown": category_rankings,
-                "categoryPercentages": category_percentages,
-                "categoryTrends": category_trends,
-                "totalSpending": Decimal(str(total_spending)),
-                "topCategory": category_rankings[0]["category"] if category_rankings else None,
-                "categoryCount": len(category_spending),
-                "uncategorizedAmount": Decimal('0')  # No uncategorized since we're using simple categorization
-            }
+            period_length = (end_date - start_date).days
+            previous_end = start_date - timedelta(days=1)
+            previous_start = previous_end - timedelta(days=period_length)
+            previous_spending, _ = self._window_category_spending(
+                user_id, rollups, previous_start, previous_end, account_id, include_transfers=True
+            )
+
+            category_trends = self._compare_category_spending(category_spending, previous_spending)
+            return self._build_category_result(category_spending, category_counts, category_trends)
 
         except Exception as e:
-            logger.error(f"Error computing category analytics: {str(e)}")
-            # Return safe defaults instead of crashing
-            return {
-                "categoryBreakdown": [],
-                "categoryPercentages": {},
-                "categoryTrends": {},
-                "totalSpending": Decimal('0.0'),
-                "topCategory": None,
-                "categoryCount": 0,
-                "uncategorizedAmount": Decimal('0')
-            }
+            logger.error(f"Error computing category analytics from rollups: {str(e)}")
+            return self._default_category_result()
 
-    def compute_account_analytics(self, user_id: str, time_period: str) -> Dict[str, Any]:
+    def _window_category_spending(self, user_id: str, rollups: List[MonthlyRollup],
+                                  start_date: date, end_date: date, account_id: Optional[str],
+                                  include_transfers: bool) -> Tuple[Dict[str, Decimal], Dict[str, int]]:
+        """
+        Spending and counts per category key for a date window.
+
+        Whole months come from the rollups and partial months from the
+        window's transactions, so the result matches the transaction path
+        (_aggregate_transactions without transfers, _category_spending with).
+        """
+        transfer_category_ids = set() if include_transfers else self._get_transfer_category_ids(user_id)
+
+        full_start = start_date if start_date.day == 1 else self._shift_months(start_date, 1)
+        full_end = self._shift_months(end_date, 1 if (end_date + timedelta(days=1)).day == 1 else 0) - timedelta(days=1)
+        if full_start > full_end:
+            category_spending, category_counts = defaultdict(lambda: Decimal('0')), defaultdict(int)
+            partial_ranges = [(start_date, end_date)]
+        else:
+            category_spending, category_counts = self._rollup_category_spending(
+                self._rollups_in_period(rollups, full_start, full_end, account_id), transfer_category_ids
+            )
+            partial_ranges = [
+                (range_start, range_end)
+                for range_start, range_end in ((start_date, full_start - timedelta(days=1)),
+                                               (full_end + timedelta(days=1), end_date))
+                if range_start <= range_end
+            ]
+
+        account_ids = [uuid.UUID(account_id)] if account_id else None
+        for range_start, range_end in partial_ranges:
+            transactions = self._get_transactions_for_period(user_id, range_start, range_end, account_ids)
+            if include_transfers:
+                partial_spending, partial_counts = self._category_spending(transactions), {}
+            else:
+                totals = self._aggregate_transactions(user_id, transactions)
+                partial_spending, partial_counts = totals.category_spending, totals.category_counts
+            for category, amount in partial_spending.items():
+                category_spending[category] += amount
+            for category, count in partial_counts.items():
+                category_counts[category] += count
+
+        return category_spending, category_counts
+
+    def _rollup_category_spending(self, rollups: List[MonthlyRollup],
+                                  transfer_category_ids: set) -> Tuple[Dict[str, Decimal], Dict[str, int]]:
+        """Sum rollup entries into spending and counts per category key, skipping transfers."""
+        category_spending = defaultdict(lambda: Decimal('0'))
+        category_counts = defaultdict(int)
+
+        for rollup in rollups:
+            for entry in rollup.entries:
+                if entry.has_category(transfer_category_ids):
+                    continue
+                if entry.transaction_type:
+                    category_spending[entry.transaction_type] += entry.income + entry.expense
+                    category_counts[entry.transaction_type] += entry.count
+                    continue
+                if entry.income_count:
+                    category_spending['Income'] += entry.income
+                    category_counts['Income'] += entry.income_count
+                if entry.expense_count:
+                    category_spending['Expense'] += entry.expense
+                    category_counts['Expense'] += entry.expense_count
+
+        return category_spending, category_counts
+
+    @staticmethod
+    def _category_key(transaction_type: Optional[str], is_income: bool) -> str:
+        """
+        Category used for grouping.
+
+        Note: Transaction model doesn't have direct category field yet.
+        Use transaction_type if available, otherwise categorize by amount
+        (positive = income, negative = expense).
+        """
+        if transaction_type:
+            return transaction_type
+        return 'Income' if is_income else 'Expense'
+
+    def _build_category_result(self, category_spending: Dict[str, Decimal],
+                               category_counts: Dict[str, int],
+                               category_trends: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the category analytics payload from per-category spending."""
+        # Calculate category percentages
+        total_spending = sum(category_spending.values())
+        category_percentages = {}
+        category_rankings = []
+
+        for category, amount in category_spending.items():
+            percentage = (amount / total_spending * 100) if total_spending > 0 else 0
+            category_percentages[category] = percentage
+            category_rankings.append({
+                "category": category,
+                "amount": Decimal(str(amount)),
+                "percentage": Decimal(str(percentage)),
+                "transactionCount": category_counts[category]
+            })
+
+        # Sort by spending amount
+        category_rankings.sort(key=lambda x: x["amount"], reverse=True)
+
+        return {
+            "categoryBreakdown": category_rankings,
+            "categoryPercentages": category_percentages,
+            "categoryTrends": category_trends,
+            "totalSpending": Decimal(str(total_spending)),
+            "topCategory": category_rankings[0]["category"] if category_rankings else None,
+            "categoryCount": len(category_spending),
+            "uncategorizedAmount": Decimal('0')  # No uncategorized since we're using simple categorization
+        }
+
+    def _default_category_result(self) -> Dict[str, Any]:
+        """Safe category defaults returned when computation fails."""
+        return {
+            "categoryBreakdown": [],
+            "categoryPercentages": {},
+            "categoryTrends": {},
+            "totalSpending": Decimal('0.0'),
+            "topCategory": None,
+            "categoryCount": 0,
+            "uncategorizedAmount": Decimal('0')
+        }
+
+    def compute_account_analytics(self, user_id: str, time_period: str,
+                                  context: Optional[AnalyticsComputationContext] = None) -> Dict[str, Any]:
         """
         Compute account analytics for the Accounts tab.
 
         Args:
             user_id: The user ID
             time_period: Time period
+            context: Optional context shared with other computations for the user
+
+        Returns:
+            Dictionary with account analytics data
+        """
+        try:
+            return self.compute_analytics(
+                user_id, time_period, [AnalyticType.ACCOUNT_EFFICIENCY], context=context
+            )[AnalyticType.ACCOUNT_EFFICIENCY]
+
+        except Exception as e:
+            logger.error(f"Error computing account analytics: {str(e)}")
+            return self._default_account_result()
+
+    def compute_account_analytics_from_rollups(self, user_id: str, time_period: str,
+                                               rollups: List[MonthlyRollup]) -> Dict[str, Any]:
+        """
+        Compute account analytics from monthly rollups instead of transactions.
+
+        Args:
+            user_id: The user ID
+            time_period: Time period
+            rollups: The user's monthly rollups
 
         Returns:
             Dictionary with account analytics data
@@ -262,176 +571,221 @@ class AnalyticsComputationEngine:
             accounts = list_user_accounts(user_id)
             start_date, end_date = self._parse_time_period(time_period)
 
-            account_analytics = []
-            total_balance = Decimal('0')
-
-            for account in accounts:
-                # Get transactions for this account
-                account_transactions = self._get_transactions_for_period(
-                    user_id, start_date, end_date, [account.account_id]
+            account_flows = defaultdict(lambda: (Decimal('0'), Decimal('0'), 0))
+            for rollup in self._rollups_in_period(rollups, start_date, end_date):
+                income, expenses, count = account_flows[rollup.account_id]
+                account_flows[rollup.account_id] = (
+                    income + rollup.income,
+                    expenses + rollup.expense,
+                    count + rollup.transaction_count
                 )
 
-                # Calculate account metrics
-                account_income = sum(t.amount for t in account_transactions if t.amount > 0)
-                account_expenses = abs(sum(t.amount for t in account_transactions if t.amount < 0))
-                account_net_flow = account_income - account_expenses
-
-                # Credit utilization for credit card accounts
-                credit_utilization = None
-                credit_utilization_estimated = None
-                if type(account.account_type).__name__ == "AccountType" and account.account_type.name == "CREDIT_CARD" and account.balance:
-                    # TODO: Use actual credit limit data when available
-                    # For now, use a rough estimate (3x balance) but mark it as estimated
-                    estimated_limit = abs(account.balance) * 3  # Rough estimate
-                    if estimated_limit > 0:
-                        credit_utilization = (abs(account.balance) / estimated_limit) * 100
-                        credit_utilization_estimated = True  # Mark as estimated since we don't have real credit limit data
-
-                # Account efficiency (transactions per balance)
-                account_efficiency = len(account_transactions) / max(abs(account.balance or Decimal('1')), Decimal('1'))
-
-                account_analytics.append({
-                    "accountId": str(account.account_id),
-                    "accountName": account.account_name,
-                    "accountType": account.account_type.value,
-                    "balance": Decimal(str(account.balance)) if account.balance else Decimal('0'),
-                    "income": Decimal(str(account_income)),
-                    "expenses": Decimal(str(account_expenses)),
-                    "netFlow": Decimal(str(account_net_flow)),
-                    "transactionCount": len(account_transactions),
-                    "creditUtilization": Decimal(str(credit_utilization)) if credit_utilization is not None else None,
-                    "creditUtilizationEstimated": credit_utilization_estimated,
-                    "efficiencyScore": Decimal(str(account_efficiency))
-                })
-
-                if account.balance:
-                    total_balance += account.balance
-
-            # Calculate cross-account insights
-            total_accounts = len(accounts)
-            avg_balance = total_balance / total_accounts if total_accounts > 0 else Decimal('0')
-
-            # Account performance ranking
-            account_analytics.sort(key=lambda x: x["netFlow"], reverse=True)
-
-            return {
-                "accountDetails": account_analytics,
-                "totalBalance": total_balance,
-                "avgBalance": avg_balance,
-                "accountCount": total_accounts,
-                "bestPerformingAccount": account_analytics[0]["accountName"] if account_analytics else None,
-                "highestUtilization": max((a["creditUtilization"] for a in account_analytics
-                                           if a["creditUtilization"] is not None), default=Decimal('0'))
-            }
+            return self._build_account_result(accounts, account_flows)
 
         except Exception as e:
-            logger.error(f"Error computing account analytics: {str(e)}")
-            # Return safe defaults instead of crashing
-            return {
-                "accountDetails": [],
-                "totalBalance": Decimal('0.0'),
-                "avgBalance": Decimal('0.0'),
-                "accountCount": 0,
-                "bestPerformingAccount": None,
-                "highestUtilization": Decimal('0')
-            }
+            logger.error(f"Error computing account analytics from rollups: {str(e)}")
+            return self._default_account_result()
+
+    def _build_account_result(self, accounts: List[Any],
+                              account_flows: Dict[str, Tuple[Decimal, Decimal, int]]) -> Dict[str, Any]:
+        """
+        Build the account analytics payload.
 
-    def compute_financial_health_score(self, user_id: str, time_period: str) -> Dict[str, Any]:
+        Args:
+            accounts: The user's accounts
+            account_flows: Account id to (income, expenses, transaction count) for the period
+        """
+        account_analytics = []
+        total_balance = Decimal('0')
+
+        for account in accounts:
+            account_income, account_expenses, transaction_count = account_flows.get(
+                str(account.account_id), (Decimal('0'), Decimal('0'), 0)
+            )
+            account_net_flow = account_income - account_expenses
+
+            # Credit utilization for credit card accounts
+            credit_utilization = None
+            credit_utilization_estimated = None
+            if type(account.account_type).__name__ == "AccountType" and account.account_type.name == "CREDIT_CARD" and account.balance:
+                # TODO: Use actual credit limit data when available
+                # For now, use a rough estimate (3x balance) but mark it as estimated
+                estimated_limit = abs(account.balance) * 3  # Rough estimate
+                if estimated_limit > 0:
+                    credit_utilization = (abs(account.balance) / estimated_limit) * 100
+                    credit_utilization_estimated = True  # Mark as estimated since we don't have real credit limit data
+
+            # Account efficiency (transactions per balance)
+            account_efficiency = transaction_count / max(abs(account.balance or Decimal('1')), Decimal('1'))
+
+            account_analytics.append({
+                "accountId": str(account.account_id),
+                "accountName": account.account_name,
+                "accountType": account.account_type.value,
+                "balance": Decimal(str(account.balance)) if account.balance else Decimal('0'),
+                "income": Decimal(str(account_income)),
+                "expenses": Decimal(str(account_expenses)),
+                "netFlow": Decimal(str(account_net_flow)),
+                "transactionCount": transaction_count,
+                "creditUtilization": Decimal(str(credit_utilization)) if credit_utilization is not None else None,
+                "creditUtilizationEstimated": credit_utilization_estimated,
+                "efficiencyScore": Decimal(str(account_efficiency))
+            })
+
+            if account.balance:
+                total_balance += account.balance
+
+        # Calculate cross-account insights
+        total_accounts = len(accounts)
+        avg_balance = total_balance / total_accounts if total_accounts > 0 else Decimal('0')
+
+        # Account performance ranking
+        account_analytics.sort(key=lambda x: x["netFlow"], reverse=True)
+
+        return {
+            "accountDetails": account_analytics,
+            "totalBalance": total_balance,
+            "avgBalance": avg_balance,
+            "accountCount": total_accounts,
+            "bestPerformingAccount": account_analytics[0]["accountName"] if account_analytics else None,
+            "highestUtilization": max((a["creditUtilization"] for a in account_analytics
+                                       if a["creditUtilization"] is not None), default=Decimal('0'))
+        }
+
+    def _default_account_result(self) -> Dict[str, Any]:
+        """Safe account defaults returned when computation fails."""
+        return {
+            "accountDetails": [],
+            "totalBalance": Decimal('0.0'),
+            "avgBalance": Decimal('0.0'),
+            "accountCount": 0,
+            "bestPerformingAccount": None,
+            "highestUtilization": Decimal('0')
+        }
+
+    def compute_financial_health_score(self, user_id: str, time_period: str,
+                                       context: Optional[AnalyticsComputationContext] = None) -> Dict[str, Any]:
         """
         Compute overall financial health score.
 
         Args:
             user_id: The user ID
             time_period: Time period
+            context: Optional context shared with other computations for the user
 
         Returns:
             Dictionary with financial health score and breakdown
         """
         try:
-            # Get component analytics
-            cash_flow_data = self.compute_cash_flow_analytics(user_id, time_period)
-            account_data = self.compute_account_analytics(user_id, time_period)
-
-            # Handle None cash_flow_data
-            if cash_flow_data is None:
-                cash_flow_data = {
-                    "netCashFlow": 0,
-                    "totalIncome": 0,
-                    "incomeStabilityScore": 50,
-                    "expenseRatio": 0
-                }
+            return self.compute_analytics(
+                user_id, time_period, [AnalyticType.FINANCIAL_HEALTH], context=context
+            )[AnalyticType.FINANCIAL_HEALTH]
 
-            # Handle None account_data
-            if account_data is None:
-                account_data = {"highestUtilization": 0}
+        except Exception as e:
+            logger.error(f"Error computing financial health score: {str(e)}")
+            raise
 
-            # Component scores (0-100)
-            cash_flow_score = min(100, max(0,
-                                           (float(cash_flow_data["netCashFlow"]) / 
-                                            max(float(cash_flow_data["totalIncome"]), 1) * 100) + 50))
-            
-            income_stability_score = float(cash_flow_data["incomeStabilityScore"])
-            
-            expense_management_score = min(100, max(0, 100 - float(cash_flow_data["expenseRatio"])))
-            
-            account_health_score = 100 - min(100, float(account_data.get("highestUtilization", 0)))
-
-            # Weighted overall score
-            overall_score = (
-                cash_flow_score * 0.3 +
-                income_stability_score * 0.25 +
-                expense_management_score * 0.25 +
-                account_health_score * 0.2
-            )
+    def compute_financial_health_from_rollups(self, user_id: str, time_period: str,
+                                              rollups: List[MonthlyRollup]) -> Dict[str, Any]:
+        """
+        Compute overall financial health score from monthly rollups.
 
-            # Generate recommendations
-            recommendations = self._generate_health_recommendations(
-                overall_score, cash_flow_data, account_data
-            )
+        Args:
+            user_id: The user ID
+            time_period: Time period
+            rollups: The user's monthly rollups
 
-            # Calculate additional health indicators
-            emergency_fund_months = 0.0  # TODO: Calculate based on savings vs expenses
-            debt_to_income_ratio = 0.0   # TODO: Calculate based on debt payments vs income
-            savings_rate = 0.0           # TODO: Calculate savings rate
-            expense_volatility = 0.0     # TODO: Calculate expense variance
-            
-            # Generate risk factors based on scores
-            risk_factors = []
-            if cash_flow_score < 50:
-                risk_factors.append("Negative cash flow - expenses exceed income")
-            if float(income_stability_score) < 60:
-                risk_factors.append("Irregular income patterns detected")
-            if expense_management_score < 50:
-                risk_factors.append("High expense ratio relative to income")
-            if account_health_score < 70:
-                risk_factors.append("High credit utilization detected")
-
-            return {
-                "overallScore": Decimal(str(round(overall_score, 1))),
-                "componentScores": {
-                    "cashFlowScore": Decimal(str(round(cash_flow_score, 1))),
-                    "expenseStabilityScore": Decimal(str(round(expense_management_score, 1))),
-                    "emergencyFundScore": Decimal(str(round(account_health_score, 1))),  # Using account health as proxy
-                    "debtManagementScore": Decimal(str(round(account_health_score, 1))), # Using account health as proxy
-                    "savingsRateScore": Decimal(str(round(float(income_stability_score), 1)))  # Using income stability as proxy
-                },
-                "healthIndicators": {
-                    "emergencyFundMonths": Decimal(str(emergency_fund_months)),
-                    "debtToIncomeRatio": Decimal(str(debt_to_income_ratio)),
-                    "savingsRate": Decimal(str(savings_rate)),
-                    "expenseVolatility": Decimal(str(expense_volatility))
-                },
-                "scoreLevel": ("excellent" if overall_score >= 80 else
-                               "good" if overall_score >= 60 else
-                               "fair" if overall_score >= 40 else "poor"),
-                "recommendations": recommendations,
-                "riskFactors": risk_factors
-            }
+        Returns:
+            Dictionary with financial health score and breakdown
+        """
+        try:
+            cash_flow_data = self.compute_cash_flow_from_rollups(user_id, time_period, rollups)
+            account_data = self.compute_account_analytics_from_rollups(user_id, time_period, rollups)
+            return self._build_financial_health_result(cash_flow_data, account_data)
 
         except Exception as e:
-            logger.error(f"Error computing financial health score: {str(e)}")
+            logger.error(f"Error computing financial health score from rollups: {str(e)}")
             raise
 
+    def _build_financial_health_result(self, cash_flow_data: Optional[Dict[str, Any]],
+                                       account_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the financial health payload from cash flow and account analytics."""
+        # Handle None cash_flow_data
+        if cash_flow_data is None:
+            cash_flow_data = {
+                "netCashFlow": 0,
+                "totalIncome": 0,
+                "incomeStabilityScore": 50,
+                "expenseRatio": 0
+            }
+
+        # Handle None account_data
+        if account_data is None:
+            account_data = {"highestUtilization": 0}
+
+        # Component scores (0-100)
+        cash_flow_score = min(100, max(0,
+                                       (float(cash_flow_data["netCashFlow"]) / 
+                                        max(float(cash_flow_data["totalIncome"]), 1) * 100) + 50))
+        
+        income_stability_score = float(cash_flow_data["incomeStabilityScore"])
+        
+        expense_management_score = min(100, max(0, 100 - float(cash_flow_data["expenseRatio"])))
+        
+        account_health_score = 100 - min(100, float(account_data.get("highestUtilization", 0)))
+
+        # Weighted overall score
+        overall_score = (
+            cash_flow_score * 0.3 +
+            income_stability_score * 0.25 +
+            expense_management_score * 0.25 +
+            account_health_score * 0.2
+        )
+
+        # Generate recommendations
+        recommendations = self._generate_health_recommendations(
+            overall_score, cash_flow_data, account_data
+        )
+
+        # Calculate additional health indicators
+        emergency_fund_months = 0.0  # TODO: Calculate based on savings vs expenses
+        debt_to_income_ratio = 0.0   # TODO: Calculate based on debt payments vs income
+        savings_rate = 0.0           # TODO: Calculate savings rate
+        expense_volatility = 0.0     # TODO: Calculate expense variance
+        
+        # Generate risk factors based on scores
+        risk_factors = []
+        if cash_flow_score < 50:
+            risk_factors.append("Negative cash flow - expenses exceed income")
+        if float(income_stability_score) < 60:
+            risk_factors.append("Irregular income patterns detected")
+        if expense_management_score < 50:
+            risk_factors.append("High expense ratio relative to income")
+        if account_health_score < 70:
+            risk_factors.append("High credit utilization detected")
+
+        return {
+            "overallScore": Decimal(str(round(overall_score, 1))),
+            "componentScores": {
+                "cashFlowScore": Decimal(str(round(cash_flow_score, 1))),
+                "expenseStabilityScore": Decimal(str(round(expense_management_score, 1))),
+                "emergencyFundScore": Decimal(str(round(account_health_score, 1))),  # Using account health as proxy
+                "debtManagementScore": Decimal(str(round(account_health_score, 1))), # Using account health as proxy
+                "savingsRateScore": Decimal(str(round(float(income_stability_score), 1)))  # Using income stability as proxy
+            },
+            "healthIndicators": {
+                "emergencyFundMonths": Decimal(str(emergency_fund_months)),
+                "debtToIncomeRatio": Decimal(str(debt_to_income_ratio)),
+                "savingsRate": Decimal(str(savings_rate)),
+                "expenseVolatility": Decimal(str(expense_volatility))
+            },
+            "scoreLevel": ("excellent" if overall_score >= 80 else
+                           "good" if overall_score >= 60 else
+                           "fair" if overall_score >= 40 else "poor"),
+            "recommendations": recommendations,
+            "riskFactors": risk_factors
+        }
+
     def _parse_time_period(self, time_period: str) -> Tuple[date, date]:
         """
         Parse time period string into start and end dates.
@@ -519,22 +873,23 @@ class AnalyticsComputationEngine:
             return start_date, end_date
 
     def _get_transactions_for_period(self, user_id: str, start_date: date, end_date: date,
-                                     account_ids: Optional[List[uuid.UUID]] = None) -> List[Transaction]:
+                                     account_ids: Optional[List[uuid.UUID]] = None) -> List[TransactionSummary]:
         """Get transactions for a specific time period and optional account filter."""
         try:
             # Convert dates to milliseconds for the API
             start_timestamp = int(datetime.combine(start_date, datetime.min.time()).timestamp() * 1000)
             end_timestamp = int(datetime.combine(end_date, datetime.max.time()).timestamp() * 1000)
 
-            transactions, _, _ = list_user_transactions(
+            # Follow pagination to the end; a single page stops at DynamoDB's 1 MB limit.
+            # Only the summary attributes are fetched and no model validation is run.
+            return list(iter_user_transactions(
                 user_id=user_id,
                 account_ids=account_ids,
                 start_date_ts=start_timestamp,
                 end_date_ts=end_timestamp,
-                limit=10000  # Get all transactions in period
-            )
-
-            return transactions
+                projection=TRANSACTION_SUMMARY_ATTRIBUTES,
+                transform=TransactionSummary.from_dynamodb_item
+            ))
 
         except Exception as e:
             logger.error(f"Error getting transactions for period: {str(e)}")
@@ -544,31 +899,37 @@ class AnalyticsComputationEngine:
         """Calculate the number of months in a date range."""
         return ((end_date.year - start_date.year) * 12 + end_date.month - start_date.month) + 1
 
-    def _calculate_income_stability(self, income_transactions: List[Transaction],
-                                    start_date: date, end_date: date) -> Decimal:
+    def _rollups_in_period(self, rollups: List[MonthlyRollup], start_date: date, end_date: date,
+                           account_id: Optional[str] = None) -> List[MonthlyRollup]:
+        """Select the rollups whose month overlaps the date range, optionally for one account."""
+        start_month = start_date.strftime('%Y-%m')
+        end_month = end_date.strftime('%Y-%m')
+        return [
+            rollup for rollup in rollups
+            if start_month <= rollup.month <= end_month
+            and (account_id is None or rollup.account_id == account_id)
+        ]
+
+    @staticmethod
+    def _shift_months(day: date, months: int) -> date:
+        """Return the first day of the month `months` away from the month of `day`."""
+        index = day.year * 12 + day.month - 1 + months
+        return date(index // 12, index % 12 + 1, 1)
+
+    def _calculate_income_stability(self, monthly_income: Dict[str, Decimal]) -> Decimal:
         """
         Calculate income stability score based on variance in monthly income.
 
         Args:
-            income_transactions: List of income transactions
-            start_date: Period start date
-            end_date: Period end date
+            monthly_income: Income totals keyed by YYYY-MM, months without income omitted
 
         Returns:
             Stability score from 0-100 (higher is more stable)
         """
         try:
-            if not income_transactions:
+            if not monthly_income:
                 return Decimal('0.0')
 
-            # Group income by month
-            monthly_income = defaultdict(lambda: Decimal('0'))
-            for transaction in income_transactions:
-                # Convert timestamp to date
-                transaction_date = datetime.fromtimestamp(transaction.date / 1000).date()
-                month_key = f"{transaction_date.year}-{transaction_date.month:02d}"
-                monthly_income[month_key] += transaction.amount
-
             if len(monthly_income) <= 1:
                 return Decimal('100.0')  # Perfect stability if only one month
 
@@ -594,38 +955,10 @@ class AnalyticsComputationEngine:
             logger.error(f"Error calculating income stability: {str(e)}")
             return Decimal('50.0')  # Default neutral score
 
-    def _calculate_category_trends(self, user_id: str, time_period: str,
-                                   current_spending: Dict[str, Decimal],
-                                   account_ids: Optional[List[uuid.UUID]] = None) -> Dict[str, Any]:
-        """Calculate category spending trends compared to previous period."""
+    def _compare_category_spending(self, current_spending: Dict[str, Decimal],
+                                   previous_spending: Dict[str, Decimal]) -> Dict[str, Any]:
+        """Compare per-category spending against the previous period."""
         try:
-            # Get previous period for comparison
-            current_start, current_end = self._parse_time_period(time_period)
-            period_length = (current_end - current_start).days
-
-            # Calculate previous period
-            previous_end = current_start - timedelta(days=1)
-            previous_start = previous_end - timedelta(days=period_length)
-
-            # Get previous period transactions
-            previous_transactions = self._get_transactions_for_period(
-                user_id, previous_start, previous_end, account_ids
-            )
-
-            # Calculate previous period spending by category
-            # Use same categorization logic as main analytics function
-            previous_spending = defaultdict(lambda: Decimal('0'))
-            for transaction in previous_transactions:
-                # Use transaction_type if available, otherwise categorize by amount
-                if hasattr(transaction, 'transaction_type') and transaction.transaction_type:
-                    category = transaction.transaction_type
-                else:
-                    # Simple categorization based on amount (positive = income, negative = expense)
-                    category = 'Income' if transaction.amount > 0 else 'Expense'
-                    
-                previous_spending[category] += abs(transaction.amount)
-
-            # Calculate trends
             trends = {}
             for category, current_amount in current_spending.items():
                 previous_amount = previous_spending.get(category, Decimal('0'))
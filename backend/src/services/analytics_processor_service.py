@@ -4,7 +4,10 @@ Simplified Analytics Processor Lambda - Scheduled processor for pending analytic
 This function runs on a CloudWatch Events schedule (every 10 minutes) and:
 1. Finds analytics that need computation (computationNeeded=True)
 2. Processes them by priority (1=high, 2=medium, 3=low)
-3. Computes analytics using AnalyticsComputationEngine
+3. Computes analytics using AnalyticsComputationEngine, deriving cash flow,
+   category, account and financial health analytics from the user's monthly
+   rollups instead of rescanning their transactions (or, without rollups, in a
+   single pass over each user's transactions)
 4. Stores results and updates status records
 """
 import json
@@ -16,10 +19,14 @@ from typing import Dict, Any, List, Optional
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
-from services.analytics_computation_engine import AnalyticsComputationEngine
-from models.analytics import AnalyticType, AnalyticsData, AnalyticsProcessingStatus
+from services.analytics_computation_engine import AnalyticsComputationEngine, ENGINE_ANALYTIC_TYPES
+from services.analytics_rollup_service import ensure_user_rollups
+from models.analytics import AnalyticType, AnalyticsData, AnalyticsProcessingStatus, MonthlyRollup
 from utils.db_utils import list_stale_analytics, store_analytics_data, store_analytics_status
 
+# Analytics that can be derived from monthly rollups
+ROLLUP_ANALYTIC_TYPES = set(ENGINE_ANALYTIC_TYPES)
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Main handler for the scheduled analytics processor.
@@ -92,6 +99,8 @@ def process_user_analytics_simple(user_id: str, status_list: List[AnalyticsProce
     
     # Initialize services
     computation_engine = AnalyticsComputationEngine()
+    rollups = load_user_rollups(user_id, status_list)
+    fused_results = compute_fused_analytics(computation_engine, user_id, status_list) if rollups is None else {}
     
     # Sort by priority (1=high, 2=medium, 3=low)
     status_list.sort(key=lambda x: x.processing_priority)
@@ -104,9 +113,12 @@ def process_user_analytics_simple(user_id: str, status_list: List[AnalyticsProce
             logger.info(f"🔄 Computing {analytic_type.value} analytics for user {user_id} (priority {priority})")
             
             # Compute analytics based on type using "overall" time period
-            analytics_data = compute_analytics_by_type_simple(
-                computation_engine, analytic_type, user_id
-            )
+            if analytic_type in fused_results:
+                analytics_data = fused_results[analytic_type]
+            else:
+                analytics_data = compute_analytics_by_type_simple(
+                    computation_engine, analytic_type, user_id, rollups
+                )
             
             if analytics_data is None:
                 logger.info(f"⏭️  Skipping {analytic_type.value} - no data available")
@@ -143,10 +155,51 @@ def process_user_analytics_simple(user_id: str, status_list: List[AnalyticsProce
             stats['failed'] += 1
 
 
+def load_user_rollups(user_id: str, status_list: List[AnalyticsProcessingStatus]) -> Optional[List[MonthlyRollup]]:
+    """
+    Load the user's monthly rollups once for all pending rollup-backed analytics.
+    
+    Returns:
+        The rollups, or None if no pending analytic uses them or they could not be loaded
+    """
+    if not any(status.analytic_type in ROLLUP_ANALYTIC_TYPES for status in status_list):
+        return None
+    
+    try:
+        return ensure_user_rollups(user_id)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not load monthly rollups for user {user_id}, computing from transactions: {str(e)}")
+        return None
+
+
+def compute_fused_analytics(
+    engine: AnalyticsComputationEngine,
+    user_id: str,
+    status_list: List[AnalyticsProcessingStatus]
+) -> Dict[AnalyticType, Dict[str, Any]]:
+    """
+    Compute every pending engine analytic of a user in one pass over their transactions.
+    
+    Returns:
+        Analytic type to computed data; empty if the fused computation failed, in
+        which case each type is computed on its own
+    """
+    analytic_types = {status.analytic_type for status in status_list} & set(ENGINE_ANALYTIC_TYPES)
+    if not analytic_types:
+        return {}
+    
+    try:
+        return engine.compute_analytics(user_id, "overall", analytic_types)
+    except Exception as e:
+        logger.warning(f"⚠️  Fused analytics computation failed for user {user_id}, computing types separately: {str(e)}")
+        return {}
+
+
 def compute_analytics_by_type_simple(
     engine: AnalyticsComputationEngine, 
     analytic_type: AnalyticType, 
-    user_id: str
+    user_id: str,
+    rollups: Optional[List[MonthlyRollup]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Compute specific analytics based on the type (simplified version).
@@ -155,6 +208,7 @@ def compute_analytics_by_type_simple(
         engine: Analytics computation engine
         analytic_type: Type of analytics to compute
         user_id: User ID
+        rollups: The user's monthly rollups; when given, supported analytics are derived from them
         
     Returns:
         Computed analytics data or None if computation failed
@@ -163,6 +217,9 @@ def compute_analytics_by_type_simple(
         # Use "overall" as the time period for all computations
         time_period = "overall"
         
+        if rollups is not None and analytic_type in ROLLUP_ANALYTIC_TYPES:
+            return compute_analytics_from_rollups(engine, analytic_type, user_id, time_period, rollups)
+        
         if analytic_type == AnalyticType.CASH_FLOW:
             return engine.compute_cash_flow_analytics(user_id, time_period)
         
@@ -190,6 +247,26 @@ def compute_analytics_by_type_simple(
         return None
 
 
+def compute_analytics_from_rollups(
+    engine: AnalyticsComputationEngine,
+    analytic_type: AnalyticType,
+    user_id: str,
+    time_period: str,
+    rollups: List[MonthlyRollup]
+) -> Dict[str, Any]:
+    """Compute a rollup-backed analytic type from the user's monthly rollups."""
+    if analytic_type == AnalyticType.CASH_FLOW:
+        return engine.compute_cash_flow_from_rollups(user_id, time_period, rollups)
+    
+    if analytic_type == AnalyticType.CATEGORY_TRENDS:
+        return engine.compute_category_analytics_from_rollups(user_id, time_period, rollups)
+    
+    if analytic_type == AnalyticType.ACCOUNT_EFFICIENCY:
+        return engine.compute_account_analytics_from_rollups(user_id, time_period, rollups)
+    
+    return engine.compute_financial_health_from_rollups(user_id, time_period, rollups)
+
+
 def mark_status_completed_simple(status: AnalyticsProcessingStatus) -> None:
     """Mark an analytics status as completed (simplified version)."""
     try:
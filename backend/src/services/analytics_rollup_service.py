@@ -0,0 +1,241 @@
+"""
+Incremental monthly rollups for analytics.
+
+Maintains per-user, per-account, per-month aggregates (income, expense and
+counts broken down by primary category, assigned categories and transaction
+type) in the analytics data table so that analytics can be derived without
+rescanning transactions.
+
+- file.processed recomputes the months the file's transactions fall in from
+  their transactions, so replayed events and reprocessed files are counted once.
+- Category and transfer edits flag their rollups stale when the transaction is
+  written (see mark_rollups_stale); stale months are recomputed before the
+  rollups are next read.
+- Deletions and edits from events rebuild only the affected accounts, because
+  the deleted rows (and their amounts) are no longer available when the event
+  arrives.
+- A user's first build scans their transactions once; file updates are skipped
+  until that build exists.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models.analytics import MonthlyRollup, month_key
+from models.transaction import TransactionSummary, TRANSACTION_SUMMARY_ATTRIBUTES
+from utils.db_utils import (
+    ConflictError,
+    iter_user_transactions,
+    list_file_transaction_summaries,
+    list_monthly_rollups,
+    get_monthly_rollup,
+    store_monthly_rollup,
+    replace_account_rollups,
+    get_rollup_state,
+    mark_rollups_built,
+    mark_rollups_stale,
+    take_stale_rollups,
+)
+
+logger = logging.getLogger(__name__)
+
+# Attempts to store one recomputed month before falling back to an account rebuild
+MAX_STORE_ATTEMPTS = 3
+
+
+def build_monthly_rollups(
+    user_id: str,
+    summaries: Iterable[TransactionSummary]
+) -> Dict[Tuple[str, str], MonthlyRollup]:
+    """
+    Aggregate transactions into rollups keyed by (account_id, month).
+
+    Args:
+        user_id: The user the transactions belong to
+        summaries: Transaction summaries to aggregate
+
+    Returns:
+        Dictionary of (account_id, month) to MonthlyRollup
+    """
+    rollups: Dict[Tuple[str, str], MonthlyRollup] = {}
+    for summary in summaries:
+        account_id = str(summary.account_id)
+        month = month_key(summary.date)
+        rollup = rollups.get((account_id, month))
+        if rollup is None:
+            rollup = MonthlyRollup(userId=user_id, accountId=account_id, month=month)
+            rollups[(account_id, month)] = rollup
+        rollup.add_amount(summary.amount, summary.primary_category_id, summary.transaction_type,
+                          summary.category_ids)
+    return rollups
+
+
+def rebuild_account_rollups(user_id: str, account_id: str) -> int:
+    """
+    Recompute every rollup of one account from its transactions.
+
+    Returns:
+        Number of months stored for the account
+    """
+    summaries = iter_user_transactions(
+        user_id=user_id,
+        account_ids=[account_id],
+        projection=TRANSACTION_SUMMARY_ATTRIBUTES,
+        transform=TransactionSummary.from_dynamodb_item
+    )
+    rollups = list(build_monthly_rollups(user_id, summaries).values())
+    replace_account_rollups(user_id, account_id, rollups)
+    return len(rollups)
+
+
+def rebuild_user_rollups(user_id: str) -> List[MonthlyRollup]:
+    """
+    Recompute all of a user's rollups in a single pass over their transactions.
+
+    Returns:
+        The rebuilt rollups
+    """
+    summaries = iter_user_transactions(
+        user_id=user_id,
+        projection=TRANSACTION_SUMMARY_ATTRIBUTES,
+        transform=TransactionSummary.from_dynamodb_item
+    )
+    rollups = build_monthly_rollups(user_id, summaries)
+
+    by_account: Dict[str, List[MonthlyRollup]] = {}
+    for (account_id, _), rollup in rollups.items():
+        by_account.setdefault(account_id, []).append(rollup)
+
+    # Accounts that had rollups but no longer have transactions are cleared too
+    for existing in list_monthly_rollups(user_id):
+        by_account.setdefault(existing.account_id, [])
+
+    for account_id, account_rollups in by_account.items():
+        replace_account_rollups(user_id, account_id, account_rollups)
+
+    mark_rollups_built(user_id)
+    logger.info(f"Rebuilt {len(rollups)} monthly rollups across {len(by_account)} accounts for user {user_id}")
+    return list(rollups.values())
+
+
+def ensure_user_rollups(user_id: str) -> List[MonthlyRollup]:
+    """
+    Return the user's rollups, building them from transactions on first use.
+
+    Months flagged stale since the last read are recomputed first.
+    """
+    if get_rollup_state(user_id) is None:
+        logger.info(f"No rollups built yet for user {user_id} - building from transactions")
+        return rebuild_user_rollups(user_id)
+
+    stale = take_stale_rollups(user_id)
+    if stale:
+        try:
+            rebuild_rollup_months(user_id, stale)
+        except Exception:
+            # Keep them flagged so the next read tries again
+            mark_rollups_stale(user_id, stale)
+            raise
+    return list_monthly_rollups(user_id)
+
+
+def _month_bounds(month: str) -> Tuple[int, int]:
+    """First and last millisecond of a YYYY-MM month (UTC)."""
+    start = datetime.strptime(month, '%Y-%m').replace(tzinfo=timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000) - 1
+
+
+def rebuild_rollup_months(user_id: str, rollup_keys: Iterable[Tuple[str, str]]) -> int:
+    """
+    Recompute individual monthly rollups from their transactions.
+
+    Idempotent, so it is safe to call again for the same months. If a rollup
+    keeps changing underneath us, its account is rebuilt instead.
+
+    Args:
+        user_id: The user ID
+        rollup_keys: (account_id, month) pairs to recompute
+
+    Returns:
+        Number of monthly rollups stored
+    """
+    updated = 0
+    accounts_to_rebuild: Set[str] = set()
+
+    for account_id, month in sorted(set(rollup_keys)):
+        start_ts, end_ts = _month_bounds(month)
+        summaries = iter_user_transactions(
+            user_id=user_id,
+            start_date_ts=start_ts,
+            end_date_ts=end_ts,
+            account_ids=[account_id],
+            projection=TRANSACTION_SUMMARY_ATTRIBUTES,
+            transform=TransactionSummary.from_dynamodb_item
+        )
+        rollup = build_monthly_rollups(user_id, summaries).get(
+            (account_id, month), MonthlyRollup(userId=user_id, accountId=account_id, month=month)
+        )
+
+        for _ in range(MAX_STORE_ATTEMPTS):
+            current = get_monthly_rollup(user_id, month, account_id)
+            if current is None and not rollup.entries:
+                break
+            rollup.version = current.version if current else 0
+            try:
+                store_monthly_rollup(rollup)
+                updated += 1
+                break
+            except ConflictError:
+                logger.info(f"Rollup {month}#{account_id} changed concurrently, retrying")
+        else:
+            accounts_to_rebuild.add(account_id)
+
+    for account_id in accounts_to_rebuild:
+        logger.warning(f"Could not store recomputed months of account {account_id}; rebuilding account")
+        rebuild_account_rollups(user_id, account_id)
+
+    return updated
+
+
+def refresh_file_rollups(user_id: str, file_id: str) -> int:
+    """
+    Bring the rollups up to date with a processed file's transactions.
+
+    Recomputes every month the file has transactions in, so replayed events
+    and reprocessed files are never counted twice.
+
+    Returns:
+        Number of monthly rollups updated
+    """
+    if get_rollup_state(user_id) is None:
+        logger.info(f"Skipping rollup update for file {file_id}: rollups for user {user_id} not built yet")
+        return 0
+
+    rollup_keys = {
+        (str(summary.account_id), month_key(summary.date))
+        for summary in list_file_transaction_summaries(file_id)
+    }
+    updated = rebuild_rollup_months(user_id, rollup_keys)
+
+    logger.info(f"Applied file {file_id} to {updated} monthly rollups for user {user_id}")
+    return updated
+
+
+def refresh_account_rollups(user_id: str, account_ids: Optional[List[str]] = None) -> None:
+    """
+    Rebuild rollups for accounts whose transactions were removed or edited.
+
+    Does nothing until the user's rollups have been built. Without account ids
+    every account of the user is rebuilt.
+    """
+    if get_rollup_state(user_id) is None:
+        return
+
+    if not account_ids:
+        rebuild_user_rollups(user_id)
+        return
+
+    for account_id in account_ids:
+        months = rebuild_account_rollups(user_id, account_id)
+        logger.info(f"Rebuilt {months} monthly rollups for account {account_id}")
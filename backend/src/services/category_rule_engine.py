@@ -17,7 +17,13 @@ from datetime import datetime, timezone
 
 from models.category import Category, CategoryRule, MatchCondition, CategoryHierarchy, CategorySuggestionStrategy
 from models.transaction import Transaction, TransactionCategoryAssignment, CategoryAssignmentStatus
-from utils.db_utils import list_categories_by_user_from_db, list_user_transactions
+from services.category_rule_matcher import (
+    CompiledRuleSet,
+    cache_rule_set,
+    categories_fingerprint,
+    get_cached_rule_set,
+)
+from utils.db_utils import list_categories_by_user_from_db, list_user_transactions, iter_user_transactions
 
 logger = logging.getLogger(__name__)
 
@@ -43,26 +49,7 @@ class CategoryRuleEngine:
             # For pattern testing, we want to check more transactions to ensure we find matches
             if uncategorized_only:
                 # When testing against uncategorized only, get ALL uncategorized transactions using pagination
-                transactions = []
-                last_evaluated_key = None
-                batch_size = 1000
-                
-                while True:
-                    batch, last_evaluated_key, _ = list_user_transactions(
-                        user_id, 
-                        limit=batch_size,
-                        last_evaluated_key=last_evaluated_key,
-                        uncategorized_only=True
-                    )
-                    
-                    if not batch:
-                        break
-                    
-                    transactions.extend(batch)
-                    logger.info(f"RULE_DEBUG: Retrieved batch of {len(batch)} uncategorized transactions (total so far: {len(transactions)})")
-                    
-                    if not last_evaluated_key:
-                        break
+                transactions = list(iter_user_transactions(user_id, uncategorized_only=True))
                 
                 logger.info(f"RULE_DEBUG: Found {len(transactions)} total uncategorized transactions to test against")
             else:
@@ -317,36 +304,57 @@ class CategoryRuleEngine:
         self,
         transaction: Transaction,
         user_categories: List[Category],
-        suggestion_strategy: CategorySuggestionStrategy = CategorySuggestionStrategy.ALL_MATCHES
+        suggestion_strategy: CategorySuggestionStrategy = CategorySuggestionStrategy.ALL_MATCHES,
+        compiled_rules: Optional[CompiledRuleSet] = None
     ) -> List[TransactionCategoryAssignment]:
-        """Categorize a single transaction, returning matching categories as suggestions"""
+        """
+        Categorize a single transaction, returning matching categories as suggestions.
         
-        potential_matches = []
+        Callers categorizing many transactions should pass compiled_rules from
+        compile_rules(user_categories) to skip the cache lookup per transaction.
+        """
+        if compiled_rules is None:
+            compiled_rules = self.compile_rules(user_categories)
         
-        # Build category hierarchy for inheritance
-        hierarchy_dict = self.build_category_hierarchy(user_categories)
-        
-        # Test each category against the transaction
-        for category in user_categories:
-            effective_rules = self.get_effective_rules(category, user_categories, hierarchy_dict)
-            
-            for rule in effective_rules:
-                if not rule.auto_suggest:
-                    continue
-                    
-                if self.rule_matches_transaction(rule, transaction):
-                    confidence = self.calculate_rule_confidence(rule, transaction)
-                    potential_matches.append((category, rule, confidence))
-                    
-                    # If multiple matches not allowed, use first match
-                    if not rule.allow_multiple_matches:
-                        break
+        # All rules are matched in one pass; the compiled set keeps evaluation order
+        potential_matches = compiled_rules.categorize(transaction)
         
         # Create suggestions based on strategy
         return self.create_category_suggestions(
             transaction, potential_matches, suggestion_strategy
         )
     
+    def compile_rules(self, user_categories: List[Category]) -> CompiledRuleSet:
+        """
+        Compile the effective rules of all categories for single-pass matching.
+        
+        Compiled sets are cached per user and reused while the categories and
+        their rules are unchanged.
+        """
+        if not user_categories:
+            return CompiledRuleSet([], self._rule_confidence)
+        
+        user_id = user_categories[0].userId
+        fingerprint = categories_fingerprint(user_categories)
+        compiled_rules = get_cached_rule_set(user_id, fingerprint)
+        if compiled_rules is not None:
+            return compiled_rules
+        
+        hierarchy_dict = self.build_category_hierarchy(user_categories)
+        slots = [
+            (category, rule)
+            for category in user_categories
+            for rule in self.get_effective_rules(category, user_categories, hierarchy_dict)
+        ]
+        compiled_rules = CompiledRuleSet(slots, self._rule_confidence)
+        cache_rule_set(user_id, fingerprint, compiled_rules)
+        logger.info(f"Compiled {len(compiled_rules)} category rules for user {user_id}")
+        return compiled_rules
+    
+    def _rule_confidence(self, rule: CategoryRule) -> int:
+        # Confidence depends only on the rule, so it is computed once at compile time
+        return self.calculate_rule_confidence(rule, None)
+    
     def create_category_suggestions(
         self,
         transaction: Transaction,
@@ -572,37 +580,20 @@ class CategoryRuleEngine:
                 transactions = [t for t in transactions if str(t.transaction_id) in transaction_id_set]
             else:
                 # Apply to all uncategorized transactions using pagination to ensure none are missed
-                transactions = []
-                last_evaluated_key = None
-                batch_size = 1000
-                
-                while True:
-                    batch, last_evaluated_key, _ = list_user_transactions(
-                        user_id, 
-                        limit=batch_size,
-                        last_evaluated_key=last_evaluated_key,
-                        uncategorized_only=True
-                    )
-                    
-                    if not batch:
-                        break
-                    
-                    transactions.extend(batch)
-                    logger.info(f"Retrieved batch of {len(batch)} uncategorized transactions (total so far: {len(transactions)})")
-                    
-                    if not last_evaluated_key:
-                        break
+                transactions = list(iter_user_transactions(user_id, uncategorized_only=True))
+                logger.info(f"Retrieved {len(transactions)} uncategorized transactions")
             
             stats = {
                 'processed': 0,
                 'suggestions_created': 0,
                 'errors': 0
             }
+            compiled_rules = self.compile_rules(categories)
             
             for transaction in transactions:
                 try:
                     suggestions = self.categorize_transaction(
-                        transaction, categories, suggestion_strategy
+                        transaction, categories, suggestion_strategy, compiled_rules
                     )
                     
                     # Here you would save the suggestions to the database
@@ -632,7 +623,7 @@ class CategoryRuleEngine:
         """Apply rules from a specific category to existing transactions"""
         
         try:
-            from utils.db_utils import checked_mandatory_category, update_transaction
+            from utils.db_utils import checked_mandatory_category, update_transaction, mark_transaction_rollups_stale
             from utils.db.base import NotFound, NotAuthorized
             from models.transaction import Transaction
             import uuid
@@ -663,26 +654,8 @@ class CategoryRuleEngine:
                 transactions = [t for t in transactions if str(t.transaction_id) in transaction_id_set]
             else:
                 # Get all uncategorized transactions using pagination to ensure none are missed
-                transactions = []
-                last_evaluated_key = None
-                batch_size = 1000
-                
-                while True:
-                    batch, last_evaluated_key, _ = list_user_transactions(
-                        user_id, 
-                        limit=batch_size,
-                        last_evaluated_key=last_evaluated_key,
-                        uncategorized_only=True
-                    )
-                    
-                    if not batch:
-                        break
-                    
-                    transactions.extend(batch)
-                    logger.info(f"Retrieved batch of {len(batch)} uncategorized transactions (total so far: {len(transactions)})")
-                    
-                    if not last_evaluated_key:
-                        break
+                transactions = list(iter_user_transactions(user_id, uncategorized_only=True))
+                logger.info(f"Retrieved {len(transactions)} uncategorized transactions")
             
             logger.info(f"Processing {len(transactions)} transactions for category {category.name} with {len(effective_rules)} rules")
             
@@ -692,21 +665,22 @@ class CategoryRuleEngine:
                 'errors': 0,
                 'applied_count': 0  # Add this for consistency with handler expectations
             }
+            categorized = []
+            
+            compiled_rules = CompiledRuleSet(
+                [(category, rule) for rule in effective_rules], self._rule_confidence
+            )
             
             for transaction in transactions:
                 try:
                     # Check if transaction matches any rule from this category
-                    matched_rules = []
-                    for rule in effective_rules:
-                        if rule.enabled and self.rule_matches_transaction(rule, transaction):
-                            matched_rules.append(rule)
+                    matched_rules = [compiled_rules.slots[index] for index in compiled_rules.match(transaction)]
                     
                     if matched_rules:
                         # Apply the category to the transaction
                         if create_suggestions:
                             # Create suggestions for manual review
-                            for rule in matched_rules:
-                                confidence = self.calculate_rule_confidence(rule, transaction)
+                            for _, rule, confidence in matched_rules:
                                 # Add as suggestion to transaction
                                 transaction.add_category_suggestion(
                                     category_id=uuid.UUID(category_id),
@@ -723,6 +697,7 @@ class CategoryRuleEngine:
                         # Save updated transaction using db_utils (proper architectural layer)
                         logger.info(f"Saving updated transaction {transaction}")
                         update_transaction(transaction)
+                        categorized.append(transaction)
                         
                         stats['categorized'] += 1
                         stats['applied_count'] += 1  # Track applied count for handler
@@ -734,6 +709,7 @@ class CategoryRuleEngine:
                     logger.error(f"Error processing transaction {transaction.transaction_id}: {str(e)}")
                     stats['errors'] += 1
             
+            mark_transaction_rollups_stale(categorized)
             logger.info(f"Category rule application completed for {category.name}: {stats}")
             return stats
             
@@ -0,0 +1,332 @@
+"""
+Compiled Category Rule Matcher
+
+Compiles a user's category rules into a structure that matches a transaction
+against every rule at once, instead of testing rules one at a time:
+
+- CONTAINS patterns share an Aho-Corasick automaton per field, so a description
+  is scanned once whatever the number of patterns
+- STARTS_WITH / ENDS_WITH / EQUALS become dictionary lookups of the field's
+  prefixes, suffixes and whole value
+- REGEX patterns are merged into one alternation with a named group per rule,
+  used to rule out all of them with a single search
+- Amount rules are kept in sorted lists searched with bisect
+
+Matching is equivalent to CategoryRuleEngine.rule_matches_transaction for every
+rule. Compiled sets are cached per user and rebuilt when the user's rules change.
+"""
+
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict, deque
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from models.category import Category, CategoryRule, MatchCondition
+
+logger = logging.getLogger(__name__)
+
+AMOUNT_CONDITIONS = {MatchCondition.AMOUNT_GREATER, MatchCondition.AMOUNT_LESS, MatchCondition.AMOUNT_BETWEEN}
+
+# Backreferences depend on group numbering, so such patterns are never merged
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; reports the values of all patterns found in a text."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+
+    def add(self, pattern: str, value: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(value)
+
+    def build(self) -> None:
+        """Compute failure links; call once after all patterns are added."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def search(self, text: str) -> Set[int]:
+        found = set(self._output[0])  # Empty patterns match any text
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class _TextIndex:
+    """Text rules for one (field, case sensitivity) pair."""
+
+    def __init__(self, case_sensitive: bool):
+        self.case_sensitive = case_sensitive
+        self.contains = AhoCorasick()
+        self.has_contains = False
+        self.equals: Dict[str, List[int]] = defaultdict(list)
+        self.prefixes: Dict[str, List[int]] = defaultdict(list)
+        self.suffixes: Dict[str, List[int]] = defaultdict(list)
+        self.prefix_lengths: List[int] = []
+        self.suffix_lengths: List[int] = []
+        self.regexes: List[Tuple[int, re.Pattern]] = []
+        self.combined_regex: Optional[re.Pattern] = None
+        self.unmerged_regexes: List[Tuple[int, re.Pattern]] = []
+
+    def add(self, index: int, rule: CategoryRule) -> None:
+        pattern = rule.value if self.case_sensitive else rule.value.lower()
+        condition = rule.condition
+        if condition == MatchCondition.CONTAINS:
+            self.contains.add(pattern, index)
+            self.has_contains = True
+        elif condition == MatchCondition.EQUALS:
+            self.equals[pattern].append(index)
+        elif condition == MatchCondition.STARTS_WITH:
+            self.prefixes[pattern].append(index)
+        elif condition == MatchCondition.ENDS_WITH:
+            self.suffixes[pattern].append(index)
+        elif condition == MatchCondition.REGEX:
+            flags = 0 if self.case_sensitive else re.IGNORECASE
+            try:
+                self.regexes.append((index, re.compile(rule.value, flags)))
+            except re.error as e:
+                logger.warning(f"Invalid regex pattern '{rule.value}': {str(e)}")
+
+    def build(self) -> None:
+        self.contains.build()
+        self.prefix_lengths = sorted({len(p) for p in self.prefixes})
+        self.suffix_lengths = sorted({len(p) for p in self.suffixes})
+
+        mergeable = [(i, p) for i, p in self.regexes if not _BACKREFERENCE.search(p.pattern)]
+        self.unmerged_regexes = [(i, p) for i, p in self.regexes if _BACKREFERENCE.search(p.pattern)]
+        if not mergeable:
+            return
+        try:
+            self.combined_regex = re.compile(
+                '|'.join(f'(?P<r{i}>{p.pattern})' for i, p in mergeable),
+                0 if self.case_sensitive else re.IGNORECASE
+            )
+        except re.error:
+            # e.g. inline global flags, which are only allowed at the start
+            self.unmerged_regexes = self.regexes
+            return
+        self.regexes = mergeable
+
+    def match(self, value: str, matched: Set[int]) -> None:
+        search_value = value if self.case_sensitive else value.lower()
+
+        if self.has_contains:
+            matched |= self.contains.search(search_value)
+        if self.equals:
+            matched.update(self.equals.get(search_value, ()))
+        for length in self.prefix_lengths:
+            if length > len(search_value):
+                break
+            matched.update(self.prefixes.get(search_value[:length], ()))
+        for length in self.suffix_lengths:
+            if length > len(search_value):
+                break
+            matched.update(self.suffixes.get(search_value[len(search_value) - length:], ()))
+
+        if self.combined_regex is not None:
+            hit = self.combined_regex.search(search_value)
+            if hit is not None:
+                first = int(hit.lastgroup[1:])
+                matched.add(first)
+                matched.update(i for i, p in self.regexes if i != first and p.search(search_value))
+        for index, pattern in self.unmerged_regexes:
+            if pattern.search(search_value):
+                matched.add(index)
+
+
+class _AmountIndex:
+    """Amount rules for one field, as sorted bounds."""
+
+    def __init__(self):
+        self.greater: List[Tuple[Decimal, int]] = []  # amount > min
+        self.less: List[Tuple[Decimal, int]] = []  # amount < max
+        self.between: List[Tuple[Decimal, Decimal, int]] = []  # min <= amount <= max
+
+    def add(self, index: int, rule: CategoryRule) -> None:
+        if rule.condition == MatchCondition.AMOUNT_GREATER and rule.amount_min is not None:
+            self.greater.append((rule.amount_min, index))
+        elif rule.condition == MatchCondition.AMOUNT_LESS and rule.amount_max is not None:
+            self.less.append((rule.amount_max, index))
+        elif (rule.condition == MatchCondition.AMOUNT_BETWEEN and
+              rule.amount_min is not None and rule.amount_max is not None):
+            self.between.append((rule.amount_min, rule.amount_max, index))
+
+    def build(self) -> None:
+        self.greater.sort()
+        self.less.sort()
+        self.between.sort()
+        self._greater_bounds = [bound for bound, _ in self.greater]
+        self._less_bounds = [bound for bound, _ in self.less]
+        self._between_mins = [low for low, _, _ in self.between]
+
+    def match(self, amount: Decimal, matched: Set[int]) -> None:
+        matched.update(i for _, i in self.greater[:bisect_left(self._greater_bounds, amount)])
+        matched.update(i for _, i in self.less[bisect_right(self._less_bounds, amount):])
+        matched.update(
+            i for _, high, i in self.between[:bisect_right(self._between_mins, amount)] if amount <= high
+        )
+
+
+class CompiledRuleSet:
+    """
+    Rules of a set of categories compiled for single-pass matching.
+
+    Built from (category, rule) slots in evaluation order: categories in the
+    order given, each category's effective rules highest priority first.
+    """
+
+    def __init__(self, slots: Iterable[Tuple[Category, CategoryRule]], confidence_of):
+        """
+        Args:
+            slots: (category, rule) pairs in evaluation order
+            confidence_of: Function giving a rule's confidence score
+        """
+        self.slots: List[Tuple[Category, CategoryRule, int]] = []
+        self._text: Dict[Tuple[str, bool], _TextIndex] = {}
+        self._amount: Dict[str, _AmountIndex] = {}
+
+        for category, rule in slots:
+            if not rule.enabled:
+                continue
+            index = len(self.slots)
+            self.slots.append((category, rule, confidence_of(rule)))
+
+            if rule.condition in AMOUNT_CONDITIONS:
+                self._amount.setdefault(rule.field_to_match, _AmountIndex()).add(index, rule)
+            else:
+                key = (rule.field_to_match, rule.case_sensitive)
+                self._text.setdefault(key, _TextIndex(rule.case_sensitive)).add(index, rule)
+
+        for text_index in self._text.values():
+            text_index.build()
+        for amount_index in self._amount.values():
+            amount_index.build()
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def match(self, transaction: Any) -> List[int]:
+        """Return the slot indices of all rules matching the transaction, in evaluation order."""
+        matched: Set[int] = set()
+        values: Dict[str, Optional[str]] = {}
+
+        for (field, _), text_index in self._text.items():
+            if field not in values:
+                values[field] = _field_value(transaction, field)
+            if values[field]:
+                text_index.match(values[field], matched)
+
+        for field, amount_index in self._amount.items():
+            if field not in values:
+                values[field] = _field_value(transaction, field)
+            if values[field] is not None:
+                amount_index.match(transaction.amount, matched)
+
+        return sorted(matched)
+
+    def categorize(self, transaction: Any, auto_suggest_only: bool = True) -> List[Tuple[Category, CategoryRule, int]]:
+        """
+        Return (category, rule, confidence) for each matching rule.
+
+        Within a category, a matching rule that does not allow multiple matches
+        ends that category's matches, as in CategoryRuleEngine.categorize_transaction.
+        """
+        matches = []
+        stopped = set()
+        for index in self.match(transaction):
+            category, rule, confidence = self.slots[index]
+            if auto_suggest_only and not rule.auto_suggest:
+                continue
+            if id(category) in stopped:
+                continue
+            matches.append((category, rule, confidence))
+            if not rule.allow_multiple_matches:
+                stopped.add(id(category))
+        return matches
+
+
+def _field_value(transaction: Any, field_name: str) -> Optional[str]:
+    """Same field extraction as CategoryRuleEngine._get_transaction_field_value"""
+    if field_name == 'description':
+        return transaction.description
+    if field_name in ('payee', 'memo'):
+        return getattr(transaction, field_name, None)
+    if field_name == 'amount':
+        return str(transaction.amount)
+    return None
+
+
+def categories_fingerprint(categories: List[Category]) -> Tuple:
+    """Everything about a user's categories that affects compiled rules."""
+    return tuple(
+        (
+            str(category.categoryId),
+            str(category.parentCategoryId),
+            category.inherit_parent_rules,
+            category.rule_inheritance_mode,
+            tuple(
+                (rule.rule_id, rule.field_to_match, rule.condition, rule.value, rule.case_sensitive,
+                 rule.priority, rule.enabled, rule.confidence, rule.amount_min, rule.amount_max,
+                 rule.allow_multiple_matches, rule.auto_suggest)
+                for rule in category.rules
+            )
+        )
+        for category in categories
+    )
+
+
+# Compiled rule sets by user id: (fingerprint, compiled set), least recently used first
+MAX_CACHED_RULE_SETS = 32
+_compiled_rule_cache: "OrderedDict[str, Tuple[Tuple, CompiledRuleSet]]" = OrderedDict()
+
+
+def get_cached_rule_set(user_id: str, fingerprint: Tuple) -> Optional[CompiledRuleSet]:
+    """Return the user's cached rule set if it was compiled from the same categories."""
+    cached = _compiled_rule_cache.get(user_id)
+    if cached is not None and cached[0] == fingerprint:
+        _compiled_rule_cache.move_to_end(user_id)
+        return cached[1]
+    return None
+
+
+def cache_rule_set(user_id: str, fingerprint: Tuple, rule_set: CompiledRuleSet) -> None:
+    """Cache the user's rule set, evicting the least recently used users past the cap."""
+    _compiled_rule_cache[user_id] = (fingerprint, rule_set)
+    _compiled_rule_cache.move_to_end(user_id)
+    while len(_compiled_rule_cache) > MAX_CACHED_RULE_SETS:
+        _compiled_rule_cache.popitem(last=False)
+
+
+def invalidate_compiled_rules(user_id: str) -> None:
+    """Drop the user's compiled rule set, e.g. after a rule was created."""
+    if _compiled_rule_cache.pop(user_id, None) is not None:
+        logger.info(f"Invalidated compiled category rules for user {user_id}")
@@ -6,8 +6,9 @@ import logging
 import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, Optional, Tuple, Union, Iterator
 from decimal import Decimal
+from itertools import islice
 
 from models.account import Account
 from models.transaction import Transaction
@@ -16,8 +17,8 @@ from models.file_map import FileMap
 from models.transaction_file import TransactionFile
 from models.analytics import AnalyticsData
 from utils.db_utils import (
-    list_user_accounts, list_user_transactions, list_categories_by_user_from_db,
-    list_file_maps_by_user, list_user_files, get_analytics_data
+    list_user_accounts, iter_user_transactions_by_key, get_user_transaction_date_range,
+    list_categories_by_user_from_db, list_file_maps_by_user, list_user_files, get_analytics_data
 )
 
 logger = logging.getLogger(__name__)
@@ -42,10 +43,14 @@ class BaseExporter(ABC):
         self.warnings = []
         
     @abstractmethod
-    def collect_data(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Collect and process entity data"""
+    def iter_data(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield serialized entities as they are read"""
         pass
     
+    def collect_data(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Collect and process entity data into a list"""
+        return list(self.iter_data(filters))
+    
     @abstractmethod
     def serialize_entity(self, entity: Any) -> Dict[str, Any]:
         """Serialize a single entity for export"""
@@ -76,15 +81,15 @@ class BaseExporter(ABC):
 class AccountExporter(BaseExporter):
     """Specialized exporter for account entities"""
     
-    def collect_data(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def iter_data(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
         """
-        Collect and process account data with optional filtering
+        Yield processed account data with optional filtering
         
         Args:
             filters: Optional filters including account_ids, include_inactive, etc.
             
-        Returns:
-            List of serialized account dictionaries
+        Yields:
+            Serialized account dictionaries
         """
         try:
             logger.info(f"Starting account data collection for user {self.user_id}")
@@ -97,7 +102,6 @@ class AccountExporter(BaseExporter):
                 accounts = self._apply_filters(accounts, filters)
             
             # Process and serialize accounts
-            serialized_accounts = []
             for account in accounts:
                 try:
                     serialized_account = self.serialize_entity(account)
@@ -105,19 +109,18 @@ class AccountExporter(BaseExporter):
                     # Add computed fields
                     serialized_account.update(self._add_computed_fields(account))
                     
-                    serialized_accounts.append(serialized_account)
-                    self.processed_count += 1
-                    
                 except Exception as e:
                     self.error_count += 1
                     self._add_warning(f"Failed to serialize account: {str(e)}", str(account.account_id))
                     logger.error(f"Error serializing account {account.account_id}: {str(e)}")
+                    continue
+                
+                self.processed_count += 1
+                yield serialized_account
             
             logger.info(f"Account data collection complete: {self.processed_count} accounts processed, "
                        f"{self.error_count} errors")
             
-            return serialized_accounts
-            
         except Exception as e:
             logger.error(f"Failed to collect account data for user {self.user_id}: {str(e)}")
             raise ExportException(f"Account data collection failed: {str(e)}", "account")
@@ -184,39 +187,63 @@ class AccountExporter(BaseExporter):
 class TransactionExporter(BaseExporter):
     """Specialized exporter for transaction entities with advanced filtering and batch processing"""
     
-    def __init__(self, user_id: str, batch_size: int = 1000):
+    def __init__(self, user_id: str, batch_size: int = 1000, segment_workers: int = 4):
         super().__init__(user_id, batch_size)
+        self.segment_workers = segment_workers
         self.total_amount = Decimal('0')
         self.date_range: Dict[str, Optional[int]] = {'earliest': None, 'latest': None}
         
-    def collect_data(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def iter_data(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
         """
-        Collect transaction data with pagination and filtering
+        Yield transaction data page by page with filtering
+        
+        Transactions are streamed most recent first straight from the date-sorted
+        index, so no page is held longer than it takes to serialize it. The
+        user's history is bounded by its first and last transaction dates so
+        that month segments are queried in parallel (segment_workers at a time).
+        
+        Account, category and date filters are pushed into the index key
+        conditions (AccountDateIndex, CategoryDateIndex or UserIdIndex with a
+        date range), so a selective export only reads the rows it returns.
+        Amount and transaction type filters are applied to each batch.
         
         Args:
             filters: Filters including account_ids, date_range, categories, etc.
             
-        Returns:
-            List of serialized transaction dictionaries
+        Yields:
+            Serialized transaction dictionaries
         """
         try:
             logger.info(f"Starting transaction data collection for user {self.user_id}")
             
-            serialized_transactions = []
-            last_evaluated_key: Optional[Dict[str, Any]] = None
+            filters = filters or {}
+            earliest, latest = get_user_transaction_date_range(self.user_id)
+            if filters.get('date_range_start') is not None:
+                earliest = max(earliest, filters['date_range_start']) if earliest is not None else filters['date_range_start']
+            if filters.get('date_range_end') is not None:
+                latest = min(latest, filters['date_range_end']) if latest is not None else filters['date_range_end']
+            if earliest is not None and latest is not None and earliest > latest:
+                logger.info(f"No transactions in the requested date range for user {self.user_id}")
+                return
+            
+            transaction_stream = iter_user_transactions_by_key(
+                self.user_id,
+                start_date_ts=earliest,
+                end_date_ts=latest,
+                account_ids=filters.get('account_ids'),
+                category_ids=filters.get('category_ids'),
+                sort_order_date='desc',
+                page_size=self.batch_size,
+                max_workers=self.segment_workers
+            )
             
             while True:
                 # Get batch of transactions
-                transactions, pagination_key, _ = list_user_transactions(
-                    self.user_id,
-                    limit=self.batch_size,
-                    last_evaluated_key=last_evaluated_key
-                )
-                
+                transactions = list(islice(transaction_stream, self.batch_size))
                 if not transactions:
                     break
                 
-                # Apply filters to this batch
+                # Apply the filters the index queries cannot express to this batch
                 if filters:
                     transactions = self._apply_filters(transactions, filters)
                 
@@ -224,30 +251,22 @@ class TransactionExporter(BaseExporter):
                 for transaction in transactions:
                     try:
                         serialized_transaction = self.serialize_entity(transaction)
-                        serialized_transactions.append(serialized_transaction)
                         
                         # Update statistics
                         self._update_statistics(transaction)
-                        self.processed_count += 1
                         
                     except Exception as e:
                         self.error_count += 1
                         self._add_warning(f"Failed to serialize transaction: {str(e)}", 
                                         str(transaction.transaction_id))
-                
-                # Check for more data
-                if not pagination_key:
-                    break
-                last_evaluated_key = pagination_key
-            
-            # Sort by date (most recent first)
-            serialized_transactions.sort(key=lambda t: t.get('date', 0), reverse=True)
+                        continue
+                    
+                    self.processed_count += 1
+                    yield serialized_transaction
             
             logger.info(f"Transaction data collection complete: {self.processed_count} transactions processed, "
                        f"{self.error_count} errors")
             
-            return serialized_transactions
-            
         except Exception as e:
             logger.error(f"Failed to collect transaction data for user {self.user_id}: {str(e)}")
             raise ExportException(f"Transaction data collection failed: {str(e)}", "transaction")
@@ -297,25 +316,13 @@ class TransactionExporter(BaseExporter):
             raise ExportException(f"Transaction serialization failed: {str(e)}", "transaction")
     
     def _apply_filters(self, transactions: List[Transaction], filters: Dict[str, Any]) -> List[Transaction]:
-        """Apply filters to transaction list"""
-        filtered = transactions
-        
-        # Filter by account IDs
-        if filters.get('account_ids'):
-            account_id_set = {str(aid) for aid in filters['account_ids']}
-            filtered = [tx for tx in filtered if str(tx.account_id) in account_id_set]
-        
-        # Filter by date range
-        if filters.get('date_range_start') or filters.get('date_range_end'):
-            start_date = filters.get('date_range_start', 0)
-            end_date = filters.get('date_range_end', 9999999999999)
-            filtered = [tx for tx in filtered if start_date <= tx.date <= end_date]
+        """
+        Apply the filters that are not pushed into the transaction queries
         
-        # Filter by category IDs
-        if filters.get('category_ids'):
-            category_id_set = {str(cid) for cid in filters['category_ids']}
-            filtered = [tx for tx in filtered 
-                       if tx.primary_category_id and str(tx.primary_category_id) in category_id_set]
+        Account, date range and category filters are already key conditions
+        of the queries in iter_data.
+        """
+        filtered = transactions
         
         # Filter by amount range
         if filters.get('amount_min') or filters.get('amount_max'):
@@ -360,15 +367,17 @@ class TransactionExporter(BaseExporter):
 class CategoryExporter(BaseExporter):
     """Specialized exporter for category entities with hierarchy preservation"""
     
-    def collect_data(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def iter_data(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
         """
-        Collect category data preserving hierarchy relationships
+        Yield category data preserving hierarchy relationships
+        
+        Categories are few, so they are sorted by hierarchy before being yielded.
         
         Args:
             filters: Optional filters including category_ids, include_rules, etc.
             
-        Returns:
-            List of serialized category dictionaries with hierarchy preserved
+        Yields:
+            Serialized category dictionaries, parents before children
         """
         try:
             logger.info(f"Starting category data collection for user {self.user_id}")
@@ -408,7 +417,7 @@ class CategoryExporter(BaseExporter):
             logger.info(f"Category data collection complete: {self.processed_count} categories processed, "
                        f"{self.error_count} errors")
             
-            return serialized_categories
+            yield from serialized_categories
             
         except Exception as e:
             logger.error(f"Failed to collect category data for user {self.user_id}: {str(e)}")
@@ -567,15 +576,15 @@ class CategoryExporter(BaseExporter):
 class FileMapExporter(BaseExporter):
     """Specialized exporter for file map entities"""
     
-    def collect_data(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def iter_data(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
         """
-        Collect file map data with mapping configurations
+        Yield file map data with mapping configurations
         
         Args:
             filters: Optional filters including account_ids, include_unused, etc.
             
-        Returns:
-            List of serialized file map dictionaries
+        Yields:
+            Serialized file map dictionaries
         """
         try:
             logger.info(f"Starting file map data collection for user {self.user_id}")
@@ -588,7 +597,6 @@ class FileMapExporter(BaseExporter):
                 file_maps = self._apply_filters(file_maps, filters)
             
             # Process and serialize file maps
-            serialized_file_maps = []
             for file_map in file_maps:
                 try:
                     serialized_file_map = self.serialize_entity(file_map)
@@ -596,18 +604,17 @@ class FileMapExporter(BaseExporter):
                     # Add computed fields
                     serialized_file_map.update(self._add_computed_fields(file_map))
                     
-                    serialized_file_maps.append(serialized_file_map)
-                    self.processed_count += 1
-                    
                 except Exception as e:
                     self.error_count += 1
                     self._add_warning(f"Failed to serialize file map: {str(e)}", str(file_map.file_map_id))
+                    continue
+                
+                self.processed_count += 1
+                yield serialized_file_map
             
             logger.info(f"File map data collection complete: {self.processed_count} file maps processed, "
                        f"{self.error_count} errors")
             
-            return serialized_file_maps
-            
         except Exception as e:
             logger.error(f"Failed to collect file map data for user {self.user_id}: {str(e)}")
             raise ExportException(f"File map data collection failed: {str(e)}", "file_map")
@@ -708,15 +715,15 @@ class TransactionFileExporter(BaseExporter):
         self.total_file_size = 0
         self.file_format_counts = {}
         
-    def collect_data(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def iter_data(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
         """
-        Collect transaction file data with metadata
+        Yield transaction file data with metadata
         
         Args:
             filters: Optional filters including account_ids, file_formats, etc.
             
-        Returns:
-            List of serialized transaction file dictionaries
+        Yields:
+            Serialized transaction file dictionaries, most recent upload first
         """
         try:
             logger.info(f"Starting transaction file data collection for user {self.user_id}")
@@ -753,7 +760,7 @@ class TransactionFileExporter(BaseExporter):
             logger.info(f"Transaction file data collection complete: {self.processed_count} files processed, "
                        f"{self.error_count} errors")
             
-            return serialized_files
+            yield from serialized_files
             
         except Exception as e:
             logger.error(f"Failed to collect transaction file data for user {self.user_id}: {str(e)}")
@@ -27,12 +27,15 @@ from utils.transaction_parser_new import parse_transactions, file_type_selector
 from utils.db_utils import (
     create_transaction_file,
     get_transaction_by_account_and_hash,
+    get_account_transaction_hashes,
     list_account_files,
     list_account_transactions,
     update_account,
     update_transaction,
+    mark_transaction_rollups_stale,
     update_transaction_file,
     create_transaction,
+    batch_create_transactions,
     update_account_derived_values,
     delete_transactions_for_file,
     checked_optional_file_map,
@@ -250,18 +253,15 @@ def create_transactions(
             update_account(account.account_id, account.user_id, update_data)
         
         for transaction in transactions:
-            try:
-                # Add the file_id and user_id to each transaction
-                transaction.file_id = transaction_file.file_id
-                transaction.user_id = transaction_file.user_id
-                                
-                # Create and save the transaction
-                create_transaction(transaction)
-                transaction_count += 1
-            except Exception as tx_error:
-                logger.error(f"Error creating transaction: {str(tx_error)}")
-                logger.error(f"Transaction data that caused error: {transaction}")
-                logger.error(traceback.format_exc())
+            # Add the file_id and user_id to each transaction
+            transaction.file_id = transaction_file.file_id
+            transaction.user_id = transaction_file.user_id
+
+        # Bulk ingest: parallel 25-item BatchWriteItem chunks with UnprocessedItems retries
+        failed_transactions = batch_create_transactions(transactions)
+        transaction_count = len(transactions) - len(failed_transactions)
+        if failed_transactions:
+            record_failed_transactions(transaction_file, failed_transactions, len(transactions))
                 
         return transaction_count, duplicate_count
     except Exception as e:
@@ -270,6 +270,38 @@ def create_transactions(
         raise
 
 
+def record_failed_transactions(
+    transaction_file: TransactionFile,
+    failed_transactions: List[Transaction],
+    total_count: int
+) -> None:
+    """
+    Record rows that could not be saved on the file's processing status.
+    Modifies the transaction_file object in place; it is persisted with the
+    rest of the file metadata.
+    
+    Args:
+        transaction_file: TransactionFile object to update
+        failed_transactions: Transactions that failed to be written
+        total_count: Number of transactions that were submitted
+    """
+    failed_rows = sorted(
+        tx.import_order for tx in failed_transactions if tx.import_order is not None
+    )
+    row_summary = ", ".join(str(row) for row in failed_rows[:20])
+    if len(failed_rows) > 20:
+        row_summary += f" (+{len(failed_rows) - 20} more)"
+    
+    message = f"Failed to save {len(failed_transactions)} of {total_count} transactions"
+    if row_summary:
+        message += f" (rows: {row_summary})"
+    
+    transaction_file.error_message = message
+    logger.error(f"File {transaction_file.file_id}: {message}")
+    for tx in failed_transactions:
+        logger.error(f"Transaction data that failed to save: {tx}")
+
+
 def update_file_status(
     transaction_file: TransactionFile, 
     transactions : List[Transaction]
@@ -325,15 +357,31 @@ def update_transaction_duplicates(
             return 0
             
         logger.info("Checking for duplicate transactions")
-        duplicate_count = 0
+
+        # Group by account so each account's existing hashes are loaded once,
+        # with a single paginated query over the date span this file covers
+        transactions_by_account: Dict[str, List[Transaction]] = {}
         for transaction in transactions:
-            is_duplicate = check_duplicate_transaction(transaction)
-            if is_duplicate:
+            if transaction.transaction_hash is None or transaction.account_id is None:
+                logger.error(f"Transaction hash or account ID is None for transaction: {transaction}")
+                raise ValueError("Transaction hash or account ID is None")
+            transactions_by_account.setdefault(str(transaction.account_id), []).append(transaction)
+
+        duplicate_count = 0
+        for account_id, account_transactions in transactions_by_account.items():
+            existing_hashes = get_account_transaction_hashes(
+                account_id,
+                min(tx.date for tx in account_transactions),
+                max(tx.date for tx in account_transactions)
+            )
+            for transaction in account_transactions:
+                if transaction.transaction_hash in existing_hashes:
                     transaction.status = 'duplicate'
                     duplicate_count += 1
-            else:
-                transaction.status = 'new'
+                else:
+                    transaction.status = 'new'
 
+        logger.info(f"Found {duplicate_count} duplicates among {len(transactions)} transactions")
         return duplicate_count
     except Exception as e:
         logger.error(f"Error in duplicate detection: {str(e)}")
@@ -470,10 +518,12 @@ def change_file_account(transaction_file: TransactionFile) -> FileProcessorRespo
         # Calculate running balances
         if transaction_file.opening_balance:
             calculate_running_balances(transactions, transaction_file.opening_balance)
-        # Update account ID for all transactions
+        # Update account ID for all transactions; rollups of the old and the new account change
+        mark_transaction_rollups_stale(transactions)
         for tx in transactions:
             tx.account_id = uuid.UUID(account.account_id) if isinstance(account.account_id, str) else account.account_id
             update_transaction(tx)
+        mark_transaction_rollups_stale(transactions)
             
     return FileProcessorResponse(
         message="File account updated successfully",
@@ -0,0 +1,310 @@
+"""
+Batch restore engine for FZIP packages.
+
+Restores exported records in chunks: each chunk is validated as a batch,
+written through parallel BatchWriteItem calls and then checkpointed, so an
+interrupted restore can continue from the last committed chunk.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterable
+
+from models.money import Currency
+from models.transaction import CategoryAssignmentStatus
+from utils.db_utils import batch_restore_items
+from utils.transaction_utils import generate_transaction_hash
+
+logger = logging.getLogger(__name__)
+
+# Order entities are restored in; later entities reference earlier ones
+RESTORE_ENTITY_ORDER = ('accounts', 'categories', 'file_maps', 'transaction_files', 'transactions')
+
+# Converts a chunk of exported records to (DynamoDB items, per-record errors)
+ItemBuilder = Callable[[List[Dict[str, Any]]], Tuple[List[Dict[str, Any]], List[str]]]
+
+# Called after each committed chunk with (entity_type, committed_records, results_so_far)
+CheckpointCallback = Callable[[str, int, Dict[str, Any]], None]
+
+
+class BatchRestoreEngine:
+    """
+    Writes restored entities chunk by chunk with checkpoints.
+
+    A checkpoint is {"entityType": ..., "committed": n}: every entity before
+    entityType in RESTORE_ENTITY_ORDER is fully restored and the first n
+    records of entityType are committed. Records that fail validation or
+    cannot be written are reported as errors and count as committed, the
+    same as a failed single-row create did before.
+    """
+
+    def __init__(self, checkpoint: Optional[Dict[str, Any]] = None, chunk_size: int = 500,
+                 max_workers: int = 4, on_checkpoint: Optional[CheckpointCallback] = None,
+                 before_chunk: Optional[Callable[[], None]] = None):
+        self.checkpoint = checkpoint or {}
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.on_checkpoint = on_checkpoint
+        self.before_chunk = before_chunk
+
+    def start_offset(self, entity_type: str) -> Optional[int]:
+        """
+        Number of records of entity_type already committed, or None if the
+        checkpoint shows the entity type was fully restored.
+        """
+        checkpoint_entity = self.checkpoint.get('entityType')
+        if checkpoint_entity not in RESTORE_ENTITY_ORDER:
+            return 0
+        position = RESTORE_ENTITY_ORDER.index(entity_type)
+        checkpoint_position = RESTORE_ENTITY_ORDER.index(checkpoint_entity)
+        if position < checkpoint_position:
+            return None
+        if position == checkpoint_position:
+            return int(self.checkpoint.get('committed', 0))
+        return 0
+
+    def restore(self, entity_type: str, records: Iterable[Dict[str, Any]], build_items: ItemBuilder,
+                previous_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Restore one entity type, resuming after the checkpoint
+
+        Args:
+            entity_type: Package entity type
+            records: All exported records of that type, in package order;
+                streamed chunk by chunk, so a lazily decoded package works
+            build_items: Batch converter from exported records to DynamoDB items
+            previous_results: Results recorded for this entity type before an
+                interruption, extended when resuming mid-entity
+
+        Returns:
+            Dictionary with 'created' count and 'errors' list
+        """
+        offset = self.start_offset(entity_type)
+        if offset is None:
+            logger.info(f"Skipping {entity_type}: already restored before checkpoint")
+            return previous_results or {'created': 0, 'errors': []}
+
+        results = {'created': 0, 'errors': []}
+        if offset and previous_results:
+            results = {
+                'created': int(previous_results.get('created', 0)),
+                'errors': list(previous_results.get('errors', []))
+            }
+            logger.info(f"Resuming {entity_type} restore after {offset} committed records")
+
+        remaining = islice(records, offset, None)
+        committed = offset
+        while True:
+            chunk = list(islice(remaining, self.chunk_size))
+            if not chunk:
+                break
+            if self.before_chunk:
+                self.before_chunk()
+
+            items, errors = build_items(chunk)
+            results['errors'].extend(errors)
+            if items:
+                write_result = batch_restore_items(entity_type, items, self.max_workers)
+                results['created'] += write_result.written_count
+                results['errors'].extend(
+                    f"Failed to write {entity_type} item {_item_label(item)}"
+                    for item in write_result.failed_items
+                )
+
+            committed += len(chunk)
+            self.checkpoint = {'entityType': entity_type, 'committed': committed}
+            if self.on_checkpoint:
+                self.on_checkpoint(entity_type, committed, results)
+
+        if committed == offset:
+            # Nothing left to write; still mark the entity as done
+            self.checkpoint = {'entityType': entity_type, 'committed': committed}
+            if self.on_checkpoint:
+                self.on_checkpoint(entity_type, committed, results)
+
+        logger.info(f"Restored {results['created']} {entity_type}, {len(results['errors'])} errors")
+        return results
+
+
+def _item_label(item: Dict[str, Any]) -> str:
+    for key in ('transactionId', 'accountId', 'categoryId', 'fileMapId', 'fileId'):
+        if key in item:
+            return str(item[key])
+    return 'unknown'
+
+
+def per_record_builder(build_item: Callable[[Dict[str, Any]], Dict[str, Any]],
+                       label: str, id_key: str) -> ItemBuilder:
+    """Adapt a single-record converter (e.g. via the Pydantic model) to an ItemBuilder"""
+    def build_items(records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        items, errors = [], []
+        for record in records:
+            try:
+                items.append(build_item(record))
+            except Exception as e:
+                errors.append(f"Failed to restore {label} {record.get(id_key, 'unknown')}: {str(e)}")
+        return items, errors
+    return build_items
+
+
+# =============================================================================
+# Transactions
+# =============================================================================
+
+def _uuid_str(value: Any) -> str:
+    return str(uuid.UUID(str(value)))
+
+
+def _optional_uuid_str(value: Any) -> Optional[str]:
+    return _uuid_str(value) if value else None
+
+
+def _timestamp(value: Any) -> int:
+    timestamp = int(value)
+    if timestamp < 0:
+        raise ValueError("Timestamp must be a positive integer representing milliseconds since epoch")
+    return timestamp
+
+
+def _decimal(value: Any) -> Decimal:
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"invalid decimal {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"invalid decimal {value!r}")
+    return amount
+
+
+def _optional_decimal(value: Any) -> Optional[Decimal]:
+    return _decimal(value) if value else None
+
+
+def _currency(value: Any) -> str:
+    return Currency(value or 'USD').value
+
+
+def _description(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError("description is required")
+    if len(value) > 1000:
+        raise ValueError("description exceeds 1000 characters")
+    return value
+
+
+def _assignments(value: Any) -> List[Dict[str, Any]]:
+    """Category assignments in TransactionCategoryAssignment.to_dynamodb_item format"""
+    now = int(datetime.now(timezone.utc).timestamp() * 1000)
+    assignments = []
+    for assignment in value or []:
+        confidence = int(assignment.get('confidence', 100))
+        if not 0 <= confidence <= 100:
+            raise ValueError(f"category confidence {confidence} out of range")
+        item = {
+            'categoryId': _uuid_str(assignment['categoryId']),
+            'confidence': confidence,
+            'status': CategoryAssignmentStatus(assignment.get('status', 'suggested')).value,
+            'isManual': bool(assignment.get('isManual', False)),
+            'assignedAt': _timestamp(assignment.get('assignedAt') or now),
+        }
+        if assignment.get('confirmedAt') is not None:
+            item['confirmedAt'] = _timestamp(assignment['confirmedAt'])
+        if assignment.get('ruleId') is not None:
+            item['ruleId'] = assignment['ruleId']
+        assignments.append(item)
+    return assignments
+
+
+# Exported key -> (converter, required). Converters raise on invalid values.
+TRANSACTION_COLUMNS: Dict[str, Tuple[Callable[[Any], Any], bool]] = {
+    'transactionId': (_uuid_str, True),
+    'accountId': (_uuid_str, True),
+    'fileId': (_uuid_str, True),
+    'date': (_timestamp, True),
+    'description': (_description, True),
+    'amount': (_decimal, True),
+    'currency': (_currency, False),
+    'balance': (_optional_decimal, False),
+    'importOrder': (int, False),
+    'categories': (_assignments, False),
+    'primaryCategoryId': (_optional_uuid_str, False),
+    'pairedTransactionId': (_optional_uuid_str, False),
+    'createdAt': (_timestamp, False),
+    'updatedAt': (_timestamp, False),
+}
+
+# Optional string attributes copied unchanged when present
+TRANSACTION_PASSTHROUGH = ('transactionType', 'memo', 'checkNumber', 'fitId', 'status')
+
+
+def transaction_items_builder(user_id: str, trust_exported_hashes: bool = False) -> ItemBuilder:
+    """
+    Build an ItemBuilder that converts exported transactions straight to DynamoDB items
+
+    Each chunk is validated column by column rather than by constructing a
+    Transaction model per record, and the items match
+    Transaction.to_dynamodb_item (statusDate and transferPairUserId included).
+    When the package's transaction data verified against its manifest
+    checksum, exported transaction hashes are kept instead of recomputed.
+    """
+    def build_items(records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        now = int(datetime.now(timezone.utc).timestamp() * 1000)
+        row_errors: Dict[int, str] = {}
+        columns: Dict[str, List[Any]] = {}
+
+        for key, (convert, required) in TRANSACTION_COLUMNS.items():
+            values = [record.get(key) for record in records]
+            converted: List[Any] = [None] * len(values)
+            for row, value in enumerate(values):
+                if row in row_errors:
+                    continue
+                if value is None or value == '':
+                    if required:
+                        row_errors[row] = f"missing {key}"
+                    continue
+                try:
+                    converted[row] = convert(value)
+                except (ValueError, TypeError, KeyError, AttributeError) as e:
+                    row_errors[row] = f"invalid {key}: {str(e)}"
+            columns[key] = converted
+
+        items: List[Dict[str, Any]] = []
+        for row, record in enumerate(records):
+            if row in row_errors:
+                continue
+            item = {key: column[row] for key, column in columns.items() if column[row] is not None}
+            item['userId'] = user_id  # Ensure user ownership
+            item.setdefault('currency', 'USD')
+            item.setdefault('createdAt', now)
+            item.setdefault('updatedAt', now)
+            if not item.get('categories'):
+                item.pop('categories', None)
+            for key in TRANSACTION_PASSTHROUGH:
+                if record.get(key) is not None:
+                    item[key] = record[key]
+            if item.get('status') is not None:
+                item['statusDate'] = f"{item['status']}#{item['date']}"
+            if item.get('pairedTransactionId') and item['amount'] < 0:
+                item['transferPairUserId'] = user_id
+
+            exported_hash = record.get('transactionHash')
+            if trust_exported_hashes and isinstance(exported_hash, int) and exported_hash >= 0:
+                item['transactionHash'] = exported_hash
+            else:
+                item['transactionHash'] = generate_transaction_hash(
+                    account_id=item['accountId'],
+                    date=item['date'],
+                    amount=item['amount'],
+                    description=item['description']
+                )
+            items.append(item)
+
+        errors = [
+            f"Failed to restore transaction {records[row].get('transactionId', 'unknown')}: {message}"
+            for row, message in sorted(row_errors.items())
+        ]
+        return items, errors
+
+    return build_items
@@ -3,15 +3,15 @@ Unified FZIP Service for backup/restore operations.
 Handles data collection, package building, restore processing, and backup operations.
 """
 import hashlib
-import json
 import logging
 import os
-import tempfile
 import uuid
-import zipfile
-import io
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator, Callable
+from itertools import islice
 from decimal import Decimal
 
 from models.fzip import (
@@ -34,19 +34,21 @@ from utils.db_utils import (
     list_user_accounts, list_user_transactions, list_categories_by_user_from_db,
     list_file_maps_by_user, list_user_files, get_analytics_data,
     create_fzip_job, update_fzip_job, get_fzip_job, list_user_fzip_jobs,
-    delete_fzip_job, cleanup_expired_fzip_jobs, create_account,
-    update_account, create_category_in_db, update_category_in_db,
-    create_file_map, update_file_map, create_transaction_file,
-    update_transaction_file, create_transaction, update_transaction
+    delete_fzip_job, cleanup_expired_fzip_jobs,
+    update_account, update_category_in_db, update_file_map,
+    update_transaction_file, update_transaction
 )
-from utils.s3_dao import get_object_content, put_object, get_presigned_url_simple
+from utils.s3_dao import put_object, get_presigned_url_simple
 from utils.fzip_metrics import fzip_metrics
 from services.event_service import event_service
 from services.export_data_processors import (
     AccountExporter, TransactionExporter, CategoryExporter, 
     FileMapExporter, TransactionFileExporter, ExportException
 )
-from services.s3_file_handler import S3FileStreamer, ExportPackageBuilder, FileStreamingOptions
+from services.s3_file_handler import (
+    S3FileStreamer, ExportPackageBuilder, FileStreamingOptions, RestorePackageReader
+)
+from services.fzip_restore_engine import BatchRestoreEngine, per_record_builder, transaction_items_builder
 
 
 class ImportException(Exception):
@@ -66,12 +68,79 @@ class ValidationException(Exception):
 logger = logging.getLogger(__name__)
 
 
+class CollectorPool:
+    """
+    Runs backup collectors concurrently on a bounded worker pool.
+    
+    stream() starts reading an entity's records in a worker and returns a
+    generator over them. Each collector buffers at most max_buffered records
+    ahead of the reader, so collectors overlap their DynamoDB reads while the
+    package is still written one entity at a time. Collectors are started in
+    the order they are submitted, so as long as entities are read in that
+    order a full pool cannot starve the one being read.
+    """
+    
+    _RECORD, _DONE, _ERROR = range(3)
+    
+    def __init__(self, max_workers: int, max_buffered: int = 1000,
+                 on_collector_done: Optional[Callable[[str, int], None]] = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fzip-collector')
+        self._max_buffered = max_buffered
+        self._on_collector_done = on_collector_done
+        self._stopped = threading.Event()
+    
+    def stream(self, name: str, records: Iterable[Any]) -> Iterator[Any]:
+        """Start collecting records in the pool and return an iterator over them"""
+        buffer: queue.Queue = queue.Queue(maxsize=self._max_buffered)
+        self._executor.submit(self._produce, name, records, buffer)
+        return self._consume(buffer)
+    
+    def close(self) -> None:
+        """Stop collectors that are still running, e.g. after the package build failed"""
+        self._stopped.set()
+        self._executor.shutdown(wait=False)
+    
+    def _produce(self, name: str, records: Iterable[Any], buffer: queue.Queue) -> None:
+        count = 0
+        try:
+            for record in records:
+                if not self._put(buffer, (self._RECORD, record)):
+                    return
+                count += 1
+        except Exception as e:
+            self._put(buffer, (self._ERROR, e))
+            return
+        if self._on_collector_done:
+            self._on_collector_done(name, count)
+        self._put(buffer, (self._DONE, None))
+    
+    def _put(self, buffer: queue.Queue, item: Tuple[int, Any]) -> bool:
+        # Poll so a collector blocked on a full buffer notices close()
+        while not self._stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _consume(self, buffer: queue.Queue) -> Iterator[Any]:
+        while True:
+            kind, value = buffer.get()
+            if kind == self._RECORD:
+                yield value
+            elif kind == self._DONE:
+                return
+            else:
+                raise value
+
+
 class FZIPService:
     """Unified service for handling FZIP (backup/restore) operations"""
     
     def __init__(self):
         self.housef3_version = "2.5.0"  # Current version
-        self.fzip_format_version = "1.0"
+        self.fzip_format_version = "1.1"  # 1.1: data files are NDJSON
         # Bucket used to store exported backup packages
         self.fzip_bucket = os.environ.get('FZIP_PACKAGES_BUCKET', 'housef3-dev-fzip-packages')
         # Bucket used to receive uploaded restore packages
@@ -81,6 +150,8 @@ class FZIPService:
         )
         self.file_storage_bucket = os.environ.get('FILE_STORAGE_BUCKET', 'housef3-dev-file-storage')
         self.batch_size = 1000  # For large datasets
+        self.collection_workers = 5  # Concurrent entity collectors per backup
+        self.restore_chunk_size = 500  # Records written per restore checkpoint
         
     # =============================================================================
     # Backup Operations
@@ -148,6 +219,54 @@ class FZIPService:
             ))
             raise
     
+    def _create_exporters(self, user_id: str) -> Dict[str, Any]:
+        """Create the specialized entity exporters, keyed by package entity type"""
+        return {
+            'accounts': AccountExporter(user_id, self.batch_size),
+            'transactions': TransactionExporter(user_id, self.batch_size),
+            'categories': CategoryExporter(user_id, self.batch_size),
+            'file_maps': FileMapExporter(user_id, self.batch_size),
+            'transaction_files': TransactionFileExporter(user_id, self.batch_size)
+        }
+    
+    def stream_backup_data(self, user_id: str, backup_type: FZIPBackupType,
+                           include_analytics: bool = False,
+                           **filters) -> Dict[str, Any]:
+        """
+        Prepare lazy record streams for a backup
+        
+        Each entity type maps to a generator that yields serialized records as
+        the exporter reads them, so build_backup_package can write them into the
+        package without holding a whole entity type in memory. All exporters
+        start reading at once in a CollectorPool, each buffering up to
+        batch_size records ahead, so a backup takes about as long as its
+        slowest collector. Export summaries are only complete once the streams
+        are consumed; build_backup_package adds them as '_export_summaries'.
+        
+        Args:
+            user_id: User identifier
+            backup_type: Type of backup
+            include_analytics: Whether to include analytics
+            **filters: Additional filters for selective backups
+            
+        Returns:
+            Dictionary of entity type to record generator
+        """
+        logger.info(f"Streaming data for user {user_id}, backup type: {backup_type}")
+        
+        exporters = self._create_exporters(user_id)
+        on_collector_done = self._collection_progress_recorder(len(exporters), backup_type)
+        pool = CollectorPool(self.collection_workers, self.batch_size, on_collector_done)
+        collected_data: Dict[str, Any] = {
+            entity_type: pool.stream(entity_type, exporter.iter_data(filters))
+            for entity_type, exporter in exporters.items()
+        }
+        if include_analytics:
+            collected_data['analytics'] = self._collect_analytics(user_id)
+        collected_data['_exporters'] = exporters
+        collected_data['_collector_pool'] = pool
+        return collected_data
+    
     def collect_backup_data(self, user_id: str, backup_type: FZIPBackupType,
                          include_analytics: bool = False,
                          **filters) -> Dict[str, Any]:
@@ -165,35 +284,21 @@ class FZIPService:
         try:
             logger.info(f"Collecting data for user {user_id}, backup type: {backup_type}")
             
-            collected_data = {}
-            export_summaries = {}
-            
-            # Use specialized exporters for enhanced data collection
-            
-            # Collect accounts
-            account_exporter = AccountExporter(user_id, self.batch_size)
-            collected_data['accounts'] = account_exporter.collect_data(filters)
-            export_summaries['accounts'] = account_exporter.get_export_summary()
+            collected_data: Dict[str, Any] = {}
+            exporters = self._create_exporters(user_id)
+            on_collector_done = self._collection_progress_recorder(len(exporters), backup_type)
             
-            # Collect transactions
-            transaction_exporter = TransactionExporter(user_id, self.batch_size)
-            collected_data['transactions'] = transaction_exporter.collect_data(filters)
-            export_summaries['transactions'] = transaction_exporter.get_export_summary()
-            
-            # Collect categories
-            category_exporter = CategoryExporter(user_id, self.batch_size)
-            collected_data['categories'] = category_exporter.collect_data(filters)
-            export_summaries['categories'] = category_exporter.get_export_summary()
-            
-            # Collect file maps
-            file_map_exporter = FileMapExporter(user_id, self.batch_size)
-            collected_data['file_maps'] = file_map_exporter.collect_data(filters)
-            export_summaries['file_maps'] = file_map_exporter.get_export_summary()
-            
-            # Collect transaction files
-            transaction_file_exporter = TransactionFileExporter(user_id, self.batch_size)
-            collected_data['transaction_files'] = transaction_file_exporter.collect_data(filters)
-            export_summaries['transaction_files'] = transaction_file_exporter.get_export_summary()
+            # Run the collectors concurrently; each does its own paginated reads
+            with ThreadPoolExecutor(max_workers=self.collection_workers,
+                                    thread_name_prefix='fzip-collector') as executor:
+                futures = {
+                    executor.submit(exporter.collect_data, filters): entity_type
+                    for entity_type, exporter in exporters.items()
+                }
+                for future in as_completed(futures):
+                    entity_type = futures[future]
+                    collected_data[entity_type] = future.result()
+                    on_collector_done(entity_type, len(collected_data[entity_type]))
             
             # Collect analytics if requested
             if include_analytics:
@@ -201,37 +306,15 @@ class FZIPService:
                 collected_data['analytics'] = analytics
             
             # Add export summaries for reporting
-            collected_data['_export_summaries'] = export_summaries
-            
-            # Record data volume metrics
-            entity_counts = {
-                entity_type: summary['processed_count'] 
-                for entity_type, summary in export_summaries.items()
-            }
-            fzip_metrics.record_backup_data_volume(entity_counts, backup_type)
-            
-            logger.info("Enhanced data collection complete using specialized exporters")
-            for entity_type, summary in export_summaries.items():
-                logger.info(
-                    "%s: %d items, %.1f%% success rate",
-                    entity_type,
-                    summary['processed_count'],
-                    summary.get('success_rate', 100)
-                )
+            collected_data['_export_summaries'] = self._summarize_exports(exporters, backup_type)
             
             return collected_data
             
-        except ExportException as e:
-            logger.error(f"Export-specific error collecting data for user {user_id}: {str(e)}")
-            fzip_metrics.record_backup_error(
-                error_type=type(e).__name__,
-                error_message=str(e),
-                backup_type=backup_type,
-                phase="data_collection"
-            )
-            raise
         except Exception as e:
-            logger.error(f"Failed to collect data for user {user_id}: {str(e)}")
+            if isinstance(e, ExportException):
+                logger.error(f"Export-specific error collecting data for user {user_id}: {str(e)}")
+            else:
+                logger.error(f"Failed to collect data for user {user_id}: {str(e)}")
             fzip_metrics.record_backup_error(
                 error_type=type(e).__name__,
                 error_message=str(e),
@@ -240,6 +323,47 @@ class FZIPService:
             )
             raise
     
+    def _collection_progress_recorder(self, total_collectors: int,
+                                      backup_type: FZIPBackupType) -> Callable[[str, int], None]:
+        """Build a thread-safe callback that merges collector completions into one progress metric"""
+        lock = threading.Lock()
+        progress = {'completed': 0, 'records': 0}
+        
+        def collector_done(entity_type: str, record_count: int) -> None:
+            with lock:
+                progress['completed'] += 1
+                progress['records'] += record_count
+                completed, records = progress['completed'], progress['records']
+            logger.info(f"Collected {record_count} {entity_type} ({completed}/{total_collectors} collectors done)")
+            fzip_metrics.record_backup_collection_progress(completed, total_collectors, records, backup_type)
+        
+        return collector_done
+    
+    def _summarize_exports(self, exporters: Dict[str, Any], backup_type: FZIPBackupType) -> Dict[str, Any]:
+        """Gather exporter summaries once their data is read and record data volume metrics"""
+        export_summaries = {
+            entity_type: exporter.get_export_summary()
+            for entity_type, exporter in exporters.items()
+        }
+        
+        # Record data volume metrics
+        entity_counts = {
+            entity_type: summary['processed_count'] 
+            for entity_type, summary in export_summaries.items()
+        }
+        fzip_metrics.record_backup_data_volume(entity_counts, backup_type)
+        
+        logger.info("Enhanced data collection complete using specialized exporters")
+        for entity_type, summary in export_summaries.items():
+            logger.info(
+                "%s: %d items, %.1f%% success rate",
+                entity_type,
+                summary['processed_count'],
+                summary.get('success_rate', 100)
+            )
+        
+        return export_summaries
+    
     def _collect_analytics(self, user_id: str) -> List[Dict[str, Any]]:
         """Collect user analytics data"""
         try:
@@ -254,11 +378,16 @@ class FZIPService:
     
     def build_backup_package(self, backup_job: FZIPJob, collected_data: Dict[str, Any]) -> Tuple[str, int]:
         """
-        Build backup package using enhanced streaming and compression capabilities
+        Build backup package by streaming it straight into S3
+        
+        Records are written to NDJSON entries as they are read from
+        collected_data (lists from collect_backup_data or generators from
+        stream_backup_data) and the zip stream is sent as a multipart upload,
+        so neither memory nor local disk grows with the size of the backup.
         
         Args:
             backup_job: Backup job details
-            collected_data: Collected user data
+            collected_data: Collected or streamed user data
             
         Returns:
             Tuple of (s3_key, package_size)
@@ -276,71 +405,54 @@ class FZIPService:
             
             # Create enhanced package builder with file storage bucket for transaction files
             package_builder = ExportPackageBuilder(self.fzip_bucket, streaming_options, self.file_storage_bucket)
+            backup_type = backup_job.backup_type if backup_job.backup_type else "complete"
             
-            # Create temporary directory
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Build package with streaming capabilities
-                package_dir, processing_summary = package_builder.build_package_with_streaming(
-                    export_data=collected_data,
-                    transaction_files=collected_data.get('transaction_files', []),
-                    package_dir=os.path.join(temp_dir, "backup_package")
+            def build_manifest(processing_summary: Dict[str, Any]) -> Dict[str, Any]:
+                # Streamed exporters have read everything by the time the manifest is written
+                if '_exporters' in collected_data and '_export_summaries' not in collected_data:
+                    collected_data['_export_summaries'] = self._summarize_exports(
+                        collected_data['_exporters'], backup_job.backup_type or FZIPBackupType.COMPLETE
+                    )
+                manifest = self._create_enhanced_manifest(
+                    backup_job, collected_data, processing_summary,
+                    entity_counts=processing_summary['entity_counts']
                 )
-                
-                # Create manifest with processing summary
-                manifest = self._create_enhanced_manifest(backup_job, collected_data, processing_summary)
-                manifest_file = os.path.join(package_dir, "manifest.json")
-                with open(manifest_file, 'w') as f:
-                    json.dump(manifest.model_dump(by_alias=True), f, indent=2, default=str)
-                
-                # Create compressed ZIP file
-                zip_path = os.path.join(temp_dir, f"backup_{backup_job.job_id}.zip")
-                
-                # Use enhanced compression for large packages
-                compression_method = zipfile.ZIP_DEFLATED
-                if processing_summary['total_original_size'] > 50 * 1024 * 1024:  # > 50MB
-                    try:
-                        compression_method = zipfile.ZIP_LZMA  # Better compression for large files
-                    except AttributeError:
-                        compression_method = zipfile.ZIP_DEFLATED
-                
-                with zipfile.ZipFile(zip_path, 'w', compression_method, compresslevel=6) as zipf:
-                    for root, dirs, files in os.walk(package_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, package_dir)
-                            zipf.write(file_path, arcname)
-                
-                # Upload to S3 with retry logic
-                s3_key = f"backups/{backup_job.user_id}/{backup_job.job_id}/backup_package.zip"
-                package_size = os.path.getsize(zip_path)
-                
-                # Upload to S3
-                logger.info(f"Uploading backup package to S3: {s3_key}")
-                with open(zip_path, 'rb') as f:
-                    put_object(s3_key, f.read(), 'application/zip', self.fzip_bucket)
-                
-                # Publish backup completed event
-                event_service.publish_event(BackupCompletedEvent(
-                    user_id=backup_job.user_id,
-                    backup_id=str(backup_job.job_id),
-                    package_size=package_size,
-                    s3_key=s3_key,
-                    data_summary=processing_summary
-                ))
+                return manifest.model_dump(by_alias=True)
+            
+            s3_key = f"backups/{backup_job.user_id}/{backup_job.job_id}/backup_package.zip"
+            logger.info(f"Streaming backup package to S3: {s3_key}")
+            package_size, processing_summary = package_builder.stream_package_to_s3(
+                export_data=collected_data,
+                s3_key=s3_key,
+                build_manifest=build_manifest
+            )
+            
+            if '_collector_pool' in collected_data:
+                collected_data['_collector_pool'].close()
+            
+            # Publish backup completed event
+            event_service.publish_event(BackupCompletedEvent(
+                user_id=backup_job.user_id,
+                backup_id=str(backup_job.job_id),
+                package_size=package_size,
+                s3_key=s3_key,
+                data_summary=processing_summary
+            ))
 
-                # Record package size metrics
-                backup_type = backup_job.backup_type if backup_job.backup_type else "complete"
-                fzip_metrics.record_backup_package_size(package_size, backup_type)
-                
-                logger.info(f"Enhanced backup package created: {s3_key}")
-                logger.info(f"Package size: {package_size} bytes, "
-                          f"Compression ratio: {processing_summary.get('compression_ratio', 0):.1f}%")
-                logger.info(f"Files processed: {processing_summary['transaction_files_processed']}, "
-                          f"Failed: {processing_summary['transaction_files_failed']}")
-                
-                return s3_key, package_size
+            # Record package size metrics
+            fzip_metrics.record_backup_package_size(package_size, backup_type)
+            
+            logger.info(f"Enhanced backup package created: {s3_key}")
+            logger.info(f"Package size: {package_size} bytes, "
+                      f"Compression ratio: {processing_summary.get('compression_ratio', 0):.1f}%")
+            logger.info(f"Files processed: {processing_summary['transaction_files_processed']}, "
+                      f"Failed: {processing_summary['transaction_files_failed']}")
+            
+            return s3_key, package_size
                 
         except Exception as e:
+            if '_collector_pool' in collected_data:
+                collected_data['_collector_pool'].close()
             logger.error(f"Failed to build enhanced backup package for job {backup_job.job_id}: {str(e)}")
             # Record error metrics
             backup_type = backup_job.backup_type if backup_job.backup_type else "complete"
@@ -358,14 +470,21 @@ class FZIPService:
             raise
     
     def _create_enhanced_manifest(self, backup_job: FZIPJob, collected_data: Dict[str, Any], 
-                                processing_summary: Dict[str, Any]) -> FZIPManifest:
+                                processing_summary: Dict[str, Any],
+                                entity_counts: Optional[Dict[str, int]] = None) -> FZIPManifest:
         """Create enhanced backup manifest with processing summary"""
+        def count(entity_type: str) -> int:
+            # Streamed entities have no len(); the package builder counts what it wrote
+            if entity_counts is not None and entity_type in entity_counts:
+                return entity_counts[entity_type]
+            return len(collected_data.get(entity_type, []))
+        
         data_summary = FZIPDataSummary(
-            accountsCount=len(collected_data.get('accounts', [])),
-            transactionsCount=len(collected_data.get('transactions', [])),
-            categoriesCount=len(collected_data.get('categories', [])),
-            fileMapsCount=len(collected_data.get('file_maps', [])),
-            transactionFilesCount=len(collected_data.get('transaction_files', [])),
+            accountsCount=count('accounts'),
+            transactionsCount=count('transactions'),
+            categoriesCount=count('categories'),
+            fileMapsCount=count('file_maps'),
+            transactionFilesCount=count('transaction_files'),
             analyticsIncluded=backup_job.include_analytics and bool(collected_data.get('analytics'))
         )
         
@@ -381,7 +500,7 @@ class FZIPService:
             userId=backup_job.user_id,
             housef3Version=self.housef3_version,
             dataSummary=data_summary,
-            checksums={},  # Will be populated by package builder if needed
+            checksums=processing_summary.get('checksums', {}),
             compatibility=compatibility,
             jobId=backup_job.job_id,
             backupType=backup_job.backup_type or FZIPBackupType.COMPLETE,
@@ -490,6 +609,7 @@ class FZIPService:
 
     def start_restore(self, restore_job: FZIPJob, package_s3_key: str):
         """Start restore processing."""
+        package_data = None
         try:
             # Update job with package location
             restore_job.s3_key = package_s3_key
@@ -572,10 +692,22 @@ class FZIPService:
                 backup_id=restore_job.backup_id or '',
                 error=str(e)
             ))
+        finally:
+            self._close_package(package_data)
     
     def resume_restore(self, restore_job: FZIPJob):
-        """Resume restore processing from validation passed state."""
+        """
+        Resume restore processing from validation passed state.
+        
+        A job that failed part-way continues after its restore checkpoint
+        instead of rewriting what was already committed.
+        """
+        package_data = None
         try:
+            if restore_job.restore_checkpoint:
+                logger.info(f"Resuming restore {restore_job.job_id} from checkpoint {restore_job.restore_checkpoint}")
+                restore_job.error = None
+            
             # Update status to processing
             restore_job.status = FZIPStatus.RESTORE_PROCESSING
             restore_job.current_phase = "Starting restore..."
@@ -599,48 +731,39 @@ class FZIPService:
                 backup_id=restore_job.backup_id or '',
                 error=str(e)
             ))
+        finally:
+            self._close_package(package_data)
     
     def _parse_package(self, package_s3_key: str) -> Dict[str, Any]:
-        """Parse the ZIP package and extract data."""
+        """
+        Open the ZIP package for streaming reads.
+        
+        The package is spooled from S3 rather than loaded into memory, and each
+        entry of 'data' is a re-iterable PackageEntityRecords that decodes its
+        records incrementally. Call _close_package when done.
+        """
         try:
-            # Download package from S3
             # Read the uploaded restore package from the restore bucket
-            package_data = get_object_content(package_s3_key, self.restore_packages_bucket)
-            if not package_data:
-                raise ImportException("Could not download package from S3")
-            
-            # Parse ZIP file
-            with zipfile.ZipFile(io.BytesIO(package_data), 'r') as zipf:
-                # Read manifest
-                manifest_data = zipf.read('manifest.json')
-                manifest = json.loads(manifest_data.decode('utf-8'))
-                
-                # Read data files (handle both compressed and uncompressed)
-                data = {}
-                for entity_type in ['accounts', 'transactions', 'categories', 'file_maps', 'transaction_files']:
-                    try:
-                        # Try compressed file first (.gz)
-                        try:
-                            entity_data = zipf.read(f'data/{entity_type}.json.gz')
-                            import gzip
-                            data[entity_type] = json.loads(gzip.decompress(entity_data).decode('utf-8'))
-                        except KeyError:
-                            # Fall back to uncompressed file
-                            entity_data = zipf.read(f'data/{entity_type}.json')
-                            data[entity_type] = json.loads(entity_data.decode('utf-8'))
-                    except KeyError:
-                        data[entity_type] = []
-                
-                return {
-                    'manifest': manifest,
-                    'data': data,
-                    'raw': package_data
-                }
+            package = RestorePackageReader(self.restore_packages_bucket, package_s3_key)
+            data = {
+                entity_type: package.records(entity_type)
+                for entity_type in ['accounts', 'transactions', 'categories', 'file_maps', 'transaction_files']
+            }
+            return {
+                'manifest': package.manifest,
+                'data': data,
+                'package': package
+            }
                 
         except Exception as e:
             logger.error(f"Error parsing package: {str(e)}")
             raise ImportException(f"Failed to parse import package: {str(e)}")
     
+    def _close_package(self, package_data: Optional[Dict[str, Any]]) -> None:
+        """Release the spooled package opened by _parse_package"""
+        if package_data and package_data.get('package'):
+            package_data['package'].close()
+    
     def _validate_schema(self, package_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate the package schema."""
         try:
@@ -656,26 +779,27 @@ class FZIPService:
                         'errors': [f"Missing required manifest field: {field}"]
                     }
             
-            # Validate data structure
+            # Validate data structure, streaming each entity file once
             errors = []
+            counts = {}
             for entity_type, entities in data.items():
-                if not isinstance(entities, list):
+                if isinstance(entities, (str, bytes, dict)) or not hasattr(entities, '__iter__'):
                     errors.append(f"Invalid data structure for {entity_type}")
                     continue
                 
+                count = 0
                 for i, entity in enumerate(entities):
+                    count += 1
                     if not isinstance(entity, dict):
                         errors.append(f"Invalid entity at index {i} in {entity_type}")
+                counts[entity_type] = count
             
             return {
                 'valid': len(errors) == 0,
                 'errors': errors,
                 'summary': {
-                    'accounts': len(data.get('accounts', [])),
-                    'transactions': len(data.get('transactions', [])),
-                    'categories': len(data.get('categories', [])),
-                    'file_maps': len(data.get('file_maps', [])),
-                    'transaction_files': len(data.get('transaction_files', []))
+                    entity_type: counts.get(entity_type, 0)
+                    for entity_type in ['accounts', 'transactions', 'categories', 'file_maps', 'transaction_files']
                 }
             }
             
@@ -725,8 +849,8 @@ class FZIPService:
         try:
             data = package_data['data']
             
-            # Analyze accounts
-            accounts = data.get('accounts', [])
+            # Analyze accounts (small entity types are materialized; transactions are streamed)
+            accounts = list(data.get('accounts', []))
             account_summary = {
                 "count": len(accounts),
                 "items": [
@@ -739,7 +863,7 @@ class FZIPService:
             }
             
             # Analyze categories with hierarchy
-            categories = data.get('categories', [])
+            categories = list(data.get('categories', []))
             category_summary = self._analyze_category_hierarchy(categories)
             
             # Analyze transactions with date range
@@ -747,14 +871,14 @@ class FZIPService:
             transaction_summary = self._analyze_transaction_range(transactions)
             
             # Analyze file maps
-            file_maps = data.get('file_maps', [])
+            file_maps = list(data.get('file_maps', []))
             file_map_summary = {
                 "count": len(file_maps),
                 "totalSize": self._calculate_total_size_from_file_maps(file_maps)
             }
             
             # Analyze transaction files
-            transaction_files = data.get('transaction_files', [])
+            transaction_files = list(data.get('transaction_files', []))
             transaction_file_summary = {
                 "count": len(transaction_files),
                 "totalSize": self._calculate_transaction_files_size(transaction_files),
@@ -824,44 +948,47 @@ class FZIPService:
         
         return self._calculate_category_depth(parent, all_categories, current_depth + 1)
     
-    def _analyze_transaction_range(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze transaction date range and counts"""
+    def _analyze_transaction_range(self, transactions: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze transaction date range and counts in a single streaming pass"""
+        count = 0
+        earliest: Optional[str] = None
+        latest: Optional[str] = None
         try:
-            if not transactions:
-                return {"count": 0}
-            
-            # Extract dates and find range
-            dates = []
             for transaction in transactions:
+                count += 1
                 date_timestamp = transaction.get('date')
-                if date_timestamp:
-                    try:
-                        # Convert milliseconds timestamp to date string
-                        if isinstance(date_timestamp, (int, float)):
-                            date_obj = datetime.fromtimestamp(date_timestamp / 1000, tz=timezone.utc)
-                            dates.append(date_obj.strftime('%Y-%m-%d'))
-                        elif isinstance(date_timestamp, str):
-                            # Handle string dates that might be already formatted
-                            date_part = date_timestamp.split('T')[0] if 'T' in date_timestamp else date_timestamp
-                            dates.append(date_part)
-                    except Exception:
+                if not date_timestamp:
+                    continue
+                try:
+                    # Convert milliseconds timestamp to date string
+                    if isinstance(date_timestamp, (int, float)):
+                        date_obj = datetime.fromtimestamp(date_timestamp / 1000, tz=timezone.utc)
+                        date_str = date_obj.strftime('%Y-%m-%d')
+                    elif isinstance(date_timestamp, str):
+                        # Handle string dates that might be already formatted
+                        date_str = date_timestamp.split('T')[0] if 'T' in date_timestamp else date_timestamp
+                    else:
                         continue
+                except Exception:
+                    continue
+                if earliest is None or date_str < earliest:
+                    earliest = date_str
+                if latest is None or date_str > latest:
+                    latest = date_str
             
-            if dates:
-                dates.sort()
+            if earliest is not None:
                 return {
-                    "count": len(transactions),
+                    "count": count,
                     "dateRange": {
-                        "earliest": dates[0],
-                        "latest": dates[-1]
+                        "earliest": earliest,
+                        "latest": latest
                     }
                 }
-            else:
-                return {"count": len(transactions)}
+            return {"count": count}
                 
         except Exception as e:
             logger.error(f"Error analyzing transaction range: {str(e)}")
-            return {"count": len(transactions)}
+            return {"count": count}
     
     def _calculate_total_size_from_file_maps(self, file_maps: List[Dict[str, Any]]) -> str:
         """Calculate total size from file maps"""
@@ -952,69 +1079,57 @@ class FZIPService:
             }
     
     def _restore_data(self, restore_job: FZIPJob, package_data: Dict[str, Any]):
-        """Restore all data from the package."""
+        """
+        Restore all data from the package.
+        
+        Entities are written in chunks by a BatchRestoreEngine that checkpoints
+        each committed chunk into the job, so running this again for the same
+        job (resume_restore) skips everything already written.
+        """
         try:
             restore_job.status = FZIPStatus.RESTORE_PROCESSING
             data = package_data['data']
-            results = {}
+            results = dict(restore_job.restore_results or {})
             
-            # Restore in dependency order
-            
-            # 1. Restore accounts first
-            self._check_cancel(restore_job)
-            restore_job.current_phase = "restoring_accounts"
-            restore_job.progress = 50
-            update_fzip_job(restore_job)
-            
-            # Restore to empty profile - no merge strategy needed
-            account_results = self._restore_accounts(
-                data.get('accounts', []), restore_job.user_id
-            )
-            results['accounts'] = account_results
-            
-            # 2. Restore categories
-            self._check_cancel(restore_job)
-            restore_job.current_phase = "restoring_categories"
-            restore_job.progress = 60
-            update_fzip_job(restore_job)
-            
-            category_results = self._restore_categories(
-                data.get('categories', []), restore_job.user_id
-            )
-            results['categories'] = category_results
-            
-            # 3. Restore file maps
-            self._check_cancel(restore_job)
-            restore_job.current_phase = "restoring_file_maps"
-            restore_job.progress = 70
-            update_fzip_job(restore_job)
-            
-            file_map_results = self._restore_file_maps(
-                data.get('file_maps', []), restore_job.user_id
-            )
-            results['file_maps'] = file_map_results
-            
-            # 4. Restore transaction files
-            self._check_cancel(restore_job)
-            restore_job.current_phase = "restoring_transaction_files"
-            restore_job.progress = 80
-            update_fzip_job(restore_job)
+            def save_checkpoint(entity_type: str, committed: int, entity_results: Dict[str, Any]) -> None:
+                results[entity_type] = entity_results
+                restore_job.restore_checkpoint = {'entityType': entity_type, 'committed': committed}
+                restore_job.restore_results = results
+                update_fzip_job(restore_job)
             
-            file_results = self._restore_transaction_files(
-                data.get('transaction_files', []), restore_job.user_id, package_data
+            engine = BatchRestoreEngine(
+                checkpoint=restore_job.restore_checkpoint,
+                chunk_size=self.restore_chunk_size,
+                on_checkpoint=save_checkpoint,
+                before_chunk=lambda: self._check_cancel(restore_job)
             )
-            results['transaction_files'] = file_results
-            
-            # 5. Restore transactions
-            self._check_cancel(restore_job)
-            restore_job.current_phase = "restoring_transactions"
-            restore_job.progress = 90
-            update_fzip_job(restore_job)
             
-            transaction_results = self._restore_transactions(
-                data.get('transactions', []), restore_job.user_id
-            )
-            results['transactions'] = transaction_results
+            # Restore in dependency order
+            phases = [
+                ('accounts', "restoring_accounts", 50,
+                 lambda previous: self._restore_accounts(data.get('accounts', []), restore_job.user_id, engine, previous)),
+                ('categories', "restoring_categories", 60,
+                 lambda previous: self._restore_categories(data.get('categories', []), restore_job.user_id, engine, previous)),
+                ('file_maps', "restoring_file_maps", 70,
+                 lambda previous: self._restore_file_maps(data.get('file_maps', []), restore_job.user_id, engine, previous)),
+                ('transaction_files', "restoring_transaction_files", 80,
+                 lambda previous: self._restore_transaction_files(
+                     data.get('transaction_files', []), restore_job.user_id, package_data, engine, previous)),
+                ('transactions', "restoring_transactions", 90,
+                 lambda previous: self._restore_transactions(
+                     data.get('transactions', []), restore_job.user_id, engine, previous,
+                     trust_exported_hashes=self._transactions_verified(package_data))),
+            ]
+            
+            for entity_type, phase, progress, restore_entity in phases:
+                if engine.start_offset(entity_type) is None:
+                    continue
+                self._check_cancel(restore_job)
+                restore_job.current_phase = phase
+                restore_job.progress = progress
+                update_fzip_job(restore_job)
+                
+                results[entity_type] = restore_entity(results.get(entity_type))
             
             # Complete restore
             restore_job.status = FZIPStatus.RESTORE_COMPLETED
@@ -1046,6 +1161,11 @@ class FZIPService:
             ))
             raise
 
+    def _transactions_verified(self, package_data: Dict[str, Any]) -> bool:
+        """Whether the package's transaction data matches its manifest checksum"""
+        package = package_data.get('package')
+        return bool(package) and package.verify_checksum('transactions')
+    
     def _check_cancel(self, restore_job: FZIPJob) -> None:
         """Reload job and raise CanceledException if status is RESTORE_CANCELED.
 
@@ -1060,291 +1180,197 @@ class FZIPService:
             update_fzip_job(restore_job)
             raise CanceledException("Restore canceled by user")
     
-    def _restore_accounts(self, accounts: list, user_id: str) -> Dict[str, Any]:
+    def _restore_accounts(self, accounts: list, user_id: str, engine: Optional[BatchRestoreEngine] = None,
+                          previous_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Restore accounts data to empty profile (no conflicts expected)."""
-        
-        created = 0
-        errors = []
-        
-        for account_data in accounts:
-            try:
-                # Convert export format to Account model
-                account = Account(
-                    accountId=uuid.UUID(account_data['accountId']),
-                    userId=user_id,  # Ensure user ownership
-                    accountName=account_data['accountName'],
-                    accountType=AccountType(account_data['accountType']),
-                    institution=account_data.get('institution', ''),
-                    balance=Decimal(str(account_data['balance'])) if account_data.get('balance') else Decimal('0.00'),
-                    currency=Currency(account_data.get('currency', 'USD')),
-                    notes=account_data.get('notes', ''),
-                    isActive=account_data.get('isActive', True),
-                    defaultFileMapId=uuid.UUID(account_data['defaultFileMapId']) if account_data.get('defaultFileMapId') else None,
-                    lastTransactionDate=account_data.get('lastTransactionDate'),
-                    createdAt=account_data.get('createdAt'),
-                    updatedAt=account_data.get('updatedAt')
-                )
-                
-                # Create account directly - profile already validated as empty
-                create_account(account)
-                created += 1
-                logger.debug(f"Successfully restored account: {account.account_id}")
-                    
-            except Exception as e:
-                # Any failure indicates system issue (not conflicts - profile was validated empty)
-                error_msg = f"Failed to restore account {account_data.get('accountId', 'unknown')}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
-        
-        return {
-            'created': created,
-            'errors': errors
-        }
+        engine = engine or BatchRestoreEngine(chunk_size=self.restore_chunk_size)
+        build_items = per_record_builder(
+            lambda account_data: self._account_from_export(account_data, user_id).to_dynamodb_item(),
+            'account', 'accountId'
+        )
+        return engine.restore('accounts', accounts, build_items, previous_results)
     
-    def _restore_categories(self, categories: list, user_id: str) -> Dict[str, Any]:
+    def _account_from_export(self, account_data: Dict[str, Any], user_id: str) -> Account:
+        """Convert an exported account to an Account model owned by user_id"""
+        return Account(
+            accountId=uuid.UUID(account_data['accountId']),
+            userId=user_id,  # Ensure user ownership
+            accountName=account_data['accountName'],
+            accountType=AccountType(account_data['accountType']),
+            institution=account_data.get('institution', ''),
+            balance=Decimal(str(account_data['balance'])) if account_data.get('balance') else Decimal('0.00'),
+            currency=Currency(account_data.get('currency', 'USD')),
+            notes=account_data.get('notes', ''),
+            isActive=account_data.get('isActive', True),
+            defaultFileMapId=uuid.UUID(account_data['defaultFileMapId']) if account_data.get('defaultFileMapId') else None,
+            lastTransactionDate=account_data.get('lastTransactionDate'),
+            createdAt=account_data.get('createdAt'),
+            updatedAt=account_data.get('updatedAt')
+        )
+    
+    def _restore_categories(self, categories: list, user_id: str, engine: Optional[BatchRestoreEngine] = None,
+                            previous_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Restore categories data to empty profile (no conflicts expected)."""
+        engine = engine or BatchRestoreEngine(chunk_size=self.restore_chunk_size)
+        build_items = per_record_builder(
+            lambda category_data: self._category_from_export(category_data, user_id).to_dynamodb_item(),
+            'category', 'categoryId'
+        )
+        return engine.restore('categories', categories, build_items, previous_results)
+    
+    def _category_from_export(self, category_data: Dict[str, Any], user_id: str) -> Category:
+        """Convert an exported category, including its rules, to a Category model owned by user_id"""
         from models.category import CategoryType, CategoryRule, MatchCondition
         
-        created = 0
-        errors = []
-        
-        for category_data in categories:
-            try:
-                # Convert rules from export format
-                rules = []
-                for rule_data in category_data.get('rules', []):
-                    rule = CategoryRule(
-                        ruleId=rule_data.get('ruleId'),
-                        fieldToMatch=rule_data.get('fieldToMatch'),
-                        condition=MatchCondition(rule_data.get('condition')),
-                        value=rule_data.get('value'),
-                        caseSensitive=rule_data.get('caseSensitive', False),
-                        priority=rule_data.get('priority', 0),
-                        enabled=rule_data.get('enabled', True),
-                        confidence=rule_data.get('confidence', 100),
-                        amountMin=Decimal(str(rule_data['amountMin'])) if rule_data.get('amountMin') else None,
-                        amountMax=Decimal(str(rule_data['amountMax'])) if rule_data.get('amountMax') else None,
-                        allowMultipleMatches=rule_data.get('allowMultipleMatches', True),
-                        autoSuggest=rule_data.get('autoSuggest', True)
-                    )
-                    rules.append(rule)
-                
-                # Convert export format to Category model
-                category = Category(
-                    categoryId=uuid.UUID(category_data['categoryId']),
-                    userId=user_id,  # Ensure user ownership
-                    name=category_data['name'],
-                    type=CategoryType(category_data['type']),
-                    parentCategoryId=uuid.UUID(category_data['parentCategoryId']) if category_data.get('parentCategoryId') else None,
-                    icon=category_data.get('icon'),
-                    color=category_data.get('color'),
-                    rules=rules,
-                    inheritParentRules=category_data.get('inheritParentRules', True),
-                    ruleInheritanceMode=category_data.get('ruleInheritanceMode', 'additive'),
-                    createdAt=category_data.get('createdAt'),
-                    updatedAt=category_data.get('updatedAt')
-                )
-                
-                # Create category directly - profile already validated as empty
-                create_category_in_db(category)
-                created += 1
-                logger.debug(f"Successfully restored category: {category.categoryId}")
-                    
-            except Exception as e:
-                # Any failure indicates system issue (not conflicts - profile was validated empty)
-                error_msg = f"Failed to restore category {category_data.get('categoryId', 'unknown')}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+        # Convert rules from export format
+        rules = []
+        for rule_data in category_data.get('rules', []):
+            rule = CategoryRule(
+                ruleId=rule_data.get('ruleId'),
+                fieldToMatch=rule_data.get('fieldToMatch'),
+                condition=MatchCondition(rule_data.get('condition')),
+                value=rule_data.get('value'),
+                caseSensitive=rule_data.get('caseSensitive', False),
+                priority=rule_data.get('priority', 0),
+                enabled=rule_data.get('enabled', True),
+                confidence=rule_data.get('confidence', 100),
+                amountMin=Decimal(str(rule_data['amountMin'])) if rule_data.get('amountMin') else None,
+                amountMax=Decimal(str(rule_data['amountMax'])) if rule_data.get('amountMax') else None,
+                allowMultipleMatches=rule_data.get('allowMultipleMatches', True),
+                autoSuggest=rule_data.get('autoSuggest', True)
+            )
+            rules.append(rule)
         
-        return {
-            'created': created,
-            'errors': errors
-        }
+        return Category(
+            categoryId=uuid.UUID(category_data['categoryId']),
+            userId=user_id,  # Ensure user ownership
+            name=category_data['name'],
+            type=CategoryType(category_data['type']),
+            parentCategoryId=uuid.UUID(category_data['parentCategoryId']) if category_data.get('parentCategoryId') else None,
+            icon=category_data.get('icon'),
+            color=category_data.get('color'),
+            rules=rules,
+            inheritParentRules=category_data.get('inheritParentRules', True),
+            ruleInheritanceMode=category_data.get('ruleInheritanceMode', 'additive'),
+            createdAt=category_data.get('createdAt'),
+            updatedAt=category_data.get('updatedAt')
+        )
     
-    def _restore_file_maps(self, file_maps: list, user_id: str) -> Dict[str, Any]:
+    def _restore_file_maps(self, file_maps: list, user_id: str, engine: Optional[BatchRestoreEngine] = None,
+                           previous_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Restore file maps data to empty profile (no conflicts expected)."""
+        engine = engine or BatchRestoreEngine(chunk_size=self.restore_chunk_size)
+        build_items = per_record_builder(
+            lambda file_map_data: self._file_map_from_export(file_map_data, user_id).to_dynamodb_item(),
+            'file map', 'fileMapId'
+        )
+        return engine.restore('file_maps', file_maps, build_items, previous_results)
+    
+    def _file_map_from_export(self, file_map_data: Dict[str, Any], user_id: str) -> FileMap:
+        """Convert an exported file map, including its mappings, to a FileMap model owned by user_id"""
         from models.file_map import FieldMapping
         
-        created = 0
-        errors = []
-        
-        for file_map_data in file_maps:
-            try:
-                # Convert mappings from export format
-                mappings = []
-                for mapping_data in file_map_data.get('mappings', []):
-                    mapping = FieldMapping(
-                        sourceField=mapping_data.get('sourceField'),
-                        targetField=mapping_data.get('targetField'),
-                        transformation=mapping_data.get('transformation')
-                    )
-                    mappings.append(mapping)
-                
-                # Convert export format to FileMap model
-                file_map = FileMap(
-                    fileMapId=uuid.UUID(file_map_data['fileMapId']),
-                    userId=user_id,  # Ensure user ownership
-                    name=file_map_data['name'],
-                    mappings=mappings,
-                    accountId=uuid.UUID(file_map_data['accountId']) if file_map_data.get('accountId') else None,
-                    description=file_map_data.get('description'),
-                    reverseAmounts=file_map_data.get('reverseAmounts', False),
-                    createdAt=file_map_data.get('createdAt'),
-                    updatedAt=file_map_data.get('updatedAt')
-                )
-                
-                # Create file map directly - profile already validated as empty
-                create_file_map(file_map)
-                created += 1
-                logger.debug(f"Successfully restored file map: {file_map.file_map_id}")
-                    
-            except Exception as e:
-                # Any failure indicates system issue (not conflicts - profile was validated empty)
-                error_msg = f"Failed to restore file map {file_map_data.get('fileMapId', 'unknown')}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+        # Convert mappings from export format
+        mappings = []
+        for mapping_data in file_map_data.get('mappings', []):
+            mapping = FieldMapping(
+                sourceField=mapping_data.get('sourceField'),
+                targetField=mapping_data.get('targetField'),
+                transformation=mapping_data.get('transformation')
+            )
+            mappings.append(mapping)
         
-        return {
-            'created': created,
-            'errors': errors
-        }
+        return FileMap(
+            fileMapId=uuid.UUID(file_map_data['fileMapId']),
+            userId=user_id,  # Ensure user ownership
+            name=file_map_data['name'],
+            mappings=mappings,
+            accountId=uuid.UUID(file_map_data['accountId']) if file_map_data.get('accountId') else None,
+            description=file_map_data.get('description'),
+            reverseAmounts=file_map_data.get('reverseAmounts', False),
+            createdAt=file_map_data.get('createdAt'),
+            updatedAt=file_map_data.get('updatedAt')
+        )
     
-    def _restore_transaction_files(self, transaction_files: list, user_id: str, package_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _restore_transaction_files(self, transaction_files: list, user_id: str, package_data: Dict[str, Any],
+                                   engine: Optional[BatchRestoreEngine] = None,
+                                   previous_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Restore transaction files data to empty profile and restore files to S3."""
-        from models.transaction_file import ProcessingStatus, FileFormat, DateRange
         from utils.s3_dao import put_object
         
-        created = 0
-        errors = []
+        engine = engine or BatchRestoreEngine(chunk_size=self.restore_chunk_size)
+        offset = engine.start_offset('transaction_files') or 0
+        build_items = per_record_builder(
+            lambda file_data: self._transaction_file_from_export(file_data, user_id).to_dynamodb_item(),
+            'transaction file', 'fileId'
+        )
+        results = engine.restore('transaction_files', transaction_files, build_items, previous_results)
         
-        with zipfile.ZipFile(io.BytesIO(package_data['raw']), 'r') as zipf:
-            for file_data in transaction_files:
-                try:
-                    # Convert export format to TransactionFile model
-                    date_range = None
-                    if file_data.get('dateRange'):
-                        date_range_data = file_data['dateRange']
-                        date_range = DateRange(
-                            startDate=date_range_data.get('start'),
-                            endDate=date_range_data.get('end')
-                        )
-                    
-                    transaction_file = TransactionFile(
-                        fileId=uuid.UUID(file_data['fileId']),
-                        userId=user_id,  # Ensure user ownership
-                        fileName=file_data['fileName'],
-                        uploadDate=file_data.get('uploadDate'),
-                        fileSize=file_data.get('fileSize', 0),
-                        s3Key=file_data['s3Key'],
-                        processingStatus=ProcessingStatus(file_data.get('processingStatus', 'pending')),
-                        processedDate=file_data.get('processedDate'),
-                        fileFormat=FileFormat(file_data['fileFormat']) if file_data.get('fileFormat') else None,
-                        accountId=uuid.UUID(file_data['accountId']) if file_data.get('accountId') else None,
-                        fileMapId=uuid.UUID(file_data['fileMapId']) if file_data.get('fileMapId') else None,
-                        recordCount=file_data.get('recordCount'),
-                        dateRange=date_range,
-                        errorMessage=file_data.get('errorMessage'),
-                        openingBalance=Decimal(str(file_data['openingBalance'])) if file_data.get('openingBalance') else None,
-                        closingBalance=Decimal(str(file_data['closingBalance'])) if file_data.get('closingBalance') else None,
-                        currency=Currency(file_data['currency']) if file_data.get('currency') else None,
-                        duplicateCount=file_data.get('duplicateCount'),
-                        transactionCount=file_data.get('transactionCount'),
-                        createdAt=file_data.get('createdAt'),
-                        updatedAt=file_data.get('updatedAt')
-                    )
-                    
-                    # Create transaction file directly - profile already validated as empty
-                    create_transaction_file(transaction_file)
-                    created += 1
-                    
-                    # Restore actual file content from FZIP package to S3
-                    try:
-                        file_content = zipf.read(f"files/{file_data['s3Key']}")
-                        put_object(file_data['s3Key'], file_content, 'application/octet-stream', self.fzip_bucket)
-                        logger.info(f"Successfully restored file content for {file_data['s3Key']}")
-                    except KeyError:
-                        logger.warning(f"File content not found in FZIP package for {file_data['s3Key']}")
-
-                    logger.info(f"Transaction file metadata restored: {transaction_file.file_id}")
-                        
-                except Exception as e:
-                    # Any failure indicates system issue (not conflicts - profile was validated empty)
-                    error_msg = f"Failed to restore transaction file {file_data.get('fileId', 'unknown')}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(error_msg)
+        # Restore actual file content from FZIP package to S3 (puts are idempotent on resume)
+        package = package_data.get('package')
+        if package is None:
+            return results
+        for file_data in islice(transaction_files, offset, None):
+            if not file_data.get('s3Key'):
+                continue
+            file_content = package.read_file(file_data)
+            if file_content is None:
+                logger.warning(f"File content not found in FZIP package for {file_data['s3Key']}")
+                continue
+            put_object(file_data['s3Key'], file_content, 'application/octet-stream', self.fzip_bucket)
+            logger.info(f"Successfully restored file content for {file_data['s3Key']}")
         
-        return {
-            'created': created,
-            'errors': errors
-        }
+        return results
     
-    def _restore_transactions(self, transactions: list, user_id: str) -> Dict[str, Any]:
-        """Restore transactions data to empty profile with category assignments."""
-        from models.transaction import TransactionCategoryAssignment, CategoryAssignmentStatus
+    def _transaction_file_from_export(self, file_data: Dict[str, Any], user_id: str) -> TransactionFile:
+        """Convert exported transaction file metadata to a TransactionFile model owned by user_id"""
+        from models.transaction_file import ProcessingStatus, FileFormat, DateRange
         
-        created = 0
-        errors = []
+        date_range = None
+        if file_data.get('dateRange'):
+            date_range_data = file_data['dateRange']
+            date_range = DateRange(
+                startDate=date_range_data.get('start'),
+                endDate=date_range_data.get('end')
+            )
         
-        for transaction_data in transactions:
-            try:
-                # Convert category assignments from export format
-                category_assignments = []
-                for cat_data in transaction_data.get('categories', []):
-                    assignment = TransactionCategoryAssignment(
-                        categoryId=uuid.UUID(cat_data['categoryId']),
-                        status=CategoryAssignmentStatus(cat_data.get('status', 'suggested')),
-                        confidence=cat_data.get('confidence', 0.0),
-                        ruleId=cat_data.get('ruleId'),
-                        assignedAt=cat_data.get('assignedAt')
-                    )
-                    category_assignments.append(assignment)
-                
-                # Convert export format to Transaction model
-                file_id = uuid.UUID(transaction_data['fileId']) if transaction_data.get('fileId') else None
-                transaction_kwargs = {
-                    'transactionId': uuid.UUID(transaction_data['transactionId']),
-                    'accountId': uuid.UUID(transaction_data['accountId']),
-                    'userId': user_id,  # Ensure user ownership
-                    'date': transaction_data['date'],
-                    'description': transaction_data['description'],
-                    'amount': Decimal(str(transaction_data['amount'])),
-                    'currency': Currency(transaction_data.get('currency', 'USD')),
-                    'balance': Decimal(str(transaction_data['balance'])) if transaction_data.get('balance') else None,
-                    'importOrder': transaction_data.get('importOrder', 0),
-                    'transactionType': transaction_data.get('transactionType'),
-                    'memo': transaction_data.get('memo'),
-                    'checkNumber': transaction_data.get('checkNumber'),
-                    'fitId': transaction_data.get('fitId'),
-                    'status': transaction_data.get('status'),
-                    'statusDate': transaction_data.get('statusDate'),
-                    'transactionHash': transaction_data.get('transactionHash'),
-                    'categories': category_assignments,
-                    'primaryCategoryId': uuid.UUID(transaction_data['primaryCategoryId']) if transaction_data.get('primaryCategoryId') else None,
-                    'createdAt': transaction_data.get('createdAt'),
-                    'updatedAt': transaction_data.get('updatedAt')
-                }
-                
-                # Only add fileId if it's not None
-                if file_id is not None:
-                    transaction_kwargs['fileId'] = file_id
-                    
-                transaction = Transaction(**transaction_kwargs)
-                
-                # Create transaction directly - profile already validated as empty
-                create_transaction(transaction)
-                created += 1
-                logger.debug(f"Successfully restored transaction: {transaction.transaction_id}")
-                    
-            except Exception as e:
-                # Any failure indicates system issue (not conflicts - profile was validated empty)
-                error_msg = f"Failed to restore transaction {transaction_data.get('transactionId', 'unknown')}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+        return TransactionFile(
+            fileId=uuid.UUID(file_data['fileId']),
+            userId=user_id,  # Ensure user ownership
+            fileName=file_data['fileName'],
+            uploadDate=file_data.get('uploadDate'),
+            fileSize=file_data.get('fileSize', 0),
+            s3Key=file_data['s3Key'],
+            processingStatus=ProcessingStatus(file_data.get('processingStatus', 'pending')),
+            processedDate=file_data.get('processedDate'),
+            fileFormat=FileFormat(file_data['fileFormat']) if file_data.get('fileFormat') else None,
+            accountId=uuid.UUID(file_data['accountId']) if file_data.get('accountId') else None,
+            fileMapId=uuid.UUID(file_data['fileMapId']) if file_data.get('fileMapId') else None,
+            recordCount=file_data.get('recordCount'),
+            dateRange=date_range,
+            errorMessage=file_data.get('errorMessage'),
+            openingBalance=Decimal(str(file_data['openingBalance'])) if file_data.get('openingBalance') else None,
+            closingBalance=Decimal(str(file_data['closingBalance'])) if file_data.get('closingBalance') else None,
+            currency=Currency(file_data['currency']) if file_data.get('currency') else None,
+            duplicateCount=file_data.get('duplicateCount'),
+            transactionCount=file_data.get('transactionCount'),
+            createdAt=file_data.get('createdAt'),
+            updatedAt=file_data.get('updatedAt')
+        )
+    
+    def _restore_transactions(self, transactions: list, user_id: str, engine: Optional[BatchRestoreEngine] = None,
+                              previous_results: Optional[Dict[str, Any]] = None,
+                              trust_exported_hashes: bool = False) -> Dict[str, Any]:
+        """
+        Restore transactions data to empty profile with category assignments.
         
-        return {
-            'created': created,
-            'errors': errors
-        }
+        Records are converted to DynamoDB items in validated batches without
+        building a Transaction model each; exported hashes are reused when the
+        package's transaction data matched its manifest checksum.
+        """
+        engine = engine or BatchRestoreEngine(chunk_size=self.restore_chunk_size)
+        build_items = transaction_items_builder(user_id, trust_exported_hashes)
+        return engine.restore('transactions', transactions, build_items, previous_results)
     
     # =============================================================================
     # Job Management
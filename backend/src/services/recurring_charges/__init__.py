@@ -7,6 +7,8 @@ and prediction services.
 Public API:
     - RecurringChargeDetectionService: ML-based pattern detection using DBSCAN
     - RecurringChargeFeatureService: Feature extraction (67-dim base, 91-dim account-aware)
+    - ClusteringBackend: Pluggable clustering (blocked sparse DBSCAN/HDBSCAN or global DBSCAN)
+    - FeatureStore: Per-user cache of fitted vocabulary and feature vectors (S3 or local)
     - RecurringChargePredictionService: Predicts next occurrence of recurring charges
     - DetectionConfig: Configuration for detection parameters
     - DEFAULT_CONFIG: Default configuration instance
@@ -22,6 +24,19 @@ from services.recurring_charges.feature_service import (
     DESCRIPTION_FEATURE_SIZE,
     ACCOUNT_FEATURE_SIZE
 )
+from services.recurring_charges.clustering import (
+    ClusteringBackend,
+    DBSCANBackend,
+    BlockedClusteringBackend,
+    create_clustering_backend,
+)
+from services.recurring_charges.feature_store import (
+    FeatureStore,
+    S3FeatureStore,
+    LocalFeatureStore,
+    UserFeatureCache,
+    FEATURE_SCHEMA_VERSION,
+)
 from services.recurring_charges.prediction_service import RecurringChargePredictionService
 from services.recurring_charges.config import (
     DetectionConfig,
@@ -42,6 +57,15 @@ __all__ = [
     'RecurringChargeDetectionService',
     'RecurringChargeFeatureService',
     'RecurringChargePredictionService',
+    'ClusteringBackend',
+    'DBSCANBackend',
+    'BlockedClusteringBackend',
+    'create_clustering_backend',
+    'FeatureStore',
+    'S3FeatureStore',
+    'LocalFeatureStore',
+    'UserFeatureCache',
+    'FEATURE_SCHEMA_VERSION',
     'DetectionConfig',
     'DEFAULT_CONFIG',
     'ClusteringConfig',
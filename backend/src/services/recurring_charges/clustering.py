@@ -0,0 +1,264 @@
+"""
+Clustering backends for recurring charge detection.
+
+The detection service hands the feature matrix to a ClusteringBackend and
+gets back one label per transaction (-1 for noise). Two backends exist:
+
+- DBSCANBackend: a single DBSCAN over the whole (dense) matrix. Quadratic in
+  the number of transactions, kept for comparison and small inputs.
+- BlockedClusteringBackend: splits transactions into blocks that cannot
+  share an eps-neighborhood and clusters each block on its own, with the
+  description features kept sparse.
+
+## Blocking
+
+Two transactions can only be DBSCAN neighbors if their euclidean distance is
+at most eps, so any split where every cross-block pair is further than eps
+apart gives exactly the clusters of a global DBSCAN run:
+
+- Merchant tokens: TF-IDF rows are L2-normalized, so two descriptions without
+  a common term are sqrt(2) apart in the description dimensions alone, and
+  an empty description is 1 away from any other. With eps < 1, transactions
+  are grouped by the connected components of "shares a description term".
+- Amount buckets: within a group, transactions sorted by the amount feature
+  are split wherever two neighbors differ by more than eps.
+- Temporal gaps: transactions without any description term form a single
+  group across all merchants, so that group is also split on each temporal
+  column in the same way.
+
+Blocks are usually a single merchant, so the total cost grows with the sum
+of squared block sizes instead of the square of the history size.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Union
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+
+from services.recurring_charges.config import ClusteringConfig
+from services.recurring_charges.feature_service import (
+    TEMPORAL_FEATURE_SIZE,
+    AMOUNT_FEATURE_SIZE,
+    DESCRIPTION_FEATURE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+FeatureMatrix = Union[np.ndarray, sparse.spmatrix]
+
+# Column layout of the feature matrix (see feature_service)
+AMOUNT_COLUMN = TEMPORAL_FEATURE_SIZE
+DESCRIPTION_COLUMNS = slice(
+    TEMPORAL_FEATURE_SIZE + AMOUNT_FEATURE_SIZE,
+    TEMPORAL_FEATURE_SIZE + AMOUNT_FEATURE_SIZE + DESCRIPTION_FEATURE_SIZE
+)
+
+# Largest eps for which transactions without a shared description term are
+# guaranteed to be further apart than eps (an empty description is 1 away)
+MAX_TOKEN_BLOCKING_EPS = 1.0
+
+
+class ClusteringBackend(ABC):
+    """Assigns cluster labels to a transaction feature matrix."""
+
+    name = "clustering"
+
+    accepts_sparse = False
+    """Whether fit_predict takes a scipy sparse matrix (otherwise dense features are built)."""
+
+    @abstractmethod
+    def fit_predict(self, feature_matrix: FeatureMatrix, eps: float, min_samples: int) -> np.ndarray:
+        """
+        Cluster the feature matrix.
+
+        Args:
+            feature_matrix: Matrix of shape (n_samples, n_features), dense or sparse
+            eps: Neighborhood radius
+            min_samples: Minimum neighborhood size of a core point
+
+        Returns:
+            Array of cluster labels (-1 for noise)
+        """
+        pass
+
+
+class DBSCANBackend(ClusteringBackend):
+    """Single DBSCAN run over all transactions."""
+
+    name = "DBSCAN"
+
+    def fit_predict(self, feature_matrix: FeatureMatrix, eps: float, min_samples: int) -> np.ndarray:
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='euclidean')
+        return dbscan.fit_predict(feature_matrix)
+
+
+class BlockedClusteringBackend(ClusteringBackend):
+    """
+    Clusters each block of possibly-neighboring transactions separately.
+
+    With algorithm='dbscan' the labels match DBSCANBackend up to renumbering.
+    algorithm='hdbscan' runs HDBSCAN inside each block instead, which needs
+    no eps but only sees neighbors within the block.
+    """
+
+    name = "blocked"
+    accepts_sparse = True
+
+    def __init__(self, algorithm: str = 'dbscan', use_ball_tree: bool = False):
+        """
+        Initialize the backend.
+
+        Args:
+            algorithm: Per-block clusterer, 'dbscan' or 'hdbscan'
+            use_ball_tree: Densify each block and use a ball tree for DBSCAN
+                neighbor queries instead of brute force over sparse rows
+        """
+        if algorithm not in ('dbscan', 'hdbscan'):
+            raise ValueError(f"Unknown block clustering algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.use_ball_tree = use_ball_tree
+        self.name = f"blocked {algorithm.upper()}"
+
+    def fit_predict(self, feature_matrix: FeatureMatrix, eps: float, min_samples: int) -> np.ndarray:
+        features = sparse.csr_matrix(feature_matrix)
+        n_samples = features.shape[0]
+        labels = np.full(n_samples, -1, dtype=int)
+        if n_samples == 0:
+            return labels
+
+        blocks = self.block_ids(features, eps)
+        order = np.argsort(blocks, kind='stable')
+        boundaries = np.flatnonzero(np.diff(blocks[order])) + 1
+
+        next_label = 0
+        largest_block = 0
+        for indices in np.split(order, boundaries):
+            largest_block = max(largest_block, len(indices))
+            if len(indices) < max(min_samples, 2):
+                continue  # Too small to hold a core point
+            block_labels = self._cluster_block(features[indices], eps, min_samples)
+            clustered = block_labels >= 0
+            if clustered.any():
+                labels[indices[clustered]] = block_labels[clustered] + next_label
+                next_label += int(block_labels.max()) + 1
+
+        logger.info(
+            f"Clustered {n_samples} transactions in {len(boundaries) + 1} blocks "
+            f"(largest {largest_block})"
+        )
+        return labels
+
+    def block_ids(self, features: sparse.csr_matrix, eps: float) -> np.ndarray:
+        """
+        Assign each row a block ID such that rows in different blocks are more
+        than eps apart.
+
+        Args:
+            features: CSR feature matrix
+            eps: Neighborhood radius
+
+        Returns:
+            Array of block IDs, one per row
+        """
+        n_samples, n_features = features.shape
+        groups = np.zeros(n_samples, dtype=int)
+        termless = np.zeros(n_samples, dtype=bool)
+
+        if eps < MAX_TOKEN_BLOCKING_EPS and n_features >= DESCRIPTION_COLUMNS.stop:
+            description_features = features[:, DESCRIPTION_COLUMNS]
+            groups = _shared_term_components(description_features)
+            termless = description_features.getnnz(axis=1) == 0
+
+        if n_features <= AMOUNT_COLUMN:
+            return groups
+
+        blocks = _split_at_gaps(groups, features[:, AMOUNT_COLUMN].toarray().ravel(), eps)
+
+        # Rows without a description term all share one group whatever their
+        # merchant, so they are also split on every temporal column
+        if termless.any():
+            for column in range(TEMPORAL_FEATURE_SIZE):
+                values = np.where(termless, features[:, column].toarray().ravel(), 0.0)
+                blocks = _split_at_gaps(blocks, values, eps)
+        return blocks
+
+    def _cluster_block(self, block: sparse.csr_matrix, eps: float, min_samples: int) -> np.ndarray:
+        if self.algorithm == 'hdbscan':
+            from sklearn.cluster import HDBSCAN
+            # A block is often a single merchant, so one cluster per block is allowed
+            hdbscan = HDBSCAN(
+                min_cluster_size=max(min_samples, 2),
+                min_samples=min_samples,
+                allow_single_cluster=True,
+                copy=False  # The densified block is a fresh array HDBSCAN may modify
+            )
+            return hdbscan.fit_predict(block.toarray())
+
+        if self.use_ball_tree:
+            dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='euclidean', algorithm='ball_tree')
+            return dbscan.fit_predict(block.toarray())
+
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='euclidean')
+        return dbscan.fit_predict(block)
+
+
+def _shared_term_components(description_features: sparse.csr_matrix) -> np.ndarray:
+    """
+    Group rows that are connected through shared description terms.
+
+    Rows and terms form a bipartite graph; rows in the same connected
+    component share a term directly or through other rows. Rows without any
+    term form one extra group.
+    """
+    n_samples = description_features.shape[0]
+    incidence = (description_features != 0).astype(np.int8)
+    graph = sparse.bmat([[None, incidence], [incidence.T, None]], format='csr')
+    _, components = connected_components(graph, directed=False)
+
+    groups = components[:n_samples].copy()
+    empty_rows = incidence.getnnz(axis=1) == 0
+    if empty_rows.any():
+        groups[empty_rows] = components.max() + 1
+    return groups
+
+
+def _split_at_gaps(groups: np.ndarray, values: np.ndarray, eps: float) -> np.ndarray:
+    """
+    Split groups wherever two rows adjacent in value order differ by more than eps.
+
+    Rows further apart than eps in one column are further apart than eps
+    overall, so the split never separates DBSCAN neighbors.
+
+    Returns:
+        Array of block IDs, one per row
+    """
+    order = np.lexsort((values, groups))
+    starts = np.ones(len(groups), dtype=bool)
+    starts[1:] = (np.diff(groups[order]) != 0) | (np.diff(values[order]) > eps)
+    blocks = np.empty(len(groups), dtype=int)
+    blocks[order] = np.cumsum(starts) - 1
+    return blocks
+
+
+def create_clustering_backend(config: ClusteringConfig) -> ClusteringBackend:
+    """
+    Create the clustering backend selected by the configuration.
+
+    Args:
+        config: Clustering configuration
+
+    Returns:
+        ClusteringBackend instance
+    """
+    if config.backend == 'dbscan':
+        return DBSCANBackend()
+    if config.backend == 'blocked':
+        return BlockedClusteringBackend(
+            algorithm=config.block_algorithm,
+            use_ball_tree=config.use_ball_tree
+        )
+    raise ValueError(f"Unknown clustering backend: {config.backend}")
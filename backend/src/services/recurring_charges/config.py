@@ -23,6 +23,18 @@ class ClusteringConfig:
     
     min_cluster_size: int = 3
     """Minimum number of transactions to form a valid cluster/pattern."""
+    
+    backend: str = 'blocked'
+    """
+    Clustering backend: 'blocked' clusters merchant/amount blocks separately
+    on sparse features, 'dbscan' runs one DBSCAN over the dense matrix.
+    """
+    
+    block_algorithm: str = 'dbscan'
+    """Clusterer run inside each block by the blocked backend ('dbscan' or 'hdbscan')."""
+    
+    use_ball_tree: bool = False
+    """Densify each block and use a ball tree for DBSCAN neighbor queries."""
 
 
 @dataclass
@@ -2,7 +2,9 @@
 Recurring Charge Detection Service.
 
 This module orchestrates ML-based recurring charge detection using DBSCAN clustering
-and specialized pattern analyzers.
+and specialized pattern analyzers. Clustering runs through a pluggable backend
+(see clustering.py); the default clusters merchant/amount blocks separately on
+sparse features, which scales close to linearly with transaction history.
 
 ## Detection Pipeline
 
@@ -12,7 +14,7 @@ graph TD
     B --> C{Account-Aware?}
     C -->|Yes| D[91-dim features]
     C -->|No| E[67-dim features]
-    D --> F[DBSCAN Clustering]
+    D --> F[Blocked DBSCAN Clustering]
     E --> F
     F --> G[Pattern Analysis]
     G --> H[FrequencyAnalyzer]
@@ -40,7 +42,6 @@ from typing import List, Dict, Optional
 from decimal import Decimal
 
 import numpy as np
-from sklearn.cluster import DBSCAN
 
 from models.transaction import Transaction
 from models.account import Account
@@ -48,6 +49,12 @@ from models.recurring_charge import (
     RecurringChargePatternCreate,
 )
 from services.recurring_charges.feature_service import RecurringChargeFeatureService
+from services.recurring_charges.feature_store import FeatureStore
+from services.recurring_charges.clustering import (
+    ClusteringBackend,
+    FeatureMatrix,
+    create_clustering_backend,
+)
 from services.recurring_charges.analyzers import (
     FrequencyAnalyzer,
     TemporalPatternAnalyzer,
@@ -71,7 +78,7 @@ class RecurringChargeDetectionService:
     """
     Orchestrates recurring charge detection using specialized analyzers.
     
-    Uses DBSCAN clustering to group similar transactions, then applies
+    Uses DBSCAN-style clustering to group similar transactions, then applies
     specialized analyzers to extract patterns, calculate confidence, and
     optionally adjust scores based on account context.
     """
@@ -80,7 +87,9 @@ class RecurringChargeDetectionService:
         self, 
         country_code: str = 'US', 
         use_account_features: bool = True,
-        config: Optional[DetectionConfig] = None
+        config: Optional[DetectionConfig] = None,
+        clustering_backend: Optional[ClusteringBackend] = None,
+        feature_store: Optional[FeatureStore] = None
     ):
         """
         Initialize the detection service.
@@ -89,13 +98,18 @@ class RecurringChargeDetectionService:
             country_code: Country code for holiday detection (default: US)
             use_account_features: Whether to use account-aware features (default: True)
             config: Optional detection configuration. If None, uses DEFAULT_CONFIG.
+            clustering_backend: Optional clustering backend. If None, one is
+                created from config.clustering.
+            feature_store: Optional per-user feature cache. If provided, features
+                of transactions seen in earlier runs are reused.
         """
         self.country_code = country_code
         self.use_account_features = use_account_features
         self.config = config or DEFAULT_CONFIG
         
-        # Initialize feature service
-        self.feature_service = RecurringChargeFeatureService(country_code)
+        # Initialize feature service and clustering backend
+        self.feature_service = RecurringChargeFeatureService(country_code, feature_store=feature_store)
+        self.clustering_backend = clustering_backend or create_clustering_backend(self.config.clustering)
         
         # Initialize specialized analyzers
         import holidays
@@ -125,7 +139,8 @@ class RecurringChargeDetectionService:
         min_occurrences: int = MIN_CLUSTER_SIZE,
         min_confidence: float = MIN_CONFIDENCE,
         eps: float = DEFAULT_EPS,
-        accounts_map: Optional[Dict[uuid.UUID, Account]] = None
+        accounts_map: Optional[Dict[uuid.UUID, Account]] = None,
+        complete_history: bool = False
     ) -> List[RecurringChargePatternCreate]:
         """
         Detect recurring charge patterns in transaction history.
@@ -137,6 +152,8 @@ class RecurringChargeDetectionService:
             min_confidence: Minimum confidence score to include pattern
             eps: DBSCAN epsilon parameter (neighborhood radius)
             accounts_map: Optional dictionary mapping account_id to Account objects
+            complete_history: The transactions are the user's whole history, so
+                cached features of other (e.g. deleted) transactions are dropped
             
         Returns:
             List of RecurringChargePatternCreate objects
@@ -159,14 +176,19 @@ class RecurringChargeDetectionService:
             
             # Stage 1: Feature extraction
             with tracker.stage("feature_extraction"):
+                sparse = self.clustering_backend.accepts_sparse
                 if self.use_account_features and accounts_map:
                     feature_matrix, _ = self.feature_service.extract_features_batch(
-                        transactions, accounts_map
+                        transactions, accounts_map, sparse=sparse, user_id=user_id,
+                        complete_history=complete_history
                     )
                 else:
-                    feature_matrix, _ = self.feature_service.extract_features_batch(transactions)
+                    feature_matrix, _ = self.feature_service.extract_features_batch(
+                        transactions, sparse=sparse, user_id=user_id,
+                        complete_history=complete_history
+                    )
             
-            # Stage 2: DBSCAN clustering
+            # Stage 2: Clustering
             with tracker.stage("clustering"):
                 clusters = self._perform_clustering(feature_matrix, eps, len(transactions))
                 tracker.set_clusters_identified(len(set(clusters)) - (1 if -1 in clusters else 0))
@@ -185,15 +207,15 @@ class RecurringChargeDetectionService:
     
     def _perform_clustering(
         self,
-        feature_matrix: np.ndarray,
+        feature_matrix: FeatureMatrix,
         eps: float,
         n_samples: int
     ) -> np.ndarray:
         """
-        Perform DBSCAN clustering on feature matrix.
+        Perform DBSCAN clustering on feature matrix with the configured backend.
         
         Args:
-            feature_matrix: Feature matrix of shape (n_samples, n_features)
+            feature_matrix: Feature matrix of shape (n_samples, n_features), dense or sparse
             eps: DBSCAN epsilon parameter
             n_samples: Number of samples
             
@@ -205,15 +227,16 @@ class RecurringChargeDetectionService:
             int(n_samples * self.config.clustering.min_samples_ratio)
         )
         
-        logger.info(f"Running DBSCAN with eps={eps}, min_samples={min_samples}")
+        logger.info(
+            f"Running {self.clustering_backend.name} clustering with eps={eps}, min_samples={min_samples}"
+        )
         
-        dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='euclidean')
-        cluster_labels = dbscan.fit_predict(feature_matrix)
+        cluster_labels = self.clustering_backend.fit_predict(feature_matrix, eps, min_samples)
         
         n_clusters = len(set(cluster_labels)) - (1 if -1 in cluster_labels else 0)
         n_noise = int(np.sum(cluster_labels == -1))
         
-        logger.info(f"DBSCAN complete: {n_clusters} clusters, {n_noise} noise points")
+        logger.info(f"Clustering complete: {n_clusters} clusters, {n_noise} noise points")
         
         return cluster_labels
     
@@ -16,13 +16,17 @@ Account-aware mode (91 dimensions):
   - 8 account name features (keyword boolean flags)
   - 5 institution features (top 4 + other)
   - 5 account activity features (continuous metrics)
+
+With a FeatureStore, temporal and description features are cached per user
+and only computed for transactions not seen in an earlier run.
 """
 
 import logging
 import uuid
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 
 import numpy as np
+from scipy import sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 from models.transaction import Transaction
@@ -33,6 +37,12 @@ from services.recurring_charges.features import (
     DescriptionFeatureExtractor,
     AccountFeatureExtractor
 )
+from services.recurring_charges.feature_store import (
+    FeatureStore,
+    UserFeatureCache,
+    CACHED_FEATURE_SIZE,
+    MAX_UNKNOWN_DESCRIPTION_SHARE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -62,14 +72,16 @@ class RecurringChargeFeatureService:
     - Account-aware mode (91-dim): When accounts_map is provided
     """
     
-    def __init__(self, country_code: str = 'US'):
+    def __init__(self, country_code: str = 'US', feature_store: Optional[FeatureStore] = None):
         """
         Initialize the feature service with specialized extractors.
         
         Args:
             country_code: Country code for holiday detection (default: US)
+            feature_store: Optional per-user cache of temporal and description features
         """
         self.country_code = country_code
+        self.feature_store = feature_store
         
         # Initialize specialized feature extractors
         self.temporal_extractor = TemporalFeatureExtractor(country_code)
@@ -82,8 +94,11 @@ class RecurringChargeFeatureService:
     def extract_features_batch(
         self,
         transactions: List[Transaction],
-        accounts_map: Optional[Dict[uuid.UUID, Account]] = None
-    ) -> Tuple[np.ndarray, Optional[TfidfVectorizer]]:
+        accounts_map: Optional[Dict[uuid.UUID, Account]] = None,
+        sparse: bool = False,
+        user_id: Optional[str] = None,
+        complete_history: bool = False
+    ) -> Tuple[Union[np.ndarray, sp.csr_matrix], Optional[TfidfVectorizer]]:
         """
         Extract features from a batch of transactions.
         
@@ -95,15 +110,23 @@ class RecurringChargeFeatureService:
             accounts_map: Optional dictionary mapping account_id to Account objects.
                          If None, extracts base features only (67-dim).
                          If provided, extracts account-aware features (91-dim).
+            sparse: Return a CSR matrix that keeps the TF-IDF description
+                    features sparse instead of a dense numpy array
+            user_id: Owner of the transactions. With a feature store, cached
+                     features of this user are reused and new ones saved.
+            complete_history: The transactions are the user's whole history;
+                     cached features of other transactions are dropped
             
         Returns:
             Tuple of (feature_matrix, fitted_vectorizer)
-            - feature_matrix: numpy array of shape (n_transactions, 67 or 91)
+            - feature_matrix: numpy array (CSR matrix if sparse) of shape (n_transactions, 67 or 91)
             - fitted_vectorizer: Fitted TF-IDF vectorizer (None if failed)
         """
         if not transactions:
             # Check if accounts_map is not None AND not empty
             feature_size = ENHANCED_FEATURE_VECTOR_SIZE if (accounts_map is not None) else FEATURE_VECTOR_SIZE
+            if sparse:
+                return sp.csr_matrix((0, feature_size)), None
             return np.array([]).reshape(0, feature_size), None
         
         # Log extraction mode
@@ -111,14 +134,24 @@ class RecurringChargeFeatureService:
         logger.info(f"Extracting {mode} features from {len(transactions)} transactions")
         
         # Extract base features using specialized extractors
-        temporal_features = self.temporal_extractor.extract_batch(transactions)
+        if self.feature_store is not None and user_id:
+            temporal_features, description_features, vectorizer = self._extract_cached_features(
+                user_id, transactions, complete_history
+            )
+            if not sparse:
+                description_features = description_features.toarray()
+        else:
+            temporal_features = self.temporal_extractor.extract_batch(transactions)
+            
+            # Description extractor returns both features and vectorizer
+            if sparse:
+                description_features, vectorizer = self.description_extractor.extract_sparse(transactions)
+            else:
+                description_features, vectorizer = self.description_extractor.extract_batch(transactions)
         amount_features = self.amount_extractor.extract_batch(transactions)
         
-        # Description extractor returns both features and vectorizer
-        description_features, vectorizer = self.description_extractor.extract_batch(transactions)
-        
         # Compose base features: 17 + 1 + 49 = 67 dimensions
-        base_features = np.hstack([
+        base_features = _hstack(sparse, [
             temporal_features,      # 17
             amount_features,        # 1
             description_features    # 49
@@ -144,7 +177,7 @@ class RecurringChargeFeatureService:
         )
         
         # Compose enhanced features: 67 + 24 = 91 dimensions
-        enhanced_features = np.hstack([
+        enhanced_features = _hstack(sparse, [
             base_features,      # 67
             account_features    # 24
         ])
@@ -159,3 +192,92 @@ class RecurringChargeFeatureService:
         
         logger.info(f"Account-aware feature extraction complete: shape={enhanced_features.shape}")
         return enhanced_features, vectorizer
+
+    
+    def _extract_cached_features(
+        self,
+        user_id: str,
+        transactions: List[Transaction],
+        complete_history: bool = False
+    ) -> Tuple[np.ndarray, sp.csr_matrix, Optional[TfidfVectorizer]]:
+        """
+        Get temporal and description features through the user's feature cache.
+        
+        Cached rows are reused; missing rows are computed with the stored
+        vocabulary. Missing rows whose description has a vocabulary term are
+        added to the cache; rows without one are not, so they are transformed
+        again on later runs instead of being kept as zero description vectors.
+        Without a cache, or when too many missing descriptions fall outside the
+        stored vocabulary, the vocabulary is fitted on this batch and the cache
+        rebuilt from it.
+        
+        Args:
+            user_id: Owner of the transactions
+            transactions: List of Transaction objects
+            complete_history: The transactions are the user's whole history, so
+                cached rows of any other transaction are dropped
+        
+        Returns:
+            Tuple of (temporal features, sparse description features, vectorizer)
+        """
+        transaction_ids = [str(tx.transaction_id) for tx in transactions]
+        cache = self.feature_store.load(user_id)
+        
+        if cache is not None:
+            vectorizer = (
+                self.description_extractor.vectorizer_from_vocabulary(cache.vocabulary, cache.idf)
+                if cache.vocabulary else None
+            )
+            rows = cache.lookup(transaction_ids)
+            missing = np.flatnonzero(rows < 0)
+            missing_features = np.zeros((0, CACHED_FEATURE_SIZE))
+            changed = complete_history and cache.retain(transaction_ids) > 0
+            if missing.size:
+                new_transactions = [transactions[i] for i in missing]
+                new_description = self.description_extractor.transform_sparse(new_transactions, vectorizer)
+                has_terms = new_description.getnnz(axis=1) > 0
+                unknown_share = 1 - np.mean(has_terms)
+                if unknown_share > MAX_UNKNOWN_DESCRIPTION_SHARE:
+                    logger.info(
+                        f"{unknown_share:.0%} of {missing.size} uncached descriptions are outside the "
+                        f"cached vocabulary of user {user_id}, refitting"
+                    )
+                    cache = None
+                else:
+                    missing_features = np.hstack([
+                        self.temporal_extractor.extract_batch(new_transactions),
+                        new_description.toarray()
+                    ])
+                    cache.add([transaction_ids[i] for i in missing[has_terms]], missing_features[has_terms])
+                    changed = changed or bool(has_terms.any())
+            
+            if cache is not None:
+                if changed:
+                    self.feature_store.save(user_id, cache)
+                logger.info(
+                    f"Reused cached features for {len(transactions) - missing.size} of "
+                    f"{len(transactions)} transactions"
+                )
+                features = np.empty((len(transactions), CACHED_FEATURE_SIZE))
+                features[missing] = missing_features
+                cached = np.flatnonzero(rows >= 0)
+                features[cached] = cache.features[cache.lookup([transaction_ids[i] for i in cached])]
+                temporal_size = self.temporal_extractor.feature_size
+                return features[:, :temporal_size], sp.csr_matrix(features[:, temporal_size:]), vectorizer
+        
+        temporal_features = self.temporal_extractor.extract_batch(transactions)
+        description_features, vectorizer = self.description_extractor.extract_sparse(transactions)
+        cache = UserFeatureCache(
+            vocabulary=vectorizer.get_feature_names_out().tolist() if vectorizer is not None else [],
+            idf=vectorizer.idf_ if vectorizer is not None else np.zeros(0)
+        )
+        cache.add(transaction_ids, np.hstack([temporal_features, description_features.toarray()]))
+        self.feature_store.save(user_id, cache)
+        return temporal_features, description_features, vectorizer
+
+
+def _hstack(sparse: bool, blocks: List[Union[np.ndarray, sp.csr_matrix]]) -> Union[np.ndarray, sp.csr_matrix]:
+    """Stack feature blocks column-wise, as CSR when sparse output was requested."""
+    if sparse:
+        return sp.hstack([sp.csr_matrix(block) for block in blocks], format='csr')
+    return np.hstack(blocks)
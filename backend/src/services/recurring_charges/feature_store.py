@@ -0,0 +1,256 @@
+"""
+Per-user feature store for recurring charge detection.
+
+Keeps the fitted TF-IDF vocabulary of a user together with the feature rows
+that only depend on the transaction itself, so later detection runs reuse
+them and only compute features for transactions they have not seen:
+
+- Temporal features (17): derived from the transaction date alone.
+- Description features (49): fixed once the vocabulary and IDF weights are.
+
+Amount and account features are normalized against the batch they are
+extracted with and are always recomputed.
+
+Caches are stored as compressed .npz archives, keyed by user and feature
+schema version. S3FeatureStore keeps them in the file storage bucket;
+LocalFeatureStore writes to a directory (tests and local runs).
+
+Rows added to an existing cache are only kept if their description has a
+term in the stored vocabulary. Rows without one (often new merchants) are
+transformed again on every run and count towards a refit: when too many
+uncached transactions have no term in the stored vocabulary, the vocabulary
+is refitted and the cache rebuilt. Rows of transactions that are no longer
+part of the user's history are dropped when the cache is saved.
+"""
+
+import io
+import logging
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from botocore.exceptions import ClientError
+
+from services.recurring_charges.features import TemporalFeatureExtractor, DescriptionFeatureExtractor
+from utils.s3_dao import get_s3_client, put_object, FILE_STORAGE_BUCKET
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached feature layout or its computation changes
+FEATURE_SCHEMA_VERSION = 2
+
+# Cached columns: temporal features followed by description features
+CACHED_FEATURE_SIZE = TemporalFeatureExtractor.FEATURE_SIZE + DescriptionFeatureExtractor.FEATURE_SIZE
+
+# Refit the vocabulary when more than this share of newly extracted rows has
+# no term in it
+MAX_UNKNOWN_DESCRIPTION_SHARE = 0.2
+
+
+@dataclass
+class UserFeatureCache:
+    """Fitted vocabulary and cached feature rows of one user."""
+
+    vocabulary: List[str]
+    """TF-IDF terms in column order (empty if no vocabulary could be fitted)."""
+
+    idf: np.ndarray
+    """IDF weight of each vocabulary term."""
+
+    transaction_ids: List[str] = field(default_factory=list)
+    features: np.ndarray = field(default_factory=lambda: np.zeros((0, CACHED_FEATURE_SIZE)))
+    """Rows of shape (len(transaction_ids), CACHED_FEATURE_SIZE)."""
+
+    schema_version: int = FEATURE_SCHEMA_VERSION
+
+    _index: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        self._index = {tx_id: row for row, tx_id in enumerate(self.transaction_ids)}
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
+
+    def lookup(self, transaction_ids: List[str]) -> np.ndarray:
+        """
+        Find the cached row of each transaction.
+
+        Args:
+            transaction_ids: Transaction IDs as strings
+
+        Returns:
+            Array of row positions in `features` (-1 where not cached)
+        """
+        return np.fromiter(
+            (self._index.get(tx_id, -1) for tx_id in transaction_ids),
+            dtype=np.int64,
+            count=len(transaction_ids)
+        )
+
+    def add(self, transaction_ids: List[str], features: np.ndarray) -> None:
+        """
+        Add feature rows, replacing rows already cached for the same transactions.
+
+        Args:
+            transaction_ids: Transaction IDs as strings
+            features: Rows of shape (len(transaction_ids), CACHED_FEATURE_SIZE)
+        """
+        rows = self.lookup(transaction_ids)
+        known = rows >= 0
+        self.features[rows[known]] = features[known]
+
+        new_ids = [tx_id for tx_id, is_known in zip(transaction_ids, known) if not is_known]
+        if not new_ids:
+            return
+        for tx_id in new_ids:
+            self._index[tx_id] = len(self.transaction_ids)
+            self.transaction_ids.append(tx_id)
+        self.features = np.vstack([self.features, features[~known]])
+
+    def retain(self, transaction_ids: List[str]) -> int:
+        """
+        Drop the rows of transactions not in transaction_ids.
+
+        Args:
+            transaction_ids: Transaction IDs as strings
+
+        Returns:
+            Number of rows dropped
+        """
+        keep = sorted(row for row in self.lookup(transaction_ids) if row >= 0)
+        dropped = len(self.transaction_ids) - len(keep)
+        if dropped:
+            self.transaction_ids = [self.transaction_ids[row] for row in keep]
+            self.features = self.features[keep].reshape(-1, CACHED_FEATURE_SIZE)
+            self._index = {tx_id: row for row, tx_id in enumerate(self.transaction_ids)}
+        return dropped
+
+    def to_bytes(self) -> bytes:
+        """Serialize the cache as a compressed .npz archive."""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            schema_version=np.array(self.schema_version),
+            vocabulary=np.array(self.vocabulary, dtype=str),
+            idf=np.asarray(self.idf, dtype=np.float64),
+            transaction_ids=np.array(self.transaction_ids, dtype=str),
+            features=self.features
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'UserFeatureCache':
+        """Deserialize a cache written by to_bytes."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            return cls(
+                vocabulary=archive['vocabulary'].tolist(),
+                idf=archive['idf'],
+                transaction_ids=archive['transaction_ids'].tolist(),
+                features=archive['features'].reshape(-1, CACHED_FEATURE_SIZE),
+                schema_version=int(archive['schema_version'])
+            )
+
+
+class FeatureStore(ABC):
+    """Loads and saves per-user feature caches."""
+
+    def load(self, user_id: str) -> Optional[UserFeatureCache]:
+        """
+        Load the user's feature cache.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The cache, or None if there is none for the current schema version
+        """
+        data = self._read(user_id)
+        if data is None:
+            return None
+        try:
+            cache = UserFeatureCache.from_bytes(data)
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"Ignoring unreadable feature cache for user {user_id}: {e}")
+            return None
+        if cache.schema_version != FEATURE_SCHEMA_VERSION:
+            return None
+        return cache
+
+    def save(self, user_id: str, cache: UserFeatureCache) -> None:
+        """
+        Save the user's feature cache.
+
+        Args:
+            user_id: User ID
+            cache: Cache to store
+        """
+        self._write(user_id, cache.to_bytes())
+
+    @abstractmethod
+    def _read(self, user_id: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def _write(self, user_id: str, data: bytes) -> None:
+        pass
+
+
+class S3FeatureStore(FeatureStore):
+    """Feature caches stored as S3 objects."""
+
+    def __init__(self, bucket: Optional[str] = None, prefix: str = 'recurring-charge-features'):
+        """
+        Initialize the store.
+
+        Args:
+            bucket: Bucket name (defaults to FILE_STORAGE_BUCKET)
+            prefix: Key prefix for cache objects
+        """
+        self.bucket = bucket or FILE_STORAGE_BUCKET
+        self.prefix = prefix
+
+    def key(self, user_id: str) -> str:
+        return f"{self.prefix}/{user_id}/features-v{FEATURE_SCHEMA_VERSION}.npz"
+
+    def _read(self, user_id: str) -> Optional[bytes]:
+        try:
+            response = get_s3_client().get_object(Bucket=self.bucket, Key=self.key(user_id))
+            return response['Body'].read()
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'NoSuchKey':
+                logger.warning(f"Error reading feature cache for user {user_id}: {str(e)}")
+            return None
+
+    def _write(self, user_id: str, data: bytes) -> None:
+        if not put_object(self.key(user_id), data, 'application/octet-stream', self.bucket):
+            logger.warning(f"Feature cache for user {user_id} was not saved")
+
+
+class LocalFeatureStore(FeatureStore):
+    """Feature caches stored as files in a local directory."""
+
+    def __init__(self, directory: str):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory for cache files (created on first save)
+        """
+        self.directory = directory
+
+    def path(self, user_id: str) -> str:
+        return os.path.join(self.directory, f"{user_id}-features-v{FEATURE_SCHEMA_VERSION}.npz")
+
+    def _read(self, user_id: str) -> Optional[bytes]:
+        try:
+            with open(self.path(user_id), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, user_id: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(user_id), 'wb') as f:
+            f.write(data)
@@ -5,11 +5,11 @@ Extracts 49 TF-IDF features from transaction descriptions to capture merchant pa
 """
 
 import logging
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Sequence
 
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from scipy.sparse import csr_matrix
+from scipy.sparse import csr_matrix, hstack
 
 from models.transaction import Transaction
 from services.recurring_charges.features.base import BaseFeatureExtractor
@@ -52,36 +52,36 @@ class DescriptionFeatureExtractor(BaseFeatureExtractor):
                 - Array of shape (n_transactions, 49) with TF-IDF features
                 - Fitted TfidfVectorizer (or None if vectorization failed)
         """
+        feature_matrix, vectorizer = self.extract_sparse(transactions)
+        return feature_matrix.toarray(), vectorizer
+    
+    def extract_sparse(
+        self,
+        transactions: List[Transaction]
+    ) -> Tuple[csr_matrix, Optional[TfidfVectorizer]]:
+        """
+        Extract TF-IDF features as a sparse matrix.
+        
+        Most descriptions only use a handful of the 49 terms, so clustering
+        backends that accept sparse input avoid densifying the matrix.
+        
+        Args:
+            transactions: List of Transaction objects
+            
+        Returns:
+            Tuple of:
+                - CSR matrix of shape (n_transactions, 49) with TF-IDF features
+                - Fitted TfidfVectorizer (or None if vectorization failed)
+        """
         # Extract descriptions (lowercase for normalization)
         descriptions = [tx.description.lower() for tx in transactions if tx.description]
         
         # Initialize TF-IDF vectorizer
-        vectorizer = TfidfVectorizer(
-            max_features=self.FEATURE_SIZE,
-            ngram_range=(1, 2),  # Unigrams and bigrams
-            min_df=1,  # Minimum document frequency
-            max_df=0.95,  # Maximum document frequency (ignore very common words)
-            strip_accents='unicode',
-            lowercase=True,
-            token_pattern=r'\b[a-z]{2,}\b'  # Words with 2+ letters
-        )
+        vectorizer = self._create_vectorizer()
         
         try:
             # Fit and transform descriptions
-            tfidf_matrix: csr_matrix = vectorizer.fit_transform(descriptions)  # type: ignore
-            feature_matrix = tfidf_matrix.toarray()
-            
-            # Ensure we have exactly FEATURE_SIZE features
-            if feature_matrix.shape[1] < self.FEATURE_SIZE:
-                # Pad with zeros if we have fewer features
-                padding = np.zeros((
-                    feature_matrix.shape[0], 
-                    self.FEATURE_SIZE - feature_matrix.shape[1]
-                ))
-                feature_matrix = np.hstack([feature_matrix, padding])
-            elif feature_matrix.shape[1] > self.FEATURE_SIZE:
-                # Truncate if we have more features (shouldn't happen with max_features)
-                feature_matrix = feature_matrix[:, :self.FEATURE_SIZE]
+            feature_matrix = self._fit_columns(csr_matrix(vectorizer.fit_transform(descriptions)))
             
             self.validate_output(feature_matrix, len(transactions))
             return feature_matrix, vectorizer
@@ -92,7 +92,73 @@ class DescriptionFeatureExtractor(BaseFeatureExtractor):
                 f"TF-IDF vectorization failed: {e}. Using zero vectors.", 
                 exc_info=True
             )
-            feature_matrix = np.zeros((len(transactions), self.FEATURE_SIZE))
+            feature_matrix = csr_matrix((len(transactions), self.FEATURE_SIZE))
             self.validate_output(feature_matrix, len(transactions))
             return feature_matrix, None
-
+    
+    def transform_sparse(
+        self,
+        transactions: List[Transaction],
+        vectorizer: Optional[TfidfVectorizer]
+    ) -> csr_matrix:
+        """
+        Extract TF-IDF features with an already fitted vocabulary.
+        
+        Rows only depend on their own description, so they can be cached and
+        combined with rows transformed in other runs.
+        
+        Args:
+            transactions: List of Transaction objects
+            vectorizer: Fitted vectorizer (None gives zero vectors)
+            
+        Returns:
+            CSR matrix of shape (n_transactions, 49) with TF-IDF features
+        """
+        if vectorizer is None or not transactions:
+            return csr_matrix((len(transactions), self.FEATURE_SIZE))
+        
+        descriptions = [(tx.description or '').lower() for tx in transactions]
+        feature_matrix = self._fit_columns(csr_matrix(vectorizer.transform(descriptions)))
+        self.validate_output(feature_matrix, len(transactions))
+        return feature_matrix
+    
+    def vectorizer_from_vocabulary(self, vocabulary: Sequence[str], idf: np.ndarray) -> TfidfVectorizer:
+        """
+        Rebuild a fitted vectorizer from a stored vocabulary and IDF weights.
+        
+        Args:
+            vocabulary: Terms in column order (get_feature_names_out of the fitted vectorizer)
+            idf: IDF weight of each term
+            
+        Returns:
+            Vectorizer that transforms like the one the vocabulary came from
+        """
+        vectorizer = self._create_vectorizer()
+        vectorizer.set_params(vocabulary={term: column for column, term in enumerate(vocabulary)})
+        vectorizer.idf_ = np.asarray(idf, dtype=np.float64)
+        return vectorizer
+    
+    def _create_vectorizer(self) -> TfidfVectorizer:
+        return TfidfVectorizer(
+            max_features=self.FEATURE_SIZE,
+            ngram_range=(1, 2),  # Unigrams and bigrams
+            min_df=1,  # Minimum document frequency
+            max_df=0.95,  # Maximum document frequency (ignore very common words)
+            strip_accents='unicode',
+            lowercase=True,
+            token_pattern=r'\b[a-z]{2,}\b'  # Words with 2+ letters
+        )
+    
+    def _fit_columns(self, feature_matrix: csr_matrix) -> csr_matrix:
+        """Pad or truncate the TF-IDF matrix to exactly FEATURE_SIZE columns."""
+        if feature_matrix.shape[1] < self.FEATURE_SIZE:
+            # Pad with empty columns if we have fewer features
+            padding = csr_matrix((
+                feature_matrix.shape[0], 
+                self.FEATURE_SIZE - feature_matrix.shape[1]
+            ))
+            return hstack([feature_matrix, padding], format='csr')
+        if feature_matrix.shape[1] > self.FEATURE_SIZE:
+            # Truncate if we have more features (shouldn't happen with max_features)
+            return feature_matrix[:, :self.FEATURE_SIZE]
+        return feature_matrix
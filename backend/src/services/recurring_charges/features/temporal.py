@@ -2,19 +2,20 @@
 Temporal feature extractor.
 
 Extracts 17 temporal features from transactions that capture when charges occur.
+Features are computed for the whole batch as NumPy arrays; working-day flags
+are looked up in a per-country calendar built once per year range.
 """
 
-import math
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
 
 import numpy as np
 import holidays
 
 from models.transaction import Transaction
-from utils.temporal_utils import is_first_working_day, is_last_working_day
+from utils.temporal_utils import WorkingDayCalendar, build_working_day_calendar
 from services.recurring_charges.features.base import BaseFeatureExtractor
 
+MS_PER_DAY = 24 * 60 * 60 * 1000
 
 class TemporalFeatureExtractor(BaseFeatureExtractor):
     """
@@ -38,6 +39,7 @@ class TemporalFeatureExtractor(BaseFeatureExtractor):
         """
         self.country_code = country_code
         self.holidays = holidays.country_holidays(country_code)
+        self._calendar: Optional[WorkingDayCalendar] = None
     
     @property
     def feature_size(self) -> int:
@@ -55,7 +57,8 @@ class TemporalFeatureExtractor(BaseFeatureExtractor):
         Returns:
             Array of shape (n_transactions, 17) with temporal features
         """
-        features = np.array([self.extract_single(tx) for tx in transactions])
+        dates = np.fromiter((tx.date for tx in transactions), dtype=np.int64, count=len(transactions))
+        features = self.extract_dates(dates)
         self.validate_output(features, len(transactions))
         return features
     
@@ -69,125 +72,80 @@ class TemporalFeatureExtractor(BaseFeatureExtractor):
         Returns:
             List of 17 float values representing temporal features
         """
-        # Convert timestamp (ms) to datetime
-        dt = datetime.fromtimestamp(transaction.date / 1000, tz=timezone.utc)
-        
-        # Extract basic temporal components
-        day_of_week = dt.weekday()  # 0=Monday, 6=Sunday
-        day_of_month = dt.day
-        month = dt.month
-        year = dt.year
-        
-        # Calculate days in month
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-        else:
-            next_month = datetime(year, month + 1, 1, tzinfo=timezone.utc)
-        days_in_month = (next_month - datetime(year, month, 1, tzinfo=timezone.utc)).days
-        
-        # Calculate week of month (1-5)
-        week_of_month = (day_of_month - 1) // 7 + 1
-        
-        # Circular encoding (prevents discontinuity at boundaries)
-        day_of_week_sin = math.sin(2 * math.pi * day_of_week / 7)
-        day_of_week_cos = math.cos(2 * math.pi * day_of_week / 7)
-        
-        day_of_month_sin = math.sin(2 * math.pi * day_of_month / 31)
-        day_of_month_cos = math.cos(2 * math.pi * day_of_month / 31)
-        
-        month_position_sin = math.sin(2 * math.pi * (day_of_month - 1) / days_in_month)
-        month_position_cos = math.cos(2 * math.pi * (day_of_month - 1) / days_in_month)
-        
-        week_of_month_sin = math.sin(2 * math.pi * week_of_month / 5)
-        week_of_month_cos = math.cos(2 * math.pi * week_of_month / 5)
-        
-        # Boolean flags
-        is_weekend = 1.0 if day_of_week >= 5 else 0.0  # Saturday or Sunday
-        is_working_day_flag = 1.0 if (day_of_week < 5 and dt.date() not in self.holidays) else 0.0
-        
-        # First/last day flags
-        is_first_day = 1.0 if day_of_month == 1 else 0.0
-        is_last_day = 1.0 if day_of_month == days_in_month else 0.0
-        
-        # First/last working day
-        is_first_working_day_flag = 1.0 if is_first_working_day(dt, self.holidays) else 0.0
-        is_last_working_day_flag = 1.0 if is_last_working_day(dt, self.holidays) else 0.0
-        
-        # First/last weekday of month
-        is_first_weekday = 1.0 if self._is_first_weekday_of_month(dt) else 0.0
-        is_last_weekday = 1.0 if self._is_last_weekday_of_month(dt) else 0.0
-        
-        # Normalized day position (0.0 to 1.0)
-        normalized_day_position = (day_of_month - 1) / (days_in_month - 1) if days_in_month > 1 else 0.5
-        
-        return [
-            # Circular encoding (8 features)
-            day_of_week_sin, day_of_week_cos,
-            day_of_month_sin, day_of_month_cos,
-            month_position_sin, month_position_cos,
-            week_of_month_sin, week_of_month_cos,
-            # Boolean flags (8 features)
-            is_working_day_flag, is_first_working_day_flag, is_last_working_day_flag,
-            is_first_weekday, is_last_weekday, is_weekend,
-            is_first_day, is_last_day,
-            # Position (1 feature)
-            normalized_day_position
-        ]
+        return self.extract_dates(np.array([transaction.date], dtype=np.int64))[0].tolist()
     
-    def _is_first_weekday_of_month(self, dt: datetime) -> bool:
+    def extract_dates(self, dates: np.ndarray) -> np.ndarray:
         """
-        Check if date is the first occurrence of its weekday in the month.
+        Extract temporal features for an array of timestamps.
         
         Args:
-            dt: Datetime to check
+            dates: Array of timestamps in milliseconds since epoch (UTC)
             
         Returns:
-            True if this is the first occurrence of this weekday in the month
+            Array of shape (len(dates), 17) with temporal features
         """
-        year = dt.year
-        month = dt.month
-        target_weekday = dt.weekday()
+        features = np.zeros((len(dates), self.FEATURE_SIZE))
+        if len(dates) == 0:
+            return features
+        
+        # Calendar components (UTC days, floor division keeps pre-1970 dates right)
+        days = (dates // MS_PER_DAY).astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        month_start = months.astype('datetime64[D]')
+        days_in_month = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+        day_of_month = (days - month_start).astype(np.int64) + 1
+        day_of_week = (days.astype(np.int64) + 3) % 7  # 0=Monday, 1970-01-01 was a Thursday
+        week_of_month = (day_of_month - 1) // 7 + 1
         
-        for day in range(1, 8):  # First week
-            try:
-                candidate = datetime(year, month, day, tzinfo=timezone.utc)
-                if candidate.weekday() == target_weekday:
-                    return candidate.date() == dt.date()
-            except ValueError:
-                break
+        # Circular encoding (prevents discontinuity at boundaries)
+        features[:, 0] = np.sin(2 * np.pi * day_of_week / 7)
+        features[:, 1] = np.cos(2 * np.pi * day_of_week / 7)
+        features[:, 2] = np.sin(2 * np.pi * day_of_month / 31)
+        features[:, 3] = np.cos(2 * np.pi * day_of_month / 31)
+        features[:, 4] = np.sin(2 * np.pi * (day_of_month - 1) / days_in_month)
+        features[:, 5] = np.cos(2 * np.pi * (day_of_month - 1) / days_in_month)
+        features[:, 6] = np.sin(2 * np.pi * week_of_month / 5)
+        features[:, 7] = np.cos(2 * np.pi * week_of_month / 5)
+        
+        # Working-day flags from the precomputed calendar
+        calendar = self._get_calendar(days.min(), days.max())
+        index = calendar.day_index(days)
+        features[:, 8] = calendar.is_working_day[index]
+        features[:, 9] = calendar.is_first_working_day[index]
+        features[:, 10] = calendar.is_last_working_day[index]
+        
+        # First/last occurrence of the weekday in the month
+        features[:, 11] = day_of_month <= 7
+        features[:, 12] = day_of_month > days_in_month - 7
+        
+        # Weekend and first/last day flags
+        features[:, 13] = day_of_week >= 5
+        features[:, 14] = day_of_month == 1
+        features[:, 15] = day_of_month == days_in_month
         
-        return False
+        # Normalized day position (0.0 to 1.0)
+        features[:, 16] = (day_of_month - 1) / (days_in_month - 1)
+        
+        return features
     
-    def _is_last_weekday_of_month(self, dt: datetime) -> bool:
+    def _get_calendar(self, first_day: np.datetime64, last_day: np.datetime64) -> WorkingDayCalendar:
         """
-        Check if date is the last occurrence of its weekday in the month.
+        Return a working-day calendar covering the given days.
         
-        Args:
-            dt: Datetime to check
-            
-        Returns:
-            True if this is the last occurrence of this weekday in the month
+        The calendar is kept between batches and rebuilt to cover the union
+        of both year ranges when a batch falls outside it.
         """
-        year = dt.year
-        month = dt.month
-        target_weekday = dt.weekday()
+        if self._calendar is not None and self._calendar.covers(first_day, last_day):
+            return self._calendar
         
-        # Get last day of month
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-        else:
-            next_month = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+        first_year, last_year = _year(first_day), _year(last_day)
+        if self._calendar is not None:
+            first_year = min(first_year, _year(self._calendar.start))
+            last_year = max(last_year, _year(self._calendar.end) - 1)
         
-        last_day = (next_month - datetime(year, month, 1, tzinfo=timezone.utc)).days
-        
-        # Search backwards for last occurrence of target weekday
-        for day in range(last_day, 0, -1):
-            try:
-                candidate = datetime(year, month, day, tzinfo=timezone.utc)
-                if candidate.weekday() == target_weekday:
-                    return candidate.date() == dt.date()
-            except ValueError:
-                continue
-        
-        return False
+        self._calendar = build_working_day_calendar(self.holidays, first_year, last_year)
+        return self._calendar
+
 
+def _year(day: np.datetime64) -> int:
+    return int(day.astype('datetime64[Y]').astype(np.int64)) + 1970
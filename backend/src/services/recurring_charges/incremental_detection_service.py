@@ -0,0 +1,264 @@
+"""
+Incremental Recurring Charge Detection Service.
+
+Handles new transactions (e.g. from a processed file) without re-clustering
+the user's whole history:
+
+1. New transactions are matched against existing patterns with the same
+   criteria PatternValidationService applies (merchant, amount tolerance,
+   temporal rule). Matches extend the pattern: its criteria are kept and its
+   amount/date statistics and matched transaction IDs are updated.
+2. The unmatched new transactions, together with unclaimed history that
+   shares a merchant token with them, are re-clustered by the regular
+   RecurringChargeDetectionService to find new patterns.
+
+A routine monthly upload therefore clusters a few hundred rows instead of
+every transaction the user has.
+"""
+
+import logging
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List, Dict, Optional, Set, Tuple
+
+from models.transaction import Transaction
+from models.account import Account
+from models.recurring_charge import (
+    RecurringChargePattern,
+    RecurringChargePatternCreate,
+    PatternStatus,
+)
+from services.recurring_charges.detection_service import RecurringChargeDetectionService
+from services.recurring_charges.pattern_validation_service import PatternValidationService
+from services.recurring_charges.config import MIN_CLUSTER_SIZE, MIN_CONFIDENCE
+
+logger = logging.getLogger(__name__)
+
+# Same tokens the TF-IDF description features are built from
+MERCHANT_TOKEN_PATTERN = re.compile(r'\b[a-z]{2,}\b')
+
+# How far back history is considered for re-clustering unmatched transactions
+RESIDUE_LOOKBACK_DAYS = 400
+
+# Tokens found in more than this share of the history (e.g. "pos", "payment")
+# do not identify a merchant and are ignored when selecting residue history,
+# unless they occur no more often than a weekly charge over the lookback window
+MAX_TOKEN_SHARE = 0.05
+MIN_TOKEN_COUNT_LIMIT = RESIDUE_LOOKBACK_DAYS // 7
+
+
+@dataclass
+class IncrementalDetectionResult:
+    """Outcome of an incremental detection run."""
+
+    updated_patterns: List[RecurringChargePattern] = field(default_factory=list)
+    """Existing patterns extended with newly matched transactions."""
+
+    new_patterns: List[RecurringChargePatternCreate] = field(default_factory=list)
+    """Patterns detected in the unmatched residue."""
+
+    matched_count: int = 0
+    """New transactions absorbed by existing patterns."""
+
+    residue_count: int = 0
+    """Transactions re-clustered to look for new patterns."""
+
+
+class IncrementalDetectionService:
+    """Scores new transactions against existing patterns and clusters the rest."""
+
+    def __init__(
+        self,
+        detection_service: Optional[RecurringChargeDetectionService] = None,
+        validation_service: Optional[PatternValidationService] = None
+    ):
+        """
+        Initialize the incremental detection service.
+
+        Args:
+            detection_service: Detection service used for the residue. If not provided, creates one.
+            validation_service: Criteria matcher. If not provided, creates one.
+        """
+        self.detection_service = detection_service or RecurringChargeDetectionService(country_code='US')
+        self.validation_service = validation_service or PatternValidationService()
+
+    def detect(
+        self,
+        user_id: str,
+        new_transactions: List[Transaction],
+        history: List[Transaction],
+        patterns: List[RecurringChargePattern],
+        min_occurrences: int = MIN_CLUSTER_SIZE,
+        min_confidence: float = MIN_CONFIDENCE,
+        accounts_map: Optional[Dict[uuid.UUID, Account]] = None
+    ) -> IncrementalDetectionResult:
+        """
+        Run incremental detection for a batch of new transactions.
+
+        Args:
+            user_id: User ID for pattern ownership
+            new_transactions: Transactions added since the last run
+            history: Recent transactions (may include the new ones), used to
+                complete the residue with earlier occurrences
+            patterns: The user's existing patterns
+            min_occurrences: Minimum number of occurrences to form a pattern
+            min_confidence: Minimum confidence score to include a new pattern
+            accounts_map: Optional dictionary mapping account_id to Account objects
+
+        Returns:
+            IncrementalDetectionResult
+        """
+        result = IncrementalDetectionResult()
+        if not new_transactions:
+            return result
+
+        result.updated_patterns, unmatched = self.match_new_transactions(patterns, new_transactions)
+        result.matched_count = len(new_transactions) - len(unmatched)
+
+        residue = self.select_residue(unmatched, history, patterns)
+        result.residue_count = len(residue)
+        if residue:
+            result.new_patterns = self.detection_service.detect_recurring_patterns(
+                user_id=user_id,
+                transactions=residue,
+                min_occurrences=min_occurrences,
+                min_confidence=min_confidence,
+                accounts_map=accounts_map,
+            )
+
+        logger.info(
+            f"Incremental detection for user {user_id}: {result.matched_count} of "
+            f"{len(new_transactions)} new transactions matched {len(result.updated_patterns)} patterns, "
+            f"{result.residue_count} residue transactions produced {len(result.new_patterns)} new patterns"
+        )
+        return result
+
+    def match_new_transactions(
+        self,
+        patterns: List[RecurringChargePattern],
+        new_transactions: List[Transaction]
+    ) -> Tuple[List[RecurringChargePattern], List[Transaction]]:
+        """
+        Assign new transactions to the existing patterns whose criteria they meet.
+
+        Rejected patterns are skipped. Patterns are tried in order of
+        confidence and a transaction joins at most one pattern. Transactions
+        a pattern already holds are not added again.
+
+        Args:
+            patterns: The user's existing patterns
+            new_transactions: Transactions to match
+
+        Returns:
+            Tuple of (updated patterns, unmatched transactions)
+        """
+        claimed = _claimed_transaction_ids(patterns)
+        remaining = [tx for tx in new_transactions if tx.transaction_id not in claimed]
+
+        updated = []
+        candidates = [p for p in patterns if p.status != PatternStatus.REJECTED]
+        for pattern in sorted(candidates, key=lambda p: p.confidence_score, reverse=True):
+            if not remaining:
+                break
+            matches = self.validation_service.get_matching_transactions(pattern, remaining)
+            if not matches:
+                continue
+            _absorb_transactions(pattern, matches)
+            updated.append(pattern)
+            matched_ids = {tx.transaction_id for tx in matches}
+            remaining = [tx for tx in remaining if tx.transaction_id not in matched_ids]
+
+        return updated, remaining
+
+    def select_residue(
+        self,
+        unmatched: List[Transaction],
+        history: List[Transaction],
+        patterns: List[RecurringChargePattern]
+    ) -> List[Transaction]:
+        """
+        Pick the transactions to re-cluster for new patterns.
+
+        These are the unmatched new transactions plus the history
+        transactions that no pattern holds and that share a merchant token
+        with them. Tokens common to much of the history are ignored.
+
+        Args:
+            unmatched: New transactions that matched no pattern
+            history: Recent transactions
+            patterns: The user's existing patterns
+
+        Returns:
+            Transactions to cluster
+        """
+        if not unmatched:
+            return []
+
+        claimed = _claimed_transaction_ids(patterns)
+        unmatched_ids = {tx.transaction_id for tx in unmatched}
+        history = [
+            tx for tx in history
+            if tx.transaction_id not in claimed and tx.transaction_id not in unmatched_ids
+        ]
+        history_tokens = [_merchant_tokens(tx.description) for tx in history]
+
+        token_counts: Dict[str, int] = {}
+        for tokens in history_tokens:
+            for token in tokens:
+                token_counts[token] = token_counts.get(token, 0) + 1
+        max_count = max(MIN_TOKEN_COUNT_LIMIT, int(len(history) * MAX_TOKEN_SHARE))
+
+        wanted: Set[str] = set()
+        for tx in unmatched:
+            wanted.update(
+                token for token in _merchant_tokens(tx.description)
+                if token_counts.get(token, 0) <= max_count
+            )
+
+        related = [tx for tx, tokens in zip(history, history_tokens) if tokens & wanted]
+        return list(unmatched) + related
+
+
+def _claimed_transaction_ids(patterns: List[RecurringChargePattern]) -> Set[uuid.UUID]:
+    return {
+        tx_id
+        for pattern in patterns
+        for tx_id in (pattern.matched_transaction_ids or [])
+    }
+
+
+def _merchant_tokens(description: Optional[str]) -> Set[str]:
+    return set(MERCHANT_TOKEN_PATTERN.findall((description or '').lower()))
+
+
+def _absorb_transactions(pattern: RecurringChargePattern, transactions: List[Transaction]) -> None:
+    """
+    Extend a pattern with newly matched transactions.
+
+    Criteria (merchant pattern, frequency, temporal rule, tolerances) are
+    kept; the amount statistics are combined with the new amounts as if the
+    pattern had been computed over all of its transactions.
+    """
+    amounts = [abs(tx.amount) for tx in transactions]
+    previous_count = pattern.transaction_count
+    count = previous_count + len(amounts)
+
+    mean = (pattern.amount_mean * previous_count + sum(amounts, Decimal('0'))) / count
+    squared_deviation = previous_count * (
+        pattern.amount_std ** 2 + (pattern.amount_mean - mean) ** 2
+    ) + sum(((amount - mean) ** 2 for amount in amounts), Decimal('0'))
+
+    pattern.amount_mean = mean
+    pattern.amount_std = (squared_deviation / count).sqrt()
+    pattern.amount_min = min([pattern.amount_min] + amounts)
+    pattern.amount_max = max([pattern.amount_max] + amounts)
+    pattern.transaction_count = count
+    pattern.first_occurrence = min([pattern.first_occurrence] + [tx.date for tx in transactions])
+    pattern.last_occurrence = max([pattern.last_occurrence] + [tx.date for tx in transactions])
+    pattern.matched_transaction_ids = (pattern.matched_transaction_ids or []) + [
+        tx.transaction_id for tx in transactions
+    ]
+    pattern.updated_at = int(datetime.now(timezone.utc).timestamp() * 1000)
@@ -88,10 +88,10 @@ class RecurringChargePredictionService:
         
         # Calculate expected amount and range
         expected_amount = pattern.amount_mean
-        tolerance_pct = pattern.amount_tolerance_pct / 100.0
+        tolerance_pct = pattern.amount_tolerance_pct / Decimal('100')
         amount_range = {
-            'min': pattern.amount_mean * Decimal(str(1 - tolerance_pct)),
-            'max': pattern.amount_mean * Decimal(str(1 + tolerance_pct))
+            'min': pattern.amount_mean * (1 - tolerance_pct),
+            'max': pattern.amount_mean * (1 + tolerance_pct)
         }
         
         # Confidence is based on pattern confidence and time since last occurrence
@@ -517,7 +517,7 @@ class RecurringChargePredictionService:
         - Long time since last occurrence
         - Few historical occurrences
         """
-        base_confidence = pattern.confidence_score
+        base_confidence = float(pattern.confidence_score)
         
         # Time decay factor
         days_since_last = (from_date - last_occurrence).days
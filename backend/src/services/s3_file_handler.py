@@ -5,12 +5,14 @@ Provides streaming, compression, retry logic, and large file handling capabiliti
 import gzip
 import hashlib
 import io
+import json
 import logging
 import os
 import tempfile
 import time
+import zipfile
 from contextlib import contextmanager
-from typing import Dict, List, Any, Optional, Iterator, Union, BinaryIO, Tuple
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Union, BinaryIO, Tuple, Callable
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import boto3
@@ -20,6 +22,12 @@ from utils.s3_dao import get_s3_client, get_object_content, put_object
 
 logger = logging.getLogger(__name__)
 
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+# Entity data files written to every export package, in order
+PACKAGE_ENTITY_TYPES = ('accounts', 'transactions', 'categories', 'file_maps', 'transaction_files')
+
 
 @dataclass
 class FileStreamingOptions:
@@ -31,6 +39,8 @@ class FileStreamingOptions:
     compression_level: int = 6
     enable_checksum: bool = True
     max_memory_usage: int = 100 * 1024 * 1024  # 100MB max in memory
+    multipart_part_size: int = 8 * 1024 * 1024  # 8MB S3 multipart upload parts
+    file_spool_size: int = 8 * 1024 * 1024  # Files read before packaging spill to disk beyond 8MB
 
 
 @dataclass
@@ -418,6 +428,119 @@ class S3FileStreamer:
         }
 
 
+class S3MultipartUploadWriter:
+    """
+    Write-only file object that uploads to S3 in multipart upload parts.
+    
+    Bytes are buffered until a full part is available, so memory stays at about
+    one part regardless of the object size. The object only becomes visible
+    once close() completes the upload; an exception inside the context manager
+    aborts it instead.
+    
+    Usage:
+        with S3MultipartUploadWriter(s3_client, bucket, key, 'application/zip') as writer:
+            with zipfile.ZipFile(writer, 'w') as zipf:
+                ...
+    """
+    
+    def __init__(self, s3_client: Any, bucket_name: str, s3_key: str, content_type: str,
+                 part_size: int = 8 * 1024 * 1024, max_retries: int = 3, retry_delay: float = 1.0):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+        self.part_size = max(part_size, MIN_MULTIPART_PART_SIZE)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.bytes_written = 0
+        self.closed = False
+        self._buffer = bytearray()
+        self._parts: List[Dict[str, Any]] = []
+        
+        response = self.s3_client.create_multipart_upload(
+            Bucket=bucket_name, Key=s3_key, ContentType=content_type
+        )
+        self._upload_id = response['UploadId']
+        logger.info(f"Started multipart upload to s3://{bucket_name}/{s3_key}")
+    
+    def write(self, data: bytes) -> int:
+        """Buffer data and upload every full part."""
+        if self.closed:
+            raise ValueError("write to closed S3MultipartUploadWriter")
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+    
+    def tell(self) -> int:
+        """Number of bytes written so far."""
+        return self.bytes_written
+    
+    def flush(self) -> None:
+        """Parts are only uploaded once full; nothing to flush."""
+    
+    def close(self) -> None:
+        """Upload the final part and complete the multipart upload."""
+        if self.closed:
+            return
+        if self._buffer or not self._parts:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.s3_key,
+            UploadId=self._upload_id,
+            MultipartUpload={'Parts': self._parts}
+        )
+        self.closed = True
+        logger.info(f"Completed multipart upload of {self.bytes_written} bytes in {len(self._parts)} parts "
+                   f"to s3://{self.bucket_name}/{self.s3_key}")
+    
+    def abort(self) -> None:
+        """Abort the multipart upload so no partial object or parts are left behind."""
+        if self.closed:
+            return
+        self.closed = True
+        self._buffer.clear()
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self.s3_key, UploadId=self._upload_id
+            )
+            logger.info(f"Aborted multipart upload to s3://{self.bucket_name}/{self.s3_key}")
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Failed to abort multipart upload {self._upload_id}: {str(e)}")
+    
+    def _upload_part(self, body: bytes) -> None:
+        """Upload one part with retry logic."""
+        part_number = len(self._parts) + 1
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.s3_client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=self.s3_key,
+                    UploadId=self._upload_id,
+                    PartNumber=part_number,
+                    Body=body
+                )
+                self._parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+                return
+            except (ClientError, BotoCoreError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Part {part_number} upload attempt {attempt + 1} failed: {str(e)}")
+                time.sleep(self.retry_delay * (2 ** attempt))
+    
+    def __enter__(self) -> 'S3MultipartUploadWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
 class ExportPackageBuilder:
     """Enhanced package builder with streaming and compression capabilities"""
     
@@ -428,6 +551,7 @@ class ExportPackageBuilder:
         # Create separate streamer for accessing transaction files from file storage bucket
         self.file_access_streamer = S3FileStreamer(self.file_storage_bucket, streaming_options)
         self.compression_enabled = streaming_options.enable_compression if streaming_options else True
+        self.streaming_options = streaming_options or FileStreamingOptions()
         
     def build_package_with_streaming(self, export_data: Dict[str, Any], 
                                    transaction_files: List[Dict[str, Any]],
@@ -510,6 +634,131 @@ class ExportPackageBuilder:
             logger.error(f"Failed to build package with streaming: {str(e)}")
             raise
     
+    def stream_package_to_s3(self, export_data: Dict[str, Any], s3_key: str,
+                             build_manifest: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Stream an export package straight into an S3 multipart upload
+        
+        Entity records are written as NDJSON entries (data/<entity>.ndjson) as
+        they are read from the export_data iterables, transaction file contents
+        are read from S3 in chunks into a spool (disk beyond file_spool_size)
+        before being added, and the zip stream is uploaded part by part.
+        Memory stays at about one upload part plus one spool, whatever the
+        size of the export.
+        
+        Args:
+            export_data: Entity type to iterable of serialized records (lists or generators)
+            s3_key: S3 key of the package in the package bucket
+            build_manifest: Called with the processing summary once all data is
+                written; returns the manifest dict written as manifest.json
+            
+        Returns:
+            Tuple of (package_size, processing_summary)
+        """
+        logger.info(f"Streaming export package to s3://{self.bucket_name}/{s3_key}")
+        
+        processing_summary: Dict[str, Any] = {
+            'data_files_created': 0,
+            'transaction_files_processed': 0,
+            'transaction_files_failed': 0,
+            'total_original_size': 0,
+            'total_compressed_size': 0,
+            'compression_ratio': 0.0,
+            'processing_time': 0.0,
+            'entity_counts': {},
+            'checksums': {}
+        }
+        start_time = time.time()
+        
+        entity_types = list(PACKAGE_ENTITY_TYPES)
+        if export_data.get('analytics'):
+            entity_types.append('analytics')
+        
+        compression = zipfile.ZIP_DEFLATED if self.compression_enabled else zipfile.ZIP_STORED
+        options = self.streaming_options
+        
+        with S3MultipartUploadWriter(
+            self.file_streamer.s3_client, self.bucket_name, s3_key, 'application/zip',
+            part_size=options.multipart_part_size,
+            max_retries=options.max_retries,
+            retry_delay=options.retry_delay
+        ) as writer:
+            with zipfile.ZipFile(writer, 'w', compression, compresslevel=options.compression_level) as zipf:
+                # Transaction file metadata is read twice (records, then contents), so keep it
+                transaction_files = list(export_data.get('transaction_files') or [])
+                
+                for entity_type in entity_types:
+                    records = transaction_files if entity_type == 'transaction_files' else export_data.get(entity_type) or []
+                    arcname = f"data/{entity_type}.ndjson"
+                    count, checksum = self._write_ndjson_entry(zipf, arcname, records)
+                    processing_summary['entity_counts'][entity_type] = count
+                    processing_summary['checksums'][arcname] = checksum
+                    processing_summary['data_files_created'] += 1
+                
+                for file_info in transaction_files:
+                    self._copy_transaction_file_to_zip(zipf, file_info, processing_summary)
+                
+                if processing_summary['total_original_size'] > 0:
+                    processing_summary['compression_ratio'] = (
+                        (processing_summary['total_original_size'] - processing_summary['total_compressed_size']) /
+                        processing_summary['total_original_size']
+                    ) * 100
+                processing_summary['processing_time'] = time.time() - start_time
+                
+                zipf.writestr('manifest.json', json.dumps(build_manifest(processing_summary), indent=2, default=str))
+        
+        logger.info(f"Package streaming complete: {writer.bytes_written} bytes, {processing_summary}")
+        return writer.bytes_written, processing_summary
+    
+    def _write_ndjson_entry(self, zipf: zipfile.ZipFile, arcname: str,
+                            records: Iterable[Any]) -> Tuple[int, str]:
+        """Write records to a zip entry as NDJSON, one record at a time; returns (count, sha256)"""
+        count = 0
+        sha256 = hashlib.sha256()
+        with zipf.open(arcname, 'w', force_zip64=True) as entry:
+            for record in records:
+                line = json.dumps(record, default=str).encode('utf-8') + b'\n'
+                entry.write(line)
+                sha256.update(line)
+                count += 1
+        return count, sha256.hexdigest()
+    
+    def _copy_transaction_file_to_zip(self, zipf: zipfile.ZipFile, file_info: Dict[str, Any],
+                                      processing_summary: Dict[str, Any]) -> None:
+        """
+        Copy a transaction file from file storage into the package in chunks
+        
+        The file is read into a spool first and only added to the package once
+        the whole read succeeded, so a failed read leaves no truncated entry.
+        """
+        s3_key = file_info.get('s3Key')
+        if not s3_key:
+            return
+        
+        file_id = str(file_info['fileId'])
+        filename = file_info.get('fileName', f'file_{file_id}')
+        arcname = f"files/{file_id}/{filename}"
+        
+        with tempfile.SpooledTemporaryFile(max_size=self.streaming_options.file_spool_size) as spool:
+            try:
+                response = self.file_access_streamer.s3_client.get_object(Bucket=self.file_storage_bucket, Key=s3_key)
+                for chunk in self.file_access_streamer._read_chunks(response['Body']):
+                    spool.write(chunk)
+            except (ClientError, BotoCoreError, IOError) as e:
+                logger.warning(f"Skipping file {s3_key}: {str(e)}")
+                processing_summary['transaction_files_failed'] += 1
+                return
+            
+            spool.seek(0)
+            with zipf.open(arcname, 'w', force_zip64=True) as entry:
+                for chunk in self.file_access_streamer._read_chunks(spool):
+                    entry.write(chunk)
+        
+        info = zipf.getinfo(arcname)
+        processing_summary['transaction_files_processed'] += 1
+        processing_summary['total_original_size'] += info.file_size
+        processing_summary['total_compressed_size'] += info.compress_size
+    
     def _write_data_file(self, file_path: str, data: Any):
         """Write data file with optional compression"""
         import json
@@ -549,6 +798,185 @@ class ExportPackageBuilder:
             return []
 
 
+def iter_json_array(stream: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Incrementally decode a JSON array, yielding one element at a time
+    
+    Only the element being decoded (plus one read chunk) is held in memory,
+    so arrays far larger than memory can be read from a file-like stream.
+    """
+    decoder = json.JSONDecoder()
+    text = io.TextIOWrapper(stream, encoding='utf-8')
+    buffer = ''
+    pos = 0
+    eof = False
+    started = False
+    
+    def skip_whitespace() -> None:
+        nonlocal pos
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+    
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = text.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        
+        if not started:
+            if buffer[pos] != '[':
+                raise ValueError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        
+        if buffer[pos] == ']':
+            return
+        if buffer[pos] == ',':
+            pos += 1
+            continue
+        
+        try:
+            element, end = decoder.raw_decode(buffer, pos)
+            next_pos = end
+            while next_pos < len(buffer) and buffer[next_pos].isspace():
+                next_pos += 1
+            complete = next_pos < len(buffer) and buffer[next_pos] in ',]'
+        except json.JSONDecodeError:
+            complete = False
+        # An element is complete only once the next non-whitespace character is
+        # ',' or ']'; before that it may be cut at a chunk boundary (e.g. '12.'
+        # decodes as 12), so read another chunk first
+        if not complete:
+            if eof:
+                raise ValueError("Invalid JSON array element")
+            chunk = text.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        
+        yield element
+        pos = end
+
+
+class PackageEntityRecords:
+    """
+    Re-iterable view of one entity data file in a restore package
+    
+    Every iteration decodes the entry again from the start, so validation
+    passes and the restore itself can each stream the records without the
+    package keeping them in memory.
+    """
+    
+    def __init__(self, reader: 'RestorePackageReader', entity_type: str):
+        self._reader = reader
+        self.entity_type = entity_type
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._reader.iter_records(self.entity_type)
+
+
+class RestorePackageReader:
+    """
+    Streaming reader for FZIP restore packages
+    
+    The package is streamed from S3 into a SpooledTemporaryFile (memory up to
+    spool_size, local disk beyond that) and entity files are decoded record
+    by record: NDJSON line by line, and older .json/.json.gz array files with
+    an incremental decoder. Memory use does not grow with the number of
+    records in the package.
+    
+    Usage:
+        with RestorePackageReader(bucket, key) as package:
+            for transaction in package.records('transactions'):
+                ...
+    """
+    
+    def __init__(self, bucket_name: str, s3_key: str, streaming_options: Optional[FileStreamingOptions] = None,
+                 spool_size: int = 64 * 1024 * 1024):
+        self.s3_key = s3_key
+        self.file_streamer = S3FileStreamer(bucket_name, streaming_options or FileStreamingOptions(chunk_size=1024 * 1024))
+        self._spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        try:
+            response = self.file_streamer.s3_client.get_object(Bucket=bucket_name, Key=s3_key)
+            for chunk in self.file_streamer._read_chunks(response['Body']):
+                self._spool.write(chunk)
+            self._spool.seek(0)
+            self.zipf = zipfile.ZipFile(self._spool, 'r')
+            self._names = set(self.zipf.namelist())
+            self.manifest = json.loads(self.zipf.read('manifest.json').decode('utf-8'))
+        except Exception:
+            self._spool.close()
+            raise
+    
+    def records(self, entity_type: str) -> PackageEntityRecords:
+        """Re-iterable records of an entity type (empty if the package has no data file for it)"""
+        return PackageEntityRecords(self, entity_type)
+    
+    def iter_records(self, entity_type: str) -> Iterator[Dict[str, Any]]:
+        """Decode the records of an entity type one at a time"""
+        ndjson_name = f'data/{entity_type}.ndjson'
+        if ndjson_name in self._names:
+            with self.zipf.open(ndjson_name) as entry:
+                for line in entry:
+                    if line.strip():
+                        yield json.loads(line)
+            return
+        
+        gz_name = f'data/{entity_type}.json.gz'
+        if gz_name in self._names:
+            with self.zipf.open(gz_name) as entry, gzip.GzipFile(fileobj=entry) as stream:
+                yield from iter_json_array(stream)
+            return
+        
+        json_name = f'data/{entity_type}.json'
+        if json_name in self._names:
+            with self.zipf.open(json_name) as entry:
+                yield from iter_json_array(entry)
+    
+    def verify_checksum(self, entity_type: str) -> bool:
+        """Whether the entity's NDJSON data file matches the sha256 recorded in the manifest"""
+        name = f'data/{entity_type}.ndjson'
+        expected = self.manifest.get('checksums', {}).get(name)
+        if not expected or name not in self._names:
+            return False
+        sha256 = hashlib.sha256()
+        with self.zipf.open(name) as entry:
+            for chunk in self.file_streamer._read_chunks(entry):
+                sha256.update(chunk)
+        return sha256.hexdigest() == expected
+    
+    def read_file(self, file_info: Dict[str, Any]) -> Optional[bytes]:
+        """Contents of a transaction file in the package, or None if it was not packaged"""
+        candidates = []
+        if file_info.get('fileId'):
+            file_id = str(file_info['fileId'])
+            candidates.append(f"files/{file_id}/{file_info.get('fileName', f'file_{file_id}')}")
+        if file_info.get('s3Key'):
+            candidates.append(f"files/{file_info['s3Key']}")  # Packages from before the fileId layout
+        for name in candidates:
+            if name in self._names:
+                return self.zipf.read(name)
+        return None
+    
+    def close(self) -> None:
+        """Close the package and release its spooled file"""
+        self.zipf.close()
+        self._spool.close()
+    
+    def __enter__(self) -> 'RestorePackageReader':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
 @contextmanager
 def temporary_export_workspace(base_dir: Optional[str] = None):
     """Context manager for temporary export workspace"""
@@ -11,23 +11,33 @@ Follows backend conventions:
 """
 
 import logging
-from typing import List, Dict, Optional, Tuple, Set, NamedTuple
-from decimal import Decimal
+from collections import deque
+from typing import Any, Deque, List, Dict, Iterable, Iterator, Optional, Tuple, Set, NamedTuple, Union
+from decimal import Decimal, ROUND_FLOOR
 from datetime import datetime, timedelta
+from enum import Enum
 import uuid
 
-from models.transaction import Transaction
+from models.transaction import Transaction, TransactionSummary, TRANSACTION_SUMMARY_ATTRIBUTES
 from models.category import Category, CategoryType, CategoryCreate
 from utils.db_utils import (
-    list_user_transactions,
     list_categories_by_user_from_db,
     update_transaction,
+    mark_transaction_rollups_stale,
     create_category_in_db
 )
+from utils.db.transactions import get_transactions_by_ids, iter_user_transactions
 
 logger = logging.getLogger(__name__)
 
 
+# Transfer matching criteria
+TRANSFER_AMOUNT_TOLERANCE = Decimal('0.01')
+TRANSFER_MAX_DATE_DIFF_DAYS = 7
+
+TransferCandidate = Union[Transaction, TransactionSummary]
+
+
 class MinimalTransaction(NamedTuple):
     """Minimal transaction data for memory-efficient transfer detection."""
     transaction_id: str
@@ -35,6 +45,14 @@ class MinimalTransaction(NamedTuple):
     amount: Decimal
     date: int  # timestamp in milliseconds
     abs_amount: Decimal
+    currency: Optional[str] = None
+
+
+def _currency_code(currency: Any) -> Optional[str]:
+    """Currency of a transaction or summary as a code, None if unknown."""
+    if isinstance(currency, Enum):
+        return currency.value
+    return currency if isinstance(currency, str) else None
 
 
 class TransferDetectionService:
@@ -50,16 +68,19 @@ class TransferDetectionService:
         
         Args:
             user_id: The user ID to analyze
-            date_range_days: Number of days to look for matching transactions (default: 7)
+            date_range_days: Number of days to look back, and to look for matching transactions (default: 7)
             
         Returns:
             List of tuples containing matched transfer transactions (outgoing, incoming)
         """
         try:
-            # Process transfer detection in batches - each batch is self-sufficient
-            all_transfer_pairs = self._detect_transfers_in_batches(
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=date_range_days)
+            all_transfer_pairs = self._detect_transfers_in_date_range(
                 user_id=user_id,
-                date_range_days=date_range_days
+                start_date_ts=int(start_date.timestamp() * 1000),
+                end_date_ts=int(end_date.timestamp() * 1000),
+                max_date_diff_days=date_range_days
             )
             
             logger.info(f"Detected {len(all_transfer_pairs)} potential transfer pairs for user {user_id}")
@@ -82,7 +103,6 @@ class TransferDetectionService:
             List of tuples containing matched transfer transactions (outgoing, incoming)
         """
         try:
-            # Process transfer detection in batches using timestamps
             all_transfer_pairs = self._detect_transfers_in_date_range(
                 user_id=user_id,
                 start_date_ts=start_date_ts,
@@ -95,472 +115,204 @@ class TransferDetectionService:
         except Exception as e:
             logger.error(f"Error detecting transfers for user {user_id} in date range: {str(e)}")
             return []
-    
-    def _detect_transfers_in_batches(
-        self, 
-        user_id: str, 
-        date_range_days: int
-    ) -> List[Tuple[Transaction, Transaction]]:
-        """
-        Detect transfers in batches - each batch is self-sufficient since transfer pairs are typically close in time.
-        
-        Args:
-            user_id: The user ID
-            date_range_days: Total date range in days
-            
-        Returns:
-            List of all transfer pairs found across all batches
-        """
-        from datetime import datetime, timedelta
-        
-        # Calculate batch size - each batch should be large enough to capture transfer pairs
-        # Since transfers are usually within a few days, 14-day batches with overlap should work well
-        batch_days = min(14, date_range_days)
-        overlap_days = min(date_range_days, 3)  # 3-day overlap to ensure cross-batch transfers are caught
-        
-        all_transfer_pairs = []
-        processed_global_ids = set()  # Track globally to avoid duplicates across batches
-        
-        end_date = datetime.now()
-        current_end = end_date
-        
-        while True:
-            # Calculate batch date range
-            current_start = current_end - timedelta(days=batch_days)
-            
-            # Don't go beyond the requested date range
-            requested_start = end_date - timedelta(days=date_range_days)
-            if current_start < requested_start:
-                current_start = requested_start
-            
-            # Convert to milliseconds since epoch
-            start_date_ts = int(current_start.timestamp() * 1000)
-            end_date_ts = int(current_end.timestamp() * 1000)
-            
-            logger.info(f"Processing transfer detection batch: {current_start.date()} to {current_end.date()}")
-            
-            # Get uncategorized transactions for this batch
-            batch_transactions = self._get_batch_transactions(
-                user_id=user_id,
-                start_date_ts=start_date_ts,
-                end_date_ts=end_date_ts
-            )
-            
-            # Process transfer detection within this batch
-            batch_transfer_pairs = self._detect_transfers_in_batch(
-                batch_transactions, 
-                date_range_days,
-                processed_global_ids
-            )
-            
-            # Add new pairs to results
-            all_transfer_pairs.extend(batch_transfer_pairs)
-            logger.info(f"Batch found {len(batch_transfer_pairs)} transfer pairs, total: {len(all_transfer_pairs)}")
-            
-            # Check if we've covered the full date range
-            if current_start <= requested_start:
-                break
-            
-            # Move to next batch with overlap
-            current_end = current_start + timedelta(days=overlap_days)
-        
-        logger.info(f"Total transfer pairs found across all batches: {len(all_transfer_pairs)}")
-        return all_transfer_pairs
 
     def _detect_transfers_in_date_range(
         self, 
         user_id: str, 
         start_date_ts: int,
-        end_date_ts: int
+        end_date_ts: int,
+        max_date_diff_days: int = TRANSFER_MAX_DATE_DIFF_DAYS
     ) -> List[Tuple[Transaction, Transaction]]:
         """
-        Fast transfer detection using sliding window algorithm.
+        Fast transfer detection using a single sweep over the date range.
         
-        Algorithm:
-        1. Sliding window moves back in time with 3-day overlap
-        2. Minimal memory usage - only essential transaction data
-        3. Sort by abs(amount) for efficient matching
-        4. Early termination when amount difference exceeds tolerance
+        Uncategorized transaction summaries are streamed once in ascending date
+        order and matched by _sweep_transfer_pairs; only the matched transactions
+        are then loaded in full.
         
         Args:
             user_id: The user ID
             start_date_ts: Start date timestamp in milliseconds
             end_date_ts: End date timestamp in milliseconds
+            max_date_diff_days: Maximum days between the two sides of a transfer
             
         Returns:
             List of all transfer pairs found in the date range
         """
-        from datetime import datetime, timedelta
-        
-        logger.info(f"Starting sliding window transfer detection for user {user_id}")
-        
-        # Convert to datetime for window calculations
-        start_date = datetime.fromtimestamp(start_date_ts / 1000)
-        end_date = datetime.fromtimestamp(end_date_ts / 1000)
+        logger.info(f"Starting transfer detection sweep for user {user_id}")
         
-        # Window parameters
-        window_days = 14  # 2-week windows
-        overlap_days = 3  # 3-day overlap
+        transactions = self._iter_user_transactions_in_range(user_id, start_date_ts, end_date_ts)
+        summary_pairs = list(self._sweep_transfer_pairs(transactions, set(), max_date_diff_days))
         
-        all_transfer_pairs = []
-        processed_tx_ids = set()
-        
-        # Calculate sliding window parameters
-        start_day_increment = window_days - overlap_days  # Days to move window start each iteration
-        total_days = (end_date - start_date).days
-        loop_size = max(1, (total_days // start_day_increment) + 1)  # Ensure at least 1 iteration
-        
-        logger.info(f"Sliding window: {total_days} total days, {start_day_increment} day increments, {loop_size} windows to process")
-        
-        # Process windows with simple for loop
-        for i in range(loop_size):
-            # Calculate window boundaries
-            current_end = end_date - timedelta(days=i * start_day_increment)
-            window_start = max(start_date, current_end - timedelta(days=window_days))
-            
-            # Convert to timestamps
-            window_start_ts = int(window_start.timestamp() * 1000)
-            window_end_ts = int(current_end.timestamp() * 1000)
-            
-            logger.info(f"Processing window {i+1}/{loop_size}: {window_start.date()} to {current_end.date()}")
-            
-            # Get transactions for this window
-            window_transactions = self._get_user_transactions_in_range(
-                user_id, window_start_ts, window_end_ts
-            )
-            
-            logger.info(f"Window returned {len(window_transactions)} transactions")
-            
-            if len(window_transactions) < 2:
-                logger.debug(f"Skipping window {i+1} - insufficient transactions for transfer detection")
-                continue
-            
-            # Find transfers in this window using amount-sorted algorithm
-            window_pairs = self._sliding_window_transfer_detection(
-                window_transactions, processed_tx_ids
-            )
-            
-            all_transfer_pairs.extend(window_pairs)
-            logger.debug(f"Window {i+1} found {len(window_pairs)} transfer pairs")
-        
-        logger.info(f"Sliding window completed: processed {loop_size} windows")
-        
-        logger.info(f"Sliding window algorithm found {len(all_transfer_pairs)} transfer pairs")
-        return all_transfer_pairs
-
-    def _get_user_transactions_in_range(self, user_id: str, start_date_ts: int, end_date_ts: int) -> List[Transaction]:
-        """Get uncategorized user transactions within a specific date range for transfer detection."""
-        from utils.db_utils import list_user_transactions
-        
-        # Get only uncategorized transactions within the date range with pagination
-        # This prevents detect from returning transactions that are already marked as transfers
-        all_transactions = []
-        last_evaluated_key = None
-        consecutive_empty_batches = 0
-        max_consecutive_empty_batches = 3  # Prevent infinite loops
-        
-        while True:
-            batch_result, last_evaluated_key, _ = list_user_transactions(
-                user_id=user_id,
-                start_date_ts=start_date_ts,
-                end_date_ts=end_date_ts,
-                last_evaluated_key=last_evaluated_key,
-                limit=1000,
-                ignore_dup=True,  # Only consider non-duplicate transactions for transfer detection
-                uncategorized_only=True  # Only get transactions without categories to avoid returning already marked transfers
-            )
-            
-            all_transactions.extend(batch_result)
-            
-            # Debug logging for pagination behavior
-            logger.debug(f"Pagination batch for user {user_id}: returned {len(batch_result)} items, "
-                        f"has_last_evaluated_key={last_evaluated_key is not None}, "
-                        f"total_so_far={len(all_transactions)}")
-            
-            if last_evaluated_key:
-                logger.debug(f"LastEvaluatedKey present: {last_evaluated_key}")
-            
-            # Track consecutive empty batches to prevent infinite loops
-            if len(batch_result) == 0:
-                consecutive_empty_batches += 1
-                logger.warning(f"Empty batch {consecutive_empty_batches}/{max_consecutive_empty_batches} for user {user_id} - "
-                              f"DynamoDB returned LastEvaluatedKey={last_evaluated_key is not None} with 0 items")
-                if consecutive_empty_batches >= max_consecutive_empty_batches:
-                    logger.warning(f"Breaking pagination after {consecutive_empty_batches} consecutive empty batches "
-                                  f"for user {user_id} - DynamoDB GSI pagination issue detected")
-                    break
-            else:
-                consecutive_empty_batches = 0  # Reset counter when we get results
-            
-            # Normal termination condition
-            if not last_evaluated_key:
-                logger.info(f"Pagination complete for user {user_id} - no more LastEvaluatedKey")
-                break
-        
-        logger.debug(f"Retrieved {len(all_transactions)} transactions for user {user_id} in range")
-        return all_transactions
+        logger.info(f"Transfer detection sweep found {len(summary_pairs)} transfer pairs")
+        return self._load_transfer_pairs(user_id, summary_pairs)
 
-    def _get_batch_transactions(
+    def _load_transfer_pairs(
         self,
         user_id: str,
-        start_date_ts: int,
-        end_date_ts: int
-    ) -> List[Transaction]:
-        """Get all uncategorized transactions for a specific date range batch."""
-        batch_transactions = []
-        last_evaluated_key = None
-        consecutive_empty_batches = 0
-        max_consecutive_empty_batches = 3  # Prevent infinite loops
-        
-        while True:
-            batch_result, last_evaluated_key, _ = list_user_transactions(
-                user_id=user_id,
-                uncategorized_only=True,
-                start_date_ts=start_date_ts,
-                end_date_ts=end_date_ts,
-                last_evaluated_key=last_evaluated_key,
-                limit=500  # Reasonable page size
-            )
-            
-            batch_transactions.extend(batch_result)
-            
-            # Debug logging for uncategorized transactions
-            logger.debug(f"Uncategorized batch for user {user_id}: returned {len(batch_result)} items, "
-                        f"has_last_evaluated_key={last_evaluated_key is not None}, "
-                        f"total_so_far={len(batch_transactions)}")
-            
-            # Track consecutive empty batches to prevent infinite loops
-            if len(batch_result) == 0:
-                consecutive_empty_batches += 1
-                logger.warning(f"Empty uncategorized batch {consecutive_empty_batches}/{max_consecutive_empty_batches} for user {user_id} - "
-                              f"DynamoDB returned LastEvaluatedKey={last_evaluated_key is not None} with 0 items")
-                if consecutive_empty_batches >= max_consecutive_empty_batches:
-                    logger.warning(f"Breaking uncategorized pagination after {consecutive_empty_batches} consecutive empty batches "
-                                  f"for user {user_id} - DynamoDB GSI pagination issue detected")
-                    break
-            else:
-                consecutive_empty_batches = 0  # Reset counter when we get results
-            
-            # Normal termination condition
-            if not last_evaluated_key:
-                logger.info(f"Uncategorized pagination complete for user {user_id} - no more LastEvaluatedKey")
-                break
-        
-        return batch_transactions
-
-    def _detect_transfers_in_batch(
-        self,
-        batch_transactions: List[Transaction],
-        date_range_days: int,
-        processed_global_ids: Set[str]
+        summary_pairs: List[Tuple[TransactionSummary, TransactionSummary]]
     ) -> List[Tuple[Transaction, Transaction]]:
-        """Detect transfer pairs within a single batch of transactions."""
-        # Group transactions by account
-        account_transactions = self._group_by_account(batch_transactions)
+        """
+        Load the full transactions for matched summary pairs.
         
-        # Find potential transfer pairs within this batch
-        batch_transfer_pairs = []
-        processed_batch_ids: Set[str] = set()
+        Matching runs on projected summaries; only the matched transactions are
+        fetched in full. Pairs with a side that can no longer be loaded are dropped.
+        """
+        if not summary_pairs:
+            return []
         
-        for account_id, transactions in account_transactions.items():
-            for tx in transactions:
-                tx_id = str(tx.transaction_id)
-                
-                # Skip if already processed globally or in this batch
-                if tx_id in processed_global_ids or tx_id in processed_batch_ids:
-                    continue
-                
-                # Look for matching transaction in other accounts within this batch
-                matching_tx = self._find_matching_transfer(
-                    tx, account_transactions, date_range_days, processed_batch_ids
-                )
-                
-                if matching_tx:
-                    matching_tx_id = str(matching_tx.transaction_id)
-                    
-                    # Skip if matching transaction was already processed globally
-                    if matching_tx_id in processed_global_ids:
-                        continue
-                    
-                    # Determine which is outgoing (negative) and incoming (positive)
-                    if tx.amount < 0 and matching_tx.amount > 0:
-                        batch_transfer_pairs.append((tx, matching_tx))
-                    elif tx.amount > 0 and matching_tx.amount < 0:
-                        batch_transfer_pairs.append((matching_tx, tx))
-                    
-                    # Mark both as processed in this batch and globally
-                    processed_batch_ids.add(tx_id)
-                    processed_batch_ids.add(matching_tx_id)
-                    processed_global_ids.add(tx_id)
-                    processed_global_ids.add(matching_tx_id)
+        transaction_ids = [
+            uuid.UUID(str(tx.transaction_id))
+            for pair in summary_pairs
+            for tx in pair
+        ]
+        loaded = {
+            str(tx.transaction_id): tx
+            for tx in get_transactions_by_ids(transaction_ids, user_id)
+        }
         
-        return batch_transfer_pairs
-    
-    def _sliding_window_transfer_detection(
-        self, 
-        transactions: List[Transaction], 
-        processed_tx_ids: Set[str]
-    ) -> List[Tuple[Transaction, Transaction]]:
+        transfer_pairs = []
+        for outgoing, incoming in summary_pairs:
+            outgoing_tx = loaded.get(str(outgoing.transaction_id))
+            incoming_tx = loaded.get(str(incoming.transaction_id))
+            if outgoing_tx is None or incoming_tx is None:
+                logger.warning(
+                    f"Dropping transfer pair {outgoing.transaction_id} <-> {incoming.transaction_id}: "
+                    "transaction could not be loaded"
+                )
+                continue
+            transfer_pairs.append((outgoing_tx, incoming_tx))
+        return transfer_pairs
+
+    def _iter_user_transactions_in_range(self, user_id: str, start_date_ts: int, end_date_ts: int) -> Iterator[TransactionSummary]:
+        """Stream uncategorized user transaction summaries within a date range, oldest first."""
+        # Only uncategorized transactions, so detect does not return transactions already marked as transfers.
+        # Matching only needs id, account, amount, currency and date, so fetch projected summaries.
+        return iter_user_transactions(
+            user_id=user_id,
+            start_date_ts=start_date_ts,
+            end_date_ts=end_date_ts,
+            sort_order_date='asc',
+            ignore_dup=True,  # Only consider non-duplicate transactions for transfer detection
+            uncategorized_only=True,
+            projection=TRANSACTION_SUMMARY_ATTRIBUTES,
+            transform=TransactionSummary.from_dynamodb_item
+        )
+
+    def _sweep_transfer_pairs(
+        self,
+        transactions: Iterable[TransferCandidate],
+        processed_tx_ids: Set[str],
+        max_date_diff_days: int = TRANSFER_MAX_DATE_DIFF_DAYS
+    ) -> Iterator[Tuple[TransferCandidate, TransferCandidate]]:
         """
-        Simple sliding window transfer detection with minimal memory usage.
+        Match transfer pairs in one pass over transactions in ascending date order.
         
-        Algorithm:
-        1. Convert to minimal transaction objects for memory efficiency
-        2. Sort by abs(amount) for efficient matching
-        3. For each transaction, look at earlier ones where amount + earlier.amount < tolerance
-        4. Early termination when amount difference is too large
+        Unmatched transactions from the last max_date_diff_days days are kept in a
+        buffer indexed by (sign, amount in cents). Each transaction looks up the
+        opposite-signed buckets for its amount and the cent either side (for the
+        0.01 tolerance) instead of scanning the buffer. Of the candidates in a
+        different account with a compatible currency, the closest amount wins,
+        then the closest date.
         
         Args:
-            transactions: List of transactions in current window
-            processed_tx_ids: Set of already processed transaction IDs
+            transactions: Transactions or transaction summaries, oldest first
+            processed_tx_ids: IDs to skip; matched IDs are added to it
+            max_date_diff_days: Maximum days between the two sides of a transfer
             
-        Returns:
-            List of transfer pairs (outgoing, incoming)
+        Yields:
+            Transfer pairs (outgoing, incoming) of the input objects, as they are found
         """
-        # Convert to minimal objects for memory efficiency
-        minimal_txs = []
-        tx_lookup = {}  # Map minimal tx back to full transaction
+        max_date_diff_ms = max_date_diff_days * 24 * 60 * 60 * 1000
+        buckets: Dict[Tuple[bool, int], Deque[Tuple[MinimalTransaction, TransferCandidate]]] = {}
+        buffered: Deque[Tuple[Tuple[bool, int], Tuple[MinimalTransaction, TransferCandidate]]] = deque()
         
         for tx in transactions:
             tx_id = str(tx.transaction_id)
-            if tx_id in processed_tx_ids:
+            if tx_id in processed_tx_ids or not tx.amount:
                 continue
-                
             minimal_tx = MinimalTransaction(
                 transaction_id=tx_id,
                 account_id=str(tx.account_id),
                 amount=tx.amount,
                 date=tx.date,
-                abs_amount=abs(tx.amount)
+                abs_amount=abs(tx.amount),
+                currency=_currency_code(getattr(tx, 'currency', None))
             )
-            minimal_txs.append(minimal_tx)
-            tx_lookup[tx_id] = tx
-        
-        if len(minimal_txs) < 2:
-            return []
-        
-        # Sort by abs(amount) for efficient matching
-        minimal_txs.sort(key=lambda tx: tx.abs_amount)
-        
-        transfer_pairs = []
-        matched_ids = set()
-        tolerance = Decimal('0.01')
-        max_date_diff_ms = 7 * 24 * 60 * 60 * 1000  # 7 days
-        
-        logger.debug(f"Processing {len(minimal_txs)} transactions in window")
-        
-        # For each transaction, look at earlier ones in the sorted list
-        for i, tx in enumerate(minimal_txs):
-            if tx.transaction_id in matched_ids:
+            
+            # Drop buffered transactions too old to match this one or any later one
+            while buffered and buffered[0][1][0].date < minimal_tx.date - max_date_diff_ms:
+                key, entry = buffered.popleft()
+                bucket = buckets.get(key)
+                if bucket and bucket[0] is entry:
+                    bucket.popleft()
+                    if not bucket:
+                        del buckets[key]
+            
+            cents = int((minimal_tx.abs_amount * 100).to_integral_value(rounding=ROUND_FLOOR))
+            opposite = minimal_tx.amount < 0
+            match = None
+            best_rank = None
+            for key in ((opposite, cents), (opposite, cents - 1), (opposite, cents + 1)):
+                for entry in buckets.get(key, ()):
+                    candidate = entry[0]
+                    if candidate.account_id == minimal_tx.account_id:
+                        continue
+                    if candidate.currency and minimal_tx.currency and candidate.currency != minimal_tx.currency:
+                        continue
+                    amount_diff = abs(candidate.abs_amount - minimal_tx.abs_amount)
+                    if amount_diff > TRANSFER_AMOUNT_TOLERANCE:
+                        continue
+                    rank = (amount_diff, abs(minimal_tx.date - candidate.date))
+                    if best_rank is None or rank < best_rank:
+                        match, match_key, best_rank = entry, key, rank
+            
+            if match is None:
+                key = (minimal_tx.amount > 0, cents)
+                entry = (minimal_tx, tx)
+                buckets.setdefault(key, deque()).append(entry)
+                buffered.append((key, entry))
                 continue
             
-            # Look at earlier transactions in reverse order (closest amounts first)
-            for j in range(i - 1, -1, -1):
-                earlier_tx = minimal_txs[j]
-                
-                if earlier_tx.transaction_id in matched_ids:
-                    continue
-                
-                # Early termination: if amount difference is too large, break
-                # Since list is sorted, all earlier transactions will have even larger differences
-                amount_diff = abs(tx.abs_amount - earlier_tx.abs_amount)
-                if amount_diff > tolerance:
-                    break  # No point checking further - all earlier amounts are smaller
-                
-                # Check if amounts sum to near zero (transfer condition)
-                amount_sum = abs(tx.amount + earlier_tx.amount)
-                if amount_sum > tolerance:
-                    continue
-                
-                # Must be different accounts
-                if tx.account_id == earlier_tx.account_id:
-                    continue
-                
-                # Must be within date window
-                date_diff = abs(tx.date - earlier_tx.date)
-                if date_diff > max_date_diff_ms:
-                    continue
-                
-                # Must have opposite signs
-                if (tx.amount > 0 and earlier_tx.amount > 0) or (tx.amount < 0 and earlier_tx.amount < 0):
-                    continue
-                
-                # Found a match!
-                tx_full = tx_lookup[tx.transaction_id]
-                earlier_tx_full = tx_lookup[earlier_tx.transaction_id]
-                
-                # Determine outgoing vs incoming
-                if tx.amount < 0:
-                    transfer_pairs.append((tx_full, earlier_tx_full))  # (outgoing, incoming)
-                else:
-                    transfer_pairs.append((earlier_tx_full, tx_full))  # (outgoing, incoming)
-                
-                # Mark both as matched
-                matched_ids.add(tx.transaction_id)
-                matched_ids.add(earlier_tx.transaction_id)
-                processed_tx_ids.add(tx.transaction_id)
-                processed_tx_ids.add(earlier_tx.transaction_id)
-                
-                logger.debug(f"Matched transfer: {tx.transaction_id} <-> {earlier_tx.transaction_id}")
-                break  # Found match for this transaction, move to next
-        
-        logger.debug(f"Window found {len(transfer_pairs)} transfer pairs")
-        return transfer_pairs
+            bucket = buckets[match_key]
+            bucket.remove(match)
+            if not bucket:
+                del buckets[match_key]
+            processed_tx_ids.add(tx_id)
+            processed_tx_ids.add(match[0].transaction_id)
+            logger.debug(f"Matched transfer: {tx_id} <-> {match[0].transaction_id}")
+            
+            # Determine outgoing vs incoming
+            yield (tx, match[1]) if minimal_tx.amount < 0 else (match[1], tx)
 
-    def _group_by_account(self, transactions: List[Transaction]) -> Dict[str, List[Transaction]]:
-        """Group transactions by account ID."""
-        account_groups = {}
-        for tx in transactions:
-            account_key = str(tx.account_id)
-            if account_key not in account_groups:
-                account_groups[account_key] = []
-            account_groups[account_key].append(tx)
-        return account_groups
-    
-    def _find_matching_transfer(
-        self, 
-        transaction: Transaction, 
-        account_transactions: Dict[str, List[Transaction]], 
-        date_range_days: int,
-        processed_ids: Set[str]
-    ) -> Optional[Transaction]:
-        """
-        Find a matching transaction that could be the other side of a transfer.
-        
-        Matching criteria:
-        1. Different account
-        2. Opposite amount (within tolerance)
-        3. Within date range
-        4. Not already processed
+    def find_transfer_pairs(
+        self,
+        transactions: Iterable[TransferCandidate],
+        processed_tx_ids: Optional[Set[str]] = None,
+        max_date_diff_days: int = TRANSFER_MAX_DATE_DIFF_DAYS
+    ) -> List[Tuple[TransferCandidate, TransferCandidate]]:
         """
-        tx_date = datetime.fromtimestamp(transaction.date / 1000)
-        date_tolerance = timedelta(days=date_range_days)
-        amount_tolerance = Decimal('0.01')  # Allow for small rounding differences
+        Pair up transfer transactions given in any order.
         
-        current_account = str(transaction.account_id)
+        Sorts by date and runs the indexed sweep, so pairing n transactions is
+        O(n log n) rather than comparing every pair. Used both for detection and
+        for re-pairing transactions already categorized as transfers.
         
-        for account_id, transactions in account_transactions.items():
-            if account_id == current_account:
-                continue  # Skip same account
+        Args:
+            transactions: Transactions or transaction summaries
+            processed_tx_ids: IDs to skip; matched IDs are added to it
+            max_date_diff_days: Maximum days between the two sides of a transfer
             
-            for candidate in transactions:
-                if str(candidate.transaction_id) in processed_ids:
-                    continue
-                
-                # Check date range
-                candidate_date = datetime.fromtimestamp(candidate.date / 1000)
-                if abs((tx_date - candidate_date).total_seconds()) > date_tolerance.total_seconds():
-                    continue
-                
-                # Check if amounts are opposite (within tolerance)
-                if abs(abs(transaction.amount) - abs(candidate.amount)) <= amount_tolerance:
-                    # Check if one is positive and one is negative
-                    if (transaction.amount > 0 and candidate.amount < 0) or \
-                       (transaction.amount < 0 and candidate.amount > 0):
-                        return candidate
-        
-        return None
-    
+        Returns:
+            List of transfer pairs (outgoing, incoming) of the input objects
+        """
+        ordered = sorted(transactions, key=lambda tx: tx.date)
+        if processed_tx_ids is None:
+            processed_tx_ids = set()
+        transfer_pairs = list(self._sweep_transfer_pairs(ordered, processed_tx_ids, max_date_diff_days))
+        logger.debug(f"Found {len(transfer_pairs)} transfer pairs among {len(ordered)} transactions")
+        return transfer_pairs
+
     def _get_transfer_category_ids(self, user_id: str) -> Set[str]:
         """Get the category IDs for transfer categories for this user."""
         if user_id in self._transfer_category_ids_cache:
@@ -578,7 +330,7 @@ class TransferDetectionService:
             logger.warning(f"Error getting transfer categories for user {user_id}: {str(e)}")
             return set()
     
-    def _is_already_transfer(self, transaction: Transaction) -> bool:
+    def is_transfer(self, transaction: Transaction) -> bool:
         """Check if transaction is already categorized as a transfer."""
         if not transaction.categories:
             return False
@@ -646,7 +398,13 @@ class TransferDetectionService:
             logger.error(f"Error getting/creating transfer category for user {user_id}: {str(e)}")
             raise
     
-    def mark_as_transfer_pair(self, outgoing_tx: Transaction, incoming_tx: Transaction, user_id: str) -> bool:
+    def mark_as_transfer_pair(
+        self,
+        outgoing_tx: Transaction,
+        incoming_tx: Transaction,
+        user_id: str,
+        mark_rollups: bool = True
+    ) -> bool:
         """
         Mark two transactions as a transfer pair.
         
@@ -654,6 +412,9 @@ class TransferDetectionService:
             outgoing_tx: The outgoing transaction (negative amount)
             incoming_tx: The incoming transaction (positive amount)
             user_id: The user ID
+            mark_rollups: Flag the analytics rollups of both transactions as
+                stale. Callers marking many pairs pass False and flag all
+                marked transactions once.
             
         Returns:
             bool: True if successful, False otherwise
@@ -665,9 +426,15 @@ class TransferDetectionService:
             outgoing_tx.add_manual_category(transfer_category.categoryId, set_as_primary=True)
             incoming_tx.add_manual_category(transfer_category.categoryId, set_as_primary=True)
             
+            # Store the pair link on both sides so paired transfers can be listed without re-pairing
+            outgoing_tx.paired_transaction_id = incoming_tx.transaction_id
+            incoming_tx.paired_transaction_id = outgoing_tx.transaction_id
+            
             # Update both transactions in database
             update_transaction(outgoing_tx)
             update_transaction(incoming_tx)
+            if mark_rollups:
+                mark_transaction_rollups_stale([outgoing_tx, incoming_tx])
             
             logger.info(f"Marked transactions {outgoing_tx.transaction_id} and {incoming_tx.transaction_id} as transfer pair")
             return True
@@ -676,7 +443,68 @@ class TransferDetectionService:
             logger.error(f"Error marking transfer pair: {str(e)}")
             return False
     
+    def unlink_transfer_pair(self, transaction: Transaction, user_id: str) -> None:
+        """
+        Clear the stored pair link of a transaction and of its partner.
+
+        The partner is only cleared (and saved) if it still links back to the
+        transaction. The transaction itself is modified but not saved; the
+        caller writes it along with its other changes.
+
+        Args:
+            transaction: Transaction whose pair link is removed
+            user_id: The user ID
+        """
+        partner_id = transaction.paired_transaction_id
+        if partner_id is None:
+            return
+        transaction.paired_transaction_id = None
+
+        for partner in get_transactions_by_ids([partner_id], user_id):
+            if partner.paired_transaction_id == transaction.transaction_id:
+                partner.paired_transaction_id = None
+                update_transaction(partner)
+
+        logger.info(f"Unlinked transfer pair {transaction.transaction_id} <-> {partner_id}")
 
+    def link_existing_transfer_pairs(self, user_id: str) -> int:
+        """
+        Store pair links for transfer-categorized transactions that have none.
+        
+        Transactions marked as transfers before pair links were stored are
+        re-paired once with the indexed sweep and both sides are updated, so
+        they show up in the stored-pair listing.
+        
+        Args:
+            user_id: The user ID
+            
+        Returns:
+            Number of pairs linked
+        """
+        transfer_category_ids = list(self._get_transfer_category_ids(user_id))
+        if not transfer_category_ids:
+            return 0
+        
+        unlinked = [
+            tx for tx in iter_user_transactions(
+                user_id=user_id,
+                category_ids=transfer_category_ids,
+                sort_order_date='asc',
+                page_size=500
+            )
+            if tx.paired_transaction_id is None
+        ]
+        
+        linked_count = 0
+        for outgoing_tx, incoming_tx in self.find_transfer_pairs(unlinked):
+            outgoing_tx.paired_transaction_id = incoming_tx.transaction_id
+            incoming_tx.paired_transaction_id = outgoing_tx.transaction_id
+            update_transaction(outgoing_tx)
+            update_transaction(incoming_tx)
+            linked_count += 1
+        
+        logger.info(f"Linked {linked_count} existing transfer pairs among {len(unlinked)} unlinked transactions for user {user_id}")
+        return linked_count
     
     def _transactions_could_be_transfer_pair(self, tx1: Transaction, tx2: Transaction) -> bool:
         """Check if two transactions could be a transfer pair."""
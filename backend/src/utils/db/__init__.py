@@ -48,10 +48,17 @@ from .helpers import (
     batch_delete_items,
     batch_write_items,
     batch_update_items,
+    parallel_batch_write_items,
+    grouped_update_items,
+    batch_get_items,
+    BatchWriteResult,
+    BatchGetResult,
     
     # Pagination
     paginated_query,
     paginated_scan,
+    build_projection_expression,
+    with_projection,
     
     # Update expressions
     build_update_expression,
@@ -88,16 +95,25 @@ from .accounts import (
 
 from .transactions import (
     list_file_transactions,
+    list_file_transaction_summaries,
     list_user_transactions,
+    iter_user_transactions,
+    iter_user_transactions_by_key,
+    list_transfer_pairs,
+    count_transfer_pairs,
     create_transaction,
+    batch_create_transactions,
     delete_transactions_for_file,
     list_account_transactions,
     update_transaction_statuses_by_status,
     get_transaction_by_account_and_hash,
     check_duplicate_transaction,
+    get_account_transaction_hashes,
     update_transaction,
+    mark_transaction_rollups_stale,
     get_first_transaction_date,
     get_last_transaction_date,
+    get_user_transaction_date_range,
     get_latest_transaction,
     checked_mandatory_transaction,
     checked_optional_transaction,
@@ -126,6 +142,7 @@ from .files import (
     get_account_default_file_map,
     create_file_map,
     update_file_map,
+    update_file_map_date_format,
     delete_file_map,
     list_file_maps_by_user,
     list_account_file_maps,
@@ -164,6 +181,16 @@ from .analytics import (
     list_analytics_status_for_user,
     update_analytics_status,
     list_stale_analytics,
+    
+    # Monthly rollups
+    list_monthly_rollups,
+    get_monthly_rollup,
+    store_monthly_rollup,
+    replace_account_rollups,
+    get_rollup_state,
+    mark_rollups_built,
+    mark_rollups_stale,
+    take_stale_rollups,
 )
 
 # ============================================================================
@@ -177,6 +204,7 @@ from .fzip import (
     list_user_fzip_jobs,
     delete_fzip_job,
     cleanup_expired_fzip_jobs,
+    batch_restore_items,
 )
 
 # ============================================================================
@@ -228,10 +256,17 @@ __all__ = [
     'batch_delete_items',
     'batch_write_items',
     'batch_update_items',
+    'parallel_batch_write_items',
+    'grouped_update_items',
+    'batch_get_items',
+    'BatchWriteResult',
+    'BatchGetResult',
     
     # Pagination
     'paginated_query',
     'paginated_scan',
+    'build_projection_expression',
+    'with_projection',
     
     # Update expressions
     'build_update_expression',
@@ -258,16 +293,25 @@ __all__ = [
     
     # Transaction operations
     'list_file_transactions',
+    'list_file_transaction_summaries',
     'list_user_transactions',
+    'iter_user_transactions',
+    'iter_user_transactions_by_key',
+    'list_transfer_pairs',
+    'count_transfer_pairs',
     'create_transaction',
+    'batch_create_transactions',
     'delete_transactions_for_file',
     'list_account_transactions',
     'update_transaction_statuses_by_status',
     'get_transaction_by_account_and_hash',
     'check_duplicate_transaction',
+    'get_account_transaction_hashes',
     'update_transaction',
+    'mark_transaction_rollups_stale',
     'get_first_transaction_date',
     'get_last_transaction_date',
+    'get_user_transaction_date_range',
     'get_latest_transaction',
     'checked_mandatory_transaction',
     'checked_optional_transaction',
@@ -289,6 +333,7 @@ __all__ = [
     'get_account_default_file_map',
     'create_file_map',
     'update_file_map',
+    'update_file_map_date_format',
     'delete_file_map',
     'list_file_maps_by_user',
     'list_account_file_maps',
@@ -314,6 +359,14 @@ __all__ = [
     'list_analytics_status_for_user',
     'update_analytics_status',
     'list_stale_analytics',
+    'list_monthly_rollups',
+    'get_monthly_rollup',
+    'store_monthly_rollup',
+    'replace_account_rollups',
+    'get_rollup_state',
+    'mark_rollups_built',
+    'mark_rollups_stale',
+    'take_stale_rollups',
     
     # FZIP operations
     'create_fzip_job',
@@ -322,6 +375,7 @@ __all__ = [
     'list_user_fzip_jobs',
     'delete_fzip_job',
     'cleanup_expired_fzip_jobs',
+    'batch_restore_items',
     
     # Workflow operations
     'checked_mandatory_workflow',
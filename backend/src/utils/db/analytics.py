@@ -5,23 +5,26 @@ This module provides CRUD operations for analytics data and processing status.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from datetime import date, datetime
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Key, Attr
 from boto3.dynamodb.types import Binary
+from botocore.exceptions import ClientError
 
 from models import (
     AnalyticsData,
     AnalyticsProcessingStatus,
     AnalyticType,
+    MonthlyRollup,
 )
 from .base import (
     tables,
     dynamodb_operation,
     retry_on_throttle,
     monitor_performance,
+    ConflictError,
 )
-from .helpers import batch_write_items
+from .helpers import batch_write_items, batch_delete_items, paginated_query, current_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -348,3 +351,238 @@ def list_stale_analytics(computation_needed_only: bool = True) -> List[Analytics
     
     return status_list
 
+
+# =============================================================================
+# Monthly Rollup Operations
+# =============================================================================
+
+# Sort key of the marker item recording that a user's rollups have been built
+ROLLUP_STATE_SK = 'state'
+
+# Bump when the rollup layout changes; rollups built with an older version
+# are treated as not built and rebuilt from transactions on next use
+ROLLUP_SCHEMA_VERSION = 2
+
+
+def _rollup_pk(user_id: str) -> str:
+    return f"{user_id}#rollup"
+
+
+@monitor_performance(operation_type="query", warn_threshold_ms=500)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("list_monthly_rollups")
+def list_monthly_rollups(user_id: str, account_id: Optional[str] = None) -> List[MonthlyRollup]:
+    """
+    List all monthly rollups for a user, optionally for a single account.
+    
+    Args:
+        user_id: The user ID
+        account_id: Optional account ID to filter by
+        
+    Returns:
+        List of MonthlyRollup objects ordered by month
+    """
+    filter_expression = Attr('sk').ne(ROLLUP_STATE_SK)
+    if account_id:
+        filter_expression = filter_expression & Attr('accountId').eq(account_id)
+    
+    query_params: Dict[str, Any] = {
+        'KeyConditionExpression': Key('pk').eq(_rollup_pk(user_id)),
+        'FilterExpression': filter_expression
+    }
+    
+    rollups, _ = paginated_query(
+        table=tables.analytics_data,
+        query_params=query_params,
+        transform=MonthlyRollup.from_dynamodb_item
+    )
+    return rollups
+
+
+@monitor_performance(warn_threshold_ms=200)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("get_monthly_rollup")
+def get_monthly_rollup(user_id: str, month: str, account_id: str) -> Optional[MonthlyRollup]:
+    """
+    Retrieve the rollup for one account and month.
+    
+    Args:
+        user_id: The user ID
+        month: Month in YYYY-MM format
+        account_id: The account ID
+        
+    Returns:
+        MonthlyRollup object if found, None otherwise
+    """
+    response = tables.analytics_data.get_item(
+        Key={'pk': _rollup_pk(user_id), 'sk': MonthlyRollup.sort_key(month, account_id)},
+        ConsistentRead=True
+    )
+    
+    if 'Item' in response:
+        return MonthlyRollup.from_dynamodb_item(response['Item'])
+    return None
+
+
+@monitor_performance(warn_threshold_ms=300)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("store_monthly_rollup")
+def store_monthly_rollup(rollup: MonthlyRollup) -> None:
+    """
+    Store a rollup using optimistic locking on its version.
+    
+    The write only succeeds if the stored version still equals rollup.version
+    (or no item exists yet); the stored item gets version + 1.
+    
+    Args:
+        rollup: The MonthlyRollup to store
+        
+    Raises:
+        ConflictError: If the rollup was changed concurrently
+    """
+    item = rollup.to_dynamodb_item()
+    item['version'] = rollup.version + 1
+    
+    try:
+        tables.analytics_data.put_item(
+            Item=item,
+            ConditionExpression=Attr('pk').not_exists() | Attr('version').eq(rollup.version)
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            raise ConflictError(
+                f"Rollup {rollup.month}#{rollup.account_id} for user {rollup.user_id} was modified concurrently"
+            )
+        raise
+    rollup.version = item['version']
+
+
+@monitor_performance(warn_threshold_ms=1000)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("replace_account_rollups")
+def replace_account_rollups(user_id: str, account_id: str, rollups: List[MonthlyRollup]) -> None:
+    """
+    Replace every rollup of an account with the given set.
+    
+    Months that are no longer present are deleted. Used when rebuilding an
+    account's rollups from its transactions.
+    
+    Args:
+        user_id: The user ID
+        account_id: The account ID
+        rollups: The complete new set of rollups for the account
+    """
+    existing = {rollup.month: rollup for rollup in list_monthly_rollups(user_id, account_id)}
+    new_months = {rollup.month for rollup in rollups}
+    stale = [rollup for month, rollup in existing.items() if month not in new_months]
+    
+    # Bump versions so that a delta computed against the old item fails its condition
+    for rollup in rollups:
+        previous = existing.get(rollup.month)
+        rollup.version = previous.version + 1 if previous else 1
+    
+    if rollups:
+        batch_write_items(
+            table=tables.analytics_data,
+            items=[rollup.to_dynamodb_item() for rollup in rollups]
+        )
+    if stale:
+        batch_delete_items(
+            table=tables.analytics_data,
+            items=stale,
+            key_extractor=lambda r: {'pk': _rollup_pk(user_id), 'sk': MonthlyRollup.sort_key(r.month, r.account_id)}
+        )
+    
+    logger.info(
+        f"Replaced rollups for account {account_id}: {len(rollups)} months stored, "
+        f"{len(stale)} removed"
+    )
+
+
+@monitor_performance(warn_threshold_ms=200)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("get_rollup_state")
+def get_rollup_state(user_id: str) -> Optional[int]:
+    """
+    Return when the user's rollups were last fully built (ms since epoch), or None.
+    
+    Deltas are only applied once a full build exists; before that the next
+    build picks up every transaction anyway. Rollups built with an older
+    ROLLUP_SCHEMA_VERSION count as not built.
+    """
+    response = tables.analytics_data.get_item(
+        Key={'pk': _rollup_pk(user_id), 'sk': ROLLUP_STATE_SK}
+    )
+    
+    item = response.get('Item')
+    if item and int(item.get('schemaVersion', 1)) == ROLLUP_SCHEMA_VERSION:
+        return int(item['builtAt'])
+    return None
+
+
+@monitor_performance(warn_threshold_ms=200)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("mark_rollups_built")
+def mark_rollups_built(user_id: str) -> None:
+    """Record that the user's rollups have been fully built from transactions."""
+    tables.analytics_data.put_item(Item={
+        'pk': _rollup_pk(user_id),
+        'sk': ROLLUP_STATE_SK,
+        'builtAt': current_timestamp(),
+        'schemaVersion': ROLLUP_SCHEMA_VERSION
+    })
+
+
+@monitor_performance(warn_threshold_ms=200)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("mark_rollups_stale")
+def mark_rollups_stale(user_id: str, rollup_keys: Iterable[Tuple[str, str]]) -> None:
+    """
+    Record rollups whose transactions changed outside of a file import.
+    
+    Does nothing until the user's rollups have been built.
+    
+    Args:
+        user_id: The user ID
+        rollup_keys: (account_id, month) pairs of the affected rollups
+    """
+    sort_keys = {MonthlyRollup.sort_key(month, account_id) for account_id, month in rollup_keys}
+    if not sort_keys:
+        return
+    
+    try:
+        tables.analytics_data.update_item(
+            Key={'pk': _rollup_pk(user_id), 'sk': ROLLUP_STATE_SK},
+            UpdateExpression='ADD staleRollups :keys',
+            ConditionExpression=Attr('pk').exists(),
+            ExpressionAttributeValues={':keys': sort_keys}
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+
+
+@monitor_performance(warn_threshold_ms=200)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("take_stale_rollups")
+def take_stale_rollups(user_id: str) -> List[Tuple[str, str]]:
+    """
+    Remove and return the rollups recorded by mark_rollups_stale.
+    
+    Returns:
+        (account_id, month) pairs of the rollups to recompute
+    """
+    try:
+        response = tables.analytics_data.update_item(
+            Key={'pk': _rollup_pk(user_id), 'sk': ROLLUP_STATE_SK},
+            UpdateExpression='REMOVE staleRollups',
+            ConditionExpression=Attr('staleRollups').exists(),
+            ReturnValues='UPDATED_OLD'
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            return []
+        raise
+    
+    sort_keys = response.get('Attributes', {}).get('staleRollups', set())
+    return [tuple(reversed(sort_key.split('#', 1))) for sort_key in sorted(sort_keys)]
@@ -314,9 +314,10 @@ def _cleanup_transaction_category_references(category_id: uuid.UUID, user_id: st
         Number of transactions that were cleaned up
     """
     # Import here to avoid circular dependency
-    from .transactions import list_user_transactions, update_transaction
+    from .transactions import list_user_transactions, update_transaction, mark_transaction_rollups_stale
     
     cleaned_count = 0
+    cleaned = []
     
     # Get all transactions that reference this category either as primary or in categories list
     # We need to scan through all user transactions since DynamoDB doesn't have a direct way
@@ -371,11 +372,13 @@ def _cleanup_transaction_category_references(category_id: uuid.UUID, user_id: st
             # Update transaction if it was modified
             if transaction_updated:
                 update_transaction(transaction)
+                cleaned.append(transaction)
                 cleaned_count += 1
         
         # If we got fewer transactions than requested, we're done
         if not last_evaluated_key:
             break
     
+    mark_transaction_rollups_stale(cleaned)
     return cleaned_count
 
@@ -494,6 +494,32 @@ def update_file_map(file_map: FileMap) -> None:
     logger.info(f"Successfully updated file map {str(file_map.file_map_id)}")
 
 
+@monitor_performance(warn_threshold_ms=300)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("update_file_map_date_format")
+def update_file_map_date_format(file_map_id: uuid.UUID, date_format: str) -> None:
+    """
+    Store the date format inferred for a file map's files.
+    
+    Only the dateFormat and updatedAt attributes are written, so concurrent
+    edits to the mappings are not overwritten.
+    
+    Args:
+        file_map_id: The unique identifier of the file map
+        date_format: strptime format of the date column
+    """
+    tables.file_maps.update_item(
+        Key={'fileMapId': str(file_map_id)},
+        UpdateExpression="SET dateFormat = :dateFormat, updatedAt = :updatedAt",
+        ConditionExpression="attribute_exists(fileMapId)",
+        ExpressionAttributeValues={
+            ":dateFormat": date_format,
+            ":updatedAt": int(datetime.now(timezone.utc).timestamp() * 1000)
+        }
+    )
+    logger.info(f"Stored date format '{date_format}' on file map {str(file_map_id)}")
+
+
 @monitor_performance(warn_threshold_ms=300)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("delete_file_map")
@@ -17,10 +17,19 @@ from .base import (
     retry_on_throttle,
     monitor_performance,
 )
-from .helpers import batch_delete_items
+from .helpers import BatchWriteResult, batch_delete_items, parallel_batch_write_items
 
 logger = logging.getLogger(__name__)
 
+# Table (attribute of `tables`) that each restored package entity type is written to
+RESTORE_ENTITY_TABLES = {
+    'accounts': 'accounts',
+    'categories': 'categories',
+    'file_maps': 'file_maps',
+    'transaction_files': 'files',
+    'transactions': 'transactions',
+}
+
 
 # ============================================================================
 # CRUD Operations
@@ -41,6 +50,34 @@ def create_fzip_job(fzip_job: FZIPJob) -> None:
     logger.info(f"Created FZIP job: {fzip_job.job_id} for user {fzip_job.user_id}")
 
 
+@monitor_performance(operation_type="batch_write", warn_threshold_ms=2000)
+@dynamodb_operation("batch_restore_items")
+def batch_restore_items(entity_type: str, items: List[Dict[str, Any]], max_workers: int = 4) -> BatchWriteResult:
+    """
+    Write restored entity items with parallel BatchWriteItem calls.
+    
+    Items are written as-is, so callers must already have converted them to
+    DynamoDB format. Unprocessed items are retried with backoff; items that
+    still fail are returned in the result for per-record error reporting.
+    
+    Args:
+        entity_type: Package entity type (accounts, categories, file_maps,
+            transaction_files or transactions)
+        items: DynamoDB items to write
+        max_workers: Number of 25-item chunks written concurrently
+        
+    Returns:
+        BatchWriteResult with written count and failed items
+        
+    Raises:
+        ValueError: If the entity type has no restore table
+    """
+    if entity_type not in RESTORE_ENTITY_TABLES:
+        raise ValueError(f"Unknown restore entity type: {entity_type}")
+    table = getattr(tables, RESTORE_ENTITY_TABLES[entity_type])
+    return parallel_batch_write_items(table=table, items=items, max_workers=max_workers)
+
+
 @monitor_performance(warn_threshold_ms=200)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("get_fzip_job")
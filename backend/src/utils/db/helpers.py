@@ -2,18 +2,24 @@
 Helper functions for database operations.
 
 This module provides:
-- Batch operation helpers
+- Batch operation helpers (including retrying, parallel BatchWriteItem and BatchGetItem)
 - Pagination helpers
 - UUID conversion helpers
 - Query building helpers
 """
 
 import logging
+import random
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional, Union, Tuple, Callable, TypeVar, Sequence
 from decimal import Decimal
 
+from botocore.exceptions import ClientError
+
 logger = logging.getLogger(__name__)
 
 # Type variable for generic functions
@@ -241,15 +247,457 @@ def batch_update_items(
     return count
 
 
+# DynamoDB error codes that indicate a retryable capacity problem
+THROTTLE_ERROR_CODES = (
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+)
+
+
+@dataclass
+class BatchWriteResult:
+    """Outcome of a parallel batch write."""
+    written_count: int = 0
+    failed_items: List[Dict[str, Any]] = field(default_factory=list)
+    retries_used: int = 0
+
+    @property
+    def failed_count(self) -> int:
+        return len(self.failed_items)
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.05, max_delay: float = 2.0) -> float:
+    """
+    Exponential backoff delay with full jitter.
+    
+    Args:
+        attempt: Zero-based retry attempt
+        base_delay: Delay for the first retry in seconds
+        max_delay: Ceiling for the delay in seconds
+    
+    Returns:
+        Delay in seconds, uniformly drawn from [0, min(max_delay, base_delay * 2^attempt)]
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _write_chunk_with_retry(
+    table: Any,
+    chunk: List[Dict[str, Any]],
+    max_retries: int,
+    base_delay: float,
+    max_delay: float
+) -> BatchWriteResult:
+    """
+    Write a single BatchWriteItem chunk (<= 25 items), retrying UnprocessedItems.
+    
+    Items still unprocessed after max_retries, or rejected by a non-throttling
+    error, are returned in failed_items.
+    """
+    result = BatchWriteResult()
+    pending = [{'PutRequest': {'Item': item}} for item in chunk]
+    attempt = 0
+    
+    while pending:
+        try:
+            response = table.meta.client.batch_write_item(
+                RequestItems={table.name: pending}
+            )
+            unprocessed = response.get('UnprocessedItems', {}).get(table.name, [])
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            if error_code not in THROTTLE_ERROR_CODES:
+                logger.error(f"Batch write chunk rejected ({error_code}): {e}")
+                result.failed_items.extend(req['PutRequest']['Item'] for req in pending)
+                return result
+            unprocessed = pending
+        
+        result.written_count += len(pending) - len(unprocessed)
+        pending = unprocessed
+        
+        if not pending:
+            break
+        if attempt >= max_retries:
+            logger.warning(
+                f"Giving up on {len(pending)} unprocessed items for {table.name} "
+                f"after {max_retries} retries"
+            )
+            result.failed_items.extend(req['PutRequest']['Item'] for req in pending)
+            break
+        
+        time.sleep(backoff_delay(attempt, base_delay, max_delay))
+        attempt += 1
+        result.retries_used += 1
+    
+    return result
+
+
+def parallel_batch_write_items(
+    table: Any,
+    items: List[Dict[str, Any]],
+    batch_size: int = 25,
+    max_workers: int = 4,
+    max_retries: int = 5,
+    base_delay: float = 0.05,
+    max_delay: float = 2.0
+) -> BatchWriteResult:
+    """
+    Write items with concurrent BatchWriteItem calls, retrying unprocessed items.
+    
+    Unlike batch_write_items (which hides UnprocessedItems inside
+    table.batch_writer), this reports exactly which items could not be written
+    so callers can surface per-row failures.
+    
+    Args:
+        table: DynamoDB table resource
+        items: List of item dicts to write
+        batch_size: Items per BatchWriteItem call (DynamoDB limit is 25)
+        max_workers: Number of chunks written concurrently
+        max_retries: Retries per chunk for UnprocessedItems / throttling
+        base_delay: Initial backoff delay in seconds
+        max_delay: Maximum backoff delay in seconds
+    
+    Returns:
+        BatchWriteResult with written count and the items that failed
+    
+    Example:
+        result = parallel_batch_write_items(
+            table=tables.transactions,
+            items=[tx.to_dynamodb_item() for tx in transactions]
+        )
+        if result.failed_items:
+            ...
+    """
+    if not items:
+        logger.debug("No items to write")
+        return BatchWriteResult()
+    
+    batch_size = min(batch_size, 25)
+    chunks = [items[i:i+batch_size] for i in range(0, len(items), batch_size)]
+    combined = BatchWriteResult()
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        futures = [
+            executor.submit(_write_chunk_with_retry, table, chunk, max_retries, base_delay, max_delay)
+            for chunk in chunks
+        ]
+        for future, chunk in zip(futures, chunks):
+            try:
+                chunk_result = future.result()
+            except Exception as e:
+                logger.exception(f"Unexpected error writing batch chunk to {table.name}: {e}")
+                chunk_result = BatchWriteResult(failed_items=list(chunk))
+            combined.written_count += chunk_result.written_count
+            combined.failed_items.extend(chunk_result.failed_items)
+            combined.retries_used += chunk_result.retries_used
+    
+    logger.info(
+        f"Parallel batch wrote {combined.written_count}/{len(items)} items to {table.name} "
+        f"({combined.failed_count} failed, {combined.retries_used} retries)"
+    )
+    return combined
+
+
+# BatchGetItem accepts at most 100 keys per call
+BATCH_GET_MAX_KEYS = 100
+
+
+@dataclass
+class BatchGetResult:
+    """Outcome of a parallel batch get."""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    unprocessed_keys: List[Dict[str, Any]] = field(default_factory=list)
+    retries_used: int = 0
+
+
+def _get_chunk_with_retry(
+    table: Any,
+    keys: List[Dict[str, Any]],
+    projection: Dict[str, Any],
+    max_retries: int,
+    base_delay: float,
+    max_delay: float
+) -> BatchGetResult:
+    """
+    Read a single BatchGetItem chunk (<= 100 keys), retrying UnprocessedKeys.
+
+    Keys still unprocessed after max_retries, or rejected by a non-throttling
+    error, are returned in unprocessed_keys.
+    """
+    result = BatchGetResult()
+    pending = keys
+    attempt = 0
+
+    while pending:
+        try:
+            response = table.meta.client.batch_get_item(
+                RequestItems={table.name: {'Keys': pending, **projection}}
+            )
+            result.items.extend(response.get('Responses', {}).get(table.name, []))
+            pending = response.get('UnprocessedKeys', {}).get(table.name, {}).get('Keys', [])
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            if error_code not in THROTTLE_ERROR_CODES:
+                logger.error(f"Batch get chunk rejected ({error_code}): {e}")
+                result.unprocessed_keys.extend(pending)
+                return result
+
+        if not pending:
+            break
+        if attempt >= max_retries:
+            logger.warning(
+                f"Giving up on {len(pending)} unprocessed keys for {table.name} "
+                f"after {max_retries} retries"
+            )
+            result.unprocessed_keys.extend(pending)
+            break
+
+        time.sleep(backoff_delay(attempt, base_delay, max_delay))
+        attempt += 1
+        result.retries_used += 1
+
+    return result
+
+
+def batch_get_items(
+    table: Any,
+    keys: Sequence[Dict[str, Any]],
+    attributes: Optional[Sequence[str]] = None,
+    preserve_order: bool = False,
+    batch_size: int = BATCH_GET_MAX_KEYS,
+    max_workers: int = 4,
+    max_retries: int = 5,
+    base_delay: float = 0.05,
+    max_delay: float = 2.0
+) -> BatchGetResult:
+    """
+    Read items by key with concurrent BatchGetItem calls, retrying unprocessed keys.
+
+    Works for any table: pass the table resource and its primary keys.
+    Duplicate keys are read once. Keys with no item are simply absent
+    from the result.
+
+    Args:
+        table: DynamoDB table resource
+        keys: Primary key dicts, all with the same key attributes
+        attributes: Optional attributes to project (key attributes are always included)
+        preserve_order: Return items in the order of their keys (default is arrival order)
+        batch_size: Keys per BatchGetItem call (DynamoDB limit is 100)
+        max_workers: Number of chunks read concurrently
+        max_retries: Retries per chunk for UnprocessedKeys / throttling
+        base_delay: Initial backoff delay in seconds
+        max_delay: Maximum backoff delay in seconds
+
+    Returns:
+        BatchGetResult with the items found and the keys that could not be read
+
+    Example:
+        result = batch_get_items(
+            table=tables.accounts,
+            keys=[{'accountId': str(account_id)} for account_id in account_ids],
+            preserve_order=True
+        )
+        accounts = [Account.from_dynamodb_item(item) for item in result.items]
+    """
+    if not keys:
+        return BatchGetResult()
+
+    key_names = list(keys[0])
+
+    def key_of(item: Dict[str, Any]) -> Tuple:
+        return tuple(item.get(name) for name in key_names)
+
+    unique_keys = list({key_of(key): key for key in keys}.values())
+
+    projection: Dict[str, Any] = {}
+    if attributes:
+        expression, names = build_projection_expression(
+            list(dict.fromkeys([*key_names, *attributes]))
+        )
+        projection = {'ProjectionExpression': expression, 'ExpressionAttributeNames': names}
+
+    batch_size = min(batch_size, BATCH_GET_MAX_KEYS)
+    chunks = [unique_keys[i:i+batch_size] for i in range(0, len(unique_keys), batch_size)]
+    combined = BatchGetResult()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        futures = [
+            executor.submit(_get_chunk_with_retry, table, chunk, projection, max_retries, base_delay, max_delay)
+            for chunk in chunks
+        ]
+        for future, chunk in zip(futures, chunks):
+            try:
+                chunk_result = future.result()
+            except Exception as e:
+                logger.exception(f"Unexpected error reading batch chunk from {table.name}: {e}")
+                chunk_result = BatchGetResult(unprocessed_keys=list(chunk))
+            combined.items.extend(chunk_result.items)
+            combined.unprocessed_keys.extend(chunk_result.unprocessed_keys)
+            combined.retries_used += chunk_result.retries_used
+
+    if preserve_order:
+        position = {key_of(key): index for index, key in enumerate(unique_keys)}
+        combined.items.sort(key=lambda item: position.get(key_of(item), len(position)))
+
+    logger.info(
+        f"Batch get read {len(combined.items)}/{len(unique_keys)} items from {table.name} "
+        f"({len(combined.unprocessed_keys)} unprocessed, {combined.retries_used} retries)"
+    )
+    return combined
+
+
+# TransactWriteItems accepts at most 100 actions per call
+TRANSACT_WRITE_MAX_ITEMS = 100
+
+
+def grouped_update_items(
+    table: Any,
+    updates: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    group_size: int = TRANSACT_WRITE_MAX_ITEMS,
+    condition_expression: Optional[str] = None
+) -> BatchWriteResult:
+    """
+    Update attributes of many items with grouped TransactWriteItems calls.
+
+    BatchWriteItem can only put whole items, so partial updates of many items
+    would otherwise take one UpdateItem call each. Each group is written
+    atomically; a group that is cancelled (e.g. an item fails the condition)
+    or throttled is retried item by item so one bad item does not fail the
+    rest of its group.
+
+    Args:
+        table: DynamoDB table resource
+        updates: (key, attribute updates) per item; keys must be distinct
+        group_size: Items per TransactWriteItems call (DynamoDB limit is 100)
+        condition_expression: Optional condition every updated item must meet
+
+    Returns:
+        BatchWriteResult whose failed_items are the keys that were not updated
+
+    Example:
+        result = grouped_update_items(
+            table=tables.transactions,
+            updates=[({'transactionId': tid}, {'status': 'reviewed'}) for tid in ids],
+            condition_expression='attribute_exists(transactionId)'
+        )
+    """
+    result = BatchWriteResult()
+    if not updates:
+        logger.debug("No items to update")
+        return result
+
+    group_size = min(group_size, TRANSACT_WRITE_MAX_ITEMS)
+    for i in range(0, len(updates), group_size):
+        actions = []
+        for key, attributes in updates[i:i+group_size]:
+            expression, names, values = build_update_expression(attributes)
+            action = {
+                'TableName': table.name,
+                'Key': key,
+                'UpdateExpression': expression,
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values,
+            }
+            if condition_expression:
+                action['ConditionExpression'] = condition_expression
+            actions.append(action)
+
+        try:
+            table.meta.client.transact_write_items(
+                TransactItems=[{'Update': action} for action in actions]
+            )
+            result.written_count += len(actions)
+            continue
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            logger.warning(
+                f"Grouped update of {len(actions)} items in {table.name} failed ({error_code}), "
+                "retrying item by item"
+            )
+
+        for action in actions:
+            params = {k: v for k, v in action.items() if k != 'TableName'}
+            try:
+                table.update_item(**params)
+                result.written_count += 1
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+                logger.error(f"Update of {action['Key']} in {table.name} failed ({error_code}): {e}")
+                result.failed_items.append(action['Key'])
+            result.retries_used += 1
+
+    logger.info(
+        f"Grouped update wrote {result.written_count}/{len(updates)} items to {table.name} "
+        f"({result.failed_count} failed)"
+    )
+    return result
+
+
 # ============================================================================
 # Pagination Helper
 # ============================================================================
 
+def build_projection_expression(attributes: Sequence[str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Build a DynamoDB ProjectionExpression for top-level attributes.
+    
+    Every attribute goes through a name placeholder so reserved words such as
+    'date' and 'status' can be projected.
+    
+    Args:
+        attributes: Attribute names to return
+    
+    Returns:
+        Tuple of (projection_expression, expression_attribute_names)
+    
+    Example:
+        expr, names = build_projection_expression(['transactionId', 'date', 'amount'])
+        # expr == "#transactionId, #date, #amount"
+    """
+    if not attributes:
+        raise ValueError("At least one attribute must be projected")
+    
+    placeholders: List[str] = []
+    expr_attr_names: Dict[str, str] = {}
+    for attribute in attributes:
+        safe_name = attribute.replace('-', '_').replace('.', '_')
+        placeholders.append(f"#{safe_name}")
+        expr_attr_names[f"#{safe_name}"] = attribute
+    
+    return ", ".join(placeholders), expr_attr_names
+
+
+def with_projection(params: Dict[str, Any], attributes: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """
+    Return a copy of query/scan params that only fetches the given attributes.
+    
+    Existing ExpressionAttributeNames are preserved; boto3 merges the names it
+    generates for Key/Attr conditions into the same map.
+    
+    Args:
+        params: Query or scan parameters
+        attributes: Attribute names to return (None returns params unchanged)
+    """
+    if not attributes:
+        return params
+    
+    projection_expression, expr_attr_names = build_projection_expression(attributes)
+    projected = dict(params)
+    projected['ProjectionExpression'] = projection_expression
+    projected['ExpressionAttributeNames'] = {
+        **params.get('ExpressionAttributeNames', {}),
+        **expr_attr_names
+    }
+    return projected
+
+
 def paginated_query(
     table: Any,
     query_params: Dict[str, Any],
     max_items: Optional[int] = None,
-    transform: Optional[Callable[[Dict], T]] = None
+    transform: Optional[Callable[[Dict], T]] = None,
+    projection: Optional[Sequence[str]] = None
 ) -> Tuple[List[T], Optional[Dict[str, Any]]]:
     """
     Execute paginated DynamoDB query and return all items.
@@ -259,6 +707,7 @@ def paginated_query(
         query_params: Query parameters (KeyConditionExpression, etc.)
         max_items: Maximum items to return (None for all)
         transform: Optional function to transform each item
+        projection: Optional attribute names to fetch instead of whole items
     
     Returns:
         Tuple of (items, last_evaluated_key)
@@ -278,7 +727,7 @@ def paginated_query(
     """
     items: List[T] = []
     items_collected = 0
-    current_params = query_params.copy()
+    current_params = with_projection(query_params, projection).copy()
     last_evaluated_key = None
     
     while True:
@@ -313,7 +762,8 @@ def paginated_scan(
     table: Any,
     scan_params: Dict[str, Any],
     max_items: Optional[int] = None,
-    transform: Optional[Callable[[Dict], T]] = None
+    transform: Optional[Callable[[Dict], T]] = None,
+    projection: Optional[Sequence[str]] = None
 ) -> Tuple[List[T], Optional[Dict[str, Any]]]:
     """
     Execute paginated DynamoDB scan and return all items.
@@ -323,6 +773,7 @@ def paginated_scan(
         scan_params: Scan parameters (FilterExpression, etc.)
         max_items: Maximum items to return (None for all)
         transform: Optional function to transform each item
+        projection: Optional attribute names to fetch instead of whole items
     
     Returns:
         Tuple of (items, last_evaluated_key)
@@ -338,7 +789,7 @@ def paginated_scan(
     """
     items: List[T] = []
     items_collected = 0
-    current_params = scan_params.copy()
+    current_params = with_projection(scan_params, projection).copy()
     last_evaluated_key = None
     
     while True:
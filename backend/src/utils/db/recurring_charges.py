@@ -290,7 +290,7 @@ def delete_pattern_from_db(pattern_id: uuid.UUID, user_id: str) -> bool:
 @monitor_performance(operation_type="batch_write", warn_threshold_ms=1000)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("batch_create_patterns_in_db")
-def batch_create_patterns_in_db(pattern_creates: List[RecurringChargePatternCreate]) -> int:
+def batch_create_patterns_in_db(pattern_creates: List[RecurringChargePatternCreate]) -> List[RecurringChargePattern]:
     """
     Batch create multiple recurring charge patterns.
     
@@ -298,7 +298,7 @@ def batch_create_patterns_in_db(pattern_creates: List[RecurringChargePatternCrea
         pattern_creates: List of RecurringChargePatternCreate DTOs to create
         
     Returns:
-        Number of patterns successfully created
+        The created RecurringChargePattern objects, with their generated IDs
         
     Raises:
         ConnectionError: If database table is not initialized
@@ -309,13 +309,13 @@ def batch_create_patterns_in_db(pattern_creates: List[RecurringChargePatternCrea
         raise ConnectionError(DB_TABLE_NOT_INITIALIZED_ERROR)
     
     if not pattern_creates:
-        return 0
+        return []
     
     logger.debug(f"DB: Batch creating {len(pattern_creates)} patterns")
     
     # DynamoDB batch_write_item has a limit of 25 items per batch
     batch_size = 25
-    total_created = 0
+    created: List[RecurringChargePattern] = []
     
     for i in range(0, len(pattern_creates), batch_size):
         batch = pattern_creates[i:i + batch_size]
@@ -326,10 +326,10 @@ def batch_create_patterns_in_db(pattern_creates: List[RecurringChargePatternCrea
                 pattern_data = pattern_create.model_dump(by_alias=False)
                 pattern = RecurringChargePattern(**pattern_data)
                 writer.put_item(Item=pattern.to_dynamodb_item())
-                total_created += 1
+                created.append(pattern)
     
-    logger.info(f"DB: Batch created {total_created} patterns successfully")
-    return total_created
+    logger.info(f"DB: Batch created {len(created)} patterns successfully")
+    return created
 
 
 # ============================================================================
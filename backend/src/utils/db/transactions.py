@@ -4,15 +4,20 @@ Transaction database operations.
 This module provides CRUD operations for transactions.
 """
 
+import heapq
 import logging
 import uuid
 import operator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
+from itertools import islice
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Union, Tuple
+from typing import List, Dict, Any, Optional, Union, Tuple, Set, Iterator, Callable, Sequence, TypeVar, Iterable
 from boto3.dynamodb.conditions import Key, Attr
 
-from models.transaction import Transaction
+from models.analytics import month_key
+from models.transaction import Transaction, TransactionSummary, TRANSACTION_SUMMARY_ATTRIBUTES
 from .base import (
     tables,
     dynamodb_operation,
@@ -21,10 +26,22 @@ from .base import (
     NotFound,
     check_user_owns_resource,
 )
-from .helpers import batch_delete_items
+from .helpers import (
+    BatchWriteResult,
+    batch_delete_items,
+    batch_get_items,
+    grouped_update_items,
+    paginated_query,
+    parallel_batch_write_items,
+    with_projection,
+)
+from .analytics import mark_rollups_stale
 
 logger = logging.getLogger(__name__)
 
+# Type variable for the item transform of bulk reads
+T = TypeVar('T')
+
 
 # ============================================================================
 # Helper Functions
@@ -114,7 +131,8 @@ def _get_transaction(transaction_id: uuid.UUID) -> Optional[Transaction]:
 @dynamodb_operation("get_transactions_by_ids")
 def get_transactions_by_ids(
     transaction_ids: List[uuid.UUID],
-    user_id: str
+    user_id: str,
+    preserve_order: bool = False
 ) -> List[Transaction]:
     """
     Retrieve multiple transactions by their IDs.
@@ -122,14 +140,16 @@ def get_transactions_by_ids(
     Args:
         transaction_ids: List of transaction IDs to retrieve
         user_id: User ID for authorization (all transactions must belong to this user)
+        preserve_order: Return transactions in the order of transaction_ids
         
     Returns:
         List of Transaction objects (only those found and owned by user)
         
     Note:
         - Transactions not found or not owned by user are silently excluded
-        - DynamoDB BatchGetItem has a limit of 100 items per request
-        - Results may not be in the same order as input IDs
+        - Keys are read in concurrent 100-key BatchGetItem chunks; unprocessed
+          keys are retried with backoff
+        - Without preserve_order, results may not be in the same order as input IDs
     """
     if not transaction_ids:
         return []
@@ -139,56 +159,29 @@ def get_transactions_by_ids(
         logger.error("TRANSACTIONS_TABLE is not configured.")
         return []
     
-    # DynamoDB BatchGetItem limit is 100 items
-    # Process in chunks if needed
-    chunk_size = 100
-    all_transactions = []
+    result = batch_get_items(
+        table,
+        [{'transactionId': str(tid)} for tid in transaction_ids],
+        preserve_order=preserve_order
+    )
+    if result.unprocessed_keys:
+        logger.warning(f"Could not read {len(result.unprocessed_keys)} transactions (throttling)")
     
-    for i in range(0, len(transaction_ids), chunk_size):
-        chunk = transaction_ids[i:i + chunk_size]
-        
-        # Build batch get request
-        keys = [{'transactionId': str(tid)} for tid in chunk]
-        
+    # Convert to Transaction objects and filter by user
+    all_transactions = []
+    for item in result.items:
         try:
-            response = table.meta.client.batch_get_item(
-                RequestItems={
-                    table.name: {
-                        'Keys': keys
-                    }
-                }
-            )
-            
-            items = response.get('Responses', {}).get(table.name, [])
-            
-            # Convert to Transaction objects and filter by user
-            for item in items:
-                try:
-                    transaction = Transaction.from_dynamodb_item(item)
-                    # Only include transactions owned by the requesting user
-                    if transaction.user_id == user_id:
-                        all_transactions.append(transaction)
-                    else:
-                        logger.warning(
-                            f"Transaction {transaction.transaction_id} not owned by user {user_id}"
-                        )
-                except Exception as e:
-                    logger.exception(f"Error deserializing transaction: {e}")
-                    continue
-            
-            # Handle unprocessed keys (throttling)
-            unprocessed = response.get('UnprocessedKeys', {})
-            if unprocessed:
-                logger.warning(
-                    f"Batch get had {len(unprocessed.get(table.name, {}).get('Keys', []))} "
-                    "unprocessed keys (throttling)"
-                )
-                # Note: Could implement retry logic here if needed
-                
+            transaction = Transaction.from_dynamodb_item(item)
         except Exception as e:
-            logger.exception(f"Error in batch get transactions: {e}")
-            # Continue with next chunk
+            logger.exception(f"Error deserializing transaction: {e}")
             continue
+        # Only include transactions owned by the requesting user
+        if transaction.user_id == user_id:
+            all_transactions.append(transaction)
+        else:
+            logger.warning(
+                f"Transaction {transaction.transaction_id} not owned by user {user_id}"
+            )
     
     logger.info(
         f"Retrieved {len(all_transactions)} transactions out of {len(transaction_ids)} requested"
@@ -343,6 +336,32 @@ def _list_file_transactions_internal(file_id: uuid.UUID) -> List[Transaction]:
     return [Transaction.from_dynamodb_item(item) for item in response.get('Items', [])]
 
 
+@monitor_performance(operation_type="query", warn_threshold_ms=1000)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("list_file_transaction_summaries")
+def list_file_transaction_summaries(file_id: Union[str, uuid.UUID]) -> List[TransactionSummary]:
+    """
+    List projected summaries of every transaction in a file (no auth check).
+    INTERNAL USE ONLY - callers must verify authorization first.
+    
+    Args:
+        file_id: The unique identifier of the file
+        
+    Returns:
+        List of TransactionSummary objects
+    """
+    summaries, _ = paginated_query(
+        table=tables.transactions,
+        query_params={
+            'IndexName': 'FileIdIndex',
+            'KeyConditionExpression': Key('fileId').eq(str(file_id))
+        },
+        transform=TransactionSummary.from_dynamodb_item,
+        projection=TRANSACTION_SUMMARY_ATTRIBUTES
+    )
+    return summaries
+
+
 def list_file_transactions(file_id: uuid.UUID, user_id: str) -> List[Transaction]:
     """
     List all transactions for a specific file.
@@ -367,6 +386,65 @@ def list_file_transactions(file_id: uuid.UUID, user_id: str) -> List[Transaction
     return _list_file_transactions_internal(file_id)
 
 
+def _build_user_transactions_query(
+    user_id: str,
+    start_date_ts: Optional[int] = None,
+    end_date_ts: Optional[int] = None,
+    account_ids: Optional[List[uuid.UUID]] = None,
+    category_ids: Optional[List[str]] = None,
+    transaction_type: Optional[str] = None,
+    search_term: Optional[str] = None,
+    sort_order_date: str = 'desc',
+    ignore_dup: bool = False,
+    uncategorized_only: bool = False
+) -> Dict[str, Any]:
+    """
+    Build the DynamoDB query parameters (index, key condition, filters, order)
+    for a user transaction listing. Limit and ExclusiveStartKey are left to the caller.
+    """
+    # Smart GSI selection - choose the most selective index to minimize data scanning
+    index_name, key_condition = _select_optimal_gsi(
+        user_id=user_id,
+        account_ids=account_ids,
+        category_ids=category_ids,
+        transaction_type=transaction_type,
+        ignore_dup=ignore_dup,
+        uncategorized_only=uncategorized_only,
+        start_date_ts=start_date_ts,
+        end_date_ts=end_date_ts
+    )
+
+    query_params: Dict[str, Any] = {
+        'IndexName': index_name,
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': sort_order_date.lower() == 'asc'
+    }
+
+    # Build filter expressions, excluding filters already handled by GSI selection
+    filter_expressions = []
+    
+    # Only add filters that aren't already handled by the selected GSI
+    remaining_filters = _get_remaining_filters(
+        index_name=index_name,
+        user_id=user_id,
+        account_ids=account_ids,
+        category_ids=category_ids,
+        transaction_type=transaction_type,
+        ignore_dup=ignore_dup,
+        uncategorized_only=uncategorized_only,
+        search_term=search_term
+    )
+    
+    # Add non-None filters to the list
+    filter_expressions.extend(filter_expr for filter_expr in remaining_filters.values() if filter_expr)
+    
+    # Combine all filters with AND logic
+    if filter_expressions:
+        query_params['FilterExpression'] = reduce(operator.and_, filter_expressions)
+
+    return query_params
+
+
 @monitor_performance(operation_type="query", warn_threshold_ms=1000)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("list_user_transactions")
@@ -382,8 +460,10 @@ def list_user_transactions(
     search_term: Optional[str] = None,
     sort_order_date: str = 'desc',
     ignore_dup: bool = False,
-    uncategorized_only: bool = False
-) -> Tuple[List[Transaction], Optional[Dict[str, Any]], int]:
+    uncategorized_only: bool = False,
+    projection: Optional[Sequence[str]] = None,
+    transform: Callable[[Dict[str, Any]], T] = Transaction.from_dynamodb_item
+) -> Tuple[List[T], Optional[Dict[str, Any]], int]:
     """
     List transactions for a user with filtering, date sorting, and pagination.
     Returns up to 'limit' transactions. May return fewer due to filtering - this is the 
@@ -402,6 +482,8 @@ def list_user_transactions(
         sort_order_date: Sort order ('asc' or 'desc')
         ignore_dup: Whether to ignore duplicate transactions
         uncategorized_only: If True, only return transactions without categories
+        projection: Optional attribute names to fetch instead of whole items
+        transform: Converts each item (default: full Transaction model)
         
     Returns:
         Tuple of (transactions, last_evaluated_key, items_count)
@@ -411,64 +493,39 @@ def list_user_transactions(
         logger.error("TRANSACTIONS_TABLE is not configured.")
         return [], None, 0
 
-    # Smart GSI selection - choose the most selective index to minimize data scanning
-    index_name, key_condition = _select_optimal_gsi(
+    query_params = _build_user_transactions_query(
         user_id=user_id,
+        start_date_ts=start_date_ts,
+        end_date_ts=end_date_ts,
         account_ids=account_ids,
         category_ids=category_ids,
         transaction_type=transaction_type,
+        search_term=search_term,
+        sort_order_date=sort_order_date,
         ignore_dup=ignore_dup,
-        uncategorized_only=uncategorized_only,
-        start_date_ts=start_date_ts,
-        end_date_ts=end_date_ts
+        uncategorized_only=uncategorized_only
     )
-
-    query_params: Dict[str, Any] = {
-        'IndexName': index_name,
-        'KeyConditionExpression': key_condition,
-        'Limit': limit,
-        'ScanIndexForward': sort_order_date.lower() == 'asc'
-    }
+    query_params = with_projection(query_params, projection)
+    query_params['Limit'] = limit
+    index_name = query_params['IndexName']
 
     if last_evaluated_key:
         query_params['ExclusiveStartKey'] = last_evaluated_key
 
-    # Build filter expressions, excluding filters already handled by GSI selection
-    filter_expressions = []
-    
-    # Only add filters that aren't already handled by the selected GSI
-    remaining_filters = _get_remaining_filters(
-        index_name=index_name,
-        user_id=user_id,
-        account_ids=account_ids,
-        category_ids=category_ids,
-        transaction_type=transaction_type,
-        ignore_dup=ignore_dup,
-        uncategorized_only=uncategorized_only,
-        search_term=search_term
-    )
-    
-    # Add non-None filters to the list
-    filter_expressions.extend(filter_expr for filter_expr in remaining_filters.values() if filter_expr)
-    
-    # Combine all filters with AND logic
-    if filter_expressions:
-        query_params['FilterExpression'] = reduce(operator.and_, filter_expressions)
-
     logger.info(f"Using GSI: {index_name} for user {user_id}")
     logger.debug(f"DynamoDB query params: {query_params}")
     
     # Log optimization info
     if category_ids:
         logger.info(f"Filtering transactions by category IDs: {category_ids}")
-    if filter_expressions:
-        logger.info(f"Additional filters applied: {len(filter_expressions)} FilterExpressions")
+    if 'FilterExpression' in query_params:
+        logger.info("Additional filters applied via FilterExpression")
     else:
         logger.info("No additional filters needed - all filtering done via GSI KeyCondition")
         
     response = table.query(**query_params)
     
-    transactions = [Transaction.from_dynamodb_item(item) for item in response.get('Items', [])]
+    transactions = [transform(item) for item in response.get('Items', [])]
     new_last_evaluated_key = response.get('LastEvaluatedKey')
     
     # Count of items returned in this query response  
@@ -498,6 +555,390 @@ def list_user_transactions(
     return transactions, new_last_evaluated_key, items_in_current_response
 
 
+def _month_segments(start_date_ts: int, end_date_ts: int) -> List[Tuple[int, int]]:
+    """
+    Split an inclusive millisecond range into consecutive calendar-month (UTC) segments.
+    
+    Returns:
+        List of inclusive (start_ts, end_ts) tuples in ascending order
+    """
+    segments: List[Tuple[int, int]] = []
+    segment_start = start_date_ts
+    while segment_start <= end_date_ts:
+        dt = datetime.fromtimestamp(segment_start / 1000, tz=timezone.utc)
+        if dt.month == 12:
+            next_month = datetime(dt.year + 1, 1, 1, tzinfo=timezone.utc)
+        else:
+            next_month = datetime(dt.year, dt.month + 1, 1, tzinfo=timezone.utc)
+        segment_end = min(end_date_ts, int(next_month.timestamp() * 1000) - 1)
+        segments.append((segment_start, segment_end))
+        segment_start = segment_end + 1
+    return segments
+
+
+def _query_pages(table: Any, query_params: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the items of every page of a query, following LastEvaluatedKey to the end.
+    
+    Pages that come back empty because of a FilterExpression do not stop the
+    iteration; only a missing LastEvaluatedKey does.
+    """
+    params = dict(query_params)
+    while True:
+        response = table.query(**params)
+        yield response.get('Items', [])
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if not last_evaluated_key:
+            break
+        params['ExclusiveStartKey'] = last_evaluated_key
+
+
+def iter_user_transactions(
+    user_id: str,
+    start_date_ts: Optional[int] = None,
+    end_date_ts: Optional[int] = None,
+    account_ids: Optional[List[uuid.UUID]] = None,
+    category_ids: Optional[List[str]] = None,
+    transaction_type: Optional[str] = None,
+    search_term: Optional[str] = None,
+    sort_order_date: str = 'asc',
+    ignore_dup: bool = False,
+    uncategorized_only: bool = False,
+    page_size: int = 1000,
+    max_workers: int = 4,
+    projection: Optional[Sequence[str]] = None,
+    transform: Callable[[Dict[str, Any]], T] = Transaction.from_dynamodb_item
+) -> Iterator[T]:
+    """
+    Stream every transaction matching the filters, following pagination to the end.
+    
+    Unlike list_user_transactions, which returns a single DynamoDB page (capped
+    at 1 MB regardless of limit), this iterator exhausts the query. When both
+    date bounds are given and span more than one month, the range is split into
+    calendar-month segments that are fetched concurrently (at most max_workers
+    segments in flight) and yielded in date order.
+    
+    Hot read paths that only need a few fields can pass
+    projection=TRANSACTION_SUMMARY_ATTRIBUTES and
+    transform=TransactionSummary.from_dynamodb_item to fetch less data and
+    skip model validation.
+    
+    Args:
+        user_id: The user ID to filter by
+        start_date_ts: Start date filter (milliseconds since epoch)
+        end_date_ts: End date filter (milliseconds since epoch)
+        account_ids: List of account IDs to filter by
+        category_ids: List of category IDs to filter by
+        transaction_type: Transaction type to filter by
+        search_term: Search term to filter descriptions
+        sort_order_date: Sort order ('asc' or 'desc')
+        ignore_dup: Whether to ignore duplicate transactions
+        uncategorized_only: If True, only return transactions without categories
+        page_size: DynamoDB page size (Limit) per query call
+        max_workers: Maximum number of month segments fetched concurrently
+        projection: Optional attribute names to fetch instead of whole items
+        transform: Converts each item (default: full Transaction model)
+        
+    Yields:
+        Transformed items (Transaction objects by default) in the requested date order
+    """
+    table = tables.transactions
+    if not table:
+        logger.error("TRANSACTIONS_TABLE is not configured.")
+        return
+    
+    def build_params(segment_start: Optional[int], segment_end: Optional[int]) -> Dict[str, Any]:
+        params = _build_user_transactions_query(
+            user_id=user_id,
+            start_date_ts=segment_start,
+            end_date_ts=segment_end,
+            account_ids=account_ids,
+            category_ids=category_ids,
+            transaction_type=transaction_type,
+            search_term=search_term,
+            sort_order_date=sort_order_date,
+            ignore_dup=ignore_dup,
+            uncategorized_only=uncategorized_only
+        )
+        params = with_projection(params, projection)
+        params['Limit'] = page_size
+        return params
+    
+    segments = (
+        _month_segments(start_date_ts, end_date_ts)
+        if start_date_ts is not None and end_date_ts is not None
+        else []
+    )
+    
+    if len(segments) <= 1 or max_workers <= 1:
+        # Single stream: yield each page as soon as it arrives
+        count = 0
+        for items in _query_pages(table, build_params(start_date_ts, end_date_ts)):
+            for item in items:
+                count += 1
+                yield transform(item)
+        logger.info(f"Streamed {count} transactions for user {user_id}")
+        return
+    
+    if sort_order_date.lower() != 'asc':
+        segments.reverse()
+    
+    def fetch_segment(segment: Tuple[int, int]) -> List[T]:
+        return [
+            transform(item)
+            for items in _query_pages(table, build_params(*segment))
+            for item in items
+        ]
+    
+    logger.info(
+        f"Fetching transactions for user {user_id} in {len(segments)} month segments "
+        f"with {max_workers} workers"
+    )
+    count = 0
+    remaining = iter(segments)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque(
+            executor.submit(fetch_segment, segment)
+            for segment in islice(remaining, max_workers)
+        )
+        while in_flight:
+            segment_transactions = in_flight.popleft().result()
+            next_segment = next(remaining, None)
+            if next_segment is not None:
+                in_flight.append(executor.submit(fetch_segment, next_segment))
+            count += len(segment_transactions)
+            yield from segment_transactions
+    logger.info(f"Streamed {count} transactions for user {user_id}")
+
+
+def iter_user_transactions_by_key(
+    user_id: str,
+    start_date_ts: Optional[int] = None,
+    end_date_ts: Optional[int] = None,
+    account_ids: Optional[List[uuid.UUID]] = None,
+    category_ids: Optional[List[str]] = None,
+    sort_order_date: str = 'asc',
+    page_size: int = 1000,
+    max_workers: int = 4,
+    projection: Optional[Sequence[str]] = None,
+    transform: Callable[[Dict[str, Any]], T] = Transaction.from_dynamodb_item
+) -> Iterator[T]:
+    """
+    Stream transactions for several accounts or categories through key conditions.
+    
+    iter_user_transactions only uses AccountDateIndex / CategoryDateIndex for a
+    single account or category; with several it falls back to UserIdIndex and
+    a FilterExpression, which reads every transaction the user has. This runs
+    one index query per account (or, without accounts, per primary category),
+    with the date range in the key condition, and merges the date-ordered
+    streams, so only matching rows are read and the result is still ordered
+    by date. Categories given together with accounts are applied as a filter
+    on the account queries.
+    
+    Args:
+        user_id: The user ID to filter by
+        start_date_ts: Start date filter (milliseconds since epoch)
+        end_date_ts: End date filter (milliseconds since epoch)
+        account_ids: Account IDs to query, one AccountDateIndex query each
+        category_ids: Primary category IDs; queried on CategoryDateIndex when
+            no account IDs are given
+        sort_order_date: Sort order ('asc' or 'desc')
+        page_size: DynamoDB page size (Limit) per query call
+        max_workers: Month segments fetched concurrently, shared by all keys
+        projection: Optional attribute names to fetch instead of whole items
+            (must include 'date')
+        transform: Converts each item (default: full Transaction model)
+        
+    Yields:
+        Transformed items in the requested date order
+    """
+    account_keys = list(dict.fromkeys(str(aid) for aid in account_ids or []))
+    category_keys = list(dict.fromkeys(str(cid) for cid in category_ids or []))
+    
+    if account_keys:
+        key_filters = [{'account_ids': [aid], 'category_ids': category_keys or None} for aid in account_keys]
+    elif category_keys:
+        key_filters = [{'category_ids': [cid]} for cid in category_keys]
+    else:
+        key_filters = [{}]
+    
+    streams = [
+        iter_user_transactions(
+            user_id,
+            start_date_ts=start_date_ts,
+            end_date_ts=end_date_ts,
+            sort_order_date=sort_order_date,
+            page_size=page_size,
+            max_workers=max(1, max_workers // len(key_filters)),
+            projection=projection,
+            transform=transform,
+            **key_filter
+        )
+        for key_filter in key_filters
+    ]
+    if len(streams) == 1:
+        yield from streams[0]
+        return
+    
+    def item_date(item: Any) -> int:
+        return item['date'] if isinstance(item, dict) else item.date
+    
+    yield from heapq.merge(*streams, key=item_date, reverse=sort_order_date.lower() != 'asc')
+
+
+def _transfer_pair_key_condition(
+    user_id: str,
+    start_date_ts: Optional[int] = None,
+    end_date_ts: Optional[int] = None
+):
+    """Build the TransferPairIndex key condition for a user and optional date range."""
+    key_condition = Key('transferPairUserId').eq(user_id)
+    if start_date_ts is not None and end_date_ts is not None:
+        key_condition = key_condition & Key('date').between(start_date_ts, end_date_ts)
+    elif start_date_ts is not None:
+        key_condition = key_condition & Key('date').gte(start_date_ts)
+    elif end_date_ts is not None:
+        key_condition = key_condition & Key('date').lte(end_date_ts)
+    return key_condition
+
+
+@monitor_performance(operation_type="query", warn_threshold_ms=1000)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("list_transfer_pairs")
+def list_transfer_pairs(
+    user_id: str,
+    limit: Optional[int] = 50,
+    last_evaluated_key: Optional[Dict[str, Any]] = None,
+    start_date_ts: Optional[int] = None,
+    end_date_ts: Optional[int] = None,
+    sort_order_date: str = 'desc'
+) -> Tuple[List[Tuple[Transaction, Transaction]], Optional[Dict[str, Any]]]:
+    """
+    List stored transfer pair links for a user, one page at a time.
+    
+    Queries the sparse TransferPairIndex, which only holds the outgoing side of
+    each linked pair (keyed by userId and date), then batch-gets the incoming
+    sides. The cost is proportional to the page, not to the transfer history.
+    Pairs whose incoming side is missing or no longer links back are skipped,
+    so a page may hold fewer than limit pairs.
+    
+    Args:
+        user_id: The user ID to filter by
+        limit: Maximum number of pairs per page; None follows every page
+        last_evaluated_key: For pagination
+        start_date_ts: Start date filter on the outgoing side (milliseconds since epoch)
+        end_date_ts: End date filter on the outgoing side (milliseconds since epoch)
+        sort_order_date: Sort order ('asc' or 'desc')
+        
+    Returns:
+        Tuple of ((outgoing, incoming) pairs, last_evaluated_key)
+    """
+    table = tables.transactions
+    if not table:
+        logger.error("TRANSACTIONS_TABLE is not configured.")
+        return [], None
+    
+    query_params: Dict[str, Any] = {
+        'IndexName': 'TransferPairIndex',
+        'KeyConditionExpression': _transfer_pair_key_condition(user_id, start_date_ts, end_date_ts),
+        'ScanIndexForward': sort_order_date.lower() == 'asc'
+    }
+    if last_evaluated_key:
+        query_params['ExclusiveStartKey'] = last_evaluated_key
+    
+    new_last_evaluated_key: Optional[Dict[str, Any]] = None
+    if limit is None:
+        items = [item for page in _query_pages(table, query_params) for item in page]
+    else:
+        query_params['Limit'] = limit
+        response = table.query(**query_params)
+        items = response.get('Items', [])
+        new_last_evaluated_key = response.get('LastEvaluatedKey')
+    
+    outgoing_transactions = [Transaction.from_dynamodb_item(item) for item in items]
+    incoming_by_id = {
+        str(tx.transaction_id): tx
+        for tx in get_transactions_by_ids(
+            [tx.paired_transaction_id for tx in outgoing_transactions if tx.paired_transaction_id],
+            user_id
+        )
+    }
+    
+    pairs = []
+    for outgoing_tx in outgoing_transactions:
+        incoming_tx = incoming_by_id.get(str(outgoing_tx.paired_transaction_id))
+        if incoming_tx is None or incoming_tx.paired_transaction_id != outgoing_tx.transaction_id:
+            logger.warning(
+                f"Skipping stale transfer pair link {outgoing_tx.transaction_id} -> "
+                f"{outgoing_tx.paired_transaction_id}"
+            )
+            continue
+        pairs.append((outgoing_tx, incoming_tx))
+    
+    logger.info(f"Listed {len(pairs)} stored transfer pairs for user {user_id}")
+    return pairs, new_last_evaluated_key
+
+
+@monitor_performance(operation_type="query", warn_threshold_ms=1000)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("count_transfer_pairs")
+def count_transfer_pairs(
+    user_id: str,
+    start_date_ts: Optional[int] = None,
+    end_date_ts: Optional[int] = None
+) -> int:
+    """
+    Count the stored transfer pairs for a user that list_transfer_pairs would return.
+    
+    Applies the same date range to the outgoing side and skips the same stale
+    links (incoming side missing or not linking back). Only the link IDs are
+    projected, on both the outgoing and the incoming sides.
+    
+    Args:
+        user_id: The user ID to filter by
+        start_date_ts: Start date filter on the outgoing side (milliseconds since epoch)
+        end_date_ts: End date filter on the outgoing side (milliseconds since epoch)
+        
+    Returns:
+        Number of valid transfer pairs
+    """
+    table = tables.transactions
+    if not table:
+        logger.error("TRANSACTIONS_TABLE is not configured.")
+        return 0
+    
+    params: Dict[str, Any] = {
+        'IndexName': 'TransferPairIndex',
+        'KeyConditionExpression': _transfer_pair_key_condition(user_id, start_date_ts, end_date_ts),
+        'ProjectionExpression': 'transactionId, pairedTransactionId'
+    }
+    links = {
+        str(item['transactionId']): str(item['pairedTransactionId'])
+        for page in _query_pages(table, params)
+        for item in page
+        if item.get('pairedTransactionId')
+    }
+    if not links:
+        return 0
+    
+    result = batch_get_items(
+        table,
+        [{'transactionId': incoming_id} for incoming_id in links.values()],
+        attributes=['userId', 'pairedTransactionId']
+    )
+    if result.unprocessed_keys:
+        logger.warning(f"Could not read {len(result.unprocessed_keys)} transactions (throttling)")
+    incoming_links = {
+        str(item['transactionId']): str(item['pairedTransactionId'])
+        for item in result.items
+        if item.get('userId') == user_id and item.get('pairedTransactionId')
+    }
+    return sum(
+        1 for outgoing_id, incoming_id in links.items()
+        if incoming_links.get(incoming_id) == outgoing_id
+    )
+
+
 @monitor_performance(warn_threshold_ms=300)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("create_transaction")
@@ -516,6 +957,57 @@ def create_transaction(transaction: Transaction):
     return transaction
 
 
+@monitor_performance(operation_type="batch_write", warn_threshold_ms=5000)
+@dynamodb_operation("batch_create_transactions")
+def batch_create_transactions(
+    transactions: List[Transaction],
+    max_workers: int = 4
+) -> List[Transaction]:
+    """
+    Create many transactions using parallel BatchWriteItem calls.
+    
+    Unprocessed items are retried with backoff by the batch helper; anything
+    that still cannot be written is returned so the caller can report it.
+    
+    Args:
+        transactions: Transaction objects to create
+        max_workers: Number of 25-item chunks written concurrently
+        
+    Returns:
+        List of transactions that failed to be written (empty on full success)
+    """
+    if not transactions:
+        return []
+    
+    table = tables.transactions
+    if not table:
+        logger.error("TRANSACTIONS_TABLE is not configured.")
+        return list(transactions)
+    
+    failed: List[Transaction] = []
+    items_by_id: Dict[str, Transaction] = {}
+    items: List[Dict[str, Any]] = []
+    for transaction in transactions:
+        try:
+            item = transaction.to_dynamodb_item()
+        except Exception as e:
+            logger.error(f"Error serializing transaction {transaction.transaction_id}: {e}")
+            failed.append(transaction)
+            continue
+        items_by_id[item['transactionId']] = transaction
+        items.append(item)
+    
+    result = parallel_batch_write_items(
+        table=table,
+        items=items,
+        max_workers=max_workers
+    )
+    failed.extend(items_by_id[item['transactionId']] for item in result.failed_items)
+    
+    logger.info(f"Batch created {result.written_count} transactions, {len(failed)} failed")
+    return failed
+
+
 @monitor_performance(warn_threshold_ms=500)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("delete_transactions_for_file")
@@ -683,6 +1175,48 @@ def get_transaction_by_account_and_hash(account_id: Union[str, uuid.UUID], trans
     return None
 
 
+@monitor_performance(operation_type="query", warn_threshold_ms=1000)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("get_account_transaction_hashes")
+def get_account_transaction_hashes(
+    account_id: Union[str, uuid.UUID],
+    start_date_ts: int,
+    end_date_ts: int
+) -> Set[int]:
+    """
+    Load the hashes of all stored transactions for an account within a date span.
+    
+    The transaction hash encodes the date, so any stored transaction with the
+    same hash as a row dated inside [start_date_ts, end_date_ts] is returned by
+    this single paginated AccountDateIndex query.
+    
+    Args:
+        account_id: The account ID
+        start_date_ts: Start of the span (milliseconds since epoch, inclusive)
+        end_date_ts: End of the span (milliseconds since epoch, inclusive)
+        
+    Returns:
+        Set of transaction hashes
+    """
+    items, _ = paginated_query(
+        table=tables.transactions,
+        query_params={
+            'IndexName': 'AccountDateIndex',
+            'KeyConditionExpression': (
+                Key('accountId').eq(str(account_id)) &
+                Key('date').between(start_date_ts, end_date_ts)
+            ),
+            'ProjectionExpression': 'transactionHash'
+        }
+    )
+    hashes = {int(item['transactionHash']) for item in items if item.get('transactionHash') is not None}
+    logger.info(
+        f"Loaded {len(hashes)} transaction hashes for account {account_id} "
+        f"between {start_date_ts} and {end_date_ts}"
+    )
+    return hashes
+
+
 @monitor_performance(warn_threshold_ms=200)
 @dynamodb_operation("check_duplicate_transaction")
 def check_duplicate_transaction(transaction: Transaction) -> bool: 
@@ -715,12 +1249,78 @@ def update_transaction(transaction: Transaction) -> None:
     """
     Update an existing transaction in DynamoDB.
     
+    Analytics rollups are not flagged here; callers that change categories,
+    amounts, dates or accounts call mark_transaction_rollups_stale once for
+    all transactions they updated.
+    
     Args:
         transaction: Transaction object to update
     """
     tables.transactions.put_item(Item=transaction.to_dynamodb_item())
 
 
+@monitor_performance(operation_type="batch_write", warn_threshold_ms=2000)
+@dynamodb_operation("update_transaction_categories")
+def update_transaction_categories(transactions: List[Transaction]) -> BatchWriteResult:
+    """
+    Write back only the category assignments of many transactions.
+    
+    Updates the categories and primaryCategoryId attributes (and updatedAt)
+    in groups of up to 100 transactions per call, instead of a full put_item
+    per transaction.
+    
+    Args:
+        transactions: Transactions whose categories changed
+        
+    Returns:
+        BatchWriteResult whose failed_items are the keys that were not updated
+    """
+    updated_at = int(datetime.now(timezone.utc).timestamp() * 1000)
+    updates = []
+    for transaction in transactions:
+        transaction.updated_at = updated_at
+        attributes: Dict[str, Any] = {
+            'categories': [assignment.to_dynamodb_item() for assignment in transaction.categories],
+            'updatedAt': updated_at
+        }
+        if transaction.primary_category_id is not None:
+            attributes['primaryCategoryId'] = str(transaction.primary_category_id)
+        updates.append(({'transactionId': str(transaction.transaction_id)}, attributes))
+    
+    result = grouped_update_items(
+        tables.transactions,
+        updates,
+        condition_expression='attribute_exists(transactionId)'
+    )
+    mark_transaction_rollups_stale(transactions)
+    return result
+
+
+def mark_transaction_rollups_stale(transactions: Iterable[Transaction]) -> None:
+    """
+    Flag the monthly analytics rollups of edited transactions for recomputation.
+    
+    Categories change through transaction writes without a file import, so
+    the rollups cannot see the change otherwise. Issues one update per user,
+    so loops should collect their transactions and call this once. Failures
+    are logged and never fail the transaction write.
+    
+    Args:
+        transactions: Transactions whose rollup months changed
+    """
+    rollup_keys: Dict[str, Set[Tuple[str, str]]] = {}
+    for transaction in transactions:
+        rollup_keys.setdefault(transaction.user_id, set()).add(
+            (str(transaction.account_id), month_key(transaction.date))
+        )
+    
+    for user_id, keys in rollup_keys.items():
+        try:
+            mark_rollups_stale(user_id, keys)
+        except Exception as e:
+            logger.warning(f"Could not mark analytics rollups stale for user {user_id}: {str(e)}")
+
+
 @monitor_performance(operation_type="query", warn_threshold_ms=200)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("get_first_transaction_date")
@@ -777,6 +1377,38 @@ def get_last_transaction_date(account_id: Union[str, uuid.UUID]) -> Optional[int
     return None
 
 
+@monitor_performance(operation_type="query", warn_threshold_ms=200)
+@retry_on_throttle(max_attempts=3)
+@dynamodb_operation("get_user_transaction_date_range")
+def get_user_transaction_date_range(user_id: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Get the earliest and latest transaction dates across all of a user's accounts.
+    
+    Two Limit=1 queries on UserIdIndex, one in each direction, so callers such as
+    iter_user_transactions can split a whole-history read into date segments.
+    
+    Args:
+        user_id: The user ID
+        
+    Returns:
+        Tuple of (earliest, latest) dates as milliseconds since epoch, or
+        (None, None) if the user has no transactions
+    """
+    def edge_date(ascending: bool) -> Optional[int]:
+        response = tables.transactions.query(
+            IndexName='UserIdIndex',
+            KeyConditionExpression=Key('userId').eq(user_id),
+            ProjectionExpression='#date',
+            ExpressionAttributeNames={'#date': 'date'},
+            Limit=1,
+            ScanIndexForward=ascending
+        )
+        items = response.get('Items', [])
+        return int(items[0]['date']) if items else None
+    
+    return edge_date(True), edge_date(False)
+
+
 @monitor_performance(operation_type="query", warn_threshold_ms=200)
 @retry_on_throttle(max_attempts=3)
 @dynamodb_operation("get_latest_transaction")
@@ -45,16 +45,25 @@ from utils.db import (  # noqa: F401
     
     # Transaction operations
     list_file_transactions,
+    list_file_transaction_summaries,
     list_user_transactions,
+    iter_user_transactions,
+    iter_user_transactions_by_key,
+    list_transfer_pairs,
+    count_transfer_pairs,
     create_transaction,
+    batch_create_transactions,
     delete_transactions_for_file,
     list_account_transactions,
     update_transaction_statuses_by_status,
     get_transaction_by_account_and_hash,
     check_duplicate_transaction,
+    get_account_transaction_hashes,
     update_transaction,
+    mark_transaction_rollups_stale,
     get_first_transaction_date,
     get_last_transaction_date,
+    get_user_transaction_date_range,
     get_latest_transaction,
     checked_mandatory_transaction,
     checked_optional_transaction,
@@ -77,6 +86,7 @@ from utils.db import (  # noqa: F401
     get_account_default_file_map,
     create_file_map,
     update_file_map,
+    update_file_map_date_format,
     delete_file_map,
     list_file_maps_by_user,
     list_account_file_maps,
@@ -102,6 +112,14 @@ from utils.db import (  # noqa: F401
     list_analytics_status_for_user,
     update_analytics_status,
     list_stale_analytics,
+    list_monthly_rollups,
+    get_monthly_rollup,
+    store_monthly_rollup,
+    replace_account_rollups,
+    get_rollup_state,
+    mark_rollups_built,
+    mark_rollups_stale,
+    take_stale_rollups,
     
     # FZIP operations
     create_fzip_job,
@@ -110,6 +128,7 @@ from utils.db import (  # noqa: F401
     list_user_fzip_jobs,
     delete_fzip_job,
     cleanup_expired_fzip_jobs,
+    batch_restore_items,
     
     # Workflow operations
     checked_mandatory_workflow,
@@ -108,6 +108,39 @@ class FZIPMetrics:
         except Exception as e:
             logger.error(f"Failed to record backup data volume metrics: {str(e)}")
     
+    def record_backup_collection_progress(self, completed_collectors: int, total_collectors: int,
+                                          records_collected: int, backup_type: str = "complete"):
+        """Record merged progress of the concurrent backup data collectors."""
+        try:
+            progress = (completed_collectors / total_collectors) * 100 if total_collectors else 100.0
+            dimensions = [{'Name': 'BackupType', 'Value': backup_type}]
+            
+            self.cloudwatch.put_metric_data(
+                Namespace=self.namespace,
+                MetricData=[
+                    {
+                        'MetricName': 'BackupCollectionProgress',
+                        'Dimensions': dimensions,
+                        'Value': progress,
+                        'Unit': 'Percent',
+                        'Timestamp': datetime.utcnow()
+                    },
+                    {
+                        'MetricName': 'BackupRecordsCollected',
+                        'Dimensions': dimensions,
+                        'Value': records_collected,
+                        'Unit': 'Count',
+                        'Timestamp': datetime.utcnow()
+                    }
+                ]
+            )
+            
+            logger.info(f"Recorded backup collection progress: {completed_collectors}/{total_collectors} "
+                       f"collectors, {records_collected} records")
+            
+        except Exception as e:
+            logger.error(f"Failed to record backup collection progress metrics: {str(e)}")
+    
     def record_backup_success_rate(self, success_count: int, total_count: int):
         """Record FZIP backup success rate."""
         try:
@@ -5,9 +5,12 @@ This module provides utility functions for working with dates, calendars,
 and temporal patterns, particularly for recurring charge detection.
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
+
 
 def is_first_working_day(dt: datetime, holidays_calendar: Any) -> bool:
     """
@@ -68,3 +71,76 @@ def is_last_working_day(dt: datetime, holidays_calendar: Any) -> bool:
     
     return False
 
+
+
+@dataclass(frozen=True)
+class WorkingDayCalendar:
+    """
+    Precomputed working-day flags for every day of a range of years.
+
+    Arrays are indexed by days since `start`; use `day_index` to map
+    datetime64[D] values to positions.
+    """
+
+    start: np.datetime64
+    """First day covered (January 1st of the first year)."""
+
+    end: np.datetime64
+    """Day after the last day covered."""
+
+    is_working_day: np.ndarray
+    is_first_working_day: np.ndarray
+    is_last_working_day: np.ndarray
+
+    def covers(self, first_day: np.datetime64, last_day: np.datetime64) -> bool:
+        """Whether the calendar covers every day from first_day to last_day."""
+        return self.start <= first_day and last_day < self.end
+
+    def day_index(self, days: np.ndarray) -> np.ndarray:
+        """Positions of the given datetime64[D] days in the calendar arrays."""
+        return (days - self.start).astype(np.int64)
+
+
+def build_working_day_calendar(holidays_calendar: Any, first_year: int, last_year: int) -> WorkingDayCalendar:
+    """
+    Build the working-day table for whole years.
+
+    Flags match is_first_working_day / is_last_working_day for every day in
+    the range, so batches of dates can be looked up instead of checked one
+    by one.
+
+    Args:
+        holidays_calendar: Holiday calendar object (from holidays library)
+        first_year: First year to cover
+        last_year: Last year to cover (inclusive)
+
+    Returns:
+        WorkingDayCalendar for January 1st of first_year to December 31st of last_year
+    """
+    start = np.datetime64(f'{first_year:04d}-01-01', 'D')
+    end = np.datetime64(f'{last_year + 1:04d}-01-01', 'D')
+    days = np.arange(start, end, dtype='datetime64[D]')
+
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    is_holiday = np.fromiter((day in holidays_calendar for day in days.tolist()), dtype=bool, count=len(days))
+    is_working_day = (weekday < 5) & ~is_holiday
+
+    # Working days are in date order, so the first/last one of each month is
+    # where its month ID first/last appears
+    working_positions = np.flatnonzero(is_working_day)
+    working_months = days[working_positions].astype('datetime64[M]')
+    _, first_in_month = np.unique(working_months, return_index=True)
+    _, last_in_month = np.unique(working_months[::-1], return_index=True)
+
+    is_first_working_day = np.zeros(len(days), dtype=bool)
+    is_first_working_day[working_positions[first_in_month]] = True
+    is_last_working_day = np.zeros(len(days), dtype=bool)
+    is_last_working_day[working_positions[len(working_positions) - 1 - last_in_month]] = True
+
+    return WorkingDayCalendar(
+        start=start,
+        end=end,
+        is_working_day=is_working_day,
+        is_first_working_day=is_first_working_day,
+        is_last_working_day=is_last_working_day
+    )
@@ -13,10 +13,13 @@ import io
 import logging
 import logging.config
 import os
+import re
 import xml.etree.ElementTree as ET
+from collections import Counter
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Dict, Any, Optional, Callable
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator
 from datetime import datetime
 
 # Model imports
@@ -24,7 +27,7 @@ from models.account import Currency
 from models.transaction import Transaction
 from models.transaction_file import FileFormat, TransactionFile
 from models.file_map import FileMap
-from utils.db_utils import checked_mandatory_file_map
+from utils.db_utils import checked_mandatory_file_map, update_file_map_date_format
 
 def parse_ofx_headers(content: bytes) -> Dict[str, str]:
     """
@@ -348,6 +351,165 @@ class ParsingContext:
 # IMPROVED DATE PROCESSING - ANALYZE ALL DATES TO DETERMINE FORMAT
 # =============================================================================
 
+# Candidate date formats by file type, in order of preference
+DATE_FORMATS: Dict[str, List[str]] = {
+    'csv': [
+        "%Y-%m-%d",     # 2024-01-15
+        "%m/%d/%Y",     # 1/15/2024 (US format)
+        "%d/%m/%Y",     # 15/1/2024 (EU format)
+        "%Y%m%d",       # 20240115
+        "%m-%d-%Y",     # 1-15-2024
+        "%d-%m-%Y",     # 15-1-2024
+        "%m/%d/%y",     # 1/15/24
+        "%d/%m/%y",     # 15/1/24
+    ],
+    'ofx': [
+        "%Y%m%d",       # 20240115 (standard OFX)
+    ],
+    'qif': [
+        "%d/%m/%Y",     # 15/01/2024
+        "%d/%m/%y",     # 15/01/24
+        "%m/%d/%Y",     # 1/15/2024
+        "%m/%d/%y",     # 1/15/24  
+        "%m/%d'%y",     # 1/15'24 (Quicken format)
+        "%m/ %d/%y",    # 1/ 1/24 (spaces)
+        "%Y-%m-%d"      # 2024-01-15
+    ]
+}
+
+
+# strptime's own patterns for the directives used in DATE_FORMATS (see _strptime.TimeRE)
+_DIRECTIVE_PATTERNS = {
+    'd': r"(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+    'm': r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+    'Y': r"(?P<Y>\d\d\d\d)",
+    'y': r"(?P<y>\d\d)",
+}
+
+# Looser patterns that only describe which characters are digits
+_DIRECTIVE_SHAPES = {
+    'd': r"(?:\d\d?| \d)",
+    'm': r"\d\d?",
+    'Y': r"\d{4}",
+    'y': r"\d\d",
+}
+
+# Digit count of each directive's text in the fast paths
+_DIRECTIVE_WIDTHS = {'d': (1, 2), 'm': (1, 2), 'Y': (4,), 'y': (2,)}
+
+_DIGIT = re.compile(r"\d")
+
+
+def _format_pattern(date_format: str, directive_patterns: Dict[str, str]) -> Optional[str]:
+    """
+    Build a regex for a date format the way strptime does, or None if the
+    format uses a directive without a known pattern.
+    """
+    pattern = re.sub(r"([\\.^$*+?\(\){}\[\]|])", r"\\\1", date_format)
+    pattern = re.sub(r'\s+', r'\\s+', pattern)
+    processed = ''
+    while '%' in pattern:
+        directive_index = pattern.index('%') + 1
+        directive = pattern[directive_index:directive_index + 1]
+        if directive not in directive_patterns:
+            return None
+        processed += pattern[:directive_index - 1] + directive_patterns[directive]
+        pattern = pattern[directive_index + 1:]
+    return processed + pattern
+
+
+def _date_from_parts(parts: Dict[str, str]) -> datetime:
+    """Build the datetime strptime would return for day, month and year fields"""
+    if 'Y' in parts:
+        year = int(parts['Y'])
+    else:
+        year = int(parts['y'])
+        # Same pivot as strptime: 69-99 are 1900s, 00-68 are 2000s
+        year += 2000 if year <= 68 else 1900
+    return datetime(year, int(parts['m']), int(parts['d']))
+
+
+def _fast_path(date_format: str) -> Optional[Callable[[str], Optional[datetime]]]:
+    """
+    Parser for the common shapes of a format without a regex: slices for
+    YYYYMMDD, str.split for formats like D/M/Y.
+    
+    Returns None for dates it does not handle (the caller falls back to the
+    strptime-equivalent regex); for the dates it does handle, the result or
+    ValueError is the same as strptime's.
+    """
+    if date_format == "%Y%m%d":
+        def parse_compact(date_str: str) -> Optional[datetime]:
+            if len(date_str) != 8 or not (date_str.isascii() and date_str.isdigit()):
+                return None
+            return datetime(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:]))
+        return parse_compact
+    
+    directives = re.fullmatch(r"%([dmYy])(\W)%([dmYy])\2%([dmYy])", date_format)
+    if not directives or directives.group(2).isspace() or directives.group(2) == '%':
+        return None
+    separator = directives.group(2)
+    names = directives.group(1, 3, 4)
+    if sorted(name.lower() for name in names) != ['d', 'm', 'y']:
+        return None
+    widths = [_DIRECTIVE_WIDTHS[name] for name in names]
+    
+    def parse_separated(date_str: str) -> Optional[datetime]:
+        fields = date_str.split(separator)
+        if len(fields) != 3 or not all(
+            len(value) in width and value.isascii() and value.isdigit()
+            for value, width in zip(fields, widths)
+        ):
+            return None
+        return _date_from_parts(dict(zip(names, fields)))
+    return parse_separated
+
+
+@lru_cache(maxsize=None)
+def compile_date_parser(date_format: str) -> Callable[[str], datetime]:
+    """
+    Compile a parser equivalent to datetime.strptime(date_str, date_format).
+    
+    Common formats use slicing or splitting, everything else a precompiled
+    copy of strptime's regex, avoiding strptime's per-call format handling.
+    Formats with other directives fall back to strptime itself.
+    """
+    pattern = _format_pattern(date_format, _DIRECTIVE_PATTERNS)
+    if pattern is None:
+        return lambda date_str: datetime.strptime(date_str, date_format)
+    
+    regex = re.compile(pattern, re.IGNORECASE)
+    fast_path = _fast_path(date_format)
+    
+    def parse(date_str: str) -> datetime:
+        if fast_path is not None:
+            result = fast_path(date_str)
+            if result is not None:
+                return result
+        found = regex.match(date_str)
+        if found is None:
+            raise ValueError(f"time data {date_str!r} does not match format {date_format!r}")
+        if found.end() != len(date_str):
+            raise ValueError(f"unconverted data remains: {date_str[found.end():]}")
+        return _date_from_parts(found.groupdict())
+    return parse
+
+
+@lru_cache(maxsize=None)
+def _shape_regex(date_format: str) -> Optional[re.Pattern]:
+    pattern = _format_pattern(date_format, _DIRECTIVE_SHAPES)
+    return re.compile(pattern, re.IGNORECASE) if pattern is not None else None
+
+
+def date_shape(date_str: str) -> str:
+    """Classify a date string by its shape, e.g. '15/01/2024' -> '99/99/9999'"""
+    return _DIGIT.sub('9', date_str)
+
+
+def formats_for_shape(shape: str, formats: List[str]) -> List[str]:
+    """The formats that dates of this shape could possibly be in"""
+    return [fmt for fmt in formats if _shape_regex(fmt) is None or _shape_regex(fmt).fullmatch(shape)]
+
 def determine_date_format(date_strings: List[str], format_type: str = 'csv') -> Optional[str]:
     """
     Analyze all date strings in the file to determine the correct date format.
@@ -364,68 +526,54 @@ def determine_date_format(date_strings: List[str], format_type: str = 'csv') ->
     Returns:
         The date format string that works for all dates, or None if no format works
     """
-    # Define format sets by file type
-    format_sets = {
-        'csv': [
-            "%Y-%m-%d",     # 2024-01-15
-            "%m/%d/%Y",     # 1/15/2024 (US format)
-            "%d/%m/%Y",     # 15/1/2024 (EU format)
-            "%Y%m%d",       # 20240115
-            "%m-%d-%Y",     # 1-15-2024
-            "%d-%m-%Y",     # 15-1-2024
-            "%m/%d/%y",     # 1/15/24
-            "%d/%m/%y",     # 15/1/24
-        ],
-        'ofx': [
-            "%Y%m%d",       # 20240115 (standard OFX)
-        ],
-        'qif': [
-            "%d/%m/%Y",     # 15/01/2024
-            "%d/%m/%y",     # 15/01/24
-            "%m/%d/%Y",     # 1/15/2024
-            "%m/%d/%y",     # 1/15/24  
-            "%m/%d'%y",     # 1/15'24 (Quicken format)
-            "%m/ %d/%y",    # 1/ 1/24 (spaces)
-            "%Y-%m-%d"      # 2024-01-15
-        ]
-    }
-    
-    formats_to_try = format_sets.get(format_type, format_sets['csv'])
-    
     # Filter out empty or None date strings
     valid_dates = [d.strip() for d in date_strings if d and d.strip()]
     
-    if not valid_dates:
+    return determine_date_format_from_counts(Counter(valid_dates), format_type, valid_dates[:5])
+
+
+def determine_date_format_from_counts(
+    date_counts: Counter,
+    format_type: str = 'csv',
+    sample_dates: Optional[List[str]] = None
+) -> Optional[str]:
+    """
+    Determine the date format from counts of distinct date strings.
+    
+    Gives the same result as determine_date_format() on the full list of dates,
+    but each distinct date is parsed once per candidate format, so a file can be
+    analysed while its rows stream past without keeping every date. Dates are
+    classified by shape first, so they are only parsed with the formats their
+    shape allows, using compiled parsers.
+    
+    Args:
+        date_counts: Number of occurrences of each stripped, non-empty date string
+        format_type: Type of file format ('csv', 'ofx', 'qif')
+        sample_dates: A few dates from the start of the file, for logging
+    
+    Returns:
+        The date format string that works for all dates, or None if no format works
+    """
+    formats_to_try = DATE_FORMATS.get(format_type, DATE_FORMATS['csv'])
+    total_dates = sum(date_counts.values())
+    
+    if not total_dates:
         logger.warning("No valid date strings provided")
         return None
     
-    logger.info(f"Analyzing {len(valid_dates)} date strings to determine format")
-    logger.debug(f"Sample dates: {valid_dates[:5]}")  # Log first 5 dates for debugging
+    logger.info(f"Analyzing {total_dates} date strings to determine format")
+    logger.debug(f"Sample dates: {sample_dates}")  # Log first 5 dates for debugging
     
-    # Try each format and count successful parses
+    # Count successful parses for each format
+    format_successes = count_parseable_dates(date_counts, formats_to_try, format_type)
     best_format = None
     best_success_rate = 0
     
     for fmt in formats_to_try:
-        successful_parses = 0
-        total_attempts = 0
+        successful_parses = format_successes[fmt]
+        success_rate = successful_parses / total_dates
         
-        for date_str in valid_dates:
-            total_attempts += 1
-            try:
-                # For OFX dates, handle timestamp format (take first 8 chars)
-                test_date = date_str
-                if format_type == 'ofx' and len(test_date) > 8:
-                    test_date = test_date[:8]
-                
-                datetime.strptime(test_date, fmt)
-                successful_parses += 1
-            except ValueError:
-                continue
-        
-        success_rate = successful_parses / total_attempts if total_attempts > 0 else 0
-        
-        logger.debug(f"Format '{fmt}': {successful_parses}/{total_attempts} successful ({success_rate:.2%})")
+        logger.debug(f"Format '{fmt}': {successful_parses}/{total_dates} successful ({success_rate:.2%})")
         
         # A format must work for at least 90% of dates to be considered valid
         # This allows for some malformed dates while ensuring consistency
@@ -446,6 +594,48 @@ def determine_date_format(date_strings: List[str], format_type: str = 'csv') ->
         return None
 
 
+def count_parseable_dates(date_counts: Counter, formats: List[str], format_type: str = 'csv') -> Dict[str, int]:
+    """
+    Count how many of the dates each format parses.
+    
+    Args:
+        date_counts: Number of occurrences of each stripped, non-empty date string
+        formats: Candidate date formats
+        format_type: Type of file format ('csv', 'ofx', 'qif')
+    
+    Returns:
+        Number of dates parsed successfully, by format
+    """
+    successes = dict.fromkeys(formats, 0)
+    candidates_by_shape: Dict[str, List[str]] = {}
+    
+    for date_str, count in date_counts.items():
+        # For OFX dates, handle timestamp format (take first 8 chars)
+        test_date = date_str
+        if format_type == 'ofx' and len(test_date) > 8:
+            test_date = test_date[:8]
+        
+        shape = date_shape(test_date)
+        candidates = candidates_by_shape.get(shape)
+        if candidates is None:
+            candidates = candidates_by_shape[shape] = formats_for_shape(shape, formats)
+        
+        for fmt in candidates:
+            try:
+                compile_date_parser(fmt)(test_date)
+                successes[fmt] += count
+            except ValueError:
+                continue
+    
+    return successes
+
+
+@lru_cache(maxsize=4096)
+def _date_millis(date_str: str, date_format: str) -> int:
+    """Milliseconds since epoch of a date; statements repeat the same dates many times"""
+    return int(compile_date_parser(date_format)(date_str).timestamp() * 1000)
+
+
 def parse_date_with_format(date_str: str, date_format: str, format_type: str = 'csv') -> int:
     """
     Parse a single date string using a predetermined format.
@@ -465,8 +655,7 @@ def parse_date_with_format(date_str: str, date_format: str, format_type: str = '
         if format_type == 'ofx' and len(processed_date) > 8:
             processed_date = processed_date[:8]  # Take first 8 chars for YYYYMMDD
         
-        dt = datetime.strptime(processed_date, date_format)
-        return int(dt.timestamp() * 1000)
+        return _date_millis(processed_date, date_format)
         
     except ValueError as e:
         raise ValueError(f"Failed to parse date '{date_str}' with format '{date_format}': {str(e)}")
@@ -609,8 +798,85 @@ class DateInfo:
     sample_dates: List[str]
 
 
-def extract_raw_transactions(transaction_file: TransactionFile, content: bytes) -> List[Dict[str, str]]:
-    """Dispatch to format-specific extractor"""
+FORMAT_TYPES: Dict[FileFormat, str] = {
+    FileFormat.CSV: 'csv',
+    FileFormat.OFX: 'ofx',
+    FileFormat.QFX: 'ofx',
+    FileFormat.QIF: 'qif'
+}
+
+# Data lines passed to preprocess_csv_text() at a time while streaming a CSV file
+CSV_PREPROCESS_CHUNK_LINES = 1000
+
+
+class QuotedDialect(csv.Dialect):
+    """CSV dialect for preprocessed statement files"""
+    delimiter = ','
+    quotechar = '"'
+    doublequote = True
+    skipinitialspace = True
+    lineterminator = '\n'
+    quoting = csv.QUOTE_MINIMAL
+
+
+def iter_text_lines(content: bytes, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Decode content incrementally and yield its lines.
+    
+    Yields the same lines as content.decode(encoding).splitlines() without
+    building the decoded text.
+    """
+    stream = io.TextIOWrapper(io.BytesIO(content), encoding=encoding)
+    for physical_line in stream:
+        yield from physical_line.splitlines()
+
+
+def preprocess_csv_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Stream CSV lines through preprocess_csv_text() a chunk at a time.
+    🔒 CRITICAL: Uses protected preprocess_csv_text() function
+    
+    Each chunk is preprocessed together with the header line, which gives the
+    same lines as preprocessing the whole file at once.
+    """
+    lines = iter(lines)
+    header_line = next(lines, None)
+    if header_line is None:
+        return
+    
+    def chunks() -> Iterator[List[str]]:
+        chunk: List[str] = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == CSV_PREPROCESS_CHUNK_LINES:
+                yield chunk
+                chunk = []
+        yield chunk
+    
+    for chunk_number, chunk in enumerate(chunks()):
+        preprocessed_lines = preprocess_csv_text('\n'.join([header_line] + chunk)).splitlines()  # 🔒 PROTECTED
+        if len(preprocessed_lines) != len(chunk) + 1:
+            raise ValueError("Preprocessing CSV text resulted in a different number of lines")
+        yield from preprocessed_lines if chunk_number == 0 else preprocessed_lines[1:]
+
+
+def _with_line_endings(lines: Iterable[str]) -> Iterator[str]:
+    """Yield lines as io.StringIO('\n'.join(lines)) would, so quoted fields keep their newlines"""
+    previous = None
+    for line in lines:
+        if previous is not None:
+            yield previous + '\n'
+        previous = line
+    if previous is not None:
+        yield previous
+
+
+def extract_raw_transactions(transaction_file: TransactionFile, content: bytes) -> Iterable[Dict[str, str]]:
+    """
+    Dispatch to format-specific extractor.
+    
+    CSV and QIF rows are streamed from the content; OFX/QFX rows are returned as a list.
+    """
     if not transaction_file.file_format:
         raise ValueError("File format is required")
     
@@ -627,31 +893,16 @@ def extract_raw_transactions(transaction_file: TransactionFile, content: bytes)
     return extractor(transaction_file, content)
 
 
-def extract_raw_transactions_csv(transaction_file: TransactionFile, content: bytes) -> List[Dict[str, str]]:
+def extract_raw_transactions_csv(transaction_file: TransactionFile, content: bytes) -> Iterator[Dict[str, str]]:
     """
-    Extract raw CSV data into list of dictionaries.
+    Stream raw CSV rows as dictionaries.
     🔒 CRITICAL: Uses protected preprocess_csv_text() function
     """
-    raw_content = content.decode('utf-8')
-    preprocessed_content = preprocess_csv_text(raw_content)  # 🔒 PROTECTED
-    
-    if len(preprocessed_content.splitlines()) != len(raw_content.splitlines()):
-        raise ValueError("Preprocessing CSV text resulted in a different number of lines")
-    
-    # Create custom CSV dialect
-    class QuotedDialect(csv.Dialect):
-        delimiter = ','
-        quotechar = '"'
-        doublequote = True
-        skipinitialspace = True
-        lineterminator = '\n'
-        quoting = csv.QUOTE_MINIMAL
+    preprocessed_lines = preprocess_csv_lines(iter_text_lines(content))
+    reader = csv.DictReader(_with_line_endings(preprocessed_lines), dialect=QuotedDialect())
     
-    # Parse CSV into raw dictionaries
-    csv_file = io.StringIO(preprocessed_content)
-    reader = csv.DictReader(csv_file, dialect=QuotedDialect())
-    
-    return [dict(row) for row in reader]
+    for row in reader:
+        yield dict(row)
 
 
 def extract_raw_transactions_ofx(transaction_file: TransactionFile, content: bytes) -> List[Dict[str, str]]:
@@ -698,17 +949,15 @@ def extract_raw_transactions_ofx(transaction_file: TransactionFile, content: byt
         return result
 
 
-def extract_raw_transactions_qif(transaction_file: TransactionFile, content: bytes) -> List[Dict[str, str]]:
-    """Extract raw QIF data into list of dictionaries"""
-    text_content = content.decode('utf-8')
-    transactions = []
+def extract_raw_transactions_qif(transaction_file: TransactionFile, content: bytes) -> Iterator[Dict[str, str]]:
+    """Stream raw QIF transactions as dictionaries"""
     current_transaction = {}
     
-    for line in text_content.splitlines():
+    for line in iter_text_lines(content):
         line = line.strip()
         if line == '^':  # End of transaction
             if current_transaction:
-                transactions.append(current_transaction.copy())
+                yield current_transaction
             current_transaction = {}
         elif len(line) >= 2:
             field_code = line[0]
@@ -717,74 +966,140 @@ def extract_raw_transactions_qif(transaction_file: TransactionFile, content: byt
     
     # Add final transaction if exists
     if current_transaction:
-        transactions.append(current_transaction)
-    
-    return transactions
+        yield current_transaction
 
 
-def apply_mappings_to_transactions(raw_transactions: List[Dict[str, str]], transaction_file: TransactionFile) -> List[Dict[str, Any]]:
+def apply_mappings_to_transactions(raw_transactions: Iterable[Dict[str, str]], file_map: FileMap) -> Iterator[Dict[str, Any]]:
     """
-    Apply field mappings to all transactions.
+    Apply field mappings to transactions as they stream through.
     🔒 CRITICAL: Uses protected apply_field_mapping() function
     """
-    file_map = checked_mandatory_file_map(transaction_file.file_map_id, transaction_file.user_id)
-    mapped_transactions = []
-    
     for raw_txn in raw_transactions:
         # 🔒 PROTECTED: Use existing field mapping function
         mapped_data = apply_field_mapping(raw_txn, file_map)
         if mapped_data:
-            mapped_transactions.append(mapped_data)
-    
-    return mapped_transactions
+            yield mapped_data
+
 
+def _iso_timestamp(date_string: str) -> Optional[float]:
+    """Timestamp of a YYYY-MM-DD date, parsed as detect_date_order() does"""
+    try:
+        return datetime.strptime(date_string, "%Y-%m-%d").timestamp()
+    except ValueError:
+        return None
 
-def determine_dates_and_order(mapped_transactions: List[Dict[str, Any]], file_format: Optional[FileFormat]) -> DateInfo:
+
+def determine_dates_and_order(
+    mapped_transactions: Iterable[Dict[str, Any]],
+    file_format: Optional[FileFormat],
+    known_format: Optional[str] = None
+) -> DateInfo:
     """
     Determine date format and order from mapped transaction data.
     Combines collective date analysis with order detection.
+    
+    Consumes the transactions in one pass, keeping counts of distinct dates for
+    format analysis and only the dates that decide the order.
+    
+    Args:
+        mapped_transactions: Mapped transaction data
+        file_format: Format of the file
+        known_format: Date format stored on the file map by an earlier import;
+            used without inference if it parses at least 90% of the dates
     """
     if not file_format:
         raise ValueError("File format is required")
     
-    # Extract date strings from mapped 'date' field (field mapping already applied)
-    date_strings = [txn.get('date', '') for txn in mapped_transactions if txn.get('date', '').strip()]
+    format_type = FORMAT_TYPES[file_format]
+    date_counts: Counter = Counter()
+    sample_dates: List[str] = []
+    # detect_date_order() only looks at the first parseable date and the first that differs from it
+    order_dates: List[str] = []
+    first_timestamp = None
+    
+    # Date strings from mapped 'date' field (field mapping already applied)
+    for txn in mapped_transactions:
+        date_string = txn.get('date', '')
+        if not date_string.strip():
+            continue
+        
+        date_counts[date_string.strip()] += 1
+        if len(sample_dates) < 5:
+            sample_dates.append(date_string)  # Keep samples for logging
+        if len(order_dates) < 2:
+            timestamp = _iso_timestamp(date_string)
+            if timestamp is not None and timestamp != first_timestamp:
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                order_dates.append(date_string)
+    
+    date_format = None
+    if known_format and date_counts:
+        # Any miss means the stored format may be wrong for this file, so infer again
+        successful_parses = count_parseable_dates(date_counts, [known_format], format_type)[known_format]
+        if successful_parses == sum(date_counts.values()):
+            logger.info(f"Using stored date format '{known_format}'")
+            date_format = known_format
+        else:
+            logger.warning(f"Stored date format '{known_format}' does not match all of the file's dates")
     
     # Determine format using collective analysis
-    format_type_map = {
-        FileFormat.CSV: 'csv',
-        FileFormat.OFX: 'ofx', 
-        FileFormat.QFX: 'ofx',
-        FileFormat.QIF: 'qif'
-    }
-    
-    date_format = determine_date_format(date_strings, format_type_map[file_format])
+    if not date_format:
+        date_format = determine_date_format_from_counts(date_counts, format_type, [d.strip() for d in sample_dates])
     if not date_format:
         raise ValueError(f"Could not determine date format for {file_format} file")
     
     # 🔒 PROTECTED: Use existing date order detection
-    order = detect_date_order(date_strings)
+    order = detect_date_order(order_dates)
     
     return DateInfo(
         format_string=date_format,
         order=order,
-        sample_dates=date_strings[:5]  # Keep samples for logging
+        sample_dates=sample_dates
     )
 
 
+def _parse_mapped_data(
+    mapped_data: Dict[str, Any],
+    transaction_file: TransactionFile,
+    date_info: DateInfo,
+    reverse_amounts: bool
+) -> Optional[ParsedTransactionData]:
+    """Parse one mapped row, or return None if it cannot be parsed"""
+    try:
+        return ParsedTransactionData(
+            date=parse_date_with_format(mapped_data['date'], date_info.format_string, FORMAT_TYPES[transaction_file.file_format]),
+            description=mapped_data.get('description', ''),
+            amount=_process_amount_for_format(mapped_data, transaction_file.file_format, reverse_amounts),
+            currency=_parse_currency(mapped_data.get('currency')) or transaction_file.currency,
+            memo=mapped_data.get('memo'),
+            transaction_type=mapped_data.get('debitOrCredit') or mapped_data.get('transactionType'),
+            check_number=mapped_data.get('checkNumber'),
+            fit_id=mapped_data.get('fitId'),
+            status=mapped_data.get('status')
+        )
+    except Exception as e:
+        logger.error(f"Error creating transaction from mapped data: {str(e)}")
+        return None
+
+
 def create_transactions_from_mapped_data(
-    mapped_transactions: List[Dict[str, Any]], 
+    mapped_transactions: Iterable[Dict[str, Any]], 
     transaction_file: TransactionFile,
+    file_map: FileMap,
     date_info: DateInfo
 ) -> List[Transaction]:
     """
     Create Transaction objects from mapped data.
     Universal function that works for all formats.
+    
+    Transactions are created newest first so running balances are correct.
+    Files in descending order are created as rows stream through; ascending
+    files are parsed first and then created in reverse.
     """
     if not transaction_file.file_format:
         raise ValueError("File format is required")
     
-    file_map = checked_mandatory_file_map(transaction_file.file_map_id, transaction_file.user_id)
     context = ParsingContext(
         transaction_file=transaction_file,
         file_map=file_map,
@@ -792,37 +1107,23 @@ def create_transactions_from_mapped_data(
         import_order=1
     )
     
-    transactions = []
+    # Determine if amounts should be reversed based on file mapping
+    reverse_amounts = file_map.reverse_amounts if file_map else False
+    
+    parsed_transactions: Iterable[Optional[ParsedTransactionData]] = (
+        _parse_mapped_data(mapped_data, transaction_file, date_info, reverse_amounts)
+        for mapped_data in mapped_transactions
+    )
     
     # Sort by date if needed
     if date_info.order == 'asc':
-        mapped_transactions.reverse()
+        parsed_transactions = reversed(list(parsed_transactions))
     
-    for mapped_data in mapped_transactions:
+    transactions = []
+    for parsed_data in parsed_transactions:
+        if parsed_data is None:
+            continue
         try:
-            # Parse using determined date format
-            format_type = {
-                FileFormat.CSV: 'csv',
-                FileFormat.OFX: 'ofx',
-                FileFormat.QFX: 'ofx', 
-                FileFormat.QIF: 'qif'
-            }[transaction_file.file_format]
-            
-            # Determine if amounts should be reversed based on file mapping
-            reverse_amounts = file_map.reverse_amounts if file_map else False
-            
-            parsed_data = ParsedTransactionData(
-                date=parse_date_with_format(mapped_data['date'], date_info.format_string, format_type),
-                description=mapped_data.get('description', ''),
-                amount=_process_amount_for_format(mapped_data, transaction_file.file_format, reverse_amounts),
-                currency=_parse_currency(mapped_data.get('currency')) or transaction_file.currency,
-                memo=mapped_data.get('memo'),
-                transaction_type=mapped_data.get('debitOrCredit') or mapped_data.get('transactionType'),
-                check_number=mapped_data.get('checkNumber'),
-                fit_id=mapped_data.get('fitId'),
-                status=mapped_data.get('status')
-            )
-            
             transaction = create_transaction_from_parsed_data(parsed_data, context)
             transactions.append(transaction)
             
@@ -837,19 +1138,37 @@ def parse_transactions_orchestrator(transaction_file: TransactionFile, content:
     """
     Universal transaction parser orchestrator.
     Uses format-specific extractors but common processing pipeline.
+    
+    Rows stream through extraction and field mapping twice: once to determine
+    the date format and order, and again to create transactions, so neither
+    the decoded file nor its rows are held in memory.
     """
     try:
         # Step 1: Extract raw transaction data (format-specific)
         raw_transactions = extract_raw_transactions(transaction_file, content)
-        # get first 500 chars of raw_transactions
-        # Step 2: Apply field mappings (🔒 PROTECTED - universal)
-        mapped_transactions = apply_mappings_to_transactions(raw_transactions, transaction_file)
+        file_map = checked_mandatory_file_map(transaction_file.file_map_id, transaction_file.user_id)
         
-        # Step 3: Analyze dates and determine order (now that we know the date field)
-        date_info = determine_dates_and_order(mapped_transactions, transaction_file.file_format)
+        # Step 2: Analyze dates and determine order, mapping only the date field (🔒 PROTECTED - universal)
+        date_file_map = file_map.model_copy(
+            update={'mappings': [m for m in file_map.mappings if m.target_field == 'date']}
+        )
+        date_info = determine_dates_and_order(
+            apply_mappings_to_transactions(raw_transactions, date_file_map),
+            transaction_file.file_format,
+            known_format=file_map.date_format
+        )
+        if date_info.format_string != file_map.date_format:
+            _store_date_format(file_map, date_info.format_string)
         
-        # Step 4: Create transaction objects (universal)
-        return create_transactions_from_mapped_data(mapped_transactions, transaction_file, date_info)
+        # Step 3: Create transaction objects (universal), streaming the rows again
+        if not isinstance(raw_transactions, list):
+            raw_transactions = extract_raw_transactions(transaction_file, content)
+        return create_transactions_from_mapped_data(
+            apply_mappings_to_transactions(raw_transactions, file_map),
+            transaction_file,
+            file_map,
+            date_info
+        )
         
     except Exception as e:
         logger.error(f"Error in transaction parsing orchestrator: {str(e)}")
@@ -883,6 +1202,15 @@ def _process_amount_for_format(mapped_data: Dict[str, Any], file_format: Optiona
     return amount
 
 
+def _store_date_format(file_map: FileMap, date_format: str) -> None:
+    """Remember the file map's date format so later imports skip inference"""
+    try:
+        update_file_map_date_format(file_map.file_map_id, date_format)
+        file_map.date_format = date_format
+    except Exception as e:
+        logger.warning(f"Could not store date format on file map {file_map.file_map_id}: {str(e)}")
+
+
 def _parse_currency(currency_str: Optional[str]) -> Optional[Currency]:
     """Parse currency string to Currency enum"""
     if not currency_str:
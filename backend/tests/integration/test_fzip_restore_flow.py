@@ -94,7 +94,7 @@ def test_upload_s3_event_validation_and_listing(
 
     # S3 metadata and package parsing/validation pass
     mock_head.return_value = {'metadata': {'userid': user_id, 'restoreid': restore_id}, 'content_length': 1024}
-    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {}, 'raw': b''}
+    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {}}
     mock_schema.return_value = {'valid': True}
     mock_business.return_value = {'valid': True}
     mock_empty.return_value = {'valid': True}
@@ -113,11 +113,7 @@ def test_upload_s3_event_validation_and_listing(
     assert jobs[0]['progress'] == 40
 
 
-@patch('services.fzip_service.create_transaction')
-@patch('services.fzip_service.create_transaction_file')
-@patch('services.fzip_service.create_file_map')
-@patch('services.fzip_service.create_category_in_db')
-@patch('services.fzip_service.create_account')
+@patch('services.fzip_restore_engine.batch_restore_items')
 @patch('services.fzip_service.put_object')
 @patch('services.fzip_service.FZIPService._parse_package')
 @patch('src.handlers.fzip_operations.get_fzip_job')
@@ -127,11 +123,7 @@ def test_start_restore_completes(
     mock_get,
     mock_parse,
     mock_put,
-    mock_create_account,
-    mock_create_category,
-    mock_create_file_map,
-    mock_create_tf,
-    mock_create_txn,
+    mock_batch_restore,
 ):
     user_id = 'itest-user-2'
     restore_id = str(uuid.uuid4())
@@ -147,7 +139,7 @@ def test_start_restore_completes(
     mock_update.side_effect = store.update
 
     # Minimal package with empty data but valid structure
-    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {e: [] for e in ['accounts', 'categories', 'file_maps', 'transaction_files', 'transactions']}, 'raw': b''}
+    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {e: [] for e in ['accounts', 'categories', 'file_maps', 'transaction_files', 'transactions']}}
 
     # Invoke start handler
     resp = ops.start_fzip_restore_handler({'pathParameters': {'jobId': restore_id}}, user_id, restore_id)
@@ -185,7 +177,7 @@ def test_start_restore_cancel_midway(
     mock_update.side_effect = store.update
 
     # Minimal parse result
-    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {e: [] for e in ['accounts', 'categories', 'file_maps', 'transaction_files', 'transactions']}, 'raw': b''}
+    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {e: [] for e in ['accounts', 'categories', 'file_maps', 'transaction_files', 'transactions']}}
 
     # Service get_fzip_job will return a canceled status on first check to trigger cancel
     canceled_once = {'called': False}
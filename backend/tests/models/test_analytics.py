@@ -5,6 +5,7 @@ This test verifies that Analytics models properly handle enum conversion
 for DataQuality, AnalyticType, and ComputationStatus fields.
 """
 from datetime import date, datetime, timezone
+from decimal import Decimal
 from typing import Dict, Any
 
 import pytest
@@ -14,7 +15,8 @@ from models.analytics import (
     AnalyticType,
     ComputationStatus,
     AccountDataRange,
-    AnalyticsProcessingStatus
+    AnalyticsProcessingStatus,
+    MonthlyRollup
 )
 
 
@@ -285,6 +287,60 @@ class TestAnalyticsEnumConversion:
             assert deserialized.status == computation_status
 
 
+class TestMonthlyRollup:
+    """Test MonthlyRollup aggregation and serialization."""
+
+    def test_add_amount_splits_income_and_expense(self):
+        rollup = MonthlyRollup(userId='test-user', accountId='acc-1', month='2024-03')
+
+        rollup.add_amount(Decimal('100.00'), 'cat-salary', 'CREDIT')
+        rollup.add_amount(Decimal('-20.50'), 'cat-food', 'DEBIT')
+        rollup.add_amount(Decimal('-4.50'), 'cat-food', 'DEBIT')
+
+        assert rollup.income == Decimal('100.00')
+        assert rollup.expense == Decimal('25.00')
+        assert rollup.transaction_count == 3
+        assert len(rollup.entries) == 2
+
+    def test_merge_adds_entries(self):
+        rollup = MonthlyRollup(userId='test-user', accountId='acc-1', month='2024-03')
+        rollup.add_amount(Decimal('-10.00'), 'cat-food')
+        delta = MonthlyRollup(userId='test-user', accountId='acc-1', month='2024-03')
+        delta.add_amount(Decimal('-5.00'), 'cat-food')
+        delta.add_amount(Decimal('50.00'))
+
+        rollup.merge(delta)
+
+        assert rollup.expense == Decimal('15.00')
+        assert rollup.income == Decimal('50.00')
+        assert rollup.transaction_count == 3
+        assert len(rollup.entries) == 2
+
+    def test_dynamodb_roundtrip(self):
+        rollup = MonthlyRollup(userId='test-user', accountId='acc-1', month='2024-03', version=2)
+        rollup.add_amount(Decimal('-10.00'), 'cat-food', 'DEBIT', ('cat-food', 'cat-transfer'))
+
+        item = rollup.to_dynamodb_item()
+        restored = MonthlyRollup.from_dynamodb_item(item)
+
+        assert item['pk'] == 'test-user#rollup'
+        assert item['sk'] == '2024-03#acc-1'
+        assert isinstance(item['updatedAt'], str)
+        assert restored.entries == rollup.entries
+        assert restored.entries[0].category_ids == ['cat-food', 'cat-transfer']
+        assert restored.version == 2
+
+    def test_legacy_item_with_file_ids_still_loads(self):
+        restored = MonthlyRollup.from_dynamodb_item({
+            'pk': 'test-user#rollup', 'sk': '2024-03#acc-1', 'userId': 'test-user', 'accountId': 'acc-1',
+            'month': '2024-03', 'fileIds': ['file-1'],
+            'entries': [{'categoryId': 'cat-food', 'expense': Decimal('10'), 'expenseCount': 1}]
+        })
+
+        assert restored.entries[0].category_ids == []
+        assert restored.expense == Decimal('10')
+
+
 if __name__ == "__main__":
     # Run the specific test
     pytest.main([__file__, "-v"])
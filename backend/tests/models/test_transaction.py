@@ -11,6 +11,8 @@ from models.transaction import (
     CategoryAssignmentStatus,
     TransactionCreate,
     TransactionUpdate,
+    TransactionSummary,
+    TRANSACTION_SUMMARY_ATTRIBUTES,
     transaction_to_json
 )
 from models.account import Currency
@@ -470,6 +472,31 @@ class TestTransaction:
         # Hash should be recalculated
         assert transaction.transaction_hash != original_hash
 
+    def test_transfer_pair_index_key_only_on_outgoing_side(self):
+        """Test that only the outgoing side of a linked pair carries transferPairUserId."""
+        def _transaction(amount):
+            return Transaction.create(TransactionCreate(
+                userId="test-user",
+                fileId=uuid.uuid4(),
+                accountId=uuid.uuid4(),
+                date=1717632000000,
+                description="Transfer",
+                amount=Decimal(amount),
+                currency=Currency.USD
+            ))
+        outgoing, incoming = _transaction("-50.00"), _transaction("50.00")
+        assert 'transferPairUserId' not in outgoing.to_dynamodb_item()
+        
+        outgoing.paired_transaction_id = incoming.transaction_id
+        incoming.paired_transaction_id = outgoing.transaction_id
+        outgoing_item = outgoing.to_dynamodb_item()
+        incoming_item = incoming.to_dynamodb_item()
+        
+        assert outgoing_item['transferPairUserId'] == "test-user"
+        assert outgoing_item['pairedTransactionId'] == str(incoming.transaction_id)
+        assert 'transferPairUserId' not in incoming_item
+        assert Transaction.from_dynamodb_item(outgoing_item).paired_transaction_id == incoming.transaction_id
+
     def test_transaction_validation(self):
         """Test transaction validation."""
         # Test with valid data
@@ -758,4 +785,73 @@ class TestTransactionSerialization:
             Transaction.from_dynamodb_item(dynamodb_data)
         
         # Verify it's a UUID validation error
-        assert 'fileId' in str(exc_info.value) 
\ No newline at end of file
+        assert 'fileId' in str(exc_info.value) 
+
+
+class TestTransactionSummary:
+    """Test cases for the TransactionSummary read model."""
+
+    def test_from_dynamodb_item(self):
+        """Test building a summary from a projected DynamoDB item."""
+        category_id = str(uuid.uuid4())
+        item = {
+            'transactionId': '87654321-4321-4321-4321-210987654321',
+            'accountId': '11111111-2222-3333-4444-555555555555',
+            'date': Decimal('1640995200000'),
+            'amount': Decimal('-42.10'),
+            'transactionType': 'DEBIT',
+            'primaryCategoryId': category_id,
+            'categories': [{'categoryId': category_id, 'confidence': Decimal('100')}]
+        }
+
+        summary = TransactionSummary.from_dynamodb_item(item)
+
+        assert summary.transaction_id == item['transactionId']
+        assert summary.account_id == item['accountId']
+        assert summary.date == 1640995200000
+        assert isinstance(summary.date, int)
+        assert summary.amount == Decimal('-42.10')
+        assert summary.transaction_type == 'DEBIT'
+        assert summary.primary_category_id == category_id
+        assert summary.category_ids == (category_id,)
+
+    def test_from_dynamodb_item_optional_fields_and_legacy_categories(self):
+        """Test missing optional attributes and legacy string category assignments."""
+        category_id = str(uuid.uuid4())
+        item = {
+            'transactionId': 'tx-1',
+            'accountId': 'acc-1',
+            'date': Decimal('1'),
+            'amount': Decimal('5'),
+            'categories': [str({'categoryId': category_id}), 'not a dict']
+        }
+
+        summary = TransactionSummary.from_dynamodb_item(item)
+
+        assert summary.transaction_type is None
+        assert summary.primary_category_id is None
+        assert summary.category_ids == (category_id,)
+
+    def test_matches_full_model(self):
+        """Test a summary agrees with the full model built from the same item."""
+        transaction = Transaction(
+            userId='test-user',
+            fileId=uuid.uuid4(),
+            accountId=uuid.uuid4(),
+            date=1640995200000,
+            description='Coffee',
+            amount=Decimal('-3.50')
+        )
+        transaction.add_manual_category(uuid.uuid4(), set_as_primary=True)
+        item = transaction.to_dynamodb_item()
+        projected = {key: item[key] for key in TRANSACTION_SUMMARY_ATTRIBUTES if key in item}
+
+        summary = TransactionSummary.from_dynamodb_item(projected)
+
+        assert summary.transaction_id == str(transaction.transaction_id)
+        assert summary.account_id == str(transaction.account_id)
+        assert summary.file_id == str(transaction.file_id)
+        assert summary.date == transaction.date
+        assert summary.amount == transaction.amount
+        assert summary.primary_category_id == str(transaction.primary_category_id)
+        assert summary.category_ids == tuple(str(a.category_id) for a in transaction.categories)
@@ -0,0 +1,82 @@
+"""
+Unit tests for the columnar (NumPy) analytics aggregation backend.
+
+Tests cover:
+- Agreement with the engine's pure Python aggregation
+- Falling back when amounts cannot be held in minor units
+"""
+
+import random
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from models.transaction import TransactionSummary
+from services import analytics_columnar
+from services.analytics_computation_engine import AnalyticsComputationEngine
+
+
+def _transactions(count, seed=7):
+    rng = random.Random(seed)
+    base = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    categories = ['cat-food', 'cat-rent', 'cat-salary', 'cat-transfer', None]
+    types = ['DEBIT', 'CREDIT', None]
+    transactions = []
+    for i in range(count):
+        category = rng.choice(categories)
+        transactions.append(TransactionSummary(
+            transaction_id=f'tx-{i}',
+            account_id=rng.choice(['acc-1', 'acc-2', 'acc-3']),
+            date=base + rng.randrange(0, 365) * 86400000,
+            amount=Decimal(rng.randrange(-50000, 50000)).scaleb(-2),
+            transaction_type=rng.choice(types),
+            primary_category_id=category,
+            category_ids=(category,) if category else ()
+        ))
+    return transactions
+
+
+@pytest.fixture
+def engine():
+    engine = AnalyticsComputationEngine()
+    engine._transfer_category_cache['user123'] = {'cat-transfer'}
+    return engine
+
+
+class TestColumnarAggregation:
+    """The columnar backend matches the Python aggregation exactly."""
+
+    def test_aggregate_period_matches_python(self, engine):
+        transactions = _transactions(2000)
+
+        with patch.object(analytics_columnar, 'aggregate_period', return_value=None):
+            expected = engine._aggregate_transactions('user123', transactions)
+        actual = engine._aggregate_transactions('user123', transactions)
+
+        assert actual.total_income == expected.total_income
+        assert actual.total_expenses == expected.total_expenses
+        assert actual.transaction_count == expected.transaction_count
+        assert actual.monthly_income == dict(expected.monthly_income)
+        assert actual.category_spending == dict(expected.category_spending)
+        assert actual.category_counts == dict(expected.category_counts)
+        assert {k: list(v) for k, v in actual.account_flows.items()} == \
+            {k: list(v) for k, v in expected.account_flows.items()}
+
+    def test_category_spending_matches_python(self, engine):
+        transactions = _transactions(1500, seed=11)
+
+        with patch.object(analytics_columnar, 'category_spending', return_value=None):
+            expected = engine._category_spending(transactions)
+
+        assert engine._category_spending(transactions) == dict(expected)
+
+    def test_small_periods_use_python(self):
+        assert analytics_columnar.aggregate_period(_transactions(10), set()) is None
+
+    def test_sub_minor_unit_amounts_fall_back(self):
+        transactions = _transactions(analytics_columnar.COLUMNAR_MIN_ROWS)
+        transactions[0] = transactions[0]._replace(amount=Decimal('1.005'))
+
+        assert analytics_columnar.aggregate_period(transactions, set()) is None
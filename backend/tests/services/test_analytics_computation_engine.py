@@ -0,0 +1,110 @@
+"""
+Unit tests for AnalyticsComputationEngine.
+
+Tests cover:
+- Computing several analytic types from a single read of the period
+- Sharing period reads between computations through a context
+"""
+
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from models.analytics import AnalyticType
+from models.transaction import TransactionSummary
+from services.analytics_computation_engine import (
+    AnalyticsComputationContext,
+    AnalyticsComputationEngine,
+    ENGINE_ANALYTIC_TYPES,
+)
+
+
+def _ts(year, month, day):
+    return int(datetime(year, month, day, 12, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _summary(amount, date_ts, account_id='acc-1', category_id=None, transaction_type=None):
+    return TransactionSummary(
+        transaction_id='tx',
+        account_id=account_id,
+        date=date_ts,
+        amount=Decimal(amount),
+        transaction_type=transaction_type,
+        primary_category_id=category_id,
+        category_ids=(category_id,) if category_id else ()
+    )
+
+
+@pytest.fixture
+def engine():
+    engine = AnalyticsComputationEngine()
+    engine._transfer_category_cache['user123'] = {'cat-transfer'}
+    return engine
+
+
+@pytest.fixture
+def transactions():
+    return [
+        _summary('2500.00', _ts(2024, 5, 1), category_id='cat-salary', transaction_type='CREDIT'),
+        _summary('-80.00', _ts(2024, 5, 4), category_id='cat-food', transaction_type='DEBIT'),
+        _summary('-20.00', _ts(2024, 5, 9), account_id='acc-2'),
+        _summary('-300.00', _ts(2024, 5, 15), category_id='cat-transfer', transaction_type='DEBIT'),
+    ]
+
+
+@pytest.fixture
+def accounts():
+    current = MagicMock(account_id='acc-1', account_name='Current', balance=Decimal('1000'))
+    current.account_type.value = 'checking'
+    savings = MagicMock(account_id='acc-2', account_name='Savings', balance=Decimal('5000'))
+    savings.account_type.value = 'savings'
+    with patch('services.analytics_computation_engine.list_user_accounts', return_value=[current, savings]):
+        yield [current, savings]
+
+
+class TestComputeAnalytics:
+    """Tests for the single-pass compute_analytics."""
+
+    def test_all_types_read_each_window_once(self, engine, transactions, accounts):
+        with patch.object(engine, '_get_transactions_for_period',
+                          side_effect=[transactions, []]) as mock_fetch:
+            results = engine.compute_analytics('user123', '2024-05', ENGINE_ANALYTIC_TYPES)
+
+        # Current period plus the previous period for category trends
+        assert mock_fetch.call_count == 2
+        assert set(results) == set(ENGINE_ANALYTIC_TYPES)
+
+        cash_flow = results[AnalyticType.CASH_FLOW]
+        assert cash_flow['totalIncome'] == Decimal('2500.00')
+        assert cash_flow['totalExpenses'] == Decimal('100.00')
+        assert cash_flow['transactionCount'] == 3
+
+        details = {a['accountId']: a for a in results[AnalyticType.ACCOUNT_EFFICIENCY]['accountDetails']}
+        assert details['acc-1']['expenses'] == Decimal('380.00')
+        assert details['acc-1']['transactionCount'] == 3
+        assert details['acc-2']['transactionCount'] == 1
+
+        assert results[AnalyticType.CATEGORY_TRENDS]['totalSpending'] == Decimal('2600.00')
+        assert 'overallScore' in results[AnalyticType.FINANCIAL_HEALTH]
+
+    def test_matches_individual_computations(self, engine, transactions, accounts):
+        with patch.object(engine, '_get_transactions_for_period',
+                          side_effect=lambda user_id, start, end, account_ids=None:
+                          transactions if start.month == 5 else []):
+            fused = engine.compute_analytics('user123', '2024-05', ENGINE_ANALYTIC_TYPES)
+
+            assert fused[AnalyticType.CASH_FLOW] == engine.compute_cash_flow_analytics('user123', '2024-05')
+            assert fused[AnalyticType.CATEGORY_TRENDS] == engine.compute_category_analytics('user123', '2024-05')
+            assert fused[AnalyticType.ACCOUNT_EFFICIENCY] == engine.compute_account_analytics('user123', '2024-05')
+            assert fused[AnalyticType.FINANCIAL_HEALTH] == engine.compute_financial_health_score('user123', '2024-05')
+
+    def test_context_shares_reads_between_calls(self, engine, transactions, accounts):
+        context = AnalyticsComputationContext(user_id='user123')
+
+        with patch.object(engine, '_get_transactions_for_period', return_value=transactions) as mock_fetch:
+            engine.compute_cash_flow_analytics('user123', '2024-05', context=context)
+            engine.compute_account_analytics('user123', '2024-05', context=context)
+            engine.compute_financial_health_score('user123', '2024-05', context=context)
+
+        assert mock_fetch.call_count == 1
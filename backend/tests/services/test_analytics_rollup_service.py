@@ -0,0 +1,271 @@
+"""
+Unit tests for incremental monthly analytics rollups.
+
+Tests cover:
+- Aggregating transaction summaries into monthly rollups
+- Recomputing the months of a processed file idempotently and under concurrent updates
+- Recomputing months flagged stale by category and transfer edits
+- Deriving analytics from rollups with the same results as from transactions
+"""
+
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from models.analytics import MonthlyRollup
+from models.transaction import TransactionSummary
+from services.analytics_computation_engine import AnalyticsComputationEngine
+from services.analytics_rollup_service import (
+    build_monthly_rollups,
+    ensure_user_rollups,
+    refresh_file_rollups,
+    month_key,
+)
+from utils.db_utils import ConflictError
+
+SERVICE = 'services.analytics_rollup_service'
+
+
+def _ts(year, month, day):
+    return int(datetime(year, month, day, 12, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _summary(amount, date_ts, account_id='acc-1', category_id=None,
+             transaction_type=None, file_id='file-1', transaction_id='tx', other_category_ids=()):
+    return TransactionSummary(
+        transaction_id=transaction_id,
+        account_id=account_id,
+        date=date_ts,
+        amount=Decimal(amount),
+        transaction_type=transaction_type,
+        primary_category_id=category_id,
+        category_ids=((category_id,) if category_id else ()) + tuple(other_category_ids),
+        file_id=file_id
+    )
+
+
+def _month_reader(summaries):
+    """Stand-in for iter_user_transactions that filters by account and date range."""
+    def read(user_id, start_date_ts, end_date_ts, account_ids, **kwargs):
+        return [
+            summary for summary in summaries
+            if str(summary.account_id) in account_ids and start_date_ts <= summary.date <= end_date_ts
+        ]
+    return read
+
+
+def _period_reader(summaries):
+    """Stand-in for _get_transactions_for_period over a fixed set of transactions."""
+    def read(user_id, start_date, end_date, account_ids=None):
+        start_ts = int(datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc).timestamp() * 1000)
+        end_ts = int(datetime.combine(end_date, datetime.max.time(), tzinfo=timezone.utc).timestamp() * 1000)
+        return [summary for summary in summaries if start_ts <= summary.date <= end_ts]
+    return read
+
+
+@pytest.fixture
+def file_summaries():
+    return [
+        _summary('1000.00', _ts(2024, 1, 5), category_id='cat-salary'),
+        _summary('-30.00', _ts(2024, 1, 10), category_id='cat-food'),
+        _summary('-12.50', _ts(2024, 2, 3), category_id='cat-food'),
+        _summary('-60.00', _ts(2024, 2, 3), account_id='acc-2'),
+    ]
+
+
+class TestBuildMonthlyRollups:
+    """Tests for build_monthly_rollups."""
+
+    def test_groups_by_account_and_month(self, file_summaries):
+        rollups = build_monthly_rollups('user123', file_summaries)
+
+        assert set(rollups) == {('acc-1', '2024-01'), ('acc-1', '2024-02'), ('acc-2', '2024-02')}
+        january = rollups[('acc-1', '2024-01')]
+        assert january.income == Decimal('1000.00')
+        assert january.expense == Decimal('30.00')
+        assert january.transaction_count == 2
+
+    def test_entries_keep_every_assigned_category(self):
+        rollups = build_monthly_rollups('user123', [
+            _summary('-20.00', _ts(2024, 1, 5), category_id='cat-food', other_category_ids=['cat-transfer']),
+            _summary('-10.00', _ts(2024, 1, 6), category_id='cat-food'),
+        ])
+
+        entries = rollups[('acc-1', '2024-01')].entries
+        assert sorted(entry.category_ids for entry in entries) == [['cat-food'], ['cat-food', 'cat-transfer']]
+
+    def test_month_key_is_utc(self):
+        assert month_key(int(datetime(2024, 1, 31, 23, 30, tzinfo=timezone.utc).timestamp() * 1000)) == '2024-01'
+
+
+class TestRefreshFileRollups:
+    """Tests for refresh_file_rollups."""
+
+    def test_skipped_until_rollups_are_built(self):
+        with patch(f'{SERVICE}.get_rollup_state', return_value=None), \
+             patch(f'{SERVICE}.list_file_transaction_summaries') as mock_list:
+            assert refresh_file_rollups('user123', 'file-1') == 0
+        mock_list.assert_not_called()
+
+    def test_recomputes_months_touched_by_file(self, file_summaries):
+        earlier = _summary('-5.00', _ts(2024, 1, 2), category_id='cat-food', file_id='file-0')
+        existing = MonthlyRollup(userId='user123', accountId='acc-1', month='2024-01', version=4)
+        existing.add_amount(Decimal('-5.00'), 'cat-food')
+        stored = []
+
+        with patch(f'{SERVICE}.get_rollup_state', return_value=1), \
+             patch(f'{SERVICE}.list_file_transaction_summaries', return_value=file_summaries), \
+             patch(f'{SERVICE}.iter_user_transactions', side_effect=_month_reader(file_summaries + [earlier])), \
+             patch(f'{SERVICE}.get_monthly_rollup',
+                   side_effect=lambda user_id, month, account_id:
+                   existing if (month, account_id) == ('2024-01', 'acc-1') else None), \
+             patch(f'{SERVICE}.store_monthly_rollup', side_effect=stored.append):
+            updated = refresh_file_rollups('user123', 'file-1')
+
+        assert updated == 3
+        january = next(r for r in stored if r.month == '2024-01')
+        assert january.expense == Decimal('35.00')
+        assert january.income == Decimal('1000.00')
+        assert january.version == 4
+
+    def test_replayed_or_reprocessed_file_is_not_counted_twice(self, file_summaries):
+        stored = {}
+
+        def store(rollup):
+            stored[(rollup.account_id, rollup.month)] = rollup.model_copy(deep=True)
+
+        with patch(f'{SERVICE}.get_rollup_state', return_value=1), \
+             patch(f'{SERVICE}.list_file_transaction_summaries', return_value=file_summaries), \
+             patch(f'{SERVICE}.iter_user_transactions', side_effect=_month_reader(file_summaries)), \
+             patch(f'{SERVICE}.get_monthly_rollup',
+                   side_effect=lambda user_id, month, account_id: stored.get((account_id, month))), \
+             patch(f'{SERVICE}.store_monthly_rollup', side_effect=store):
+            refresh_file_rollups('user123', 'file-1')
+            refresh_file_rollups('user123', 'file-1')
+
+        assert stored[('acc-1', '2024-01')].expense == Decimal('30.00')
+        assert stored[('acc-1', '2024-01')].transaction_count == 2
+
+    def test_retries_on_conflict_then_rebuilds_account(self):
+        summaries = [_summary('-10.00', _ts(2024, 1, 5))]
+
+        with patch(f'{SERVICE}.get_rollup_state', return_value=1), \
+             patch(f'{SERVICE}.list_file_transaction_summaries', return_value=summaries), \
+             patch(f'{SERVICE}.iter_user_transactions', side_effect=_month_reader(summaries)), \
+             patch(f'{SERVICE}.get_monthly_rollup', return_value=None) as mock_get, \
+             patch(f'{SERVICE}.store_monthly_rollup', side_effect=ConflictError('changed')), \
+             patch(f'{SERVICE}.rebuild_account_rollups') as mock_rebuild:
+            assert refresh_file_rollups('user123', 'file-1') == 0
+
+        assert mock_get.call_count == 3
+        mock_rebuild.assert_called_once_with('user123', 'acc-1')
+
+
+class TestEnsureUserRollups:
+    """Tests for ensure_user_rollups."""
+
+    def test_recomputes_stale_months_before_reading(self):
+        # The transaction was recategorized as a transfer after the rollup was built
+        recategorized = [_summary('-500.00', _ts(2024, 3, 21), category_id='cat-transfer')]
+        stored = []
+
+        with patch(f'{SERVICE}.get_rollup_state', return_value=1), \
+             patch(f'{SERVICE}.take_stale_rollups', return_value=[('acc-1', '2024-03')]), \
+             patch(f'{SERVICE}.iter_user_transactions', side_effect=_month_reader(recategorized)) as mock_iter, \
+             patch(f'{SERVICE}.get_monthly_rollup', return_value=None), \
+             patch(f'{SERVICE}.store_monthly_rollup', side_effect=stored.append), \
+             patch(f'{SERVICE}.list_monthly_rollups', side_effect=lambda user_id: stored):
+            rollups = ensure_user_rollups('user123')
+
+        assert mock_iter.call_args.kwargs['start_date_ts'] == int(datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp() * 1000)
+        assert mock_iter.call_args.kwargs['end_date_ts'] == int(datetime(2024, 4, 1, tzinfo=timezone.utc).timestamp() * 1000) - 1
+        assert [entry.category_id for entry in rollups[0].entries] == ['cat-transfer']
+
+    def test_failed_recompute_keeps_months_stale(self):
+        with patch(f'{SERVICE}.get_rollup_state', return_value=1), \
+             patch(f'{SERVICE}.take_stale_rollups', return_value=[('acc-1', '2024-03')]), \
+             patch(f'{SERVICE}.iter_user_transactions', side_effect=RuntimeError('throttled')), \
+             patch(f'{SERVICE}.mark_rollups_stale') as mock_mark:
+            with pytest.raises(RuntimeError):
+                ensure_user_rollups('user123')
+
+        mock_mark.assert_called_once_with('user123', [('acc-1', '2024-03')])
+
+
+class TestRollupAnalytics:
+    """Analytics derived from rollups match those computed from transactions."""
+
+    @pytest.fixture
+    def engine(self):
+        engine = AnalyticsComputationEngine()
+        engine._transfer_category_cache['user123'] = {'cat-transfer'}
+        return engine
+
+    @pytest.fixture
+    def transactions(self):
+        return [
+            _summary('2000.00', _ts(2024, 3, 1), category_id='cat-salary', transaction_type='CREDIT'),
+            _summary('-45.00', _ts(2024, 3, 8), category_id='cat-food', transaction_type='DEBIT'),
+            _summary('-15.00', _ts(2024, 3, 20), category_id='cat-food'),
+            _summary('-500.00', _ts(2024, 3, 21), category_id='cat-transfer', transaction_type='DEBIT'),
+            # Transfer by a secondary assignment only
+            _summary('-250.00', _ts(2024, 3, 22), category_id='cat-savings', transaction_type='DEBIT',
+                     other_category_ids=['cat-transfer']),
+        ]
+
+    def test_cash_flow_matches_transactions(self, engine, transactions):
+        rollups = list(build_monthly_rollups('user123', transactions).values())
+
+        with patch.object(engine, '_get_transactions_for_period', return_value=transactions):
+            expected = engine.compute_cash_flow_analytics('user123', '2024-03')
+        actual = engine.compute_cash_flow_from_rollups('user123', '2024-03', rollups)
+
+        assert actual == expected
+        assert actual['totalExpenses'] == Decimal('60.00')
+
+    def test_category_breakdown_matches_transactions(self, engine, transactions):
+        rollups = list(build_monthly_rollups('user123', transactions).values())
+
+        with patch.object(engine, '_get_transactions_for_period', side_effect=_period_reader(transactions)):
+            expected = engine.compute_category_analytics('user123', '2024-03')
+            actual = engine.compute_category_analytics_from_rollups('user123', '2024-03', rollups)
+
+        assert actual['categoryBreakdown'] == expected['categoryBreakdown']
+        assert actual['totalSpending'] == expected['totalSpending']
+
+    @pytest.mark.parametrize('period', [
+        (date(2024, 3, 1), date(2024, 3, 31)),   # Previous window starts inside January
+        (date(2024, 2, 10), date(2024, 3, 20)),  # Partial months at both edges
+        (date(2024, 3, 5), date(2024, 3, 25)),   # No whole month
+    ])
+    def test_category_analytics_match_transactions_with_history(self, engine, transactions, period):
+        history = transactions + [
+            _summary('-80.00', _ts(2024, 1, 30), category_id='cat-food', transaction_type='DEBIT'),
+            _summary('-70.00', _ts(2024, 2, 5), category_id='cat-food', transaction_type='DEBIT'),
+            _summary('-300.00', _ts(2024, 2, 14), category_id='cat-transfer', transaction_type='DEBIT'),
+            _summary('1500.00', _ts(2024, 2, 28), category_id='cat-salary', transaction_type='CREDIT'),
+            _summary('-25.00', _ts(2024, 3, 28), category_id='cat-food'),
+        ]
+        rollups = list(build_monthly_rollups('user123', history).values())
+
+        with patch.object(engine, '_parse_time_period', return_value=period), \
+             patch.object(engine, '_get_transactions_for_period', side_effect=_period_reader(history)):
+            expected = engine.compute_category_analytics('user123', 'custom')
+            actual = engine.compute_category_analytics_from_rollups('user123', 'custom', rollups)
+
+        assert actual == expected
+        assert actual['categoryTrends']
+
+    def test_account_analytics_uses_rollup_totals(self, engine, transactions):
+        rollups = list(build_monthly_rollups('user123', transactions).values())
+        account = MagicMock(account_id='acc-1', account_name='Current', balance=Decimal('100'))
+        account.account_type.value = 'checking'
+
+        with patch('services.analytics_computation_engine.list_user_accounts', return_value=[account]):
+            result = engine.compute_account_analytics_from_rollups('user123', '2024-03', rollups)
+
+        details = result['accountDetails'][0]
+        assert details['income'] == Decimal('2000.00')
+        assert details['expenses'] == Decimal('810.00')
+        assert details['transactionCount'] == 5
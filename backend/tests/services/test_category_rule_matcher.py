@@ -0,0 +1,198 @@
+"""
+Unit tests for the compiled category rule matcher.
+
+Tests cover:
+- Agreement with CategoryRuleEngine.rule_matches_transaction for every rule type
+- Agreement with rule-by-rule categorization, including the
+  auto_suggest and allow_multiple_matches behaviour
+- Caching and invalidation of compiled rule sets
+"""
+
+import random
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from models.category import Category, CategoryRule, CategoryType, MatchCondition
+from models.transaction import Transaction
+from services import category_rule_matcher
+from services.category_rule_engine import CategoryRuleEngine
+from services.category_rule_matcher import AhoCorasick, CompiledRuleSet
+
+USER_ID = 'user123'
+
+DESCRIPTIONS = [
+    'TESCO STORES 1234', 'Tesco Express', 'SAINSBURYS S/MKTS', 'AMAZON MARKETPLACE',
+    'amazon prime', 'Salary ACME LTD', 'TFL TRAVEL CH', 'Shell 0042 petrol', 'NETFLIX.COM', 'abab abab',
+]
+
+
+def _transaction(description, amount, memo=None):
+    return Transaction(
+        userId=USER_ID,
+        fileId=uuid.uuid4(),
+        accountId=uuid.uuid4(),
+        date=1704067200000,
+        description=description,
+        amount=Decimal(amount),
+        memo=memo
+    )
+
+
+def _rule(condition, value='', field='description', **kwargs):
+    return CategoryRule(fieldToMatch=field, condition=condition, value=value, **kwargs)
+
+
+def _random_rules(rng, count):
+    text_values = ['tesco', 'TESCO', 'amazon', 'Amazon', 'sainsburys', 'netflix.com', 'shell', 'tfl',
+                   'salary', 'express', 'ltd', 'prime', 'ab', '', 'o']
+    regexes = [r'^tesco\s', r'\d{4}', r'AMAZON|NETFLIX', r'(ab) \1', r'[', r'(?i)shell', r'S/MKTS$']
+    rules = []
+    for _ in range(count):
+        condition = rng.choice(list(MatchCondition))
+        kwargs = dict(
+            case_sensitive=rng.random() < 0.3,
+            enabled=rng.random() < 0.9,
+            priority=rng.randrange(0, 5),
+            confidence=rng.randrange(50, 101),
+            allow_multiple_matches=rng.random() < 0.5,
+            auto_suggest=rng.random() < 0.8,
+            field=rng.choice(['description', 'description', 'memo', 'payee', 'amount']),
+        )
+        if condition == MatchCondition.REGEX:
+            rules.append(_rule(condition, rng.choice(regexes), **kwargs))
+        elif condition in category_rule_matcher.AMOUNT_CONDITIONS:
+            low = Decimal(rng.randrange(0, 100))
+            rules.append(_rule(condition, 'amount', amount_min=rng.choice([low, None]),
+                               amount_max=rng.choice([low + rng.randrange(0, 50), None]), **kwargs))
+        else:
+            value = rng.choice(text_values)
+            if condition == MatchCondition.EQUALS and rng.random() < 0.5:
+                value = rng.choice(DESCRIPTIONS)
+            rules.append(_rule(condition, value, **kwargs))
+    return rules
+
+
+def _random_transactions(rng, count):
+    return [
+        _transaction(rng.choice(DESCRIPTIONS), Decimal(rng.randrange(-15000, 15000)).scaleb(-2),
+                     memo=rng.choice([None, '', 'tesco clubcard', 'Ref 1234']))
+        for _ in range(count)
+    ]
+
+
+def _reference_matches(engine, transaction, categories):
+    """Rule-by-rule categorization as done before rules were compiled."""
+    matches = []
+    hierarchy = engine.build_category_hierarchy(categories)
+    for category in categories:
+        for rule in engine.get_effective_rules(category, categories, hierarchy):
+            if not rule.auto_suggest:
+                continue
+            if engine.rule_matches_transaction(rule, transaction):
+                matches.append((category, rule, engine.calculate_rule_confidence(rule, transaction)))
+                if not rule.allow_multiple_matches:
+                    break
+    return matches
+
+
+@pytest.fixture
+def engine():
+    category_rule_matcher._compiled_rule_cache.clear()
+    yield CategoryRuleEngine()
+    category_rule_matcher._compiled_rule_cache.clear()
+
+
+class TestAhoCorasick:
+
+    def test_reports_overlapping_and_nested_patterns(self):
+        automaton = AhoCorasick()
+        for value, pattern in enumerate(['he', 'she', 'his', 'hers', 'x']):
+            automaton.add(pattern, value)
+        automaton.build()
+
+        assert automaton.search('ushers') == {0, 1, 3}
+        assert automaton.search('') == set()
+
+    def test_empty_pattern_matches_everything(self):
+        automaton = AhoCorasick()
+        automaton.add('', 7)
+        automaton.build()
+
+        assert automaton.search('anything') == {7}
+
+
+class TestCompiledRuleSet:
+
+    def test_matches_agree_with_rule_engine(self, engine):
+        rng = random.Random(3)
+        rules = _random_rules(rng, 300)
+        category = Category(userId=USER_ID, name='All', type=CategoryType.EXPENSE)
+        compiled = CompiledRuleSet([(category, rule) for rule in rules], engine._rule_confidence)
+        enabled_rules = [rule for rule in rules if rule.enabled]
+
+        for transaction in _random_transactions(rng, 200):
+            matched = {compiled.slots[index][1].rule_id for index in compiled.match(transaction)}
+            expected = {rule.rule_id for rule in enabled_rules if engine.rule_matches_transaction(rule, transaction)}
+            assert matched == expected, transaction.description
+
+    def test_categorize_agrees_with_rule_by_rule_matching(self, engine):
+        rng = random.Random(5)
+        categories = [
+            Category(userId=USER_ID, name=f'Category {i}', type=CategoryType.EXPENSE, rules=_random_rules(rng, 12))
+            for i in range(15)
+        ]
+
+        for transaction in _random_transactions(rng, 200):
+            expected = _reference_matches(engine, transaction, categories)
+            actual = engine.compile_rules(categories).categorize(transaction)
+            assert [(c.categoryId, r.rule_id, conf) for c, r, conf in actual] == \
+                [(c.categoryId, r.rule_id, conf) for c, r, conf in expected]
+
+    def test_first_match_only_stops_category(self, engine):
+        category = Category(userId=USER_ID, name='Groceries', type=CategoryType.EXPENSE, rules=[
+            _rule(MatchCondition.CONTAINS, 'tesco', priority=10, allow_multiple_matches=False),
+            _rule(MatchCondition.STARTS_WITH, 'tesco', priority=5),
+        ])
+
+        suggestions = engine.categorize_transaction(_transaction('TESCO STORES', '-12.00'), [category])
+
+        assert len(suggestions) == 1
+        assert suggestions[0].rule_id == category.rules[0].rule_id
+
+
+class TestCompiledRuleCache:
+
+    def test_compiled_rules_are_cached_until_rules_change(self, engine):
+        category = Category(userId=USER_ID, name='Groceries', type=CategoryType.EXPENSE,
+                            rules=[_rule(MatchCondition.CONTAINS, 'tesco')])
+
+        compiled = engine.compile_rules([category])
+        assert engine.compile_rules([category]) is compiled
+
+        category.rules.append(_rule(MatchCondition.CONTAINS, 'sainsburys'))
+        recompiled = engine.compile_rules([category])
+        assert recompiled is not compiled
+        assert len(recompiled) == 2
+
+    def test_invalidate_drops_users_rules(self, engine):
+        category = Category(userId=USER_ID, name='Groceries', type=CategoryType.EXPENSE,
+                            rules=[_rule(MatchCondition.CONTAINS, 'tesco')])
+        compiled = engine.compile_rules([category])
+
+        category_rule_matcher.invalidate_compiled_rules(USER_ID)
+
+        assert engine.compile_rules([category]) is not compiled
+
+    def test_cache_evicts_least_recently_used_user(self, engine, monkeypatch):
+        monkeypatch.setattr(category_rule_matcher, 'MAX_CACHED_RULE_SETS', 2)
+        rule_set = engine.compile_rules([])
+
+        category_rule_matcher.cache_rule_set('user-a', (), rule_set)
+        category_rule_matcher.cache_rule_set('user-b', (), rule_set)
+        assert category_rule_matcher.get_cached_rule_set('user-a', ()) is rule_set
+        category_rule_matcher.cache_rule_set('user-c', (), rule_set)
+
+        assert list(category_rule_matcher._compiled_rule_cache) == ['user-a', 'user-c']
+        assert category_rule_matcher.get_cached_rule_set('user-b', ()) is None
@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 from models.transaction import Transaction, TransactionCreate
 from models.transaction_file import TransactionFile
 from models.account import Account, AccountType, Currency
-from services.file_processor_service import create_transactions
+from services.file_processor_service import create_transactions, update_transaction_duplicates
 from utils.db_utils import update_account
 
 def test_create_transactions_updates_account_balance(mocker):
@@ -87,8 +87,15 @@ def test_create_transactions_updates_account_balance(mocker):
     # Mock update_account to capture the update data
     mock_update_account = mocker.patch('services.file_processor_service.update_account')
     
+    # Mock the bulk write to succeed for every transaction
+    mock_batch_create = mocker.patch(
+        'services.file_processor_service.batch_create_transactions',
+        return_value=[]
+    )
+    
     # Call the function under test
     create_transactions(transactions, mock_transaction_file)
+    mock_batch_create.assert_called_once_with(transactions)
     
     # Verify that update_account was called with the correct data
     mock_update_account.assert_called_once_with(
@@ -96,6 +103,88 @@ def test_create_transactions_updates_account_balance(mocker):
         mock_account.user_id,
         {
             'last_transaction_date': 1641196800000,  # Latest transaction date
+            'first_transaction_date': 1641024000000,  # Earliest transaction date
             'balance': Decimal("900.00")  # Latest transaction balance
         }
-    ) 
\ No newline at end of file
+    ) 
+
+def test_create_transactions_records_failed_batch_writes(mocker):
+    """Test that rows left unprocessed by BatchWriteItem are reported on the file."""
+    account = Account(
+        userId="test-user",
+        accountId=uuid.uuid4(),
+        accountName="Test Account",
+        accountType=AccountType.CHECKING,
+        currency=Currency.USD
+    )
+    transaction_file = TransactionFile(
+        userId="test-user",
+        fileName="test.csv",
+        fileSize=1000,
+        s3Key="test/test.csv",
+        accountId=account.account_id,
+        currency=Currency.USD,
+        duplicateCount=0
+    )
+    transactions = [
+        Transaction.create(TransactionCreate(
+            userId="test-user",
+            fileId=transaction_file.file_id,
+            accountId=account.account_id,
+            date=1641024000000 + row * 86400000,
+            description=f"Transaction {row}",
+            amount=Decimal("-10.00"),
+            currency=Currency.USD,
+            importOrder=row
+        ))
+        for row in range(1, 4)
+    ]
+    mocker.patch('services.file_processor_service.checked_mandatory_account', return_value=account)
+    mocker.patch('services.file_processor_service.checked_mandatory_transaction_file', return_value=transaction_file)
+    mocker.patch('services.file_processor_service.update_transaction_duplicates', return_value=0)
+    mocker.patch('services.file_processor_service.update_transaction_file')
+    mocker.patch('services.file_processor_service.update_account')
+    mocker.patch('utils.db.helpers.time.sleep')
+
+    # Row 3 stays unprocessed on every BatchWriteItem attempt
+    mock_table = mocker.patch('utils.db.transactions.tables').transactions
+    mock_table.name = 'transactions'
+    unprocessed_item = transactions[2].to_dynamodb_item()
+    mock_table.meta.client.batch_write_item.return_value = {
+        'UnprocessedItems': {'transactions': [{'PutRequest': {'Item': unprocessed_item}}]}
+    }
+
+    transaction_count, _ = create_transactions(transactions, transaction_file)
+
+    assert transaction_count == 2
+    assert transaction_file.error_message == "Failed to save 1 of 3 transactions (rows: 3)"
+
+
+def test_update_transaction_duplicates_uses_single_hash_lookup_per_account(mocker):
+    """Test that duplicates are detected against one hash-set load per account."""
+    account_id = uuid.uuid4()
+    file_id = uuid.uuid4()
+    transactions = [
+        Transaction.create(TransactionCreate(
+            userId="test-user",
+            fileId=file_id,
+            accountId=account_id,
+            date=1641024000000 + day * 86400000,
+            description=f"Transaction {day}",
+            amount=Decimal("-10.00"),
+            currency=Currency.USD
+        ))
+        for day in range(3)
+    ]
+    mock_get_hashes = mocker.patch(
+        'services.file_processor_service.get_account_transaction_hashes',
+        return_value={transactions[1].transaction_hash}
+    )
+
+    duplicate_count = update_transaction_duplicates(transactions)
+
+    assert duplicate_count == 1
+    assert [tx.status for tx in transactions] == ['new', 'duplicate', 'new']
+    mock_get_hashes.assert_called_once_with(
+        str(account_id), 1641024000000, 1641024000000 + 2 * 86400000
+    )
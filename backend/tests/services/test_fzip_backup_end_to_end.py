@@ -153,14 +153,17 @@ class TestFZIPBackupEndToEnd:
         
         # Mock database calls for each exporter
         with patch('services.export_data_processors.list_user_accounts') as mock_accounts, \
-             patch('services.export_data_processors.list_user_transactions') as mock_transactions, \
+             patch('services.export_data_processors.get_user_transaction_date_range') as mock_date_range, \
+             patch('services.export_data_processors.iter_user_transactions_by_key') as mock_transactions, \
              patch('services.export_data_processors.list_categories_by_user_from_db') as mock_categories, \
              patch('services.export_data_processors.list_file_maps_by_user') as mock_file_maps, \
              patch('services.export_data_processors.list_user_files') as mock_files:
 
             # Setup mocks
             mock_accounts.return_value = sample_test_data['accounts']
-            mock_transactions.return_value = (sample_test_data['transactions'], None, len(sample_test_data['transactions']))
+            transaction_dates = [tx.date for tx in sample_test_data['transactions']]
+            mock_date_range.return_value = (min(transaction_dates), max(transaction_dates))
+            mock_transactions.side_effect = lambda *args, **kwargs: iter(sample_test_data['transactions'])
             mock_categories.return_value = sample_test_data['categories']
             mock_file_maps.return_value = sample_test_data['file_maps']
             mock_files.return_value = sample_test_data['transaction_files']
@@ -181,6 +184,8 @@ class TestFZIPBackupEndToEnd:
             assert len(transaction_data) == 5
             assert transaction_data[0]['description'] == "Test Transaction 1"
             assert 'exportMetadata' in transaction_data[0]
+            assert mock_transactions.call_args.args == (test_user_id,)
+            assert mock_transactions.call_args.kwargs['start_date_ts'] == min(transaction_dates)
 
             # Test CategoryExporter
             category_exporter = CategoryExporter(test_user_id, batch_size=1000)
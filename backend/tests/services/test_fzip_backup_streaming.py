@@ -0,0 +1,229 @@
+"""
+Tests for streaming FZIP packages: multipart backup upload and incremental restore reads.
+"""
+import gzip
+import io
+import json
+import os
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from services.s3_file_handler import (
+    S3MultipartUploadWriter, ExportPackageBuilder, FileStreamingOptions, MIN_MULTIPART_PART_SIZE,
+    RestorePackageReader, iter_json_array
+)
+
+
+class FakeMultipartS3Client:
+    """Records multipart upload calls and serves transaction files from memory"""
+
+    def __init__(self, objects=None):
+        self.objects = objects or {}
+        self.parts = []
+        self.completed = None
+        self.aborted = False
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        return {'UploadId': 'upload-1'}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts.append((PartNumber, Body))
+        return {'ETag': f'etag-{PartNumber}'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = MultipartUpload
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def uploaded_bytes(self):
+        return b''.join(body for _, body in sorted(self.parts))
+
+
+class TestS3MultipartUploadWriter:
+
+    def test_splits_writes_into_parts(self):
+        client = FakeMultipartS3Client()
+        payload = os.urandom(MIN_MULTIPART_PART_SIZE * 2 + 100)
+
+        with S3MultipartUploadWriter(client, 'bucket', 'key', 'application/zip',
+                                     part_size=MIN_MULTIPART_PART_SIZE) as writer:
+            for offset in range(0, len(payload), 1024 * 1024):
+                writer.write(payload[offset:offset + 1024 * 1024])
+
+        assert [len(body) for _, body in client.parts] == [MIN_MULTIPART_PART_SIZE, MIN_MULTIPART_PART_SIZE, 100]
+        assert client.uploaded_bytes() == payload
+        assert client.completed == {'Parts': [
+            {'PartNumber': 1, 'ETag': 'etag-1'},
+            {'PartNumber': 2, 'ETag': 'etag-2'},
+            {'PartNumber': 3, 'ETag': 'etag-3'},
+        ]}
+        assert writer.tell() == len(payload)
+
+    def test_part_size_is_raised_to_s3_minimum(self):
+        writer = S3MultipartUploadWriter(FakeMultipartS3Client(), 'bucket', 'key', 'application/zip', part_size=1024)
+        assert writer.part_size == MIN_MULTIPART_PART_SIZE
+
+    def test_aborts_upload_on_error(self):
+        client = FakeMultipartS3Client()
+
+        with pytest.raises(RuntimeError):
+            with S3MultipartUploadWriter(client, 'bucket', 'key', 'application/zip') as writer:
+                writer.write(b'partial')
+                raise RuntimeError("export failed")
+
+        assert client.aborted
+        assert client.completed is None
+
+
+class TestStreamPackageToS3:
+
+    @patch('services.s3_file_handler.get_s3_client')
+    def test_writes_ndjson_entries_files_and_manifest(self, mock_get_s3_client):
+        client = FakeMultipartS3Client(objects={'uploads/statement.csv': b'date,amount\n2024-01-01,10.00\n'})
+        mock_get_s3_client.return_value = client
+        builder = ExportPackageBuilder('packages', FileStreamingOptions(), 'file-storage')
+
+        def transactions():
+            for i in range(3):
+                yield {'transactionId': f'tx-{i}', 'amount': '10.00'}
+
+        export_data = {
+            'accounts': [{'accountId': 'acc-1'}],
+            'transactions': transactions(),
+            'categories': iter([]),
+            'file_maps': [],
+            'transaction_files': [{'fileId': 'file-1', 'fileName': 'statement.csv', 's3Key': 'uploads/statement.csv'}],
+        }
+
+        package_size, summary = builder.stream_package_to_s3(
+            export_data, 'backups/u1/job/backup_package.zip',
+            build_manifest=lambda processing_summary: {'counts': processing_summary['entity_counts']}
+        )
+
+        package = client.uploaded_bytes()
+        assert package_size == len(package)
+        assert summary['entity_counts'] == {
+            'accounts': 1, 'transactions': 3, 'categories': 0, 'file_maps': 0, 'transaction_files': 1
+        }
+        assert summary['transaction_files_processed'] == 1
+
+        with zipfile.ZipFile(io.BytesIO(package)) as zipf:
+            lines = zipf.read('data/transactions.ndjson').decode('utf-8').splitlines()
+            assert [json.loads(line)['transactionId'] for line in lines] == ['tx-0', 'tx-1', 'tx-2']
+            assert zipf.read('data/categories.ndjson') == b''
+            assert zipf.read('files/file-1/statement.csv') == b'date,amount\n2024-01-01,10.00\n'
+            assert json.loads(zipf.read('manifest.json'))['counts']['transactions'] == 3
+            assert zipf.namelist()[-1] == 'manifest.json'
+
+
+    @patch('services.s3_file_handler.get_s3_client')
+    def test_failed_file_read_leaves_no_partial_entry(self, mock_get_s3_client):
+        class FailingBody:
+            def __init__(self):
+                self.reads = 0
+
+            def read(self, size):
+                self.reads += 1
+                if self.reads > 1:
+                    raise IOError("connection reset")
+                return b'x' * size
+
+        client = FakeMultipartS3Client(objects={'uploads/good.csv': b'date,amount\n'})
+        get_object = client.get_object
+        client.get_object = lambda Bucket, Key: (
+            {'Body': FailingBody()} if Key == 'uploads/broken.csv' else get_object(Bucket, Key)
+        )
+        mock_get_s3_client.return_value = client
+        builder = ExportPackageBuilder('packages', FileStreamingOptions(), 'file-storage')
+        export_data = {
+            'accounts': [], 'transactions': [], 'categories': [], 'file_maps': [],
+            'transaction_files': [
+                {'fileId': 'file-1', 'fileName': 'broken.csv', 's3Key': 'uploads/broken.csv'},
+                {'fileId': 'file-2', 'fileName': 'good.csv', 's3Key': 'uploads/good.csv'},
+            ],
+        }
+
+        _, summary = builder.stream_package_to_s3(export_data, 'backups/key.zip', build_manifest=lambda _: {})
+
+        assert summary['transaction_files_failed'] == 1
+        assert summary['transaction_files_processed'] == 1
+        with zipfile.ZipFile(io.BytesIO(client.uploaded_bytes())) as zipf:
+            assert 'files/file-1/broken.csv' not in zipf.namelist()
+            assert zipf.read('files/file-2/good.csv') == b'date,amount\n'
+
+
+class TestIterJsonArray:
+
+    def test_decodes_elements_across_chunk_boundaries(self):
+        records = [{'id': i, 'description': 'x' * i} for i in range(50)] + [12345, 'tail']
+        stream = io.BytesIO(json.dumps(records).encode('utf-8'))
+
+        assert list(iter_json_array(stream, chunk_size=7)) == records
+
+    def test_number_split_after_decimal_point(self):
+        # The first 64 KiB chunk ends right after '12.'
+        stream = io.BytesIO(b'["' + b'x' * 65528 + b'", 12.5]')
+
+        assert list(iter_json_array(stream)) == ['x' * 65528, 12.5]
+
+    @pytest.mark.parametrize('number', ['1.5', '2e3', '-7.25E-2'])
+    def test_numbers_split_at_every_position(self, number):
+        data = f'[{number}, {number} ]'.encode('utf-8')
+
+        for chunk_size in range(1, len(data) + 1):
+            assert list(iter_json_array(io.BytesIO(data), chunk_size=chunk_size)) == [json.loads(number)] * 2
+
+    def test_empty_array(self):
+        assert list(iter_json_array(io.BytesIO(b' [ ] '))) == []
+
+    def test_rejects_truncated_array(self):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.BytesIO(b'[{"id": 1}, {"id": 2')))
+
+
+class TestRestorePackageReader:
+
+    @patch('services.s3_file_handler.get_s3_client')
+    def test_reads_streamed_backup_package(self, mock_get_s3_client):
+        client = FakeMultipartS3Client(objects={'uploads/statement.csv': b'date,amount\n'})
+        mock_get_s3_client.return_value = client
+        builder = ExportPackageBuilder('packages', FileStreamingOptions(), 'file-storage')
+        transactions = [{'transactionId': f'tx-{i}'} for i in range(3)]
+        builder.stream_package_to_s3(
+            {
+                'accounts': [{'accountId': 'acc-1'}],
+                'transactions': iter(transactions),
+                'transaction_files': [{'fileId': 'file-1', 'fileName': 'statement.csv', 's3Key': 'uploads/statement.csv'}],
+            },
+            'backups/u1/job/backup_package.zip',
+            build_manifest=lambda summary: {'checksums': summary['checksums']}
+        )
+        client.objects['restore/package.zip'] = client.uploaded_bytes()
+
+        with RestorePackageReader('restore-bucket', 'restore/package.zip') as package:
+            records = package.records('transactions')
+            assert list(records) == transactions
+            assert list(records) == transactions  # re-iterable
+            assert list(package.records('categories')) == []
+            assert package.verify_checksum('transactions')
+            assert package.read_file({'fileId': 'file-1', 'fileName': 'statement.csv'}) == b'date,amount\n'
+
+    @patch('services.s3_file_handler.get_s3_client')
+    def test_reads_legacy_json_and_gzip_entries(self, mock_get_s3_client):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zipf:
+            zipf.writestr('manifest.json', json.dumps({'backupFormatVersion': '1.0'}))
+            zipf.writestr('data/accounts.json', json.dumps([{'accountId': 'acc-1'}]))
+            zipf.writestr('data/transactions.json.gz', gzip.compress(json.dumps([{'transactionId': 'tx-1'}]).encode()))
+        mock_get_s3_client.return_value = FakeMultipartS3Client(objects={'restore/legacy.zip': buffer.getvalue()})
+
+        with RestorePackageReader('restore-bucket', 'restore/legacy.zip') as package:
+            assert list(package.records('accounts')) == [{'accountId': 'acc-1'}]
+            assert list(package.records('transactions')) == [{'transactionId': 'tx-1'}]
+            assert not package.verify_checksum('transactions')
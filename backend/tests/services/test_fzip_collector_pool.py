@@ -0,0 +1,88 @@
+"""
+Tests for running FZIP backup collectors concurrently.
+"""
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.fzip_service import CollectorPool, FZIPService
+from models.fzip import FZIPBackupType
+
+
+class TestCollectorPool:
+
+    def test_streams_records_in_order(self):
+        pool = CollectorPool(max_workers=2, max_buffered=2)
+        try:
+            first = pool.stream('accounts', iter(range(5)))
+            second = pool.stream('transactions', iter(range(10, 13)))
+
+            assert list(first) == [0, 1, 2, 3, 4]
+            assert list(second) == [10, 11, 12]
+        finally:
+            pool.close()
+
+    def test_collectors_read_concurrently(self):
+        # Each collector waits until the other has started, which only
+        # completes if both run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+
+        def collector(value):
+            barrier.wait()
+            yield value
+
+        pool = CollectorPool(max_workers=2)
+        try:
+            first = pool.stream('accounts', collector('a'))
+            second = pool.stream('categories', collector('c'))
+            assert list(first) + list(second) == ['a', 'c']
+        finally:
+            pool.close()
+
+    def test_collector_errors_surface_to_reader(self):
+        def failing():
+            yield 1
+            raise RuntimeError("read failed")
+
+        pool = CollectorPool(max_workers=1)
+        try:
+            records = pool.stream('accounts', failing())
+            assert next(records) == 1
+            with pytest.raises(RuntimeError, match="read failed"):
+                next(records)
+        finally:
+            pool.close()
+
+    def test_reports_each_finished_collector(self):
+        done = []
+        pool = CollectorPool(max_workers=2, on_collector_done=lambda name, count: done.append((name, count)))
+        try:
+            list(pool.stream('accounts', iter([1, 2])))
+            list(pool.stream('file_maps', iter([])))
+        finally:
+            pool.close()
+
+        assert sorted(done) == [('accounts', 2), ('file_maps', 0)]
+
+
+class TestParallelCollectBackupData:
+
+    @patch('services.fzip_service.fzip_metrics')
+    def test_collects_every_entity_and_merges_progress(self, mock_metrics):
+        service = FZIPService()
+        exporters = {}
+        for entity_type, records in [('accounts', [{'id': 1}]), ('transactions', [{'id': 2}, {'id': 3}])]:
+            exporter = MagicMock()
+            exporter.collect_data.return_value = records
+            exporter.get_export_summary.return_value = {'processed_count': len(records)}
+            exporters[entity_type] = exporter
+
+        with patch.object(service, '_create_exporters', return_value=exporters):
+            collected = service.collect_backup_data('user1', FZIPBackupType.COMPLETE)
+
+        assert collected['transactions'] == [{'id': 2}, {'id': 3}]
+        assert collected['_export_summaries']['accounts'] == {'processed_count': 1}
+        progress_calls = mock_metrics.record_backup_collection_progress.call_args_list
+        assert [call.args[0] for call in progress_calls] == [1, 2]
+        assert progress_calls[-1].args[1:3] == (2, 3)
@@ -0,0 +1,139 @@
+"""
+Tests for the chunked FZIP batch restore engine.
+"""
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from utils.db.helpers import BatchWriteResult
+from utils.transaction_utils import generate_transaction_hash
+from services.fzip_restore_engine import (
+    BatchRestoreEngine, per_record_builder, transaction_items_builder
+)
+
+
+def _exported_transaction(**overrides):
+    record = {
+        'transactionId': str(uuid.uuid4()),
+        'accountId': str(uuid.uuid4()),
+        'fileId': str(uuid.uuid4()),
+        'userId': 'original-user',
+        'date': 1704067200000,
+        'description': 'COFFEE SHOP',
+        'amount': '-4.50',
+        'currency': 'USD',
+        'status': 'new',
+        'transactionHash': 12345,
+        'categories': [{'categoryId': str(uuid.uuid4()), 'status': 'confirmed', 'confidence': 90}],
+    }
+    record.update(overrides)
+    return record
+
+
+def _write_all(entity_type, items, max_workers=4):
+    return BatchWriteResult(written_count=len(items))
+
+
+class TestTransactionItemsBuilder:
+
+    def test_builds_dynamodb_items_for_restoring_user(self):
+        record = _exported_transaction()
+
+        items, errors = transaction_items_builder('new-user')([record])
+
+        assert errors == []
+        item = items[0]
+        assert item['userId'] == 'new-user'
+        assert item['amount'] == Decimal('-4.50')
+        assert item['statusDate'] == 'new#1704067200000'
+        assert item['categories'][0]['status'] == 'confirmed'
+        assert item['categories'][0]['confidence'] == 90
+        # Like Transaction.to_dynamodb_item, a missing import order is omitted
+        assert 'importOrder' not in item
+
+    def test_recomputes_hash_unless_exported_hashes_are_trusted(self):
+        record = _exported_transaction()
+        expected = generate_transaction_hash(record['accountId'], record['date'], Decimal('-4.50'), record['description'])
+
+        recomputed, _ = transaction_items_builder('u1')([record])
+        trusted, _ = transaction_items_builder('u1', trust_exported_hashes=True)([record])
+
+        assert recomputed[0]['transactionHash'] == expected
+        assert trusted[0]['transactionHash'] == 12345
+
+    def test_invalid_records_are_reported_and_skipped(self):
+        good = _exported_transaction()
+        bad_amount = _exported_transaction(amount='abc')
+        missing_file = _exported_transaction(fileId=None)
+
+        items, errors = transaction_items_builder('u1')([good, bad_amount, missing_file])
+
+        assert [item['transactionId'] for item in items] == [good['transactionId']]
+        assert len(errors) == 2
+        assert bad_amount['transactionId'] in errors[0] and 'amount' in errors[0]
+        assert 'missing fileId' in errors[1]
+
+    def test_transfer_pair_key_on_outgoing_side(self):
+        outgoing = _exported_transaction(pairedTransactionId=str(uuid.uuid4()))
+
+        items, _ = transaction_items_builder('u1')([outgoing])
+
+        assert items[0]['transferPairUserId'] == 'u1'
+
+
+class TestBatchRestoreEngine:
+
+    @patch('services.fzip_restore_engine.batch_restore_items', side_effect=_write_all)
+    def test_writes_in_chunks_and_checkpoints_each(self, mock_write):
+        checkpoints = []
+        engine = BatchRestoreEngine(
+            chunk_size=2,
+            on_checkpoint=lambda entity, committed, results: checkpoints.append((entity, committed, results['created']))
+        )
+        records = [{'accountId': str(i)} for i in range(5)]
+
+        results = engine.restore('accounts', records, per_record_builder(dict, 'account', 'accountId'))
+
+        assert results == {'created': 5, 'errors': []}
+        assert [len(call.args[1]) for call in mock_write.call_args_list] == [2, 2, 1]
+        assert checkpoints == [('accounts', 2, 2), ('accounts', 4, 4), ('accounts', 5, 5)]
+        assert engine.checkpoint == {'entityType': 'accounts', 'committed': 5}
+
+    @patch('services.fzip_restore_engine.batch_restore_items', side_effect=_write_all)
+    def test_resumes_after_last_committed_chunk(self, mock_write):
+        engine = BatchRestoreEngine(checkpoint={'entityType': 'transactions', 'committed': 4}, chunk_size=2)
+        records = [{'transactionId': str(i)} for i in range(6)]
+
+        assert engine.start_offset('accounts') is None
+        results = engine.restore(
+            'transactions', records, per_record_builder(dict, 'transaction', 'transactionId'),
+            previous_results={'created': 4, 'errors': []}
+        )
+
+        written = [item['transactionId'] for call in mock_write.call_args_list for item in call.args[1]]
+        assert written == ['4', '5']
+        assert results['created'] == 6
+
+    @patch('services.fzip_restore_engine.batch_restore_items')
+    def test_failed_writes_are_reported(self, mock_write):
+        mock_write.return_value = BatchWriteResult(written_count=1, failed_items=[{'accountId': 'a2'}])
+        engine = BatchRestoreEngine()
+
+        results = engine.restore('accounts', [{'accountId': 'a1'}, {'accountId': 'a2'}],
+                                 per_record_builder(dict, 'account', 'accountId'))
+
+        assert results['created'] == 1
+        assert results['errors'] == ['Failed to write accounts item a2']
+
+    @patch('services.fzip_restore_engine.batch_restore_items', side_effect=_write_all)
+    def test_before_chunk_can_stop_the_restore(self, mock_write):
+        def cancel():
+            raise RuntimeError("canceled")
+
+        engine = BatchRestoreEngine(before_chunk=cancel)
+
+        with pytest.raises(RuntimeError):
+            engine.restore('accounts', [{'accountId': 'a1'}], per_record_builder(dict, 'account', 'accountId'))
+        mock_write.assert_not_called()
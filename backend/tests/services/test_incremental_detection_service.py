@@ -0,0 +1,149 @@
+"""
+Unit tests for IncrementalDetectionService.
+
+Tests matching new transactions against existing patterns, updating pattern
+statistics, and selecting the residue to re-cluster.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+
+from models.transaction import Transaction
+from models.recurring_charge import (
+    RecurringChargePattern,
+    RecurrenceFrequency,
+    TemporalPatternType,
+    PatternStatus,
+)
+from services.recurring_charges.incremental_detection_service import IncrementalDetectionService
+
+
+def _ts(year, month, day):
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _transaction(description, amount, date):
+    return Transaction(
+        userId="user123",
+        fileId=uuid.uuid4(),
+        transactionId=uuid.uuid4(),
+        accountId=uuid.uuid4(),
+        date=date,
+        description=description,
+        amount=Decimal(amount),
+    )
+
+
+@pytest.fixture
+def netflix_history():
+    return [_transaction("NETFLIX.COM", "-15.00", _ts(2024, month, 15)) for month in range(1, 5)]
+
+
+@pytest.fixture
+def netflix_pattern(netflix_history):
+    return RecurringChargePattern(
+        userId="user123",
+        merchantPattern="NETFLIX",
+        frequency=RecurrenceFrequency.MONTHLY,
+        temporalPatternType=TemporalPatternType.DAY_OF_MONTH,
+        dayOfMonth=15,
+        amountMean=Decimal("15.00"),
+        amountStd=Decimal("0"),
+        amountMin=Decimal("15.00"),
+        amountMax=Decimal("15.00"),
+        confidenceScore=Decimal("0.9"),
+        transactionCount=4,
+        firstOccurrence=netflix_history[0].date,
+        lastOccurrence=netflix_history[-1].date,
+        matchedTransactionIds=[tx.transaction_id for tx in netflix_history],
+    )
+
+
+@pytest.fixture
+def service():
+    detection_service = Mock()
+    detection_service.detect_recurring_patterns.return_value = []
+    return IncrementalDetectionService(detection_service=detection_service)
+
+
+class TestMatchNewTransactions:
+    """Tests for matching new transactions against existing patterns."""
+
+    def test_matching_transaction_extends_pattern(self, service, netflix_pattern):
+        new_tx = _transaction("NETFLIX.COM", "-16.00", _ts(2024, 5, 15))
+        other_tx = _transaction("GROCERY STORE", "-82.13", _ts(2024, 5, 3))
+
+        updated, unmatched = service.match_new_transactions([netflix_pattern], [new_tx, other_tx])
+
+        assert updated == [netflix_pattern]
+        assert unmatched == [other_tx]
+        assert netflix_pattern.transaction_count == 5
+        assert netflix_pattern.amount_mean == Decimal("15.2")
+        assert netflix_pattern.amount_std == Decimal("0.16").sqrt()
+        assert netflix_pattern.amount_max == Decimal("16.00")
+        assert netflix_pattern.last_occurrence == new_tx.date
+        assert netflix_pattern.matched_transaction_ids[-1] == new_tx.transaction_id
+        # Criteria are kept
+        assert netflix_pattern.merchant_pattern == "NETFLIX"
+        assert netflix_pattern.day_of_month == 15
+
+    def test_already_matched_transactions_are_not_added_again(self, service, netflix_pattern, netflix_history):
+        updated, unmatched = service.match_new_transactions([netflix_pattern], netflix_history[-1:])
+
+        assert updated == []
+        assert unmatched == []
+        assert netflix_pattern.transaction_count == 4
+
+    def test_rejected_patterns_are_skipped(self, service, netflix_pattern):
+        netflix_pattern.status = PatternStatus.REJECTED
+        new_tx = _transaction("NETFLIX.COM", "-15.00", _ts(2024, 5, 15))
+
+        updated, unmatched = service.match_new_transactions([netflix_pattern], [new_tx])
+
+        assert updated == []
+        assert unmatched == [new_tx]
+
+
+class TestSelectResidue:
+    """Tests for selecting the transactions to re-cluster."""
+
+    def test_residue_includes_unclaimed_history_of_same_merchant(self, service, netflix_pattern, netflix_history):
+        gym_history = [_transaction("PLANET FITNESS", "-25.00", _ts(2024, month, 1)) for month in range(1, 4)]
+        groceries = [_transaction(f"GROCERY STORE {i}", "-40.00", _ts(2024, 3, i + 1)) for i in range(30)]
+        new_gym = _transaction("PLANET FITNESS", "-25.00", _ts(2024, 4, 1))
+
+        residue = service.select_residue(
+            [new_gym], netflix_history + gym_history + groceries + [new_gym], [netflix_pattern]
+        )
+
+        assert residue == [new_gym] + gym_history
+
+    def test_common_tokens_do_not_pull_in_history(self, service):
+        history = [_transaction(f"POS PURCHASE {i}", "-10.00", _ts(2024, 1, 1)) for i in range(100)]
+        new_tx = _transaction("POS NEW MERCHANT", "-12.00", _ts(2024, 2, 1))
+
+        residue = service.select_residue([new_tx], history, [])
+
+        assert residue == [new_tx]
+
+
+class TestDetect:
+    """Tests for the full incremental run."""
+
+    def test_only_residue_is_clustered(self, service, netflix_pattern, netflix_history):
+        new_netflix = _transaction("NETFLIX.COM", "-15.00", _ts(2024, 5, 15))
+        new_gym = _transaction("PLANET FITNESS", "-25.00", _ts(2024, 5, 1))
+
+        result = service.detect(
+            "user123", [new_netflix, new_gym], netflix_history + [new_netflix, new_gym], [netflix_pattern]
+        )
+
+        assert result.updated_patterns == [netflix_pattern]
+        assert result.matched_count == 1
+        assert result.residue_count == 1
+        clustered = service.detection_service.detect_recurring_patterns.call_args.kwargs["transactions"]
+        assert clustered == [new_gym]
@@ -0,0 +1,126 @@
+"""
+Unit tests for recurring charge clustering backends.
+
+Checks that blocked clustering on sparse features finds the same clusters as
+a single DBSCAN run over the dense matrix.
+"""
+
+import pytest
+import numpy as np
+from scipy import sparse
+
+from services.recurring_charges.clustering import (
+    BlockedClusteringBackend,
+    DBSCANBackend,
+    DESCRIPTION_COLUMNS,
+    AMOUNT_COLUMN,
+    create_clustering_backend,
+)
+from services.recurring_charges.config import ClusteringConfig
+from services.recurring_charges.feature_service import FEATURE_VECTOR_SIZE
+
+
+def _same_partition(labels_a, labels_b):
+    """Whether two label arrays describe the same clusters up to renumbering."""
+    if not np.array_equal(labels_a == -1, labels_b == -1):
+        return False
+    pairs = set(zip(labels_a[labels_a >= 0], labels_b[labels_b >= 0]))
+    return len(pairs) == len({a for a, _ in pairs}) == len({b for _, b in pairs})
+
+
+@pytest.fixture
+def merchant_features():
+    """
+    Feature matrix with several merchants, each a tight group of transactions.
+
+    Every merchant uses its own description term; one merchant is split into
+    two amount levels and a few scattered rows have empty descriptions.
+    """
+    rng = np.random.default_rng(42)
+    rows = []
+    for merchant in range(8):
+        for amount in (0.2, 0.9) if merchant == 0 else (0.1 * merchant,):
+            for _ in range(6):
+                row = np.zeros(FEATURE_VECTOR_SIZE)
+                row[:AMOUNT_COLUMN] = rng.normal(0, 0.02, AMOUNT_COLUMN)
+                row[AMOUNT_COLUMN] = amount
+                row[DESCRIPTION_COLUMNS.start + merchant] = 1.0
+                rows.append(row)
+    for _ in range(4):
+        row = np.zeros(FEATURE_VECTOR_SIZE)
+        row[:AMOUNT_COLUMN] = rng.normal(0, 1, AMOUNT_COLUMN)
+        row[AMOUNT_COLUMN] = rng.uniform()
+        rows.append(row)
+    return np.vstack(rows)
+
+
+class TestBlockedClusteringBackend:
+    """Tests for BlockedClusteringBackend."""
+
+    def test_matches_global_dbscan(self, merchant_features):
+        expected = DBSCANBackend().fit_predict(merchant_features, eps=0.5, min_samples=3)
+        labels = BlockedClusteringBackend().fit_predict(sparse.csr_matrix(merchant_features), eps=0.5, min_samples=3)
+
+        assert _same_partition(labels, expected)
+        assert len(set(labels) - {-1}) == 9
+
+    def test_ball_tree_matches_global_dbscan(self, merchant_features):
+        expected = DBSCANBackend().fit_predict(merchant_features, eps=0.5, min_samples=3)
+        labels = BlockedClusteringBackend(use_ball_tree=True).fit_predict(merchant_features, eps=0.5, min_samples=3)
+
+        assert _same_partition(labels, expected)
+
+    def test_blocks_by_description_term_and_amount_gap(self, merchant_features):
+        blocks = BlockedClusteringBackend().block_ids(sparse.csr_matrix(merchant_features), eps=0.5)
+
+        # Merchant 0 is split by its amount gap (0.2 vs 0.9); others stay whole
+        assert blocks[0] != blocks[6]
+        assert len(set(blocks[:6])) == 1
+        assert len(set(blocks[12:18])) == 1
+        assert blocks[12] != blocks[18]
+
+    def test_rows_without_description_term_are_split_in_time(self):
+        rows = np.zeros((12, FEATURE_VECTOR_SIZE))
+        rows[:, AMOUNT_COLUMN] = 0.5
+        rows[:6, 0] = 1.0   # e.g. early in the month
+        rows[6:, 0] = -1.0  # late in the month
+        expected = DBSCANBackend().fit_predict(rows, eps=0.5, min_samples=3)
+
+        blocks = BlockedClusteringBackend().block_ids(sparse.csr_matrix(rows), eps=0.5)
+        labels = BlockedClusteringBackend().fit_predict(sparse.csr_matrix(rows), eps=0.5, min_samples=3)
+
+        assert len(set(blocks)) == 2
+        assert _same_partition(labels, expected)
+
+    def test_large_eps_skips_term_blocking(self, merchant_features):
+        blocks = BlockedClusteringBackend().block_ids(sparse.csr_matrix(merchant_features), eps=1.5)
+
+        assert len(set(blocks)) == 1
+
+    def test_hdbscan_labels_each_block(self, merchant_features):
+        labels = BlockedClusteringBackend(algorithm='hdbscan').fit_predict(merchant_features, eps=0.5, min_samples=3)
+
+        assert labels.shape == (merchant_features.shape[0],)
+        merchant_labels = [set(labels[start:start + 6]) - {-1} for start in range(12, 54, 6)]
+        assert all(merchant_labels)
+        assert all(a.isdisjoint(b) for i, a in enumerate(merchant_labels) for b in merchant_labels[i + 1:])
+
+    def test_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            BlockedClusteringBackend(algorithm='kmeans')
+
+
+class TestCreateClusteringBackend:
+    """Tests for create_clustering_backend."""
+
+    def test_default_is_blocked(self):
+        backend = create_clustering_backend(ClusteringConfig())
+
+        assert isinstance(backend, BlockedClusteringBackend)
+        assert backend.accepts_sparse
+
+    def test_dbscan_backend(self):
+        backend = create_clustering_backend(ClusteringConfig(backend='dbscan'))
+
+        assert isinstance(backend, DBSCANBackend)
+        assert not backend.accepts_sparse
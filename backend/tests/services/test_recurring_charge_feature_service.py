@@ -6,7 +6,7 @@ Tests feature extraction for temporal, amount, description, and account features
 
 import pytest
 import numpy as np
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 import uuid
 
@@ -27,6 +27,7 @@ from services.recurring_charges.features import (
 )
 from models.transaction import Transaction
 from models.account import Account, AccountType
+from utils.temporal_utils import is_first_working_day, is_last_working_day
 
 
 class TestTemporalFeatureExtractor:
@@ -170,6 +171,46 @@ class TestTemporalFeatureExtractor:
         assert last_features[15] == 1.0
 
 
+    def test_extract_batch_matches_calendar_rules(self, extractor):
+        """Test batch flags against the per-date working-day and weekday rules."""
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        dates = [start + timedelta(days=offset, hours=13) for offset in range(731)]
+        transactions = [
+            Transaction(
+                userId="user123",
+                fileId=uuid.uuid4(),
+                transactionId=uuid.uuid4(),
+                accountId=uuid.uuid4(),
+                date=int(dt.timestamp() * 1000),
+                description="TEST",
+                amount=Decimal("10.00")
+            )
+            for dt in dates
+        ]
+        
+        features = extractor.extract_batch(transactions)
+        
+        for dt, row in zip(dates, features):
+            next_week = dt + timedelta(days=7)
+            assert row[8] == float(dt.weekday() < 5 and dt.date() not in extractor.holidays)
+            assert row[9] == float(is_first_working_day(dt, extractor.holidays))
+            assert row[10] == float(is_last_working_day(dt, extractor.holidays))
+            assert row[11] == float(dt.day <= 7)
+            assert row[12] == float(next_week.month != dt.month)
+            assert row[13] == float(dt.weekday() >= 5)
+        # Calendar is reused for batches inside the range and extended otherwise
+        calendar = extractor._calendar
+        extractor.extract_batch(transactions[:10])
+        assert extractor._calendar is calendar
+        earlier = transactions[0].model_copy(update={'date': int(datetime(2020, 6, 1, tzinfo=timezone.utc).timestamp() * 1000)})
+        extractor.extract_batch([earlier])
+        assert extractor._calendar.covers(np.datetime64('2020-01-01'), np.datetime64('2024-12-31'))
+    
+    def test_extract_batch_empty(self, extractor):
+        """Test that an empty batch has the right shape."""
+        assert extractor.extract_batch([]).shape == (0, TEMPORAL_FEATURE_SIZE)
+
+
 class TestAmountFeatureExtractor:
     """Test suite for AmountFeatureExtractor."""
     
@@ -426,6 +467,17 @@ class TestRecurringChargeFeatureService:
         
         assert feature_matrix.shape == (len(sample_transactions), ENHANCED_FEATURE_VECTOR_SIZE)
     
+    def test_extract_features_batch_sparse_matches_dense(self, feature_service, sample_transactions, sample_accounts_map):
+        """Sparse extraction returns the same features as a CSR matrix."""
+        dense, _ = feature_service.extract_features_batch(sample_transactions, sample_accounts_map)
+        sparse, _ = feature_service.extract_features_batch(
+            sample_transactions, sample_accounts_map, sparse=True
+        )
+        
+        assert sparse.format == 'csr'
+        assert sparse.shape == dense.shape
+        np.testing.assert_allclose(sparse.toarray(), dense)
+    
     def test_extract_features_batch_empty(self, feature_service):
         """Test feature extraction with empty transaction list."""
         feature_matrix, vectorizer = feature_service.extract_features_batch([])
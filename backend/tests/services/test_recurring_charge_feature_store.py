@@ -0,0 +1,207 @@
+"""
+Unit tests for the recurring charge feature store.
+
+Tests cache serialization, the local and S3 stores, and feature extraction
+through a per-user cache.
+"""
+
+import uuid
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+from unittest.mock import patch, Mock
+
+import numpy as np
+import pytest
+from botocore.exceptions import ClientError
+
+from models.transaction import Transaction
+from services.recurring_charges.feature_service import RecurringChargeFeatureService, FEATURE_VECTOR_SIZE
+from services.recurring_charges.feature_store import (
+    UserFeatureCache,
+    LocalFeatureStore,
+    S3FeatureStore,
+    CACHED_FEATURE_SIZE,
+    FEATURE_SCHEMA_VERSION,
+)
+
+
+def _transactions(descriptions, start=datetime(2024, 1, 1, tzinfo=timezone.utc)):
+    return [
+        Transaction(
+            userId="user123",
+            fileId=uuid.uuid4(),
+            transactionId=uuid.uuid4(),
+            accountId=uuid.uuid4(),
+            date=int((start + timedelta(days=3 * i)).timestamp() * 1000),
+            description=description,
+            amount=Decimal(f"-{10 + i}.99")
+        )
+        for i, description in enumerate(descriptions)
+    ]
+
+
+@pytest.fixture
+def history():
+    return _transactions(["NETFLIX.COM", "SPOTIFY USA", "CITY WATER UTILITY", "GROCERY OUTLET"] * 10)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalFeatureStore(str(tmp_path))
+
+
+class TestUserFeatureCache:
+    """Tests for UserFeatureCache."""
+
+    def test_round_trip(self):
+        cache = UserFeatureCache(vocabulary=["netflix", "spotify"], idf=np.array([1.5, 2.0]))
+        cache.add(["a", "b"], np.arange(2 * CACHED_FEATURE_SIZE, dtype=float).reshape(2, -1))
+
+        loaded = UserFeatureCache.from_bytes(cache.to_bytes())
+
+        assert loaded.vocabulary == ["netflix", "spotify"]
+        np.testing.assert_array_equal(loaded.idf, cache.idf)
+        assert loaded.transaction_ids == ["a", "b"]
+        np.testing.assert_array_equal(loaded.features, cache.features)
+        assert loaded.schema_version == FEATURE_SCHEMA_VERSION
+
+    def test_add_replaces_known_rows(self):
+        cache = UserFeatureCache(vocabulary=[], idf=np.zeros(0))
+        cache.add(["a"], np.zeros((1, CACHED_FEATURE_SIZE)))
+        cache.add(["a", "b"], np.ones((2, CACHED_FEATURE_SIZE)))
+
+        assert len(cache) == 2
+        assert cache.lookup(["b", "a", "c"]).tolist() == [1, 0, -1]
+        assert cache.features.sum() == 2 * CACHED_FEATURE_SIZE
+
+    def test_retain_drops_other_rows(self):
+        cache = UserFeatureCache(vocabulary=[], idf=np.zeros(0))
+        cache.add(["a", "b", "c"], np.arange(3 * CACHED_FEATURE_SIZE, dtype=float).reshape(3, -1))
+
+        assert cache.retain(["c", "a", "x"]) == 1
+
+        assert cache.transaction_ids == ["a", "c"]
+        assert cache.lookup(["a", "b", "c"]).tolist() == [0, -1, 1]
+        assert cache.features[1, 0] == 2 * CACHED_FEATURE_SIZE
+
+class TestFeatureStores:
+    """Tests for LocalFeatureStore and S3FeatureStore."""
+
+    def test_local_store_missing_and_saved(self, store):
+        assert store.load("user123") is None
+
+        store.save("user123", UserFeatureCache(vocabulary=["netflix"], idf=np.array([1.0])))
+
+        assert store.load("user123").vocabulary == ["netflix"]
+
+    def test_local_store_ignores_corrupt_cache(self, store):
+        store.save("user123", UserFeatureCache(vocabulary=[], idf=np.zeros(0)))
+        with open(store.path("user123"), 'wb') as f:
+            f.write(b"not an archive")
+
+        assert store.load("user123") is None
+
+    @patch('services.recurring_charges.feature_store.get_s3_client')
+    def test_s3_store_missing_key(self, mock_get_s3_client):
+        mock_get_s3_client.return_value.get_object.side_effect = ClientError(
+            {'Error': {'Code': 'NoSuchKey'}}, 'GetObject'
+        )
+        store = S3FeatureStore(bucket='bucket')
+
+        assert store.load("user123") is None
+        mock_get_s3_client.return_value.get_object.assert_called_once_with(
+            Bucket='bucket', Key=f"recurring-charge-features/user123/features-v{FEATURE_SCHEMA_VERSION}.npz"
+        )
+
+
+class TestCachedFeatureExtraction:
+    """Tests for RecurringChargeFeatureService with a feature store."""
+
+    def test_first_run_matches_uncached_extraction(self, store, history):
+        expected, _ = RecurringChargeFeatureService().extract_features_batch(history)
+
+        features, vectorizer = RecurringChargeFeatureService(feature_store=store).extract_features_batch(
+            history, user_id="user123"
+        )
+
+        np.testing.assert_allclose(features, expected)
+        cache = store.load("user123")
+        assert len(cache) == len(history)
+        assert cache.vocabulary == vectorizer.get_feature_names_out().tolist()
+
+    def test_later_run_only_extracts_new_rows(self, store, history):
+        service = RecurringChargeFeatureService(feature_store=store)
+        first, _ = service.extract_features_batch(history, user_id="user123")
+        new = _transactions(["NETFLIX.COM", "SPOTIFY USA"], start=datetime(2024, 6, 1, tzinfo=timezone.utc))
+
+        with patch.object(service.temporal_extractor, 'extract_batch', wraps=service.temporal_extractor.extract_batch) as temporal:
+            features, _ = service.extract_features_batch(history + new, user_id="user123", sparse=True)
+
+        assert features.shape == (len(history) + 2, FEATURE_VECTOR_SIZE)
+        assert temporal.call_args.args[0] == new
+        # Cached temporal and description columns are unchanged
+        np.testing.assert_allclose(features[:len(history), :17].toarray(), first[:, :17])
+        np.testing.assert_allclose(features[:len(history), 18:].toarray(), first[:, 18:])
+        assert len(store.load("user123")) == len(history) + 2
+
+    def test_unknown_merchants_refit_vocabulary(self, store, history):
+        service = RecurringChargeFeatureService(feature_store=store)
+        service.extract_features_batch(history, user_id="user123")
+        new = _transactions(["PLANET FITNESS", "GOLDS GYM", "PLANET FITNESS", "CROSSFIT BOX", "GOLDS GYM"])
+
+        service.extract_features_batch(new, user_id="user123")
+
+        cache = store.load("user123")
+        assert "fitness" in cache.vocabulary
+        assert len(cache) == 5
+
+    def test_rows_without_vocabulary_term_are_not_cached(self, store, history):
+        service = RecurringChargeFeatureService(feature_store=store)
+        service.extract_features_batch(history, user_id="user123")
+        new = _transactions(["NETFLIX.COM"] * 9 + ["PLANET FITNESS"], start=datetime(2024, 6, 1, tzinfo=timezone.utc))
+
+        features, _ = service.extract_features_batch(history + new, user_id="user123")
+
+        cache = store.load("user123")
+        assert len(cache) == len(history) + 9
+        assert cache.lookup([str(new[-1].transaction_id)]).tolist() == [-1]
+        # The uncached row still gets its temporal features
+        expected_temporal = service.temporal_extractor.extract_batch(new[-1:])
+        np.testing.assert_allclose(features[-1:, :17], expected_temporal)
+
+    def test_uncached_rows_without_term_eventually_refit(self, store, history):
+        service = RecurringChargeFeatureService(feature_store=store)
+        service.extract_features_batch(history, user_id="user123")
+        new = _transactions(["NETFLIX.COM"] * 9 + ["PLANET FITNESS"], start=datetime(2024, 6, 1, tzinfo=timezone.utc))
+        service.extract_features_batch(history + new, user_id="user123")
+
+        # Only the term-less row is left to extract, so the vocabulary is refitted
+        service.extract_features_batch(history + new, user_id="user123")
+
+        cache = store.load("user123")
+        assert "fitness" in cache.vocabulary
+        assert len(cache) == len(history) + len(new)
+
+    def test_complete_history_drops_deleted_transactions(self, store, history):
+        service = RecurringChargeFeatureService(feature_store=store)
+        service.extract_features_batch(history, user_id="user123")
+
+        service.extract_features_batch(history[4:], user_id="user123", complete_history=True)
+
+        cache = store.load("user123")
+        assert len(cache) == len(history) - 4
+        assert (cache.lookup([str(tx.transaction_id) for tx in history[:4]]) < 0).all()
+
+    def test_partial_batch_keeps_other_rows(self, store, history):
+        service = RecurringChargeFeatureService(feature_store=store)
+        service.extract_features_batch(history, user_id="user123")
+
+        service.extract_features_batch(history[4:], user_id="user123")
+
+        assert len(store.load("user123")) == len(history)
+
+    def test_without_user_id_store_is_not_used(self, history):
+        store = Mock()
+        RecurringChargeFeatureService(feature_store=store).extract_features_batch(history)
+
+        store.load.assert_not_called()
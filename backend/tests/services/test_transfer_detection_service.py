@@ -1,12 +1,14 @@
 """
-Unit tests for TransferDetectionService sliding window algorithm.
+Unit tests for TransferDetectionService sweep algorithm.
 
 Tests the optimized transfer detection algorithm that uses:
-1. Sliding window with 3-day overlap
+1. A single pass over transactions in date order
 2. Minimal memory usage with MinimalTransaction objects
-3. Amount-sorted matching with early termination
+3. A 7-day buffer indexed by amount in cents for O(1) matching
 """
 
+import random
+
 import pytest
 from decimal import Decimal
 from datetime import datetime, timedelta
@@ -15,15 +17,21 @@ from unittest.mock import Mock, patch
 import uuid
 
 from services.transfer_detection_service import TransferDetectionService, MinimalTransaction
-from models.transaction import Transaction
+from models.account import Currency
+from models.transaction import Transaction, TransactionSummary, TRANSACTION_SUMMARY_ATTRIBUTES
 
 
 class TestTransferDetectionService:
-    """Test cases for the sliding window transfer detection algorithm."""
+    """Test cases for the sweep transfer detection algorithm."""
     
     def setup_method(self):
         """Set up test fixtures."""
         self.service = TransferDetectionService()
+
+    def sweep(self, transactions, processed_ids):
+        """Run the sweep over the transactions in date order."""
+        ordered = sorted(transactions, key=lambda tx: tx.date)
+        return list(self.service._sweep_transfer_pairs(ordered, processed_ids))
         
     def create_test_transaction(
         self, 
@@ -82,8 +90,7 @@ class TestTransferDetectionService:
         transactions = [tx_out, tx_in]
         processed_ids = set()
         
-        # Test the sliding window detection
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 1
         outgoing, incoming = pairs[0]
@@ -109,7 +116,7 @@ class TestTransferDetectionService:
         transactions = [tx1, tx2]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 0
 
@@ -131,7 +138,7 @@ class TestTransferDetectionService:
         transactions = [tx1, tx2]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 0
 
@@ -154,7 +161,7 @@ class TestTransferDetectionService:
         transactions = [tx_out, tx_in]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 1
 
@@ -177,7 +184,7 @@ class TestTransferDetectionService:
         transactions = [tx_out, tx_in]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 0
 
@@ -199,7 +206,7 @@ class TestTransferDetectionService:
         transactions = [tx_out, tx_in]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 1
 
@@ -221,7 +228,7 @@ class TestTransferDetectionService:
         transactions = [tx_out, tx_in]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 0
 
@@ -260,7 +267,7 @@ class TestTransferDetectionService:
         transactions = [tx1_out, tx1_in, tx2_out, tx2_in]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 2
         
@@ -293,7 +300,7 @@ class TestTransferDetectionService:
         transactions = [tx_small, tx_large, tx_match]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         # Should find the matching pair and ignore the large amount
         assert len(pairs) == 1
@@ -320,7 +327,7 @@ class TestTransferDetectionService:
         transactions = [tx_out, tx_in]
         processed_ids = {"already-processed"}  # tx_out is already processed
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 0  # Should not match because tx_out is already processed
 
@@ -329,7 +336,7 @@ class TestTransferDetectionService:
         transactions = []
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 0
 
@@ -346,13 +353,14 @@ class TestTransferDetectionService:
         transactions = [tx]
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 0
 
-    @patch('services.transfer_detection_service.TransferDetectionService._get_user_transactions_in_range')
-    def test_sliding_window_date_range_integration(self, mock_get_transactions):
-        """Test the full sliding window algorithm with date range."""
+    @patch('services.transfer_detection_service.get_transactions_by_ids')
+    @patch('services.transfer_detection_service.TransferDetectionService._iter_user_transactions_in_range')
+    def test_sweep_date_range_integration(self, mock_get_transactions, mock_get_by_ids):
+        """Test the full sweep with date range."""
         base_date = datetime(2024, 1, 1, 12, 0, 0)
         
         # Mock transactions returned by database
@@ -367,7 +375,8 @@ class TestTransferDetectionService:
             account_id="account-b"
         )
         
-        mock_get_transactions.return_value = [tx_out, tx_in]
+        mock_get_transactions.return_value = iter([tx_out, tx_in])
+        mock_get_by_ids.return_value = [tx_out, tx_in]
         
         # Test the full date range method
         start_ts = int(base_date.timestamp() * 1000)
@@ -376,7 +385,10 @@ class TestTransferDetectionService:
         pairs = self.service._detect_transfers_in_date_range("test-user", start_ts, end_ts)
         
         assert len(pairs) == 1
+        assert pairs[0] == (tx_out, tx_in)
         assert mock_get_transactions.called
+        # Only the matched transactions are loaded in full
+        assert mock_get_by_ids.call_count == 1
 
     def test_transfer_pair_ordering(self):
         """Test that transfer pairs are correctly ordered as (outgoing, incoming)."""
@@ -397,7 +409,7 @@ class TestTransferDetectionService:
         transactions = [tx_in, tx_out]  # Incoming first in list
         processed_ids = set()
         
-        pairs = self.service._sliding_window_transfer_detection(transactions, processed_ids)
+        pairs = self.sweep(transactions, processed_ids)
         
         assert len(pairs) == 1
         outgoing, incoming = pairs[0]
@@ -406,31 +418,194 @@ class TestTransferDetectionService:
         assert outgoing.amount < 0  # Outgoing is negative
         assert incoming.amount > 0  # Incoming is positive
 
-    def test_pagination_infinite_loop_prevention(self):
-        """Test that pagination loops are prevented when DynamoDB returns LastEvaluatedKey with 0 items."""
-        from unittest.mock import patch, MagicMock
-        
-        # Mock list_user_transactions to simulate the infinite loop scenario
-        # Return LastEvaluatedKey with 0 items for several iterations
-        mock_responses = [
-            ([], {"some": "key"}, 0),  # Empty result but with LastEvaluatedKey
-            ([], {"some": "key2"}, 0),  # Empty result but with LastEvaluatedKey
-            ([], {"some": "key3"}, 0),  # Empty result but with LastEvaluatedKey
-            ([], {"some": "key4"}, 0),  # This should trigger the infinite loop prevention
-        ]
-        
-        with patch('services.transfer_detection_service.list_user_transactions') as mock_list:
-            mock_list.side_effect = mock_responses
+    def test_transactions_are_streamed_once_in_date_order(self):
+        """Test that the date range is read in one ascending stream of summaries."""
+        with patch('services.transfer_detection_service.iter_user_transactions') as mock_iter:
+            mock_iter.return_value = iter([])
             
-            # This should not hang indefinitely
-            result = self.service._get_user_transactions_in_range(
+            self.service._iter_user_transactions_in_range("test-user", 1000000000000, 1100000000000)
+            
+            mock_iter.assert_called_once_with(
                 user_id="test-user",
                 start_date_ts=1000000000000,
-                end_date_ts=1000000001000
+                end_date_ts=1100000000000,
+                sort_order_date='asc',
+                ignore_dup=True,
+                uncategorized_only=True,
+                projection=TRANSACTION_SUMMARY_ATTRIBUTES,
+                transform=TransactionSummary.from_dynamodb_item
             )
-            
-            # Should return empty list and not hang
-            assert result == []
-            
-            # Should have called list_user_transactions exactly 3 times before breaking
-            assert mock_list.call_count == 3
+
+
+class TestTransferSweep:
+    """Test cases for the single-pass sweep over date-ordered transactions."""
+
+    def setup_method(self):
+        self.service = TransferDetectionService()
+
+    def summary(self, transaction_id, account_id, amount, day, currency=None):
+        return TransactionSummary(
+            transaction_id=transaction_id,
+            account_id=account_id,
+            date=int((datetime(2022, 1, 1) + timedelta(days=day)).timestamp() * 1000),
+            amount=Decimal(amount),
+            transaction_type=None,
+            primary_category_id=None,
+            category_ids=(),
+            currency=currency
+        )
+
+    def sweep(self, transactions):
+        return [
+            (outgoing.transaction_id, incoming.transaction_id)
+            for outgoing, incoming in self.service._sweep_transfer_pairs(iter(transactions), set())
+        ]
+
+    def test_pairs_are_yielded_as_the_sweep_goes(self):
+        pairs = self.service._sweep_transfer_pairs(iter([
+            self.summary("out-1", "a", "-10.00", 0),
+            self.summary("in-1", "b", "10.00", 1),
+            self.summary("out-2", "a", "-20.00", 400),
+        ]), set())
+
+        assert next(pairs) == (self.summary("out-1", "a", "-10.00", 0), self.summary("in-1", "b", "10.00", 1))
+
+    def test_expired_transactions_no_longer_match(self):
+        assert self.sweep([
+            self.summary("out-old", "a", "-10.00", 0),
+            self.summary("in", "b", "10.00", 8),
+            self.summary("out-new", "a", "-10.00", 9),
+        ]) == [("out-new", "in")]
+
+    def test_closest_date_wins(self):
+        assert self.sweep([
+            self.summary("out-early", "a", "-10.00", 0),
+            self.summary("out-late", "c", "-10.00", 5),
+            self.summary("in", "b", "10.00", 6),
+        ]) == [("out-late", "in")]
+
+    def test_different_currencies_do_not_match(self):
+        assert self.sweep([
+            self.summary("out-gbp", "a", "-10.00", 0, currency=Currency.GBP.value),
+            self.summary("in-eur", "b", "10.00", 1, currency=Currency.EUR.value),
+            self.summary("in-unknown", "c", "10.00", 2),
+        ]) == [("out-gbp", "in-unknown")]
+
+    def test_sweep_pairs_satisfy_transfer_criteria(self):
+        rng = random.Random(3)
+        transactions = sorted(
+            (self.summary(f"tx-{i}", rng.choice("abc"), str(rng.choice([-1, 1]) * rng.randrange(1, 300) / 100),
+                          rng.randrange(0, 3 * 365))
+             for i in range(3000)),
+            key=lambda tx: tx.date
+        )
+        by_id = {tx.transaction_id: tx for tx in transactions}
+
+        pairs = self.sweep(transactions)
+
+        matched_ids = [tx_id for pair in pairs for tx_id in pair]
+        assert pairs and len(matched_ids) == len(set(matched_ids))
+        for outgoing_id, incoming_id in pairs:
+            outgoing, incoming = by_id[outgoing_id], by_id[incoming_id]
+            assert outgoing.amount < 0 < incoming.amount
+            assert outgoing.account_id != incoming.account_id
+            assert abs(outgoing.amount + incoming.amount) <= Decimal("0.01")
+            assert abs(outgoing.date - incoming.date) <= 7 * 24 * 60 * 60 * 1000
+
+    def test_find_transfer_pairs_accepts_any_order(self):
+        transactions = [
+            self.summary("in-2", "b", "20.00", 30),
+            self.summary("out-1", "a", "-10.00", 0),
+            self.summary("out-2", "a", "-20.00", 29),
+            self.summary("in-1", "b", "10.00", 2),
+        ]
+
+        pairs = self.service.find_transfer_pairs(transactions)
+
+        assert [(o.transaction_id, i.transaction_id) for o, i in pairs] == [("out-1", "in-1"), ("out-2", "in-2")]
+        assert self.sweep(sorted(transactions, key=lambda tx: tx.date)) == [("out-1", "in-1"), ("out-2", "in-2")]
+
+
+class TestTransferPairLinks:
+    """Test cases for storing transfer pair links."""
+
+    def setup_method(self):
+        self.service = TransferDetectionService()
+        self.category = Mock(categoryId=uuid.uuid4())
+
+    def transaction(self, amount, day, account_id=None):
+        return Transaction(
+            userId="test-user",
+            fileId=uuid.uuid4(),
+            accountId=account_id or uuid.uuid4(),
+            date=int((datetime(2022, 1, 1) + timedelta(days=day)).timestamp() * 1000),
+            description="Transfer",
+            amount=Decimal(amount),
+            currency=Currency.USD
+        )
+
+    @patch('services.transfer_detection_service.mark_transaction_rollups_stale')
+    @patch('services.transfer_detection_service.update_transaction')
+    def test_mark_as_transfer_pair_links_both_sides(self, mock_update, mock_mark_stale):
+        outgoing, incoming = self.transaction("-10.00", 0), self.transaction("10.00", 1)
+
+        with patch.object(self.service, 'get_or_create_transfer_category', return_value=self.category):
+            assert self.service.mark_as_transfer_pair(outgoing, incoming, "test-user") is True
+
+        assert outgoing.paired_transaction_id == incoming.transaction_id
+        assert incoming.paired_transaction_id == outgoing.transaction_id
+        assert [call.args[0] for call in mock_update.call_args_list] == [outgoing, incoming]
+        mock_mark_stale.assert_called_once_with([outgoing, incoming])
+
+    @patch('services.transfer_detection_service.mark_transaction_rollups_stale')
+    @patch('services.transfer_detection_service.update_transaction')
+    def test_mark_as_transfer_pair_can_leave_rollups_to_caller(self, mock_update, mock_mark_stale):
+        outgoing, incoming = self.transaction("-10.00", 0), self.transaction("10.00", 1)
+
+        with patch.object(self.service, 'get_or_create_transfer_category', return_value=self.category):
+            self.service.mark_as_transfer_pair(outgoing, incoming, "test-user", mark_rollups=False)
+
+        mock_mark_stale.assert_not_called()
+
+    @patch('services.transfer_detection_service.update_transaction')
+    def test_link_existing_transfer_pairs_skips_linked_transactions(self, mock_update):
+        linked_out, linked_in = self.transaction("-10.00", 0), self.transaction("10.00", 1)
+        linked_out.paired_transaction_id = linked_in.transaction_id
+        linked_in.paired_transaction_id = linked_out.transaction_id
+        outgoing, incoming = self.transaction("-10.00", 2), self.transaction("10.00", 3)
+
+        with patch.object(self.service, '_get_transfer_category_ids', return_value={str(self.category.categoryId)}), \
+             patch('services.transfer_detection_service.iter_user_transactions',
+                   return_value=iter([linked_out, linked_in, outgoing, incoming])):
+            assert self.service.link_existing_transfer_pairs("test-user") == 1
+
+        assert outgoing.paired_transaction_id == incoming.transaction_id
+        assert incoming.paired_transaction_id == outgoing.transaction_id
+        assert mock_update.call_count == 2
+
+    @patch('services.transfer_detection_service.update_transaction')
+    def test_unlink_transfer_pair_clears_both_sides(self, mock_update):
+        outgoing, incoming = self.transaction("-10.00", 0), self.transaction("10.00", 1)
+        outgoing.paired_transaction_id = incoming.transaction_id
+        incoming.paired_transaction_id = outgoing.transaction_id
+
+        with patch('services.transfer_detection_service.get_transactions_by_ids', return_value=[incoming]):
+            self.service.unlink_transfer_pair(outgoing, "test-user")
+
+        assert outgoing.paired_transaction_id is None
+        assert incoming.paired_transaction_id is None
+        assert outgoing.to_dynamodb_item().get('transferPairUserId') is None
+        mock_update.assert_called_once_with(incoming)
+
+    @patch('services.transfer_detection_service.update_transaction')
+    def test_unlink_transfer_pair_leaves_partner_linked_elsewhere(self, mock_update):
+        outgoing, incoming = self.transaction("-10.00", 0), self.transaction("10.00", 1)
+        outgoing.paired_transaction_id = incoming.transaction_id
+        incoming.paired_transaction_id = uuid.uuid4()
+
+        with patch('services.transfer_detection_service.get_transactions_by_ids', return_value=[incoming]):
+            self.service.unlink_transfer_pair(outgoing, "test-user")
+
+        assert outgoing.paired_transaction_id is None
+        assert incoming.paired_transaction_id is not None
+        mock_update.assert_not_called()
@@ -0,0 +1,106 @@
+"""
+Unit tests for the categorization consumer.
+"""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from consumers.categorization_consumer import CategorizationEventConsumer
+from models.category import Category, CategoryRule, CategoryType, MatchCondition
+from models.events import BaseEvent
+from models.transaction import Transaction
+from services import category_rule_matcher
+from utils.db.helpers import BatchWriteResult
+
+USER_ID = "test-user-id"
+
+
+def _create_test_event(event_type="file.processed", data=None):
+    """Helper to create a test event"""
+    return BaseEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=event_type,
+        event_version="1.0",
+        timestamp=int(datetime.now().timestamp() * 1000),
+        source="transaction.service",
+        user_id=USER_ID,
+        data=data or {},
+    )
+
+
+def _create_test_transaction(description):
+    """Helper to create a test transaction"""
+    return Transaction(
+        userId=USER_ID,
+        fileId=uuid.uuid4(),
+        accountId=uuid.uuid4(),
+        date=int(datetime.now().timestamp() * 1000),
+        amount=Decimal("-12.50"),
+        description=description,
+    )
+
+
+@pytest.fixture
+def consumer():
+    category_rule_matcher._compiled_rule_cache.clear()
+    yield CategorizationEventConsumer()
+    category_rule_matcher._compiled_rule_cache.clear()
+
+
+@pytest.fixture
+def categories():
+    rule = CategoryRule(fieldToMatch="description", condition=MatchCondition.CONTAINS, value="tesco")
+    return [Category(userId=USER_ID, name="Groceries", type=CategoryType.EXPENSE, rules=[rule])]
+
+
+class TestCategorizeTransactions:
+    """Tests for batch categorization of event transactions."""
+
+    def test_batch_reads_and_writes_only_changed(self, consumer, categories):
+        transactions = [_create_test_transaction("TESCO STORES"), _create_test_transaction("NETFLIX")]
+        transaction_ids = [str(t.transaction_id) for t in transactions] + [str(uuid.uuid4())]
+
+        with patch("consumers.categorization_consumer.get_transactions_by_ids",
+                   return_value=transactions) as mock_get, \
+             patch("consumers.categorization_consumer.update_transaction_categories",
+                   return_value=BatchWriteResult(written_count=1)) as mock_update:
+            stats = consumer._categorize_transactions(USER_ID, transaction_ids, categories)
+
+        mock_get.assert_called_once_with(transaction_ids, USER_ID)
+        mock_update.assert_called_once_with([transactions[0]])
+        assert transactions[0].categories[0].category_id == categories[0].categoryId
+        assert stats == {
+            "processed": 2,
+            "suggestions_created": 1,
+            "transactions_categorized": 1,
+            "errors": 1,  # The id that was not found
+        }
+
+    def test_failed_writes_count_as_errors(self, consumer, categories):
+        transaction = _create_test_transaction("TESCO STORES")
+        failed = BatchWriteResult(failed_items=[{"transactionId": str(transaction.transaction_id)}])
+
+        with patch("consumers.categorization_consumer.get_transactions_by_ids", return_value=[transaction]), \
+             patch("consumers.categorization_consumer.update_transaction_categories", return_value=failed):
+            stats = consumer._categorize_transactions(USER_ID, [str(transaction.transaction_id)], categories)
+
+        assert stats["errors"] == 1
+
+
+class TestRuleCreatedEvent:
+    """Tests for compiled rule invalidation."""
+
+    def test_rule_created_invalidates_compiled_rules(self, consumer):
+        event = _create_test_event("category.rule_created", {"categoryId": "cat-1", "ruleId": "rule_1"})
+
+        with patch("consumers.categorization_consumer.invalidate_compiled_rules") as mock_invalidate, \
+             patch("consumers.categorization_consumer.list_categories_by_user_from_db") as mock_categories:
+            assert consumer.should_process_event(event)
+            consumer.process_event(event)
+
+        mock_invalidate.assert_called_once_with(USER_ID)
+        mock_categories.assert_not_called()
@@ -12,7 +12,10 @@ import pytest
 from consumers.recurring_charge_detection_consumer import RecurringChargeDetectionConsumer
 from models.events import BaseEvent
 from models.transaction import Transaction
-from models.recurring_charge import RecurringChargePatternCreate, RecurrenceFrequency, TemporalPatternType
+from models.recurring_charge import (
+    PatternStatus, RecurringChargePattern, RecurringChargePatternCreate, RecurrenceFrequency, TemporalPatternType
+)
+from services.recurring_charges.incremental_detection_service import IncrementalDetectionResult
 
 
 def _create_test_event(user_id="test-user-id", operation_id="op_123"):
@@ -89,10 +92,22 @@ def test_should_process_event():
     event = _create_test_event()
     assert consumer.should_process_event(event) is True
     
+    # Should process file uploads incrementally
+    file_event = BaseEvent(
+        event_id=str(uuid.uuid4()),
+        event_type="file.processed",
+        event_version="1.0",
+        timestamp=int(datetime.now().timestamp() * 1000),
+        source="transaction.service",
+        user_id="test-user-id",
+        data={},
+    )
+    assert consumer.should_process_event(file_event) is True
+    
     # Should not process other events
     other_event = BaseEvent(
         event_id=str(uuid.uuid4()),
-        event_type="file.processed",
+        event_type="transactions.deleted",
         event_version="1.0",
         timestamp=int(datetime.now().timestamp() * 1000),
         source="transaction.service",
@@ -213,50 +228,136 @@ def test_process_event_missing_operation_id(mock_tracking):
         consumer.process_event(event)
 
 
+def _create_file_processed_event(transaction_ids, user_id="test-user-id"):
+    """Helper to create a file.processed event"""
+    return BaseEvent(
+        event_id=str(uuid.uuid4()),
+        event_type="file.processed",
+        event_version="1.0",
+        timestamp=int(datetime.now().timestamp() * 1000),
+        source="transaction.service",
+        user_id=user_id,
+        data={
+            "fileId": str(uuid.uuid4()),
+            "transactionCount": len(transaction_ids),
+            "transactionIds": [str(tx_id) for tx_id in transaction_ids],
+        },
+    )
+
+
+@patch("consumers.recurring_charge_detection_consumer.operation_tracking_service")
+@patch("consumers.recurring_charge_detection_consumer.batch_create_patterns_in_db")
+@patch("consumers.recurring_charge_detection_consumer.update_pattern_in_db")
+@patch("consumers.recurring_charge_detection_consumer.list_user_accounts", return_value=[])
+@patch("consumers.recurring_charge_detection_consumer.list_patterns_by_user_from_db", return_value=[])
+@patch("consumers.recurring_charge_detection_consumer.iter_user_transactions")
+@patch("consumers.recurring_charge_detection_consumer.get_transactions_by_ids")
+def test_process_file_processed_event_is_incremental(
+    mock_get_by_ids, mock_iter_user_txs, mock_list_patterns, mock_list_accounts,
+    mock_update_pattern, mock_batch_create, mock_tracking
+):
+    """New file transactions are scored incrementally within a lookback window"""
+    consumer = RecurringChargeDetectionConsumer()
+    consumer._generate_predictions = Mock(return_value=0)
+    
+    new_transactions = [_create_test_transaction() for _ in range(3)]
+    mock_get_by_ids.return_value = new_transactions
+    mock_iter_user_txs.return_value = iter(new_transactions)
+    consumer.incremental_service.detect = Mock(return_value=IncrementalDetectionResult(residue_count=3))
+    
+    consumer.process_event(_create_file_processed_event([tx.transaction_id for tx in new_transactions]))
+    
+    detect_kwargs = consumer.incremental_service.detect.call_args.kwargs
+    assert detect_kwargs["new_transactions"] == new_transactions
+    assert detect_kwargs["patterns"] == []
+    iter_kwargs = mock_iter_user_txs.call_args.kwargs
+    assert iter_kwargs["start_date_ts"] is not None
+    assert iter_kwargs["end_date_ts"] == max(tx.date for tx in new_transactions)
+    assert not mock_batch_create.called
+    assert not mock_tracking.update_operation_status.called
+
+
+@patch("utils.db.recurring_charges.tables")
+@patch("consumers.recurring_charge_detection_consumer.update_pattern_in_db")
+@patch("consumers.recurring_charge_detection_consumer.list_user_accounts", return_value=[])
+@patch("consumers.recurring_charge_detection_consumer.list_patterns_by_user_from_db", return_value=[])
+@patch("consumers.recurring_charge_detection_consumer.iter_user_transactions")
+@patch("consumers.recurring_charge_detection_consumer.get_transactions_by_ids")
+def test_process_file_processed_event_predicts_saved_new_patterns(
+    mock_get_by_ids, mock_iter_user_txs, mock_list_patterns, mock_list_accounts,
+    mock_update_pattern, mock_tables
+):
+    """Predictions for new patterns reference the IDs the patterns were stored with"""
+    consumer = RecurringChargeDetectionConsumer()
+    
+    new_transactions = [_create_test_transaction()]
+    mock_get_by_ids.return_value = new_transactions
+    mock_iter_user_txs.return_value = iter(new_transactions)
+    consumer.incremental_service.detect = Mock(return_value=IncrementalDetectionResult(
+        new_patterns=[_create_test_pattern()], residue_count=1
+    ))
+    writer = mock_tables.recurring_charge_patterns.batch_writer.return_value.__enter__.return_value
+    
+    consumer.process_event(_create_file_processed_event([tx.transaction_id for tx in new_transactions]))
+    
+    stored_pattern = writer.put_item.call_args.kwargs["Item"]
+    stored_prediction = mock_tables.recurring_charge_predictions.put_item.call_args.kwargs["Item"]
+    assert stored_prediction["patternId"] == stored_pattern["patternId"]
+    assert stored_prediction["userId"] == "test-user-id"
+
+
+@patch("consumers.recurring_charge_detection_consumer.get_transactions_by_ids")
+def test_process_file_processed_event_without_transactions(mock_get_by_ids):
+    """A file.processed event without transaction IDs does nothing"""
+    consumer = RecurringChargeDetectionConsumer()
+    
+    consumer.process_event(_create_file_processed_event([]))
+    
+    assert not mock_get_by_ids.called
+
+
 # ==============================================================================
 # Test Transaction Fetching
 # ==============================================================================
 
 
-@patch("src.consumers.recurring_charge_detection_consumer.list_user_transactions")
-def test_fetch_transactions_for_specific_account(mock_list_user_txs):
+@patch("consumers.recurring_charge_detection_consumer.iter_user_transactions")
+def test_fetch_transactions_for_specific_account(mock_iter_user_txs):
     """Test fetching transactions for specific account"""
     consumer = RecurringChargeDetectionConsumer()
     
     account_id = str(uuid.uuid4())
     transactions = [_create_test_transaction() for _ in range(10)]
-    # list_user_transactions returns (transactions, last_key, count)
-    mock_list_user_txs.return_value = (transactions, None, 10)
+    mock_iter_user_txs.return_value = iter(transactions)
     
     result = consumer._fetch_transactions("test-user-id", account_id)
     
     assert len(result) == 10
-    assert mock_list_user_txs.called
+    assert mock_iter_user_txs.called
     # Verify it was called with the account_id filter
-    call_kwargs = mock_list_user_txs.call_args.kwargs
+    call_kwargs = mock_iter_user_txs.call_args.kwargs
     assert call_kwargs["user_id"] == "test-user-id"
     assert call_kwargs["account_ids"] == [uuid.UUID(account_id)]
     assert call_kwargs["sort_order_date"] == "desc"
     assert call_kwargs["ignore_dup"] is True
 
 
-@patch("src.consumers.recurring_charge_detection_consumer.list_user_transactions")
-def test_fetch_transactions_for_all_accounts(mock_list_user_txs):
+@patch("consumers.recurring_charge_detection_consumer.iter_user_transactions")
+def test_fetch_transactions_for_all_accounts(mock_iter_user_txs):
     """Test fetching transactions for all user accounts"""
     consumer = RecurringChargeDetectionConsumer()
     
     # Mock transactions across all accounts
     transactions = [_create_test_transaction() for _ in range(10)]
-    # list_user_transactions returns (transactions, last_key, count)
-    mock_list_user_txs.return_value = (transactions, None, 10)
+    mock_iter_user_txs.return_value = iter(transactions)
     
     result = consumer._fetch_transactions("test-user-id", None)
     
     # Should fetch all user transactions
     assert len(result) == 10
-    assert mock_list_user_txs.called
+    assert mock_iter_user_txs.called
     # Verify it was called without account filter
-    call_kwargs = mock_list_user_txs.call_args.kwargs
+    call_kwargs = mock_iter_user_txs.call_args.kwargs
     assert call_kwargs["user_id"] == "test-user-id"
     assert call_kwargs["account_ids"] is None
     assert call_kwargs["sort_order_date"] == "desc"
@@ -267,7 +368,7 @@ def test_fetch_transactions_filters_invalid():
     """Test that invalid transactions are filtered out"""
     consumer = RecurringChargeDetectionConsumer()
     
-    with patch("src.consumers.recurring_charge_detection_consumer.list_user_transactions") as mock_list:
+    with patch("consumers.recurring_charge_detection_consumer.iter_user_transactions") as mock_iter:
         # Create mix of valid and invalid transactions
         valid_tx = _create_test_transaction()
         # Create invalid transactions using model_construct to bypass validation
@@ -292,8 +393,7 @@ def test_fetch_transactions_filters_invalid():
             transactionType="debit",
         )
         
-        # list_user_transactions returns (transactions, last_key, count)
-        mock_list.return_value = ([valid_tx, invalid_tx_no_date, invalid_tx_no_amount], None, 3)
+        mock_iter.return_value = iter([valid_tx, invalid_tx_no_date, invalid_tx_no_amount])
         
         result = consumer._fetch_transactions("test-user-id", str(uuid.uuid4()))
         
@@ -301,61 +401,26 @@ def test_fetch_transactions_filters_invalid():
         assert len(result) == 1
 
 
-@patch("src.consumers.recurring_charge_detection_consumer.list_user_transactions")
-def test_fetch_transactions_pagination(mock_list_user_txs):
-    """Test that pagination works correctly to fetch up to 10,000 transactions"""
+@patch("consumers.recurring_charge_detection_consumer.MAX_DETECTION_TRANSACTIONS", 2500)
+@patch("consumers.recurring_charge_detection_consumer.iter_user_transactions")
+def test_fetch_transactions_respects_max_limit(mock_iter_user_txs):
+    """Test that fetching stops at the safety limit without draining the stream"""
     consumer = RecurringChargeDetectionConsumer()
     
-    # Simulate multiple pages of transactions
-    page1_txs = [_create_test_transaction() for _ in range(1000)]
-    page2_txs = [_create_test_transaction() for _ in range(1000)]
-    page3_txs = [_create_test_transaction() for _ in range(500)]
+    consumed = []
     
-    # Mock returns different pages with pagination keys
-    mock_list_user_txs.side_effect = [
-        (page1_txs, {"lastKey": "page2"}, 1000),
-        (page2_txs, {"lastKey": "page3"}, 1000),
-        (page3_txs, None, 500),  # Last page, no more pagination
-    ]
+    def endless_stream(**kwargs):
+        while True:
+            tx = _create_test_transaction()
+            consumed.append(tx)
+            yield tx
     
-    result = consumer._fetch_transactions("test-user-id", None)
-    
-    # Should fetch all pages
-    assert len(result) == 2500
-    assert mock_list_user_txs.call_count == 3
-    
-    # Verify pagination parameters
-    call1_kwargs = mock_list_user_txs.call_args_list[0].kwargs
-    assert call1_kwargs["limit"] == 1000
-    assert call1_kwargs["last_evaluated_key"] is None
-    
-    call2_kwargs = mock_list_user_txs.call_args_list[1].kwargs
-    assert call2_kwargs["limit"] == 1000
-    assert call2_kwargs["last_evaluated_key"] == {"lastKey": "page2"}
-    
-    call3_kwargs = mock_list_user_txs.call_args_list[2].kwargs
-    assert call3_kwargs["limit"] == 1000
-    assert call3_kwargs["last_evaluated_key"] == {"lastKey": "page3"}
-
-
-@patch("src.consumers.recurring_charge_detection_consumer.list_user_transactions")
-def test_fetch_transactions_respects_max_limit(mock_list_user_txs):
-    """Test that fetching stops at 10,000 transactions"""
-    consumer = RecurringChargeDetectionConsumer()
-    
-    # Simulate many pages that would exceed 10k
-    def side_effect(*args, **kwargs):
-        # Return 1000 transactions per page with a next key
-        txs = [_create_test_transaction() for _ in range(1000)]
-        return (txs, {"lastKey": "next"}, 1000)
-    
-    mock_list_user_txs.side_effect = side_effect
+    mock_iter_user_txs.side_effect = endless_stream
     
     result = consumer._fetch_transactions("test-user-id", None)
     
-    # Should stop at 10,000 transactions
-    assert len(result) == 10000
-    assert mock_list_user_txs.call_count == 10  # 10 pages of 1000 each
+    assert len(result) == 2500
+    assert len(consumed) == 2500
 
 
 # ==============================================================================
@@ -460,3 +525,125 @@ def test_update_operation_status_handles_failure(mock_tracking):
     # Should have attempted the update
     assert mock_tracking.update_operation_status.called
 
+
+
+# ==============================================================================
+# Test Backfill
+# ==============================================================================
+
+
+@patch("consumers.recurring_charge_detection_consumer.list_patterns_by_user_from_db", return_value=[])
+@patch("consumers.recurring_charge_detection_consumer.batch_create_patterns_in_db")
+def test_backfill_saves_patterns_and_checkpoints_users(mock_batch_create, mock_list_patterns, tmp_path):
+    """Backfill saves each user's patterns and records finished users"""
+    consumer = RecurringChargeDetectionConsumer()
+    consumer._generate_predictions = Mock(return_value=1)
+    consumer.detect_user_patterns = Mock(side_effect=lambda user_id, *args: [_create_test_pattern(user_id)])
+    mock_batch_create.side_effect = list
+    checkpoint = tmp_path / "backfill.checkpoint"
+    
+    summary = consumer.backfill(["user-1", "user-2", "user-1"], checkpoint_path=str(checkpoint), max_workers=1)
+    
+    assert summary == {"users": 2, "skipped": 0, "failed": 0, "patterns": 2, "predictions": 2}
+    assert [call.args[0][0].user_id for call in mock_batch_create.call_args_list] == ["user-1", "user-2"]
+    assert [json.loads(line)["userId"] for line in checkpoint.read_text().splitlines()] == ["user-1", "user-2"]
+
+
+@patch("consumers.recurring_charge_detection_consumer.batch_create_patterns_in_db", return_value=0)
+def test_backfill_resumes_from_checkpoint(mock_batch_create, tmp_path):
+    """Finished users are skipped and failed users are retried on the next run"""
+    consumer = RecurringChargeDetectionConsumer()
+    consumer._generate_predictions = Mock(return_value=0)
+    checkpoint = tmp_path / "backfill.checkpoint"
+    checkpoint.write_text(json.dumps({"userId": "user-1", "patternsSaved": 0}) + "\n" + '{"userId": "us')
+    
+    def detect(user_id, *args):
+        if user_id == "user-3":
+            raise RuntimeError("throttled")
+        return []
+    consumer.detect_user_patterns = Mock(side_effect=detect)
+    
+    summary = consumer.backfill(["user-1", "user-2", "user-3"], checkpoint_path=str(checkpoint), max_workers=1)
+    
+    assert summary["skipped"] == 1
+    assert summary["users"] == 1
+    assert summary["failed"] == 1
+    assert [call.args[0] for call in consumer.detect_user_patterns.call_args_list] == ["user-2", "user-3"]
+    assert not mock_batch_create.called
+    assert [json.loads(line)["userId"] for line in checkpoint.read_text().splitlines()] == ["user-1", "user-2"]
+
+
+def _stored_pattern_item(user_id):
+    """DynamoDB item of a stored pattern matching _create_test_pattern"""
+    pattern = RecurringChargePattern(**_create_test_pattern(user_id).model_dump(by_alias=False))
+    return pattern.to_dynamodb_item()
+
+
+@patch("utils.db.recurring_charges.tables")
+def test_backfill_predicts_saved_patterns(mock_tables, tmp_path):
+    """Backfill predictions reference the IDs the patterns were stored with"""
+    consumer = RecurringChargeDetectionConsumer()
+    consumer.detect_user_patterns = Mock(side_effect=lambda user_id, *args: [_create_test_pattern(user_id)])
+    mock_tables.recurring_charge_patterns.query.return_value = {"Items": []}
+    writer = mock_tables.recurring_charge_patterns.batch_writer.return_value.__enter__.return_value
+    checkpoint = tmp_path / "backfill.checkpoint"
+    
+    summary = consumer.backfill(["user-1"], checkpoint_path=str(checkpoint), max_workers=1)
+    
+    assert summary == {"users": 1, "skipped": 0, "failed": 0, "patterns": 1, "predictions": 1}
+    stored_pattern = writer.put_item.call_args.kwargs["Item"]
+    stored_prediction = mock_tables.recurring_charge_predictions.put_item.call_args.kwargs["Item"]
+    assert stored_prediction["patternId"] == stored_pattern["patternId"]
+    assert json.loads(checkpoint.read_text()) == {"userId": "user-1", "patternsSaved": 1}
+
+
+@patch("utils.db.recurring_charges.tables")
+def test_backfill_updates_known_patterns_instead_of_saving_them_again(mock_tables, tmp_path):
+    """A re-run refreshes the stored pattern with the new detection and keeps its ID and review state"""
+    consumer = RecurringChargeDetectionConsumer()
+    detected = _create_test_pattern("user-1").model_copy(update={
+        "confidence_score": Decimal("0.99"),
+        "transaction_count": 13,
+        "amount_max": Decimal("17.99"),
+        "matched_transaction_ids": [uuid.uuid4()],
+    })
+    consumer.detect_user_patterns = Mock(side_effect=lambda user_id, *args: [detected, _create_test_pattern(user_id)])
+    stored_item = _stored_pattern_item("user-1")
+    stored_item.update(status=PatternStatus.ACTIVE.value, reviewedBy="user-1", toleranceDays=5)
+    mock_tables.recurring_charge_patterns.query.return_value = {"Items": [stored_item]}
+    writer = mock_tables.recurring_charge_patterns.batch_writer.return_value.__enter__.return_value
+    
+    summary = consumer.backfill(["user-1"], checkpoint_path=str(tmp_path / "backfill.checkpoint"), max_workers=1)
+    
+    assert summary["patterns"] == 0
+    assert summary["predictions"] == 1
+    assert not writer.put_item.called
+    updated_item = mock_tables.recurring_charge_patterns.put_item.call_args.kwargs["Item"]
+    assert updated_item["patternId"] == stored_item["patternId"]
+    assert updated_item["createdAt"] == stored_item["createdAt"]
+    assert (updated_item["status"], updated_item["reviewedBy"], updated_item["toleranceDays"]) == (
+        PatternStatus.ACTIVE.value, "user-1", 5
+    )
+    assert Decimal(str(updated_item["confidenceScore"])) == Decimal("0.99")
+    assert updated_item["transactionCount"] == 13
+    assert Decimal(str(updated_item["amountMax"])) == Decimal("17.99")
+    assert updated_item["matchedTransactionIds"] == [str(detected.matched_transaction_ids[0])]
+    stored_prediction = mock_tables.recurring_charge_predictions.put_item.call_args.kwargs["Item"]
+    assert stored_prediction["patternId"] == stored_item["patternId"]
+
+
+@patch("consumers.recurring_charge_detection_consumer.list_patterns_by_user_from_db", return_value=[])
+@patch("consumers.recurring_charge_detection_consumer.batch_create_patterns_in_db")
+def test_backfill_counts_failed_saves(mock_batch_create, mock_list_patterns, tmp_path):
+    """A user whose patterns cannot be saved is failed and not checkpointed"""
+    consumer = RecurringChargeDetectionConsumer()
+    consumer._generate_predictions = Mock(return_value=0)
+    consumer.detect_user_patterns = Mock(side_effect=lambda user_id, *args: [_create_test_pattern(user_id)])
+    mock_batch_create.side_effect = [RuntimeError("throttled"), []]
+    checkpoint = tmp_path / "backfill.checkpoint"
+    
+    summary = consumer.backfill(["user-1", "user-2"], checkpoint_path=str(checkpoint), max_workers=1)
+    
+    assert summary["failed"] == 1
+    assert summary["users"] == 1
+    assert [json.loads(line)["userId"] for line in checkpoint.read_text().splitlines()] == ["user-2"]
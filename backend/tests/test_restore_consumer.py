@@ -44,7 +44,7 @@ def test_consumer_validation_pass(
     mock_get.return_value = None
 
     mock_head.return_value = {'metadata': {'userid': user_id, 'restoreid': restore_id}, 'content_length': 123}
-    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {}, 'raw': b''}
+    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {}}
     mock_schema.return_value = {'valid': True}
     mock_business.return_value = {'valid': True}
     mock_empty.return_value = {'valid': True}
@@ -83,7 +83,7 @@ def test_consumer_validation_fail_schema(
 
     mock_get.return_value = None
     mock_head.return_value = {'metadata': {'userid': user_id, 'restoreid': restore_id}, 'content_length': 123}
-    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {}, 'raw': b''}
+    mock_parse.return_value = {'manifest': {'user_id': user_id}, 'data': {}}
     mock_schema.return_value = {'valid': False, 'errors': ['bad']}
 
     resp = consumer.handler(_s3_event(bucket, key), None)
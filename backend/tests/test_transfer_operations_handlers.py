@@ -0,0 +1,147 @@
+"""
+Unit tests for transfer operations handler.
+"""
+
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from handlers import transfer_operations as ops
+
+USER_ID = "test-user-id"
+
+
+def _auth_headers(user_id=USER_ID):
+    """Helper to create authentication headers"""
+    return {
+        "headers": {"Authorization": "Bearer test"},
+        "requestContext": {
+            "authorizer": {
+                "jwt": {
+                    "claims": {
+                        "sub": user_id,
+                        "email": "test@example.com",
+                        "auth_time": "2024-01-01T00:00:00Z",
+                    }
+                }
+            }
+        },
+    }
+
+
+def _paired_event(**query):
+    return {
+        **_auth_headers(),
+        "routeKey": "GET /transfers/paired",
+        "queryStringParameters": query or None,
+    }
+
+
+class _Pair:
+    """Stand-in for a stored transaction in a pair."""
+
+    def __init__(self, transaction_id, amount, day):
+        self.transaction_id = transaction_id
+        self.amount = Decimal(amount)
+        self.date = int((datetime(2024, 1, 1) + timedelta(days=day)).timestamp() * 1000)
+
+
+def _stored_pairs(pair_count):
+    """Stored transfer pairs one day apart."""
+    return [
+        (_Pair(f"out-{i}", f"-{i + 1}.00", i), _Pair(f"in-{i}", f"{i + 1}.00", i + 1))
+        for i in range(pair_count)
+    ]
+
+
+class TestGetPairedTransfersHandler:
+    """Tests for listing stored transfer pairs."""
+
+    def test_count_only_counts_stored_links(self):
+        with patch.object(ops, "count_transfer_pairs", return_value=3000) as mock_count, \
+             patch.object(ops, "list_transfer_pairs") as mock_list:
+            resp = ops.handler(_paired_event(count_only="true", startDate="1", endDate="2"), None)
+
+        assert resp["statusCode"] == 200
+        assert json.loads(resp["body"]) == {"count": 3000}
+        mock_count.assert_called_once_with(USER_ID, 1, 2)
+        mock_list.assert_not_called()
+
+    def test_pairs_are_returned_with_date_range(self):
+        with patch.object(ops, "list_transfer_pairs", return_value=(_stored_pairs(2), None)) as mock_list, \
+             patch.object(ops, "_create_transfer_pair_response",
+                          side_effect=lambda o, i: {"out": o.transaction_id, "in": i.transaction_id}):
+            resp = ops.handler(_paired_event(startDate="1", endDate="2"), None)
+
+        body = json.loads(resp["body"])
+        assert body["pairedTransfers"] == [{"out": "out-0", "in": "in-0"}, {"out": "out-1", "in": "in-1"}]
+        assert body["count"] == 2
+        assert body["dateRange"] == {"startDate": 1, "endDate": 2}
+        assert "lastEvaluatedKey" not in body
+        kwargs = mock_list.call_args.kwargs
+        assert (kwargs["start_date_ts"], kwargs["end_date_ts"]) == (1, 2)
+        assert kwargs["limit"] is None
+
+    def test_limit_returns_one_page_with_last_evaluated_key(self):
+        start_key = {"transactionId": "out-0", "transferPairUserId": USER_ID, "date": 1}
+        next_key = {"transactionId": "out-1", "transferPairUserId": USER_ID, "date": 2}
+        with patch.object(ops, "list_transfer_pairs", return_value=(_stored_pairs(1), next_key)) as mock_list, \
+             patch.object(ops, "_create_transfer_pair_response", return_value={}):
+            resp = ops.handler(_paired_event(limit="1", lastEvaluatedKey=json.dumps(start_key)), None)
+
+        body = json.loads(resp["body"])
+        assert body["count"] == 1
+        assert body["lastEvaluatedKey"] == next_key
+        kwargs = mock_list.call_args.kwargs
+        assert kwargs["limit"] == 1
+        assert kwargs["last_evaluated_key"] == start_key
+
+    def test_last_evaluated_key_round_trips_to_the_next_page(self):
+        next_key = {"transactionId": "out-1", "transferPairUserId": USER_ID, "date": Decimal("1704067200000")}
+        with patch.object(ops, "list_transfer_pairs", return_value=(_stored_pairs(1), next_key)), \
+             patch.object(ops, "_create_transfer_pair_response", return_value={}):
+            first = ops.handler(_paired_event(limit="1"), None)
+        returned_key = json.loads(first["body"])["lastEvaluatedKey"]
+
+        with patch.object(ops, "list_transfer_pairs", return_value=([], None)) as mock_list:
+            ops.handler(_paired_event(limit="1", lastEvaluatedKey=json.dumps(returned_key)), None)
+
+        assert mock_list.call_args.kwargs["last_evaluated_key"] == {
+            "transactionId": "out-1", "transferPairUserId": USER_ID, "date": 1704067200000
+        }
+        assert isinstance(mock_list.call_args.kwargs["last_evaluated_key"]["date"], int)
+
+    def test_invalid_limit_is_rejected(self):
+        with patch.object(ops, "list_transfer_pairs") as mock_list:
+            resp = ops.handler(_paired_event(limit="0"), None)
+
+        assert resp["statusCode"] == 400
+        mock_list.assert_not_called()
+
+
+class TestBulkMarkTransfersHandler:
+    """Tests for marking many transfer pairs."""
+
+    def test_rollups_are_marked_once_for_all_pairs(self):
+        pairs = _stored_pairs(3)
+        by_id = {tx.transaction_id: tx for pair in pairs for tx in pair}
+        event = {
+            **_auth_headers(),
+            "routeKey": "POST /transfers/bulk-mark",
+            "body": json.dumps({"transferPairs": [
+                {"outgoingTransactionId": out.transaction_id, "incomingTransactionId": inc.transaction_id}
+                for out, inc in pairs
+            ]}),
+        }
+        for tx in by_id.values():
+            tx.user_id = USER_ID
+        with patch.object(ops, "_get_and_validate_transactions",
+                          side_effect=lambda out_id, in_id, user_id: (by_id[out_id], by_id[in_id], None)), \
+             patch.object(ops.TransferDetectionService, "mark_as_transfer_pair", return_value=True) as mock_mark_pair, \
+             patch.object(ops, "mark_transaction_rollups_stale") as mock_mark_stale:
+            resp = ops.handler(event, None)
+
+        assert resp["statusCode"] == 200
+        assert all(call.kwargs["mark_rollups"] is False for call in mock_mark_pair.call_args_list)
+        mock_mark_stale.assert_called_once_with([tx for pair in pairs for tx in pair])
@@ -0,0 +1,71 @@
+"""
+Unit tests for analytics database operations.
+
+Tests cover:
+- Rollup build state and schema version
+- Flagging and collecting stale monthly rollups
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
+
+from utils.db.analytics import (
+    ROLLUP_SCHEMA_VERSION,
+    get_rollup_state,
+    mark_rollups_stale,
+    take_stale_rollups,
+)
+
+
+def _condition_failed(operation):
+    return ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}}, operation)
+
+
+@pytest.fixture
+def table():
+    with patch('utils.db.analytics.tables') as mock:
+        mock.analytics_data = MagicMock()
+        yield mock.analytics_data
+
+
+class TestRollupState:
+    """Tests for get_rollup_state."""
+
+    def test_current_schema_is_built(self, table):
+        table.get_item.return_value = {'Item': {'builtAt': 1700000000000, 'schemaVersion': ROLLUP_SCHEMA_VERSION}}
+
+        assert get_rollup_state('user123') == 1700000000000
+
+    def test_older_schema_counts_as_not_built(self, table):
+        table.get_item.return_value = {'Item': {'builtAt': 1700000000000}}
+
+        assert get_rollup_state('user123') is None
+
+
+class TestStaleRollups:
+    """Tests for mark_rollups_stale and take_stale_rollups."""
+
+    def test_mark_adds_sort_keys_to_state(self, table):
+        mark_rollups_stale('user123', [('acc-1', '2024-01'), ('acc-2', '2024-02')])
+
+        kwargs = table.update_item.call_args.kwargs
+        assert kwargs['Key'] == {'pk': 'user123#rollup', 'sk': 'state'}
+        assert kwargs['UpdateExpression'] == 'ADD staleRollups :keys'
+        assert kwargs['ExpressionAttributeValues'] == {':keys': {'2024-01#acc-1', '2024-02#acc-2'}}
+
+    def test_mark_ignored_until_rollups_are_built(self, table):
+        table.update_item.side_effect = _condition_failed('UpdateItem')
+
+        mark_rollups_stale('user123', [('acc-1', '2024-01')])
+
+    def test_take_returns_account_and_month(self, table):
+        table.update_item.return_value = {'Attributes': {'staleRollups': {'2024-02#acc-2', '2024-01#acc-1'}}}
+
+        assert take_stale_rollups('user123') == [('acc-1', '2024-01'), ('acc-2', '2024-02')]
+        assert table.update_item.call_args.kwargs['UpdateExpression'] == 'REMOVE staleRollups'
+
+    def test_take_without_stale_rollups(self, table):
+        table.update_item.side_effect = _condition_failed('UpdateItem')
+
+        assert take_stale_rollups('user123') == []
@@ -8,6 +8,8 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from unittest.mock import MagicMock, patch, call
 
+from botocore.exceptions import ClientError
+
 from utils.db.helpers import (
     # UUID conversion
     to_db_id,
@@ -18,9 +20,14 @@ from utils.db.helpers import (
     batch_delete_items,
     batch_write_items,
     batch_update_items,
+    parallel_batch_write_items,
+    grouped_update_items,
+    batch_get_items,
     # Pagination
     paginated_query,
     paginated_scan,
+    build_projection_expression,
+    with_projection,
     # Update expressions
     build_update_expression,
     build_condition_expression,
@@ -188,6 +195,170 @@ class TestBatchOperations(unittest.TestCase):
         self.assertEqual(mock_writer.put_item.call_count, 5)
 
 
+    def test_parallel_batch_write_items_chunks(self):
+        """Test parallel batch write splits items into 25-item BatchWriteItem calls."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        mock_table.meta.client.batch_write_item.return_value = {'UnprocessedItems': {}}
+        
+        items = [{'id': f'item-{i}'} for i in range(60)]
+        result = parallel_batch_write_items(mock_table, items, max_workers=3)
+        
+        self.assertEqual(result.written_count, 60)
+        self.assertEqual(result.failed_count, 0)
+        self.assertEqual(mock_table.meta.client.batch_write_item.call_count, 3)
+        chunk_sizes = sorted(
+            len(c.kwargs['RequestItems']['test-table'])
+            for c in mock_table.meta.client.batch_write_item.call_args_list
+        )
+        self.assertEqual(chunk_sizes, [10, 25, 25])
+    
+    @patch('utils.db.helpers.time.sleep')
+    def test_parallel_batch_write_items_retries_unprocessed(self, mock_sleep):
+        """Test unprocessed items are retried until written."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        items = [{'id': f'item-{i}'} for i in range(3)]
+        mock_table.meta.client.batch_write_item.side_effect = [
+            {'UnprocessedItems': {'test-table': [{'PutRequest': {'Item': items[2]}}]}},
+            {'UnprocessedItems': {}},
+        ]
+        
+        result = parallel_batch_write_items(mock_table, items)
+        
+        self.assertEqual(result.written_count, 3)
+        self.assertEqual(result.failed_count, 0)
+        self.assertEqual(result.retries_used, 1)
+        retry_call = mock_table.meta.client.batch_write_item.call_args_list[1]
+        self.assertEqual(retry_call.kwargs['RequestItems']['test-table'], [{'PutRequest': {'Item': items[2]}}])
+        mock_sleep.assert_called_once()
+    
+    @patch('utils.db.helpers.time.sleep')
+    def test_parallel_batch_write_items_reports_failures(self, mock_sleep):
+        """Test items still unprocessed after max retries are reported as failed."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        items = [{'id': 'item-0'}, {'id': 'item-1'}]
+        mock_table.meta.client.batch_write_item.return_value = {
+            'UnprocessedItems': {'test-table': [{'PutRequest': {'Item': items[1]}}]}
+        }
+        
+        result = parallel_batch_write_items(mock_table, items, max_retries=2)
+        
+        self.assertEqual(result.written_count, 1)
+        self.assertEqual(result.failed_items, [items[1]])
+        self.assertEqual(mock_table.meta.client.batch_write_item.call_count, 3)
+    
+    def test_parallel_batch_write_items_non_retryable_error(self):
+        """Test a rejected chunk is reported as failed without retrying."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        mock_table.meta.client.batch_write_item.side_effect = ClientError(
+            {'Error': {'Code': 'ValidationException', 'Message': 'bad item'}},
+            'BatchWriteItem'
+        )
+        items = [{'id': 'item-0'}]
+        
+        result = parallel_batch_write_items(mock_table, items)
+        
+        self.assertEqual(result.written_count, 0)
+        self.assertEqual(result.failed_items, items)
+        self.assertEqual(mock_table.meta.client.batch_write_item.call_count, 1)
+    
+    def test_batch_get_items_parallel_chunks(self):
+        """Test batch get splits keys into 100-key chunks and dedupes keys."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        mock_table.meta.client.batch_get_item.side_effect = lambda RequestItems: {
+            'Responses': {'test-table': list(RequestItems['test-table']['Keys'])}
+        }
+        keys = [{'id': f'item-{i}'} for i in range(250)] + [{'id': 'item-0'}]
+        
+        result = batch_get_items(mock_table, keys, max_workers=3)
+        
+        self.assertEqual(len(result.items), 250)
+        chunk_sizes = sorted(
+            len(c.kwargs['RequestItems']['test-table']['Keys'])
+            for c in mock_table.meta.client.batch_get_item.call_args_list
+        )
+        self.assertEqual(chunk_sizes, [50, 100, 100])
+    
+    @patch('utils.db.helpers.time.sleep')
+    def test_batch_get_items_retries_unprocessed_and_preserves_order(self, mock_sleep):
+        """Test unprocessed keys are retried and items returned in key order."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        keys = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+        mock_table.meta.client.batch_get_item.side_effect = [
+            {'Responses': {'test-table': [{'id': 'c'}, {'id': 'b'}]},
+             'UnprocessedKeys': {'test-table': {'Keys': [{'id': 'a'}]}}},
+            ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'slow'}},
+                        'BatchGetItem'),
+            {'Responses': {'test-table': [{'id': 'a'}]}},
+        ]
+        
+        result = batch_get_items(mock_table, keys, attributes=['name'], preserve_order=True)
+        
+        self.assertEqual(result.items, keys)
+        self.assertEqual(result.unprocessed_keys, [])
+        self.assertEqual(result.retries_used, 2)
+        first_request = mock_table.meta.client.batch_get_item.call_args_list[0].kwargs['RequestItems']['test-table']
+        self.assertIn('ProjectionExpression', first_request)
+        self.assertEqual(set(first_request['ExpressionAttributeNames'].values()), {'id', 'name'})
+    
+    @patch('utils.db.helpers.time.sleep')
+    def test_batch_get_items_reports_unprocessed(self, mock_sleep):
+        """Test keys still unprocessed after max retries are reported."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        mock_table.meta.client.batch_get_item.return_value = {
+            'Responses': {'test-table': []},
+            'UnprocessedKeys': {'test-table': {'Keys': [{'id': 'a'}]}}
+        }
+        
+        result = batch_get_items(mock_table, [{'id': 'a'}], max_retries=2)
+        
+        self.assertEqual(result.unprocessed_keys, [{'id': 'a'}])
+        self.assertEqual(mock_table.meta.client.batch_get_item.call_count, 3)
+    
+    def test_grouped_update_items_groups_of_100(self):
+        """Test updates are sent as TransactWriteItems groups of up to 100."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        updates = [({'id': f'item-{i}'}, {'status': 'done'}) for i in range(150)]
+        
+        result = grouped_update_items(mock_table, updates, condition_expression='attribute_exists(id)')
+        
+        self.assertEqual(result.written_count, 150)
+        calls = mock_table.meta.client.transact_write_items.call_args_list
+        self.assertEqual([len(c.kwargs['TransactItems']) for c in calls], [100, 50])
+        action = calls[0].kwargs['TransactItems'][0]['Update']
+        self.assertEqual(action['Key'], {'id': 'item-0'})
+        self.assertEqual(action['ConditionExpression'], 'attribute_exists(id)')
+        self.assertIn('#status = :status', action['UpdateExpression'])
+        mock_table.update_item.assert_not_called()
+    
+    def test_grouped_update_items_cancelled_group_falls_back(self):
+        """Test a cancelled group is retried item by item and failures reported."""
+        mock_table = MagicMock()
+        mock_table.name = 'test-table'
+        mock_table.meta.client.transact_write_items.side_effect = ClientError(
+            {'Error': {'Code': 'TransactionCanceledException', 'Message': 'cancelled'}},
+            'TransactWriteItems'
+        )
+        mock_table.update_item.side_effect = [
+            {},
+            ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'missing'}}, 'UpdateItem'),
+        ]
+        updates = [({'id': 'item-0'}, {'status': 'done'}), ({'id': 'item-1'}, {'status': 'done'})]
+        
+        result = grouped_update_items(mock_table, updates)
+        
+        self.assertEqual(result.written_count, 1)
+        self.assertEqual(result.failed_items, [{'id': 'item-1'}])
+        self.assertNotIn('TableName', mock_table.update_item.call_args.kwargs)
+
+
 # ============================================================================
 # Pagination Tests
 # ============================================================================
@@ -286,6 +457,55 @@ class TestPagination(unittest.TestCase):
         self.assertEqual(len(items), 2)
         self.assertIsNone(last_key)
         mock_table.scan.assert_called_once()
+    
+    def test_build_projection_expression_uses_placeholders(self):
+        """Test projection uses name placeholders so reserved words work."""
+        expr, names = build_projection_expression(['transactionId', 'date', 'amount'])
+        
+        self.assertEqual(expr, '#transactionId, #date, #amount')
+        self.assertEqual(names, {
+            '#transactionId': 'transactionId',
+            '#date': 'date',
+            '#amount': 'amount'
+        })
+    
+    def test_build_projection_expression_requires_attributes(self):
+        """Test projection rejects an empty attribute list."""
+        with self.assertRaises(ValueError):
+            build_projection_expression([])
+    
+    def test_with_projection_merges_attribute_names(self):
+        """Test existing attribute names are kept and params are not mutated."""
+        params = {
+            'KeyConditionExpression': '#s = :s',
+            'ExpressionAttributeNames': {'#s': 'status'}
+        }
+        
+        projected = with_projection(params, ['date'])
+        
+        self.assertEqual(projected['ProjectionExpression'], '#date')
+        self.assertEqual(projected['ExpressionAttributeNames'], {'#s': 'status', '#date': 'date'})
+        self.assertNotIn('ProjectionExpression', params)
+        self.assertIs(with_projection(params, None), params)
+    
+    def test_paginated_query_with_projection(self):
+        """Test paginated query sends the projection on every page."""
+        mock_table = MagicMock()
+        mock_table.query.side_effect = [
+            {'Items': [{'date': 1}], 'LastEvaluatedKey': {'id': 'item-1'}},
+            {'Items': [{'date': 2}]}
+        ]
+        
+        items, _ = paginated_query(
+            mock_table,
+            {'KeyConditionExpression': 'userId = :userId'},
+            projection=['date']
+        )
+        
+        self.assertEqual(items, [{'date': 1}, {'date': 2}])
+        for query_call in mock_table.query.call_args_list:
+            self.assertEqual(query_call.kwargs['ProjectionExpression'], '#date')
+            self.assertEqual(query_call.kwargs['ExpressionAttributeNames'], {'#date': 'date'})
 
 
 # ============================================================================
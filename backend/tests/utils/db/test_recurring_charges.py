@@ -467,13 +467,16 @@ class TestBatchCreatePatternsInDB:
         
         result = batch_create_patterns_in_db(pattern_creates)
         
-        assert result == 10
+        assert len(result) == 10
+        assert all(isinstance(pattern, RecurringChargePattern) for pattern in result)
+        assert [pattern.merchant_pattern for pattern in result] == [f"MERCHANT{i}" for i in range(10)]
+        assert mock_writer.put_item.call_args_list[0].kwargs['Item']['patternId'] == str(result[0].pattern_id)
         assert mock_writer.put_item.call_count == 10
 
     def test_batch_create_empty_list(self, mock_tables):
-        """Test batch creating with empty list returns 0."""
+        """Test batch creating with empty list returns no patterns."""
         result = batch_create_patterns_in_db([])
-        assert result == 0
+        assert result == []
 
     def test_batch_create_large_batch(self, mock_tables):
         """Test batch creating more than 25 items (DynamoDB limit)."""
@@ -502,7 +505,7 @@ class TestBatchCreatePatternsInDB:
         
         result = batch_create_patterns_in_db(pattern_creates)
         
-        assert result == 50
+        assert len(result) == 50
         assert mock_writer.put_item.call_count == 50
 
 
@@ -0,0 +1,404 @@
+"""
+Unit tests for transaction database operations.
+
+Tests cover:
+- Streaming reads (iter_user_transactions)
+- Per-key index queries merged by date (iter_user_transactions_by_key)
+- Month segmentation of date ranges
+- Projected summary reads
+- Category write-back and rollup staleness
+- Stored transfer pair listing
+- User transaction date range
+"""
+
+import pytest
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from models.transaction import Transaction, TransactionSummary, TRANSACTION_SUMMARY_ATTRIBUTES
+from utils.db.transactions import (
+    get_transactions_by_ids,
+    get_user_transaction_date_range,
+    iter_user_transactions,
+    iter_user_transactions_by_key,
+    list_transfer_pairs,
+    count_transfer_pairs,
+    update_transaction,
+    update_transaction_categories,
+    _month_segments,
+    _transfer_pair_key_condition,
+)
+
+
+def _ts(year, month, day):
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _item(date_ts, description="TEST"):
+    return {
+        'userId': 'user123',
+        'fileId': str(uuid.uuid4()),
+        'transactionId': str(uuid.uuid4()),
+        'accountId': str(uuid.uuid4()),
+        'date': Decimal(date_ts),
+        'description': description,
+        'amount': Decimal('-10.00'),
+    }
+
+
+def _query_by_segment_start(**kwargs):
+    """Return one item dated at the start of the queried date range."""
+    date_condition = kwargs['KeyConditionExpression'].get_expression()['values'][1]
+    segment_start = date_condition.get_expression()['values'][1]
+    return {'Items': [_item(segment_start)]}
+
+
+@pytest.fixture
+def mock_tables():
+    """Mock DynamoDB tables."""
+    with patch('utils.db.transactions.tables') as mock:
+        mock.transactions = MagicMock()
+        yield mock
+
+
+class TestMonthSegments:
+    """Tests for _month_segments."""
+
+    def test_single_month(self):
+        start, end = _ts(2024, 3, 5), _ts(2024, 3, 20)
+        assert _month_segments(start, end) == [(start, end)]
+
+    def test_spans_year_boundary(self):
+        start, end = _ts(2023, 11, 15), _ts(2024, 1, 10)
+        segments = _month_segments(start, end)
+
+        assert segments == [
+            (start, _ts(2023, 12, 1) - 1),
+            (_ts(2023, 12, 1), _ts(2024, 1, 1) - 1),
+            (_ts(2024, 1, 1), end),
+        ]
+
+
+class TestIterUserTransactions:
+    """Tests for iter_user_transactions."""
+
+    def test_follows_pagination_past_empty_filtered_pages(self, mock_tables):
+        """An empty page with a LastEvaluatedKey must not end the stream."""
+        mock_tables.transactions.query.side_effect = [
+            {'Items': [_item(_ts(2024, 1, 1))], 'LastEvaluatedKey': {'k': 1}},
+            {'Items': [], 'LastEvaluatedKey': {'k': 2}},
+            {'Items': [_item(_ts(2024, 1, 2))]},
+        ]
+
+        result = list(iter_user_transactions('user123', uncategorized_only=True))
+
+        assert len(result) == 2
+        assert all(isinstance(tx, Transaction) for tx in result)
+        calls = mock_tables.transactions.query.call_args_list
+        assert len(calls) == 3
+        assert 'ExclusiveStartKey' not in calls[0].kwargs
+        assert calls[2].kwargs['ExclusiveStartKey'] == {'k': 2}
+
+    def test_long_range_is_fetched_in_month_segments_in_order(self, mock_tables):
+        """Segments are queried separately and yielded in date order."""
+        start, end = _ts(2024, 1, 1), _ts(2024, 3, 31)
+        segments = _month_segments(start, end)
+        mock_tables.transactions.query.side_effect = _query_by_segment_start
+
+        result = list(iter_user_transactions(
+            'user123', start_date_ts=start, end_date_ts=end, max_workers=2
+        ))
+
+        assert mock_tables.transactions.query.call_count == len(segments) == 3
+        assert [tx.date for tx in result] == [segment[0] for segment in segments]
+
+    def test_descending_order_reverses_segments(self, mock_tables):
+        start, end = _ts(2024, 1, 1), _ts(2024, 2, 29)
+        mock_tables.transactions.query.side_effect = _query_by_segment_start
+
+        result = list(iter_user_transactions(
+            'user123', start_date_ts=start, end_date_ts=end, sort_order_date='desc'
+        ))
+
+        assert [tx.date for tx in result] == [_ts(2024, 2, 1), start]
+
+    def test_projection_and_transform(self, mock_tables):
+        """A projection is sent with the query and items go through the transform."""
+        mock_tables.transactions.query.return_value = {'Items': [_item(_ts(2024, 1, 1))]}
+
+        result = list(iter_user_transactions(
+            'user123',
+            projection=TRANSACTION_SUMMARY_ATTRIBUTES,
+            transform=TransactionSummary.from_dynamodb_item
+        ))
+
+        assert len(result) == 1
+        assert isinstance(result[0], TransactionSummary)
+        query_kwargs = mock_tables.transactions.query.call_args.kwargs
+        assert query_kwargs['ProjectionExpression'].split(', ') == [
+            f"#{attribute}" for attribute in TRANSACTION_SUMMARY_ATTRIBUTES
+        ]
+        assert query_kwargs['ExpressionAttributeNames']['#date'] == 'date'
+
+
+class TestIterUserTransactionsByKey:
+    """Tests for iter_user_transactions_by_key."""
+
+    def test_queries_each_account_and_merges_by_date(self, mock_tables):
+        account_a, account_b = uuid.uuid4(), uuid.uuid4()
+        dates = {
+            str(account_a): [_ts(2024, 3, 10), _ts(2024, 1, 5)],
+            str(account_b): [_ts(2024, 2, 20)],
+        }
+
+        def query(**kwargs):
+            account_id = kwargs['KeyConditionExpression'].get_expression()['values'][1]
+            return {'Items': [_item(date) for date in dates[account_id]]}
+
+        mock_tables.transactions.query.side_effect = query
+
+        result = list(iter_user_transactions_by_key(
+            'user123', account_ids=[account_a, account_b], sort_order_date='desc'
+        ))
+
+        assert [tx.date for tx in result] == [_ts(2024, 3, 10), _ts(2024, 2, 20), _ts(2024, 1, 5)]
+        calls = mock_tables.transactions.query.call_args_list
+        assert [call.kwargs['IndexName'] for call in calls] == ['AccountDateIndex', 'AccountDateIndex']
+
+    def test_categories_without_accounts_use_category_index(self, mock_tables):
+        mock_tables.transactions.query.return_value = {'Items': []}
+
+        list(iter_user_transactions_by_key(
+            'user123', start_date_ts=_ts(2024, 1, 1), end_date_ts=_ts(2024, 1, 31),
+            category_ids=['cat-1', 'cat-2']
+        ))
+
+        calls = mock_tables.transactions.query.call_args_list
+        assert [call.kwargs['IndexName'] for call in calls] == ['CategoryDateIndex', 'CategoryDateIndex']
+        assert all(call.kwargs['KeyConditionExpression'].get_expression()['operator'] == 'AND' for call in calls)
+
+    def test_without_keys_queries_user_index(self, mock_tables):
+        mock_tables.transactions.query.return_value = {'Items': [_item(_ts(2024, 1, 1))]}
+
+        result = list(iter_user_transactions_by_key('user123'))
+
+        assert len(result) == 1
+        assert mock_tables.transactions.query.call_args.kwargs['IndexName'] == 'UserIdIndex'
+
+
+class TestGetTransactionsByIds:
+    """Tests for get_transactions_by_ids."""
+
+    @patch('utils.db.helpers.time.sleep')
+    def test_retries_unprocessed_keys(self, mock_sleep, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        first, second = _item(_ts(2024, 1, 1)), _item(_ts(2024, 1, 2))
+        unprocessed = {'transactions': {'Keys': [{'transactionId': second['transactionId']}]}}
+        table.meta.client.batch_get_item.side_effect = [
+            {'Responses': {'transactions': [first]}, 'UnprocessedKeys': unprocessed},
+            {'Responses': {'transactions': [second]}, 'UnprocessedKeys': {}},
+        ]
+
+        transactions = get_transactions_by_ids([first['transactionId'], second['transactionId']], 'user123')
+
+        assert {str(t.transaction_id) for t in transactions} == {first['transactionId'], second['transactionId']}
+        assert table.meta.client.batch_get_item.call_args_list[1].kwargs['RequestItems'] == unprocessed
+        mock_sleep.assert_called_once()
+
+    def test_preserves_input_order(self, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        items = [_item(_ts(2024, 1, day)) for day in range(1, 4)]
+        table.meta.client.batch_get_item.return_value = {'Responses': {'transactions': items[::-1]}}
+
+        transactions = get_transactions_by_ids([i['transactionId'] for i in items], 'user123', preserve_order=True)
+
+        assert [str(t.transaction_id) for t in transactions] == [i['transactionId'] for i in items]
+
+    def test_excludes_other_users_transactions(self, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        other = dict(_item(_ts(2024, 1, 1)), userId='other-user')
+        table.meta.client.batch_get_item.return_value = {'Responses': {'transactions': [other]}}
+
+        assert get_transactions_by_ids([other['transactionId']], 'user123') == []
+
+
+class TestUpdateTransactionCategories:
+    """Tests for update_transaction_categories."""
+
+    def test_updates_only_category_attributes(self, mock_tables):
+        transaction = Transaction.from_dynamodb_item(_item(_ts(2024, 1, 1)))
+        category_id = uuid.uuid4()
+        transaction.add_category_suggestion(category_id=category_id, confidence=90, rule_id='rule_1')
+
+        with patch('utils.db.transactions.grouped_update_items') as mock_update:
+            update_transaction_categories([transaction])
+
+        _, updates = mock_update.call_args.args
+        key, attributes = updates[0]
+        assert key == {'transactionId': str(transaction.transaction_id)}
+        assert set(attributes) == {'categories', 'updatedAt'}
+        assert attributes['categories'][0]['categoryId'] == str(category_id)
+        assert attributes['updatedAt'] == transaction.updated_at
+
+    def test_marks_analytics_rollups_stale(self, mock_tables):
+        transactions = [Transaction.from_dynamodb_item(_item(_ts(2024, 1, day))) for day in (5, 31)]
+
+        with patch('utils.db.transactions.grouped_update_items'), \
+             patch('utils.db.transactions.mark_rollups_stale') as mock_mark:
+            update_transaction_categories(transactions)
+
+        mock_mark.assert_called_once_with('user123', {
+            (str(transaction.account_id), '2024-01') for transaction in transactions
+        })
+
+    def test_single_update_leaves_rollups_to_caller(self, mock_tables):
+        transaction = Transaction.from_dynamodb_item(_item(_ts(2024, 1, 5)))
+
+        with patch('utils.db.transactions.mark_rollups_stale') as mock_mark:
+            update_transaction(transaction)
+
+        mock_tables.transactions.put_item.assert_called_once()
+        mock_mark.assert_not_called()
+
+    def test_rollup_marking_failure_does_not_fail_write(self, mock_tables):
+        transaction = Transaction.from_dynamodb_item(_item(_ts(2024, 1, 5)))
+
+        with patch('utils.db.transactions.grouped_update_items') as mock_update, \
+             patch('utils.db.transactions.mark_rollups_stale', side_effect=RuntimeError('throttled')):
+            assert update_transaction_categories([transaction]) is mock_update.return_value
+
+
+def _pair_items(day):
+    """Outgoing and incoming items linked to each other."""
+    outgoing = _item(_ts(2024, 1, day))
+    incoming = dict(_item(_ts(2024, 1, day + 1)), amount=Decimal('10.00'))
+    outgoing['pairedTransactionId'] = incoming['transactionId']
+    incoming['pairedTransactionId'] = outgoing['transactionId']
+    return outgoing, incoming
+
+
+class TestListTransferPairs:
+    """Tests for list_transfer_pairs."""
+
+    def test_queries_one_page_and_loads_incoming_sides(self, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        pairs = [_pair_items(1), _pair_items(5)]
+        table.query.return_value = {
+            'Items': [outgoing for outgoing, _ in pairs],
+            'LastEvaluatedKey': {'transactionId': 'next'}
+        }
+        table.meta.client.batch_get_item.return_value = {
+            'Responses': {'transactions': [incoming for _, incoming in pairs]}
+        }
+
+        result, last_key = list_transfer_pairs('user123', limit=2, start_date_ts=1, end_date_ts=2)
+
+        assert [(str(o.transaction_id), str(i.transaction_id)) for o, i in result] == [
+            (o['transactionId'], i['transactionId']) for o, i in pairs
+        ]
+        assert last_key == {'transactionId': 'next'}
+        query_kwargs = table.query.call_args.kwargs
+        assert query_kwargs['IndexName'] == 'TransferPairIndex'
+        assert query_kwargs['Limit'] == 2
+        assert query_kwargs['ScanIndexForward'] is False
+        table.query.assert_called_once()
+
+    def test_skips_links_that_do_not_point_back(self, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        outgoing, incoming = _pair_items(1)
+        incoming['pairedTransactionId'] = str(uuid.uuid4())
+        table.query.return_value = {'Items': [outgoing]}
+        table.meta.client.batch_get_item.return_value = {'Responses': {'transactions': [incoming]}}
+
+        result, last_key = list_transfer_pairs('user123')
+
+        assert result == []
+        assert last_key is None
+
+    def test_without_limit_follows_every_page(self, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        first, second = _pair_items(1), _pair_items(5)
+        table.query.side_effect = [
+            {'Items': [first[0]], 'LastEvaluatedKey': {'transactionId': 'next'}},
+            {'Items': [second[0]]},
+        ]
+        table.meta.client.batch_get_item.return_value = {
+            'Responses': {'transactions': [first[1], second[1]]}
+        }
+
+        result, last_key = list_transfer_pairs('user123', limit=None)
+
+        assert len(result) == 2
+        assert last_key is None
+        assert 'Limit' not in table.query.call_args_list[0].kwargs
+
+
+
+class TestCountTransferPairs:
+    """Tests for count_transfer_pairs."""
+
+    def test_counts_only_pairs_that_link_back_in_date_range(self, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        valid, stale = _pair_items(1), _pair_items(5)
+        stale[1]['pairedTransactionId'] = str(uuid.uuid4())
+        table.query.side_effect = [
+            {'Items': [valid[0]], 'LastEvaluatedKey': {'transactionId': 'next'}},
+            {'Items': [stale[0]]},
+        ]
+        table.meta.client.batch_get_item.return_value = {
+            'Responses': {'transactions': [valid[1], stale[1]]}
+        }
+
+        assert count_transfer_pairs('user123', start_date_ts=1, end_date_ts=2) == 1
+        query_kwargs = table.query.call_args_list[0].kwargs
+        assert query_kwargs['IndexName'] == 'TransferPairIndex'
+        assert query_kwargs['ProjectionExpression'] == 'transactionId, pairedTransactionId'
+        assert query_kwargs['KeyConditionExpression'] == _transfer_pair_key_condition('user123', 1, 2)
+        request = table.meta.client.batch_get_item.call_args.kwargs['RequestItems']['transactions']
+        assert set(request['ExpressionAttributeNames'].values()) == {'transactionId', 'userId', 'pairedTransactionId'}
+
+    def test_other_users_incoming_sides_are_not_counted(self, mock_tables):
+        table = mock_tables.transactions
+        table.name = 'transactions'
+        outgoing, incoming = _pair_items(1)
+        table.query.return_value = {'Items': [outgoing]}
+        table.meta.client.batch_get_item.return_value = {
+            'Responses': {'transactions': [dict(incoming, userId='someone-else')]}
+        }
+
+        assert count_transfer_pairs('user123') == 0
+
+    def test_no_links(self, mock_tables):
+        mock_tables.transactions.query.return_value = {'Items': []}
+
+        assert count_transfer_pairs('user123') == 0
+        mock_tables.transactions.meta.client.batch_get_item.assert_not_called()
+
+class TestGetUserTransactionDateRange:
+    """Tests for get_user_transaction_date_range."""
+
+    def test_returns_earliest_and_latest_dates(self, mock_tables):
+        table = mock_tables.transactions
+        table.query.side_effect = [
+            {'Items': [{'date': Decimal(_ts(2022, 3, 1))}]},
+            {'Items': [{'date': Decimal(_ts(2024, 6, 30))}]},
+        ]
+
+        assert get_user_transaction_date_range('user123') == (_ts(2022, 3, 1), _ts(2024, 6, 30))
+        directions = [call.kwargs['ScanIndexForward'] for call in table.query.call_args_list]
+        assert directions == [True, False]
+        assert all(call.kwargs['Limit'] == 1 for call in table.query.call_args_list)
+
+    def test_user_without_transactions(self, mock_tables):
+        mock_tables.transactions.query.return_value = {'Items': []}
+
+        assert get_user_transaction_date_range('user123') == (None, None)
@@ -0,0 +1,227 @@
+"""
+Unit tests for the streaming transaction parser.
+
+Tests cover:
+- Incremental decoding and chunked CSV preprocessing matching whole-file processing
+- Date format and order detection from streamed rows
+- Running balances and import order for ascending and descending files
+- Compiled date parsers and the date format stored on the file map
+"""
+
+import random
+import uuid
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from models.file_map import FieldMapping, FileMap, FileMapUpdate
+from models.transaction_file import FileFormat, TransactionFile
+from utils import transaction_parser_new as parser
+from utils.transaction_parser_new import (
+    DATE_FORMATS,
+    compile_date_parser,
+    date_shape,
+    determine_date_format,
+    determine_date_format_from_counts,
+    determine_dates_and_order,
+    formats_for_shape,
+    iter_text_lines,
+    parse_transactions,
+    preprocess_csv_lines,
+    preprocess_csv_text,
+)
+
+USER_ID = 'test-user-id'
+
+CSV_FILE_MAP = FileMap(userId=USER_ID, name='CSV', mappings=[
+    FieldMapping(sourceField='Date', targetField='date'),
+    FieldMapping(sourceField='Description', targetField='description'),
+    FieldMapping(sourceField='Amount', targetField='amount'),
+])
+
+
+def _transaction_file(file_format=FileFormat.CSV, opening_balance=None):
+    return TransactionFile(
+        userId=USER_ID,
+        fileName='statement',
+        fileSize=1,
+        s3Key='key',
+        fileFormat=file_format,
+        accountId=uuid.uuid4(),
+        fileMapId=uuid.uuid4(),
+        openingBalance=opening_balance,
+    )
+
+
+def _parse(content: str, file_format=FileFormat.CSV, file_map=CSV_FILE_MAP, opening_balance=None):
+    with patch.object(parser, 'checked_mandatory_file_map', return_value=file_map.model_copy()) as mock_file_map, \
+         patch.object(parser, 'update_file_map_date_format'):
+        transactions = parse_transactions(_transaction_file(file_format, opening_balance), content.encode('utf-8'))
+    mock_file_map.assert_called_once()
+    return transactions
+
+
+class TestStreamingCsv:
+    """Tests for incremental decoding and chunked preprocessing."""
+
+    def test_iter_text_lines_matches_splitlines(self):
+        text = 'a,b\r\nc\x0cd\re\n\nf g\nlast'
+        assert list(iter_text_lines(text.encode('utf-8'))) == text.splitlines()
+
+    @pytest.mark.parametrize('chunk_lines', [1, 2, 3, 1000])
+    def test_chunked_preprocessing_matches_whole_file(self, chunk_lines):
+        text = '\n'.join([
+            'Date,Description,Amount,',
+            '2024-01-01,TESCO, LONDON,-1.00,',
+            '2024-01-02,PLAIN,2.00',
+            '2024-01-03,A, B, C,3.00,,',
+            '2024-01-04,"QUOTED, DESC",4.00',
+        ])
+        with patch.object(parser, 'CSV_PREPROCESS_CHUNK_LINES', chunk_lines):
+            lines = list(preprocess_csv_lines(text.splitlines()))
+        assert lines == preprocess_csv_text(text).splitlines()
+
+    def test_blank_line_is_rejected(self):
+        with pytest.raises(ValueError, match='different number of lines'):
+            list(preprocess_csv_lines(['Date,Description,Amount', '2024-01-01,A,1', '', '2024-01-02,B,2']))
+
+    def test_quoted_field_spanning_lines(self):
+        transactions = _parse('Date,Description,Amount\n2024-01-02,"TWO\nLINES",1.00\n2024-01-01,NEXT,2.00')
+        assert [t.description for t in transactions] == ['TWO\nLINES', 'NEXT']
+
+
+class TestDateDetection:
+    """Tests for date format and order detection on streamed rows."""
+
+    def test_counts_agree_with_date_list(self):
+        dates = ['01/02/2024'] * 95 + ['13/13/2024'] * 5
+        assert determine_date_format_from_counts(Counter(dates)) == determine_date_format(dates) == '%m/%d/%Y'
+
+    def test_order_from_first_differing_date(self):
+        rows = iter([{'date': '2024-03-01'}, {'date': ''}, {'date': '2024-03-01'},
+                     {'date': '2024-02-01'}, {'date': '2024-05-01'}])
+        date_info = determine_dates_and_order(rows, FileFormat.CSV)
+        assert date_info.order == 'desc'
+        assert date_info.format_string == '%Y-%m-%d'
+        assert date_info.sample_dates == ['2024-03-01', '2024-03-01', '2024-02-01', '2024-05-01']
+
+
+class TestParseTransactions:
+    """Tests for transaction creation from streamed rows."""
+
+    def test_ascending_file_is_created_newest_first(self):
+        transactions = _parse(
+            'Date,Description,Amount\n2024-01-01,FIRST,1.00\n2024-01-02,BAD,x\n2024-01-03,LAST,2.00',
+            opening_balance=Decimal('10')
+        )
+        assert [t.description for t in transactions] == ['LAST', 'FIRST']
+        assert [t.balance for t in transactions] == [Decimal('12.00'), Decimal('13.00')]
+        assert [t.import_order for t in transactions] == [1, 2]
+
+    def test_descending_file_keeps_row_order(self):
+        transactions = _parse('Date,Description,Amount\n2024-01-03,LAST,2.00\n2024-01-01,FIRST,1.00')
+        assert [t.description for t in transactions] == ['LAST', 'FIRST']
+        assert [t.balance for t in transactions] == [Decimal('2.00'), Decimal('3.00')]
+
+    def test_qif_is_streamed(self):
+        file_map = FileMap(userId=USER_ID, name='QIF', mappings=[
+            FieldMapping(sourceField='D', targetField='date'),
+            FieldMapping(sourceField='P', targetField='description'),
+            FieldMapping(sourceField='T', targetField='amount'),
+        ])
+        transactions = _parse('!Type:Bank\nD15/01/2024\nT12.50\nPSHOP\n^\nD16/01/2024\nT-100\nPSALARY\n^',
+                              FileFormat.QIF, file_map)
+        assert [(t.description, t.amount) for t in transactions] == [('SALARY', Decimal('100')),
+                                                                      ('SHOP', Decimal('-12.50'))]
+
+
+class TestCompiledDateParsers:
+    """Tests for compiled date parsers and shape classification."""
+
+    ALL_FORMATS = sorted({fmt for formats in DATE_FORMATS.values() for fmt in formats})
+
+    def _random_date_string(self, rng):
+        date_string = datetime(rng.randrange(1950, 2060), rng.randrange(1, 13), rng.randrange(1, 29)) \
+            .strftime(rng.choice(self.ALL_FORMATS))
+        if rng.random() < 0.5:
+            date_string = date_string.replace('0', '', 1)
+        if rng.random() < 0.3:
+            position = rng.randrange(len(date_string) + 1)
+            date_string = date_string[:position] + rng.choice("0123456789/-' x") + date_string[position:]
+        return date_string
+
+    def test_parsers_agree_with_strptime(self):
+        rng = random.Random(7)
+        for _ in range(3000):
+            date_string = self._random_date_string(rng)
+            for date_format in self.ALL_FORMATS:
+                try:
+                    expected = datetime.strptime(date_string, date_format)
+                except ValueError:
+                    expected = None
+                try:
+                    actual = compile_date_parser(date_format)(date_string)
+                except ValueError:
+                    actual = None
+                assert actual == expected, (date_string, date_format)
+
+    def test_shape_never_rules_out_a_matching_format(self):
+        rng = random.Random(11)
+        for _ in range(3000):
+            date_string = self._random_date_string(rng)
+            candidates = formats_for_shape(date_shape(date_string), self.ALL_FORMATS)
+            for date_format in set(self.ALL_FORMATS) - set(candidates):
+                with pytest.raises(ValueError):
+                    datetime.strptime(date_string, date_format)
+
+    def test_shape_rules_out_formats(self):
+        assert formats_for_shape(date_shape('20240115'), DATE_FORMATS['csv']) == ['%Y%m%d']
+        assert formats_for_shape(date_shape('15/01/2024'), DATE_FORMATS['csv']) == ['%m/%d/%Y', '%d/%m/%Y']
+
+
+class TestStoredDateFormat:
+    """Tests for reusing the date format stored on the file map."""
+
+    AMBIGUOUS_DATES = [{'date': '01/02/2024'}, {'date': '03/02/2024'}]
+
+    def test_stored_format_skips_inference(self):
+        assert determine_dates_and_order(iter(self.AMBIGUOUS_DATES), FileFormat.CSV).format_string == '%m/%d/%Y'
+
+        with patch.object(parser, 'determine_date_format_from_counts') as mock_infer:
+            date_info = determine_dates_and_order(iter(self.AMBIGUOUS_DATES), FileFormat.CSV, known_format='%d/%m/%Y')
+
+        assert date_info.format_string == '%d/%m/%Y'
+        mock_infer.assert_not_called()
+
+    def test_stale_stored_format_is_inferred_again(self):
+        date_info = determine_dates_and_order(iter(self.AMBIGUOUS_DATES), FileFormat.CSV, known_format='%Y-%m-%d')
+        assert date_info.format_string == '%m/%d/%Y'
+
+    def test_stored_format_missing_any_date_is_inferred_again(self):
+        dates = [{'date': '01/02/2024'}] * 10 + [{'date': '13/02/2024'}]
+
+        date_info = determine_dates_and_order(iter(dates), FileFormat.CSV, known_format='%m/%d/%Y')
+
+        assert date_info.format_string == '%d/%m/%Y'
+
+    def test_inferred_format_is_stored_once(self):
+        file_map = CSV_FILE_MAP.model_copy()
+        content = b'Date,Description,Amount\n2024-01-02,A,1.00\n2024-01-01,B,2.00'
+
+        with patch.object(parser, 'checked_mandatory_file_map', return_value=file_map), \
+             patch.object(parser, 'update_file_map_date_format') as mock_store:
+            parse_transactions(_transaction_file(), content)
+            parse_transactions(_transaction_file(), content)
+
+        mock_store.assert_called_once_with(file_map.file_map_id, '%Y-%m-%d')
+        assert file_map.date_format == '%Y-%m-%d'
+
+    def test_changing_mappings_clears_stored_format(self):
+        file_map = CSV_FILE_MAP.model_copy(update={'date_format': '%Y-%m-%d'})
+
+        file_map.update_with_data(FileMapUpdate(mappings=[FieldMapping(sourceField='Posted', targetField='date')]))
+
+        assert file_map.date_format is None
@@ -77,6 +77,12 @@ resource "aws_dynamodb_table" "transactions" {
     type = "S"
   }
 
+  # Set only on the outgoing side of a linked transfer pair
+  attribute {
+    name = "transferPairUserId"
+    type = "S"
+  }
+
   # GSI to query transactions by file ID
   global_secondary_index {
     name            = "FileIdIndex"
@@ -179,6 +185,14 @@ resource "aws_dynamodb_table" "transactions" {
     projection_type = "ALL"
   }
 
+  # Sparse GSI to page through stored transfer pairs by date
+  global_secondary_index {
+    name            = "TransferPairIndex"
+    hash_key        = "transferPairUserId"
+    range_key       = "date"
+    projection_type = "ALL"
+  }
+
   tags = {
     Environment = var.environment
     Project     = var.project_name
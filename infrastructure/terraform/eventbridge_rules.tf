@@ -46,6 +46,11 @@ resource "aws_cloudwatch_event_rule" "analytics_events" {
         # File deletion events - all of them
         source = ["file.service"]
         detail-type = ["file.deletion.requested"]
+      },
+      {
+        # Completed file deletions - rollups of the file's account are rebuilt
+        source = ["deletion.executor"]
+        detail-type = ["file.deleted"]
       }
     ]
   })
@@ -113,6 +118,11 @@ resource "aws_cloudwatch_event_rule" "categorization_events" {
         # File deletion events from file service
         source = ["file.service"]
         detail-type = ["file.deletion.requested"]
+      },
+      {
+        # New category rules invalidate the consumer's compiled rule cache
+        source = ["category.service"]
+        detail-type = ["category.rule_created"]
       }
     ]
   })
@@ -290,6 +290,9 @@ resource "aws_lambda_function" "analytics_operations" {
   source_code_hash = base64encode(local.source_code_hash)
   depends_on       = [null_resource.prepare_lambda]
 
+  # NumPy for the columnar analytics backend
+  layers = [aws_lambda_layer_version.ml_dependencies.arn]
+
   environment {
     variables = {
       ENVIRONMENT            = var.environment
@@ -616,6 +619,9 @@ resource "aws_lambda_function" "analytics_processor" {
   source_code_hash = base64encode(local.source_code_hash)
   depends_on       = [null_resource.prepare_lambda]
 
+  # NumPy for the columnar analytics backend
+  layers = [aws_lambda_layer_version.ml_dependencies.arn]
+
   environment {
     variables = {
       ENVIRONMENT            = var.environment
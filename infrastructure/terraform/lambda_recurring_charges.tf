@@ -88,6 +88,7 @@ resource "aws_lambda_function" "recurring_charge_detection_consumer" {
       FILE_MAPS_TABLE                  = aws_dynamodb_table.file_maps.name
       FZIP_JOBS_TABLE                  = aws_dynamodb_table.fzip_jobs.name
       EVENTS_TABLE                     = aws_dynamodb_table.event_store.name
+      FILE_STORAGE_BUCKET              = aws_s3_bucket.file_storage.id
     }
   }
 
@@ -120,8 +121,27 @@ resource "aws_cloudwatch_event_rule" "recurring_charge_detection_events" {
   event_bus_name = aws_cloudwatch_event_bus.app_events.name
 
   event_pattern = jsonencode({
-    source      = ["recurring_charge.service"]
-    detail-type = ["recurring_charge.detection.requested"]
+    "$or" : [
+      {
+        source      = ["recurring_charge.service"]
+        detail-type = ["recurring_charge.detection.requested"]
+      },
+      {
+        # New transactions from file uploads are scored incrementally
+        source      = ["transaction.service"]
+        detail-type = ["file.processed"]
+        detail = {
+          data = {
+            processingStatus = ["success"]
+            transactionCount = [
+              {
+                "numeric" : [">", 0]
+              }
+            ]
+          }
+        }
+      }
+    ]
   })
 
   tags = {